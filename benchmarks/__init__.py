@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           CPU timing benchmarks of neodroidvision hot paths, run from the repository root,
+           e.g. python -m benchmarks.ssd_priors_benchmark
+
+           The suite in hot_paths runs through the runner, writing json results and failing on
+           regressions against a baseline, python -m benchmarks.runner --help
+           """
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Startup time and peak resident memory of restoring the weights of a model for
+           inference, from a torch pickle and from a checkpoint archive holding the model, the
+           optimizer state (momentum) and the scheduler, each measured in a fresh process
+
+           python -m benchmarks.checkpoint_loading_benchmark
+           """
+
+import multiprocessing
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import torch
+
+from neodroidvision.utilities import CheckPointer
+
+
+def make_model(width: int) -> torch.nn.Module:
+    torch.manual_seed(0)
+    return torch.nn.Sequential(
+        *[torch.nn.Conv2d(width, width, 3, padding=1) for _ in range(8)]
+    )
+
+
+def load_weights(path: str, width: int) -> tuple:
+    model = make_model(width)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    CheckPointer(model, save_dir=Path(path).parent).load(
+        path, use_latest=False, keys=("model",)
+    )
+    elapsed = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, (after - before) / 2 ** 10
+
+
+def benchmark_checkpoint_loading(width: int = 512) -> None:
+    """
+
+:param width: channels of the convolutions, 512 is ~75 MB of weights
+:return:
+"""
+    model = make_model(width)
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.1, momentum=0.9)
+    model(torch.randn(1, width, 4, 4)).sum().backward()
+    optimizer.step()
+    num_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+    print(f"weights {num_bytes / 2 ** 20:.1f} MB")
+    print(f'{"format":>10}{"file MB":>10}{"load s":>10}{"peak MB over model":>20}')
+    with tempfile.TemporaryDirectory() as directory:
+        for archive in (False, True):
+            CheckPointer(
+                model, optimizer, None, Path(directory), True, archive=archive
+            ).save("model")
+            path = Path(directory) / "model.pth"
+            with ProcessPoolExecutor(
+                1, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                elapsed, peak = pool.submit(load_weights, str(path), width).result()
+            print(
+                f"{'archive' if archive else 'torch':>10}"
+                f"{path.stat().st_size / 2 ** 20:>10.1f}{elapsed:>10.3f}{peak:>20.1f}"
+            )
+
+
+if __name__ == "__main__":
+    benchmark_checkpoint_loading()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Synthetic inputs shared by the tests and the benchmarks, importing this module does not
+           import pytest or the test modules, synthetic datasets on disk are written by
+           neodroidvision.data.synthetic_datasets
+           """
+
+import contextlib
+import copy
+import io
+from collections import defaultdict
+from itertools import product
+from math import sqrt
+
+import numpy
+import pycocotools.mask
+import torch
+from PIL import Image
+from pycocotools.coco import COCO
+from torch import nn
+
+from neodroidvision.data.image_decoding import available_image_decoders
+from neodroidvision.detection.single_stage.ssd.architecture.nms_box_heads import (
+    SSDNmsBoxHead,
+)
+
+PRIORS_300 = dict(
+    image_size=300,
+    feature_maps=(38, 19, 10, 5, 3, 1),
+    strides=(8, 16, 32, 64, 100, 300),
+    min_sizes=(30, 60, 111, 162, 213, 264),
+    max_sizes=(60, 111, 162, 213, 264, 315),
+    aspect_ratios=((2,), (2, 3), (2, 3), (2, 3), (2,), (2,)),
+    boxes_per_location=(4, 6, 6, 6, 4, 4),
+    clip=True,
+)
+
+PRIORS_512 = dict(
+    image_size=512,
+    feature_maps=(64, 32, 16, 8, 4, 2, 1),
+    strides=(8, 16, 32, 64, 128, 256, 512),
+    min_sizes=(35.84, 76.8, 153.6, 230.4, 307.2, 384.0, 460.8),
+    max_sizes=(76.8, 153.6, 230.4, 307.2, 384.0, 460.8, 537.65),
+    aspect_ratios=((2,), (2, 3), (2, 3), (2, 3), (2, 3), (2,), (2,)),
+    boxes_per_location=(4, 6, 6, 6, 6, 4, 4),
+    clip=True,
+)
+
+
+def build_priors_loop(
+    *,
+    image_size,
+    feature_maps,
+    min_sizes,
+    max_sizes,
+    strides,
+    aspect_ratios,
+    clip=True,
+    **kwargs,
+) -> torch.Tensor:
+    """
+The original per location implementation, kept as reference
+"""
+    priors = []
+    for k, f in enumerate(feature_maps):
+        scale = image_size / strides[k]
+        small_hw = min_sizes[k] / image_size
+        big_hw = sqrt(min_sizes[k] * max_sizes[k]) / image_size
+
+        for i, j in product(range(f), repeat=2):
+            cx = (j + 0.5) / scale
+            cy = (i + 0.5) / scale
+            h = w = small_hw
+            priors.append([cx, cy, w, h])
+            h = w = big_hw
+            priors.append([cx, cy, w, h])
+            h = w = small_hw
+            for ratio in aspect_ratios[k]:
+                ratio_sq = sqrt(ratio)
+                priors.append([cx, cy, w * ratio_sq, h / ratio_sq])
+                priors.append([cx, cy, w / ratio_sq, h * ratio_sq])
+
+    priors_t = torch.tensor(priors)
+    if clip:
+        priors_t.clamp_(min=0, max=1)
+    return priors_t
+
+
+ENCODING_CFG = dict(
+    image_size=PRIORS_300["image_size"],
+    priors_cfg={k: v for k, v in PRIORS_300.items() if k != "image_size"},
+    center_variance=0.1,
+    size_variance=0.2,
+    iou_threshold=0.5,
+)
+
+
+def random_targets(num_targets: int, generator: torch.Generator):
+    left_top = torch.rand((num_targets, 2), generator=generator) * 0.7
+    wh = torch.rand((num_targets, 2), generator=generator) * 0.3 + 0.01
+    labels = torch.randint(1, 21, (num_targets,), generator=generator)
+    return torch.cat((left_top, left_top + wh), 1), labels
+
+
+NUM_CATEGORIES = 21
+
+
+class PassThroughPredictor(nn.Module):
+    def forward(self, features):
+        return features
+
+
+def make_head(**kws) -> SSDNmsBoxHead:
+    head_kws = dict(
+        image_size=PRIORS_300["image_size"],
+        predictor=PassThroughPredictor(),
+        confidence_threshold=0.0,
+        nms_threshold=0.45,
+        max_per_image=20,
+        center_variance=0.1,
+        size_variance=0.2,
+        max_candidates=100,
+    )
+    head_kws.update(kws)
+    head = SSDNmsBoxHead(**head_kws)
+    head.post_init(**{k: v for k, v in PRIORS_300.items() if k != "image_size"})
+    return head
+
+
+def random_features(batch_size: int, seed: int = 0):
+    g = torch.Generator().manual_seed(seed)
+    logits = torch.randn((batch_size, 8732, NUM_CATEGORIES), generator=g) * 3
+    locations = torch.randn((batch_size, 8732, 4), generator=g) * 0.5
+    return logits, locations
+
+
+COCO_IMAGE_SIZE = 160
+
+
+def synthetic_coco(
+    num_images: int = 40, num_categories: int = 5, seed: int = 0, segm: bool = False
+):
+    """Ground truth with crowds and all area ranges, and noisy, duplicated and spurious detections"""
+    rng = numpy.random.RandomState(seed)
+    images = [
+        dict(id=int(i), width=COCO_IMAGE_SIZE, height=COCO_IMAGE_SIZE)
+        for i in rng.permutation(num_images * 3)[:num_images] + 1
+    ]
+    categories = [
+        dict(id=int(c), name=str(c)) for c in (1, 2, 3, 7, 11)[:num_categories]
+    ]
+
+    def random_box(scale):
+        wh = rng.uniform(2, scale, 2)
+        xy = rng.uniform(0, COCO_IMAGE_SIZE - wh)
+        return [float(v) for v in (*xy, *wh)]
+
+    annotations, results = [], []
+    for image in images:
+        for _ in range(rng.randint(0, 9)):
+            box = random_box(rng.choice((12, 50, 120)))
+            annotation = dict(
+                id=len(annotations) + 1,
+                image_id=image["id"],
+                category_id=categories[rng.randint(num_categories)]["id"],
+                bbox=box,
+                area=box[2] * box[3] * rng.uniform(0.6, 1.0),
+                iscrowd=int(rng.rand() < 0.1),
+            )
+            if segm:
+                x, y, w, h = box
+                annotation["segmentation"] = [
+                    [x, y, x + w, y + rng.uniform(0, h), x + w, y + h, x, y + h]
+                ]
+            annotations.append(annotation)
+
+            for _ in range(rng.randint(0, 4)):
+                noisy = [v + rng.normal(0, 2) for v in box]
+                noisy[2:] = [max(v, 1.0) for v in noisy[2:]]
+                results.append(
+                    dict(
+                        image_id=image["id"],
+                        category_id=annotation["category_id"]
+                        if rng.rand() < 0.9
+                        else categories[rng.randint(num_categories)]["id"],
+                        bbox=noisy,
+                        score=float(numpy.round(rng.rand(), 2)),  # with ties
+                    )
+                )
+        for _ in range(rng.randint(0, 4)):
+            results.append(
+                dict(
+                    image_id=image["id"],
+                    category_id=categories[rng.randint(num_categories)]["id"],
+                    bbox=random_box(80),
+                    score=float(rng.rand()),
+                )
+            )
+
+    if segm:
+        for result in results:
+            x, y, w, h = result.pop("bbox")
+            mask = numpy.zeros(
+                (COCO_IMAGE_SIZE, COCO_IMAGE_SIZE), dtype=numpy.uint8, order="F"
+            )
+            mask[int(y) : int(y + h) + 1, int(x) : int(x + w) + 1] = 1
+            rle = pycocotools.mask.encode(mask)
+            rle["counts"] = rle["counts"].decode("utf-8")
+            result["segmentation"] = rle
+
+    return (
+        dict(images=images, categories=categories, annotations=annotations),
+        results,
+    )
+
+
+def load(dataset, results):
+    with contextlib.redirect_stdout(io.StringIO()):
+        coco_gt = COCO()
+        coco_gt.dataset = copy.deepcopy(dataset)
+        coco_gt.createIndex()
+        coco_dt = coco_gt.loadRes(copy.deepcopy(results))
+    return coco_gt, coco_dt
+
+
+def evaluated(evaluator):
+    with contextlib.redirect_stdout(io.StringIO()):
+        evaluator.evaluate()
+        evaluator.accumulate()
+        evaluator.summarize()
+    return evaluator
+
+
+def batched_predictions(results, batch_size: int = 4):
+    per_image = defaultdict(list)
+    for result in results:
+        per_image[result["image_id"]].append(result)
+    image_ids = sorted(per_image)
+    for start in range(0, len(image_ids), batch_size):
+        batch = {}
+        for image_id in image_ids[start : start + batch_size]:
+            boxes = torch.tensor(
+                [r["bbox"] for r in per_image[image_id]], dtype=torch.float64
+            )
+            boxes[:, 2:] += boxes[:, :2]
+            batch[image_id] = dict(
+                boxes=boxes,
+                scores=torch.tensor([r["score"] for r in per_image[image_id]]),
+                labels=torch.tensor([r["category_id"] for r in per_image[image_id]]),
+            )
+        yield batch
+
+
+def synthetic_detections(num_images: int, num_categories: int = 6, seed: int = 0):
+    """Ground truth with difficult flags and noisy, partly duplicated predictions of it"""
+    rng = numpy.random.RandomState(seed)
+    gt, predictions = [], []
+    for _ in range(num_images):
+        g = rng.randint(0, 8)
+        xy = rng.uniform(0, 400, (g, 2))
+        gt_boxes = numpy.concatenate((xy, xy + rng.uniform(8, 120, (g, 2))), 1)
+        gt_labels = rng.randint(1, num_categories, g)
+        gt_difficult = rng.rand(g) < 0.15
+        gt.append(
+            (
+                gt_boxes.astype(numpy.float32),
+                gt_labels,
+                gt_difficult.astype(numpy.uint8),
+            )
+        )
+
+        copies = rng.randint(0, g + 1, rng.randint(0, 3 * g + 2)) if g else []
+        boxes = [gt_boxes[i] + rng.normal(0, 6, 4) for i in copies if i < g]
+        labels = [
+            gt_labels[i] if rng.rand() < 0.85 else rng.randint(1, num_categories)
+            for i in copies
+            if i < g
+        ]
+        for _ in range(rng.randint(0, 4)):  # background false positives
+            xy = rng.uniform(0, 400, 2)
+            boxes.append(numpy.concatenate((xy, xy + rng.uniform(8, 120, 2))))
+            labels.append(rng.randint(1, num_categories + 2))
+        boxes = numpy.asarray(boxes, dtype=numpy.float32).reshape(-1, 4)
+        predictions.append(
+            (
+                boxes,
+                numpy.asarray(labels, dtype=numpy.int64),
+                rng.rand(len(labels)).astype(numpy.float32),
+            )
+        )
+    return predictions, gt
+
+
+def usable_decoders():
+    for backend in available_image_decoders():
+        if backend == "turbojpeg":
+            try:
+                from turbojpeg import TurboJPEG
+
+                TurboJPEG()
+            except Exception:
+                continue
+        yield backend
+
+
+def smooth_image(height: int, width: int, seed: int = 0) -> numpy.ndarray:
+    rng = numpy.random.RandomState(seed)
+    y, x = numpy.mgrid[0:height, 0:width]
+    image = numpy.stack(
+        [
+            numpy.sin(x / rng.uniform(5, 40) + c) + numpy.cos(y / rng.uniform(5, 40))
+            for c in range(3)
+        ],
+        -1,
+    )
+    return ((image + 2) * 63).astype(numpy.uint8)
+
+
+def encoded(image: numpy.ndarray, format: str = "JPEG") -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format, quality=95)
+    return buffer.getvalue()
+
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           The benchmark suite of the hot paths, every case on synthetic fixtures and the cpu
+
+           python -m benchmarks.runner --list
+           """
+
+import contextlib
+import io
+import tempfile
+
+import numpy
+import torch
+from draugr.torch_utilities import Split
+
+from benchmarks.fixtures import (
+    ENCODING_CFG,
+    PRIORS_300,
+    PRIORS_512,
+    batched_predictions,
+    load,
+    make_head,
+    random_features,
+    random_targets,
+    synthetic_coco,
+)
+from benchmarks.nms_benchmark import random_candidates
+from benchmarks.runner import register_benchmark
+from neodroidvision.data.detection.coco import CocoEvaluator
+from neodroidvision.data.detection.coco.coco_evaluation import IouType
+from neodroidvision.data.detection.voc import VOCDataset
+from neodroidvision.data.detection.voc.voc_evaluation import eval_detection_voc
+from neodroidvision.data.synthetic_datasets import write_synthetic_voc
+from neodroidvision.detection.single_stage.ssd import MultiBoxLoss
+from neodroidvision.detection.single_stage.ssd.bounding_boxes import (
+    SSDAnnotationTransform,
+    ssd_assign_priors,
+)
+from neodroidvision.detection.single_stage.ssd.bounding_boxes.ssd_priors import (
+    build_priors,
+)
+from neodroidvision.multitask.fission.skip_hourglass import SkipHourglassFission
+from neodroidvision.multitask.fission.skip_hourglass.modes import MergeMode
+from neodroidvision.segmentation.masks.run_length_encoding import (
+    mask_to_run_length,
+    run_length_to_mask,
+)
+from neodroidvision.utilities.torch_utilities.non_maximum_suppression import (
+    batched_non_maximum_suppression,
+)
+
+
+NUM_PRIORS = 8732
+NUM_CATEGORIES = 21
+
+
+@register_benchmark("build_priors", params=[dict(image_size=300), dict(image_size=512)])
+def bench_build_priors(image_size: int):
+    cfg = {300: PRIORS_300, 512: PRIORS_512}[image_size]
+    yield lambda: build_priors(cache=False, **cfg)
+
+
+@register_benchmark(
+    "ssd_assign_priors", params=[dict(num_targets=3), dict(num_targets=30)]
+)
+def bench_ssd_assign_priors(num_targets: int):
+    priors = SSDAnnotationTransform(**ENCODING_CFG).corner_form_priors
+    boxes, labels = random_targets(num_targets, torch.Generator().manual_seed(0))
+    yield lambda: ssd_assign_priors(
+        gt_boxes=boxes,
+        gt_labels=labels,
+        corner_form_priors=priors,
+        iou_threshold=ENCODING_CFG["iou_threshold"],
+    )
+
+
+@register_benchmark("multi_box_loss", params=[dict(batch_size=8), dict(batch_size=32)])
+def bench_multi_box_loss(batch_size: int):
+    g = torch.Generator().manual_seed(0)
+    confidence = torch.randn(
+        (batch_size, NUM_PRIORS, NUM_CATEGORIES), generator=g, requires_grad=True
+    )
+    locations = torch.randn(
+        (batch_size, NUM_PRIORS, 4), generator=g, requires_grad=True
+    )
+    labels = torch.randint(1, NUM_CATEGORIES, (batch_size, NUM_PRIORS), generator=g)
+    positive = torch.rand((batch_size, NUM_PRIORS), generator=g) < 0.02
+    labels[~positive] = 0
+    gt_locations = torch.randn((batch_size, NUM_PRIORS, 4), generator=g)
+    loss = MultiBoxLoss(neg_pos_ratio=3)
+
+    def forward_backward():
+        reg_loss, cls_loss = loss(confidence, locations, labels, gt_locations)
+        (reg_loss + cls_loss).backward()
+
+    yield forward_backward
+
+
+@register_benchmark(
+    "batched_non_maximum_suppression",
+    params=[
+        dict(backend=backend, candidates=n)
+        for backend in ("torchvision", "tensor", "fast", "matrix")
+        for n in (1000, 5000)
+    ],
+)
+def bench_batched_nms(backend: str, candidates: int):
+    boxes, scores, idxs = random_candidates(candidates)
+    yield lambda: batched_non_maximum_suppression(
+        boxes, scores, idxs, 0.45, backend=backend
+    )
+
+
+@register_benchmark(
+    "ssd_nms_box_head_forward",
+    params=[
+        dict(batched_post_processing=batched, batch_size=8) for batched in (False, True)
+    ],
+)
+def bench_ssd_nms_box_head(batched_post_processing: bool, batch_size: int):
+    head = make_head(
+        batched_post_processing=batched_post_processing, confidence_threshold=0.01
+    ).eval()
+    features = random_features(batch_size)
+
+    def forward():
+        with torch.no_grad():
+            head(features)
+
+    yield forward
+
+
+@register_benchmark(
+    "eval_detection_voc", params=[dict(num_images=100), dict(num_images=500)]
+)
+def bench_eval_detection_voc(num_images: int):
+    rng = numpy.random.RandomState(0)
+
+    def boxes(n):
+        tl = rng.uniform(0, 400, (n, 2))
+        return numpy.concatenate((tl, tl + rng.uniform(10, 100, (n, 2))), 1)
+
+    gt_bboxes, gt_labels, gt_difficults = [], [], []
+    pred_bboxes, pred_labels, pred_scores = [], [], []
+    for _ in range(num_images):
+        n = rng.randint(1, 8)
+        gt_bboxes.append(boxes(n))
+        gt_labels.append(rng.randint(1, NUM_CATEGORIES, n))
+        gt_difficults.append(rng.rand(n) < 0.1)
+        noisy = gt_bboxes[-1] + rng.normal(0, 4, (n, 4))
+        spurious = rng.randint(0, 20)
+        pred_bboxes.append(numpy.concatenate((noisy, boxes(spurious))))
+        pred_labels.append(
+            numpy.concatenate((gt_labels[-1], rng.randint(1, NUM_CATEGORIES, spurious)))
+        )
+        pred_scores.append(rng.rand(n + spurious))
+    yield lambda: eval_detection_voc(
+        pred_bboxes,
+        pred_labels,
+        pred_scores,
+        gt_bboxes,
+        gt_labels,
+        gt_difficults,
+        use_07_metric=True,
+    )
+
+
+@register_benchmark("coco_evaluator_update", params=[dict(images_per_update=8)])
+def bench_coco_evaluator_update(images_per_update: int):
+    dataset, results = synthetic_coco(num_images=40, seed=0)
+    coco_gt, _ = load(dataset, results)
+    evaluator = CocoEvaluator(coco_gt, [IouType.BoundingBox])
+    batch = next(batched_predictions(results, images_per_update))
+
+    def update():
+        with contextlib.redirect_stdout(io.StringIO()):
+            evaluator.update(batch)
+        evaluator.eval_imgs[IouType.BoundingBox].clear()  # bounded memory across calls
+        evaluator.img_ids.clear()
+
+    yield update
+
+
+def random_mask(shape, num_blobs: int = 6, seed: int = 0) -> numpy.ndarray:
+    """Elliptic blobs, the shape of cloud or person segmentation masks"""
+    rng = numpy.random.RandomState(seed)
+    y, x = numpy.ogrid[: shape[0], : shape[1]]
+    mask = numpy.zeros(shape, dtype=numpy.uint8)
+    for _ in range(num_blobs):
+        cy, cx = rng.uniform(0, shape[0]), rng.uniform(0, shape[1])
+        ry, rx = rng.uniform(10, shape[0] / 3), rng.uniform(10, shape[1] / 3)
+        mask[((y - cy) / ry) ** 2 + ((x - cx) / rx) ** 2 <= 1] = 1
+    return mask
+
+
+@register_benchmark(
+    "run_length_encoding",
+    params=[
+        dict(direction=direction, height=height, width=width)
+        for direction in ("encode", "decode")
+        for height, width in ((350, 525), (1400, 2100))
+    ],
+)
+def bench_run_length_encoding(direction: str, height: int, width: int):
+    mask = random_mask((height, width))
+    if direction == "encode":
+        yield lambda: mask_to_run_length(mask)
+    else:
+        run_length = mask_to_run_length(mask)
+        yield lambda: run_length_to_mask(run_length, (height, width))
+
+
+@register_benchmark(
+    "voc_dataset_getitem",
+    params=[dict(annotation_store=False), dict(annotation_store=True)],
+)
+def bench_voc_dataset_getitem(annotation_store: bool):
+    with tempfile.TemporaryDirectory() as directory:
+        root = write_synthetic_voc(directory, "voc_2007_test", num_images=16)
+        dataset = VOCDataset(
+            root,
+            "voc_2007_test",
+            Split.Testing,
+            use_annotation_store=annotation_store,
+            annotation_store_dir=root / "cache",
+        )
+        indices = iter(range(10 ** 9))
+        yield lambda: dataset[next(indices) % len(dataset)]
+
+
+@register_benchmark(
+    "skip_hourglass_fission",
+    params=[
+        dict(image_size=64, encoding_depth=3),
+        dict(image_size=128, encoding_depth=3),
+    ],
+)
+def bench_skip_hourglass_fission(image_size: int, encoding_depth: int):
+    torch.manual_seed(0)
+    model = SkipHourglassFission(
+        input_channels=3,
+        output_heads={"RGB": 3, "Depth": 1},
+        encoding_depth=encoding_depth,
+        merge_mode=MergeMode.Concat,
+    )
+    x = torch.rand((2, 3, image_size, image_size))
+
+    def forward_backward():
+        model.zero_grad(set_to_none=True)
+        out = model(x)
+        (out["RGB"].sum() + out["Depth"].sum()).backward()
+
+    yield forward_backward
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Single core decode + resize throughput of the image decoding backends, at full and at
+           reduced (DCT scaled) resolution, for SSD sized targets
+
+           python -m benchmarks.image_decoding_benchmark
+           """
+
+import time
+
+import cv2
+
+from benchmarks.fixtures import encoded, smooth_image, usable_decoders
+from neodroidvision.data.image_decoding import ImageDecoder, available_image_decoders
+
+
+def benchmark_image_decoding(
+    source_sizes=((480, 640), (1080, 1920)),
+    target_sizes=(300, 512),
+    max_upsamplings=(1.0, 1.25),
+    repeats: int = 20,
+) -> None:
+    """
+
+:param source_sizes: height, width, COCO and full HD sized
+:param target_sizes:
+:param max_upsamplings:
+:param repeats:
+:return:
+"""
+    cv2.setNumThreads(1)
+    print(f"registered backends {available_image_decoders()}")
+    print(
+        f'{"source":>10}{"target":>8}{"backend":>11}{"full":>10}'
+        + "".join(f"{f'reduced {m}':>16}" for m in max_upsamplings)
+        + "   (images/s)"
+    )
+    for height, width in source_sizes:
+        data = encoded(smooth_image(height, width))
+        for target_size in target_sizes:
+            for backend in usable_decoders():
+                decoders = [ImageDecoder(backend)] + [
+                    ImageDecoder(backend, target_size, m) for m in max_upsamplings
+                ]
+                row = f"{f'{width}x{height}':>10}{target_size:>8}{backend:>11}"
+                for i, decoder in enumerate(decoders):
+                    start = time.perf_counter()
+                    for _ in range(repeats):
+                        cv2.resize(decoder(data), (target_size, target_size))
+                    rate = repeats / (time.perf_counter() - start)
+                    row += f"{rate:>10.1f}" if i == 0 else f"{rate:>16.1f}"
+                print(row)
+
+
+if __name__ == "__main__":
+    benchmark_image_decoding()
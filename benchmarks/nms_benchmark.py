@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           CPU latency of the registered batched nms backends against the number of candidates
+
+           python -m benchmarks.nms_benchmark
+           """
+
+import time
+
+import torch
+
+from neodroidvision.utilities.torch_utilities.non_maximum_suppression import (
+    available_nms_backends,
+    batched_non_maximum_suppression,
+)
+
+
+def random_candidates(n: int, num_categories: int = 20, seed: int = 0):
+    """SSD like candidates, many heavily overlapping boxes over a 300x300 image"""
+    g = torch.Generator().manual_seed(seed)
+    xy = torch.rand((n, 2), generator=g) * 250
+    wh = torch.rand((n, 2), generator=g) * 100 + 10
+    boxes = torch.cat((xy, xy + wh), 1)
+    scores = torch.rand(n, generator=g)
+    idxs = torch.randint(num_categories, (n,), generator=g)
+    return boxes, scores, idxs
+
+
+def benchmark_nms(
+    candidate_counts=(100, 300, 1000, 3000, 10000),
+    iou_threshold: float = 0.45,
+    repeats: int = 10,
+) -> None:
+    """
+
+:param candidate_counts:
+:param iou_threshold:
+:param repeats:
+:return:
+"""
+    torch.set_num_threads(1)
+    backends = available_nms_backends()
+    print(f'{"candidates":>10}' + "".join(f"{b:>14}" for b in backends) + "   (ms)")
+    for n in candidate_counts:
+        candidates = random_candidates(n)
+        row = f"{n:>10}"
+        for backend in backends:
+            batched_non_maximum_suppression(
+                *candidates, iou_threshold, backend=backend
+            )  # warm up
+            start = time.perf_counter()
+            for _ in range(repeats):
+                keep = batched_non_maximum_suppression(
+                    *candidates, iou_threshold, backend=backend
+                )
+            row += f"{(time.perf_counter() - start) / repeats * 1000:>9.2f} ({len(keep):>3})"
+        print(row)
+
+
+if __name__ == "__main__":
+    benchmark_nms()
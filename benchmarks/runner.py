@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Registry and runner of the parameterised cpu benchmarks, see hot_paths for the suite.
+
+           A benchmark is a generator function taking the keyword arguments of one of its
+           parameter sets, it sets up its synthetic fixtures, yields the callable to time and
+           tears down after. Every case is warmed up once, then timed in repeats of enough calls
+           to last min_time. Results are written as json, keyed by "name[param=value,...]", and
+           compared with a baseline, a case regresses when its best time per call exceeds the
+           baseline's by more than the threshold.
+
+           python -m benchmarks.runner --output results.json --baseline baseline.json
+           python -m benchmarks.runner --filter "nms*" --save_baseline baseline.json
+           """
+
+import argparse
+import contextlib
+import fnmatch
+import importlib
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+import numpy
+import torch
+
+
+__all__ = [
+    "register_benchmark",
+    "available_benchmarks",
+    "run_benchmarks",
+    "compare_results",
+    "main",
+]
+
+
+class Benchmark(NamedTuple):
+    name: str
+    function: Callable
+    params: Sequence[Mapping[str, Any]]
+
+
+_benchmarks: Dict[str, Benchmark] = {}
+
+
+def register_benchmark(
+    name: str, params: Sequence[Mapping[str, Any]] = ({},)
+) -> Callable:
+    """
+Decorator registering a benchmark generator function under name
+
+:param name:
+:param params: a case per parameter set
+:return:
+"""
+
+    def decorator(function: Callable) -> Callable:
+        _benchmarks[name] = Benchmark(
+            name, contextlib.contextmanager(function), tuple(params)
+        )
+        return function
+
+    return decorator
+
+
+def case_id(name: str, params: Mapping[str, Any]) -> str:
+    if not params:
+        return name
+    return f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+
+def available_benchmarks() -> List[str]:
+    """
+
+:return: every case id, importing the suite
+"""
+    importlib.import_module("benchmarks.hot_paths")  # registers the suite
+
+    return [case_id(b.name, p) for b in _benchmarks.values() for p in b.params]
+
+
+def _time(function: Callable, repeats: int, min_time: float) -> Dict[str, Any]:
+    function()  # warm up
+    number, elapsed = 1, 0.0
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 2 ** 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed * 1.2) + 1)
+    times = [elapsed / number]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+    return dict(
+        best=min(times), median=statistics.median(times), number=number, repeats=repeats
+    )
+
+
+def run_benchmarks(
+    patterns: Sequence[str] = ("*",),
+    *,
+    repeats: int = 5,
+    min_time: float = 0.1,
+    num_threads: int = 1,
+    log: Optional[Callable[[str], None]] = print,
+) -> Dict[str, Any]:
+    """
+
+:param patterns: fnmatch patterns of the case ids to run
+:param repeats:
+:param min_time: seconds per repeat at least
+:param num_threads: of torch, 1 for comparable timings
+:param log: called with a line per case
+:return: meta data and the seconds per call (best and median over repeats) per case id
+"""
+    available_benchmarks()
+    previous_threads = torch.get_num_threads()
+    torch.set_num_threads(num_threads)
+    results = {}
+    try:
+        for benchmark in _benchmarks.values():
+            for params in benchmark.params:
+                identifier = case_id(benchmark.name, params)
+                if not any(fnmatch.fnmatch(identifier, p) for p in patterns):
+                    continue
+                with benchmark.function(**params) as function:
+                    results[identifier] = _time(function, repeats, min_time)
+                if log:
+                    log(
+                        f"{identifier:<72}{results[identifier]['best'] * 1e3:>12.3f} ms"
+                    )
+    finally:
+        torch.set_num_threads(previous_threads)
+    return dict(
+        meta=dict(
+            time=time.time(),
+            platform=platform.platform(),
+            processor=platform.processor(),
+            python=platform.python_version(),
+            torch=torch.__version__,
+            numpy=numpy.__version__,
+            num_threads=num_threads,
+        ),
+        results=results,
+    )
+
+
+def compare_results(
+    results: Mapping[str, Any], baseline: Mapping[str, Any], threshold: float = 0.2
+) -> Dict[str, float]:
+    """
+
+:param results: of run_benchmarks
+:param baseline: of run_benchmarks
+:param threshold: relative slow down tolerated
+:return: the ratio of best times against the baseline, of the cases regressing beyond threshold
+"""
+    regressions = {}
+    for identifier, result in results["results"].items():
+        reference = baseline["results"].get(identifier)
+        if reference is None or reference["best"] <= 0:
+            continue
+        ratio = result["best"] / reference["best"]
+        if ratio > 1 + threshold:
+            regressions[identifier] = ratio
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+
+:param argv:
+:return: exit status, 1 on regressions
+"""
+    parser = argparse.ArgumentParser(
+        description="Runs the cpu benchmarks of the hot paths, compared with a baseline"
+    )
+    parser.add_argument(
+        "--filter",
+        nargs="*",
+        default=["*"],
+        help="fnmatch patterns of the cases to run",
+    )
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min_time", type=float, default=0.1)
+    parser.add_argument("--num_threads", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write the results as json here")
+    parser.add_argument("--baseline", type=Path, help="Compare with these results")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Fail when a case is more than this much slower than the baseline",
+    )
+    parser.add_argument(
+        "--save_baseline", type=Path, help="Write the results as the new baseline here"
+    )
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(available_benchmarks()))
+        return 0
+
+    results = run_benchmarks(
+        args.filter,
+        repeats=args.repeats,
+        min_time=args.min_time,
+        num_threads=args.num_threads,
+    )
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            path.write_text(json.dumps(results, indent=2))
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_results(results, baseline, args.threshold)
+        for identifier, ratio in regressions.items():
+            print(f"REGRESSION {identifier}: {ratio:.2f}x the baseline")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} of the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    from benchmarks import (
+        runner,
+    )  # the suite registers with the imported module, not __main__
+
+    sys.exit(runner.main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Loader throughput and buffer allocations over an epoch, for BatchCollator (a fresh
+           shared memory batch per collation, plus a fresh pinned copy with pin_memory) and
+           SharedMemoryBatchCollator with PinnedBatchLoader (reused slots)
+
+           python -m benchmarks.shared_memory_collation_benchmark
+           """
+
+import time
+
+import numpy
+import torch
+from torch.utils.data import DataLoader, Dataset
+
+from neodroidvision.utilities import (
+    BatchCollator,
+    PinnedBatchLoader,
+    SharedMemoryBatchCollator,
+)
+
+
+class Uint8Images(Dataset):
+    def __init__(self, image_size: int, num_images: int = 2048):
+        self.image = torch.randint(
+            0, 255, (3, image_size, image_size), dtype=torch.uint8
+        )
+        self.num_images = num_images
+        self.boxes = numpy.array(
+            [[0.1, 0.2, 0.5, 0.7], [0.0, 0.0, 0.9, 0.9]], numpy.float32
+        )
+        self.labels = numpy.array([12, 15])
+
+    def __len__(self):
+        return self.num_images
+
+    def __getitem__(self, index):
+        return self.image, dict(boxes=self.boxes, labels=self.labels), index
+
+
+def benchmark_shared_memory_collation(
+    image_sizes=(300, 512), batch_size: int = 32, num_workers: int = 2
+) -> None:
+    """
+
+:param image_sizes:
+:param batch_size:
+:param num_workers:
+:return:
+"""
+    pin_memory = torch.cuda.is_available()
+    print(
+        f'{"image size":>10}{"collator":>14}{"batches":>10}{"allocations":>13}'
+        f'{"MB allocated":>14}{"images/s":>10}'
+    )
+    for image_size in image_sizes:
+        dataset = Uint8Images(image_size)
+        for shared in (False, True):
+            if shared:
+                data_loader = PinnedBatchLoader(
+                    DataLoader(
+                        dataset,
+                        batch_size=batch_size,
+                        num_workers=num_workers,
+                        collate_fn=SharedMemoryBatchCollator(
+                            padded=True, num_workers=num_workers
+                        ),
+                    ),
+                    pin_memory=pin_memory,
+                )
+            else:
+                data_loader = DataLoader(
+                    dataset,
+                    batch_size=batch_size,
+                    num_workers=num_workers,
+                    pin_memory=pin_memory,
+                    collate_fn=BatchCollator(padded=True),
+                )
+
+            num_images, allocations, allocated = 0, 0, 0
+            start = time.perf_counter()
+            for images, targets, _ in data_loader:
+                num_images += images.shape[0]
+                if not shared:  # every tensor of the batch is a new buffer
+                    for tensor in (images, *(targets[k] for k in targets)):
+                        allocations += 1 + pin_memory
+                        allocated += tensor.numel() * tensor.element_size()
+            rate = num_images / (time.perf_counter() - start)
+            if shared:
+                statistics = data_loader.statistics()
+                allocations = (
+                    statistics["shared_allocations"] + statistics["pinned_allocations"]
+                )
+                allocated = statistics["shared_bytes"]
+            print(
+                f"{image_size:>10}{'shared' if shared else 'default':>14}"
+                f"{len(data_loader):>10}{allocations:>13}"
+                f"{allocated / 2 ** 20:>14.1f}{rate:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    benchmark_shared_memory_collation()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Single core SSD training augmentation throughput, per sample opencv (SSDTransform, as in
+           the data loader workers) against the batched torch version (SSDSourceTransform in the
+           workers, SSDBatchAugmentation on the collated batch)
+
+           python -m benchmarks.ssd_batch_augmentation_benchmark
+           """
+
+import time
+
+import cv2
+import numpy
+import torch
+from draugr.torch_utilities import Split
+
+from benchmarks.fixtures import smooth_image
+from neodroidvision.detection.single_stage.ssd.bounding_boxes import (
+    SSDBatchAugmentation,
+    SSDSourceTransform,
+    SSDTransform,
+)
+
+
+PIXEL_MEAN = (123, 117, 104)
+
+
+def benchmark_ssd_batch_augmentation(
+    image_sizes=(300, 512),
+    batch_size: int = 32,
+    source_size: int = 512,
+    repeats: int = 3,
+) -> None:
+    """
+
+:param image_sizes:
+:param batch_size:
+:param source_size:
+:param repeats:
+:return:
+"""
+    cv2.setNumThreads(1)
+    torch.set_num_threads(1)
+    image = smooth_image(375, 500)
+    boxes = numpy.array([[48, 240, 195, 371], [8, 12, 352, 498]], numpy.float32)
+    labels = numpy.array([12, 15])
+    print(
+        f'{"image size":>10}{"per sample":>12}{"source":>10}{"batched":>10}'
+        f'{"source+batched":>16}   (images/s)'
+    )
+    for image_size in image_sizes:
+        per_sample = SSDTransform(image_size, PIXEL_MEAN, Split.Training)
+        source = SSDSourceTransform(source_size)
+        augmentation = SSDBatchAugmentation(image_size, PIXEL_MEAN)
+
+        start = time.perf_counter()
+        for _ in range(repeats * batch_size):
+            per_sample(image.copy(), boxes.copy(), labels.copy())
+        per_sample_time = (time.perf_counter() - start) / repeats
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            samples = [source(image, boxes.copy(), labels) for _ in range(batch_size)]
+        source_time = (time.perf_counter() - start) / repeats
+
+        images = torch.stack([s[0] for s in samples])
+        padded_boxes = torch.from_numpy(numpy.stack([s[1] for s in samples]))
+        padded_labels = torch.from_numpy(numpy.stack([s[2] for s in samples]))
+        mask = torch.ones(padded_labels.shape, dtype=torch.bool)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            augmentation(images, padded_boxes, padded_labels, mask)
+        batched_time = (time.perf_counter() - start) / repeats
+
+        print(
+            f"{image_size:>10}{batch_size / per_sample_time:>12.1f}"
+            f"{batch_size / source_time:>10.1f}{batch_size / batched_time:>10.1f}"
+            f"{batch_size / (source_time + batched_time):>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_ssd_batch_augmentation()
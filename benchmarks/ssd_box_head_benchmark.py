@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           CPU latency of SSDNmsBoxHead post processing, per image loop vs batched
+           """
+
+import timeit
+
+import torch
+
+from benchmarks.fixtures import make_head, random_features
+
+
+def benchmark_box_head(
+    batch_sizes=(1, 8, 32), confidence_threshold: float = 0.01, repeats: int = 5
+) -> dict:
+    """
+
+    :param batch_sizes:
+    :param confidence_threshold:
+    :param repeats:
+    :return: best time per batch in seconds, keyed by batch size and post processing path
+    """
+    results = {}
+    with torch.no_grad():
+        for batch_size in batch_sizes:
+            features = random_features(batch_size)
+            for name, batched in (("per_image", False), ("batched", True)):
+                head = make_head(
+                    batched_post_processing=batched,
+                    confidence_threshold=confidence_threshold,
+                    max_per_image=100,
+                    max_candidates=200,
+                )
+                results[(batch_size, name)] = min(
+                    timeit.repeat(lambda: head(features), repeat=repeats, number=1)
+                )
+    return results
+
+
+if __name__ == "__main__":
+    for (batch_size, name), t in benchmark_box_head().items():
+        print(f"batch {batch_size:>3} {name:<10}: {t * 1e3:9.3f} ms")
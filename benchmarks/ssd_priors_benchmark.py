@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Timings of SSD prior generation, original loop vs vectorised vs cached
+           """
+
+import timeit
+
+from benchmarks.fixtures import PRIORS_300, PRIORS_512, build_priors_loop
+from neodroidvision.detection.single_stage.ssd.bounding_boxes.ssd_priors import (
+    build_priors,
+    clear_priors_cache,
+)
+
+
+def benchmark_build_priors(repeats: int = 5, number: int = 10) -> dict:
+    """
+
+    :param repeats:
+    :param number:
+    :return: best time per call in seconds, keyed by input size and implementation
+    """
+    results = {}
+    for cfg in (PRIORS_300, PRIORS_512):
+        clear_priors_cache()
+        build_priors(**cfg)  # warm the process-wide cache
+        for name, fn in (
+            ("loop", lambda: build_priors_loop(**cfg)),
+            ("vectorised", lambda: build_priors(cache=False, **cfg)),
+            ("cached", lambda: build_priors(**cfg)),
+        ):
+            results[(cfg["image_size"], name)] = (
+                min(timeit.repeat(fn, repeat=repeats, number=number)) / number
+            )
+    return results
+
+
+if __name__ == "__main__":
+    for (size, name), t in benchmark_build_priors().items():
+        print(f"{size:>4} {name:<12}: {t * 1e3:9.3f} ms")
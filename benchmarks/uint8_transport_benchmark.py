@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Bytes sent from the data loader workers to the main process per batch, and loader
+           throughput including the consumer side normalisation, for SSDTransform emitting float32
+           (mean subtracted in the workers) and uint8 (data_loader.uint8_transport)
+
+           python -m benchmarks.uint8_transport_benchmark
+           """
+
+import time
+
+import numpy
+from draugr.torch_utilities import Split
+from torch.utils.data import DataLoader, Dataset
+
+from benchmarks.fixtures import smooth_image
+from neodroidvision.detection.single_stage.ssd.bounding_boxes import SSDTransform
+from neodroidvision.utilities import BatchCollator, InputNormalisation
+
+
+PIXEL_MEAN = (123, 117, 104)
+
+
+class DecodedImages(Dataset):
+    def __init__(self, transform, num_images: int = 256):
+        self.transform = transform
+        self.num_images = num_images
+        self.image = smooth_image(375, 500)
+        self.boxes = numpy.array(
+            [[48, 240, 195, 371], [8, 12, 352, 498]], numpy.float32
+        )
+        self.labels = numpy.array([12, 15])
+
+    def __len__(self):
+        return self.num_images
+
+    def __getitem__(self, index):
+        image, boxes, labels = self.transform(
+            self.image, self.boxes.copy(), self.labels
+        )
+        return image, dict(boxes=boxes, labels=labels), index
+
+
+def benchmark_uint8_transport(
+    image_sizes=(300, 512),
+    splits=(Split.Testing, Split.Training),
+    batch_size: int = 32,
+    num_workers: int = 2,
+) -> None:
+    """
+
+:param image_sizes:
+:param splits:
+:param batch_size:
+:param num_workers:
+:return:
+"""
+    normalisation = InputNormalisation(mean=PIXEL_MEAN)
+    print(
+        f'{"image size":>10}{"split":>10}{"transport":>10}{"MB/batch":>10}{"images/s":>10}'
+    )
+    for image_size in image_sizes:
+        for split in splits:
+            for uint8_transport in (False, True):
+                data_loader = DataLoader(
+                    DecodedImages(
+                        SSDTransform(
+                            image_size,
+                            PIXEL_MEAN,
+                            split,
+                            uint8_transport=uint8_transport,
+                        )
+                    ),
+                    batch_size=batch_size,
+                    num_workers=num_workers,
+                    collate_fn=BatchCollator(wrap=False),
+                )
+                batch_bytes, num_images = [], 0
+                start = time.perf_counter()
+                for images, _, _ in data_loader:
+                    batch_bytes.append(images.element_size() * images.numel())
+                    images = normalisation(images)
+                    num_images += images.shape[0]
+                rate = num_images / (time.perf_counter() - start)
+                print(
+                    f"{image_size:>10}{split.value:>10}"
+                    f'{"uint8" if uint8_transport else "float32":>10}'
+                    f"{numpy.mean(batch_bytes) / 2 ** 20:>10.1f}{rate:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    benchmark_uint8_transport()
@@ -2,12 +2,16 @@
 # -*- coding: utf-8 -*-
 
 import datetime
+import importlib
+import json
 import os
 from pathlib import Path
 from warnings import warn
 
-import pkg_resources
-from apppath import AppPath
+try:
+    from importlib import metadata
+except ImportError:  # Python < 3.8
+    import importlib_metadata as metadata
 
 __project__ = "NeodroidVision"
 __author__ = "Christian Heider Nielsen"
@@ -35,10 +39,12 @@ def dist_is_editable(dist: Any) -> bool:
 Return True if given Distribution is an editable install.
 """
     import sys
-    from pathlib import Path
 
+    direct_url = dist.read_text("direct_url.json")  # PEP 610
+    if direct_url and json.loads(direct_url).get("dir_info", {}).get("editable"):
+        return True
     for path_item in sys.path:
-        egg_link = Path(path_item) / f"{dist.project_name}.egg-link"
+        egg_link = Path(path_item) / f"{dist.metadata['Name']}.egg-link"
         if egg_link.is_file():
             return True
     return False
@@ -47,14 +53,11 @@ Return True if given Distribution is an editable install.
 PROJECT_NAME = __project__.lower().strip().replace(" ", "_")
 PROJECT_VERSION = __version__
 PROJECT_AUTHOR = __author__.lower().strip().replace(" ", "_")
-PROJECT_APP_PATH = AppPath(app_name=PROJECT_NAME, app_author=PROJECT_AUTHOR)
-PACKAGE_DATA_PATH=Path(pkg_resources.resource_filename(PROJECT_NAME, 'data'))
-
-distributions = {v.key: v for v in pkg_resources.working_set}
-if PROJECT_NAME in distributions:
-    distribution = distributions[PROJECT_NAME]
-    DEVELOP = dist_is_editable(distribution)
-else:
+PACKAGE_DATA_PATH = Path(__file__).parent / "data"
+
+try:
+    DEVELOP = dist_is_editable(metadata.distribution(PROJECT_NAME))
+except metadata.PackageNotFoundError:
     DEVELOP = True
 
 
@@ -103,3 +106,33 @@ if __version__ is None:
     __version__ = get_version(append_time=True)
 
 __version_info__ = tuple(int(segment) for segment in __version__.split("."))
+
+_SUBPACKAGES = (
+    "classification",
+    "data",
+    "detection",
+    "entry_points",
+    "multitask",
+    "regression",
+    "segmentation",
+    "utilities",
+)
+
+
+def __getattr__(name: str) -> Any:
+    """
+Imports the subpackages and creates PROJECT_APP_PATH on first access (PEP 562), so
+"import neodroidvision" stays cheap
+"""
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f".{name}", __name__)
+    if name == "PROJECT_APP_PATH":
+        from apppath import AppPath  # enumerates pkg_resources.working_set on import
+
+        globals()[name] = AppPath(app_name=PROJECT_NAME, app_author=PROJECT_AUTHOR)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_SUBPACKAGES) | {"PROJECT_APP_PATH"})
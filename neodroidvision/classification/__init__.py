@@ -2,6 +2,15 @@
 # -*- coding: utf-8 -*-
 __author__ = "Christian Heider Nielsen"
 
-from .architectures import *
-from .loss_functions import *
-from .procedures import *
+from typing import TYPE_CHECKING
+
+from neodroidvision.utilities.lazy_importing import lazy_star_imports
+
+__getattr__, __dir__ = lazy_star_imports(
+    __name__, ("architectures", "loss_functions", "procedures")
+)
+
+if TYPE_CHECKING:
+    from .architectures import *
+    from .loss_functions import *
+    from .procedures import *
@@ -4,5 +4,13 @@
 __author__ = "Christian Heider Nielsen"
 __doc__ = ""
 
-# from .datasets import *
-from .neodroid_environments import *
+from typing import TYPE_CHECKING
+
+from neodroidvision.utilities.lazy_importing import lazy_star_imports
+
+__getattr__, __dir__ = lazy_star_imports(
+    __name__, ("neodroid_environments",)  # , "datasets"
+)
+
+if TYPE_CHECKING:
+    from .neodroid_environments import *
@@ -1,3 +1,5 @@
 from .coco import *
 from .coco_evaluation import *
+from .coco_native_evaluation import *
+from .coco_annotation_index import *
 from .coco_utilities import *
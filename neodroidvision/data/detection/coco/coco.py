@@ -8,10 +8,12 @@ __doc__ = r"""
            """
 
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy
-from PIL import Image
+from neodroidvision.data.detection.coco.coco_annotation_index import COCOAnnotationIndex
+from neodroidvision.data.detection.image_shards import ImageShardReader
+from neodroidvision.data.image_decoding import ImageDecoder
 from neodroidvision.data.detection.object_detection_dataset import (
     ObjectDetectionDataset,
 )
@@ -144,6 +146,10 @@ class COCODataset(ObjectDetectionDataset):
         split: Split,
         img_transform: callable = None,
         annotation_transform: callable = None,
+        use_annotation_index: bool = True,
+        annotation_index_dir: Optional[Path] = None,
+        image_shards: Optional[Path] = None,
+        decoder: Optional[ImageDecoder] = None,
     ):
         """
 
@@ -159,37 +165,103 @@ class COCODataset(ObjectDetectionDataset):
 :type annotation_transform:
 :param remove_empty:
 :type remove_empty:
+:param use_annotation_index: serve annotations from a memory mapped COCOAnnotationIndex, built once
+from the json, rather than from a pycocotools COCO object built on every start
+:type use_annotation_index:
+:param annotation_index_dir: where indices are kept, defaults to the user cache
+:type annotation_index_dir:
+:param image_shards: directory with the shards packed for dataset_name, images are then read from
+those rather than from the image directory
+:type image_shards:
+:param decoder: defaults to full resolution PIL decoding, boxes are scaled along when it decodes
+at a reduced resolution
+:type decoder:
 """
         super().__init__(
-            data_root, dataset_name, split, img_transform, annotation_transform
+            data_root=data_root,
+            dataset_name=dataset_name,
+            split=split,
+            img_transform=img_transform,
+            annotation_transform=annotation_transform,
         )
-        from pycocotools.coco import COCO
-
-        self._coco_source = COCO(str(data_root / self.splits[dataset_name]))
+        self._annotation_file = data_root / self.splits[dataset_name]
         self._image_dir = data_root / self.image_dirs[dataset_name]
         self._img_transforms = img_transform
         self._annotation_transforms = annotation_transform
         self._remove_empty = split == Split.Training
-        if self._remove_empty:
-            self._ids = list(
-                self._coco_source.imgToAnns.keys()
-            )  # when training, images without annotations are removed.
+
+        self._coco_source = None
+        self._annotation_index = None
+        if use_annotation_index:
+            self._annotation_index = COCOAnnotationIndex.open(
+                self._annotation_file, cache_dir=annotation_index_dir
+            )
+            if self._remove_empty:
+                self._positions = numpy.array(
+                    self._annotation_index.annotated
+                )  # when training, images without annotations are removed.
+            else:
+                self._positions = numpy.arange(
+                    len(self._annotation_index)
+                )  # when testing, all images used.
+            self._ids = self._annotation_index.image_ids[self._positions].tolist()
+            category_ids = self._annotation_index.category_ids.tolist()
         else:
-            self._ids = list(
-                self._coco_source.imgs.keys()
-            )  # when testing, all images used.
+            if self._remove_empty:
+                self._ids = list(
+                    self.coco.imgToAnns.keys()
+                )  # when training, images without annotations are removed.
+            else:
+                self._ids = list(
+                    self.coco.imgs.keys()
+                )  # when testing, all images used.
+            category_ids = sorted(self.coco.getCatIds())
+
+        self._image_shards = None
+        if image_shards is not None:
+            self._image_shards = ImageShardReader.from_directory(
+                image_shards, dataset_name
+            )
+        self._decoder = decoder if decoder is not None else ImageDecoder()
+
         self._coco_id_to_contiguous_id = {
-            coco_id: i + 1
-            for i, coco_id in enumerate(sorted(self._coco_source.getCatIds()))
+            coco_id: i + 1 for i, coco_id in enumerate(category_ids)
         }
         self._contiguous_id_to_coco_id = {
             v: k for k, v in self._coco_id_to_contiguous_id.items()
         }
 
+    @property
+    def coco(self):
+        """
+The pycocotools COCO object of the split, built on first access (for evaluation)
+
+:return:
+:rtype:
+"""
+        if self._coco_source is None:
+            from pycocotools.coco import COCO
+
+            self._coco_source = COCO(str(self._annotation_file))
+        return self._coco_source
+
+    @property
+    def contiguous_id_to_coco_id(self) -> dict:
+        """
+
+:return:
+:rtype:
+"""
+        return self._contiguous_id_to_coco_id
+
     def __getitem__(self, index):
-        image_id = self._ids[index]
-        boxes, labels = self._get_annotation(image_id)
-        image = self._read_image(image_id)
+        boxes, labels = self._get_annotation_at(index)
+        image = self._read_image_at(index)
+        if self._decoder.target_size is not None:
+            info = self.get_img_info(index)
+            boxes = boxes * self._decoder.decoded_scale(
+                image, (info["height"], info["width"])
+            )
         if self._img_transforms:
             image, boxes, labels = self._img_transforms(image, boxes, labels)
         if self._annotation_transforms:
@@ -205,17 +277,20 @@ class COCODataset(ObjectDetectionDataset):
 :rtype:
 """
         image_id = self._ids[index]
-        return image_id, self._get_annotation(image_id)
+        return image_id, self._get_annotation_at(index)
 
     def __len__(self):
         return len(self._ids)
 
+    def _get_annotation_at(self, index):
+        if self._annotation_index is not None:
+            return self._annotation_index.annotation(self._positions[index])
+        return self._get_annotation(self._ids[index])
+
     def _get_annotation(self, image_id):
         ann = [
             obj
-            for obj in self._coco_source.loadAnns(
-                self._coco_source.getAnnIds(imgIds=image_id)
-            )
+            for obj in self.coco.loadAnns(self.coco.getAnnIds(imgIds=image_id))
             if obj["iscrowd"] == 0
         ]  # filter crowd annotations
         boxes = numpy.array(
@@ -239,11 +314,22 @@ class COCODataset(ObjectDetectionDataset):
 :return:
 :rtype:
 """
-        return self._coco_source.imgs[self._ids[index]]
+        if self._annotation_index is not None:
+            return self._annotation_index.img_info(self._positions[index])
+        return self.coco.imgs[self._ids[index]]
 
-    def _read_image(self, image_id):
-        return numpy.array(
-            Image.open(
-                self._image_dir / self._coco_source.loadImgs(image_id)[0]["file_name"]
-            ).convert("RGB")
-        )
+    def image_files(self):
+        """
+
+:return: (image id, path) of every image, what the split is packed from
+:rtype:
+"""
+        return [
+            (str(self._ids[i]), self._image_dir / self.get_img_info(i)["file_name"])
+            for i in range(len(self))
+        ]
+
+    def _read_image_at(self, index):
+        if self._image_shards is not None:
+            return self._image_shards.read_image(str(self._ids[index]), self._decoder)
+        return self._decoder(self._image_dir / self.get_img_info(index)["file_name"])
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Mapping, Optional, Tuple
+
+import numpy
+
+from neodroidvision.data.detection.columnar_cache import load_columns, save_columns
+
+__all__ = ["COCOAnnotationIndex", "COCO_ANNOTATION_INDEX_VERSION"]
+
+COCO_ANNOTATION_INDEX_VERSION = 1
+
+_COLUMNS = (
+    "image_ids",
+    "file_names",
+    "sizes",
+    "offsets",
+    "boxes",
+    "labels",
+    "crowd",
+    "category_ids",
+    "annotated",
+)
+
+
+def _file_signature(annotation_file: Path) -> Tuple[int, int]:
+    stat = os.stat(str(annotation_file))
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _file_digest(annotation_file: Path) -> str:
+    digest = hashlib.sha1()
+    with open(str(annotation_file), "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class COCOAnnotationIndex:
+    """
+The parts of a COCO instances json a detection dataset needs, as columns. Images in json order
+with their ids, file names and sizes, and all their annotations concatenated per image (in json
+order) as min max boxes, contiguous labels (1 based, in sorted category id order) and crowd
+flags, with per image offsets.
+
+Built once from the json, then memory mapped with numpy.load(mmap_mode='r'), so opening an index
+takes milliseconds instead of the seconds pycocotools needs to parse and index the json.
+"""
+
+    def __init__(self, columns: Mapping[str, numpy.ndarray]):
+        """
+
+:param columns: image_ids (N,), file_names (N,), sizes (N, 2) height width, offsets (N + 1,),
+boxes (M, 4), labels (M,), crowd (M,), category_ids (C,) sorted, annotated (K,) positions of
+the images with annotations in order of their first annotation
+:type columns:
+"""
+        for name in _COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self) -> int:
+        return self.image_ids.shape[0]
+
+    def annotation(
+        self, position: int, remove_crowd: bool = True
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+
+:param position: of the image in the index, not its id
+:type position:
+:param remove_crowd:
+:type remove_crowd:
+:return: boxes (R, 4) float32 and labels (R,) int64 of the non empty boxes, as writable copies
+:rtype:
+"""
+        start, stop = self.offsets[position], self.offsets[position + 1]
+        boxes = numpy.array(self.boxes[start:stop])
+        labels = numpy.array(self.labels[start:stop])
+        keep = (boxes[:, 3] > boxes[:, 1]) & (boxes[:, 2] > boxes[:, 0])
+        if remove_crowd:
+            keep &= ~self.crowd[start:stop]
+        return boxes[keep], labels[keep]
+
+    def img_info(self, position: int) -> dict:
+        """
+
+:param position:
+:type position:
+:return: id, file_name, height and width, as in the images of the json
+:rtype:
+"""
+        height, width = self.sizes[position]
+        return {
+            "id": int(self.image_ids[position]),
+            "file_name": str(self.file_names[position]),
+            "height": int(height),
+            "width": int(width),
+        }
+
+    @staticmethod
+    def cache_path(annotation_file: Path, cache_dir: Optional[Path] = None) -> Path:
+        """
+
+:param annotation_file:
+:type annotation_file:
+:param cache_dir: defaults to the user cache
+:type cache_dir:
+:return:
+:rtype:
+"""
+        if cache_dir is None:
+            from neodroidvision import PROJECT_APP_PATH
+
+            cache_dir = PROJECT_APP_PATH.user_cache / "coco_annotations"
+        key = hashlib.sha1(str(Path(annotation_file).resolve()).encode("utf-8"))
+        return Path(cache_dir) / key.hexdigest()
+
+    @classmethod
+    def from_dataset(cls, dataset: Mapping) -> "COCOAnnotationIndex":
+        """
+Index of an already loaded instances json
+
+:param dataset:
+:type dataset:
+:return:
+:rtype:
+"""
+        images = dataset.get("images", [])
+        annotations = dataset.get("annotations", [])
+
+        image_ids = numpy.array([i["id"] for i in images], dtype=numpy.int64)
+        by_id = numpy.argsort(image_ids, kind="stable")
+        category_ids = numpy.array(
+            sorted(c["id"] for c in dataset.get("categories", [])), dtype=numpy.int64
+        )
+
+        ann_image_ids = numpy.array(
+            [a["image_id"] for a in annotations], dtype=numpy.int64
+        )
+        ann_positions = by_id[
+            numpy.searchsorted(image_ids[by_id], ann_image_ids).clip(
+                max=max(len(images) - 1, 0)
+            )
+        ]
+        known = (
+            image_ids[ann_positions] == ann_image_ids
+            if len(images)
+            else numpy.zeros(len(annotations), dtype=bool)
+        )  # annotations of images not in the json are dropped
+        order = numpy.nonzero(known)[0]
+        order = order[numpy.argsort(ann_positions[order], kind="stable")]
+
+        xywh = numpy.array(
+            [annotations[i]["bbox"] for i in order], dtype=numpy.float64
+        ).reshape(-1, 4)
+        boxes = numpy.concatenate((xywh[:, :2], xywh[:, :2] + xywh[:, 2:]), axis=1)
+        labels = (
+            numpy.searchsorted(
+                category_ids,
+                numpy.array(
+                    [annotations[i]["category_id"] for i in order], dtype=numpy.int64
+                ),
+            )
+            + 1
+        )
+        crowd = numpy.array(
+            [annotations[i].get("iscrowd", 0) != 0 for i in order], dtype=bool
+        )
+
+        counts = numpy.bincount(ann_positions[known], minlength=len(images))
+        first_seen, first_index = numpy.unique(ann_positions[known], return_index=True)
+
+        return cls(
+            {
+                "image_ids": image_ids,
+                "file_names": numpy.array(
+                    [i["file_name"] for i in images], dtype=numpy.str_
+                ),
+                "sizes": numpy.array(
+                    [(i["height"], i["width"]) for i in images], dtype=numpy.int32
+                ).reshape(-1, 2),
+                "offsets": numpy.concatenate(([0], numpy.cumsum(counts))).astype(
+                    numpy.int64
+                ),
+                "boxes": boxes.astype(numpy.float32),
+                "labels": labels.astype(numpy.int64),
+                "crowd": crowd,
+                "category_ids": category_ids,
+                "annotated": first_seen[numpy.argsort(first_index)].astype(numpy.int64),
+            }
+        )
+
+    @classmethod
+    def build(
+        cls, annotation_file: Path, *, cache_dir: Optional[Path] = None
+    ) -> "COCOAnnotationIndex":
+        """
+Parses annotation_file and writes its index, if the cache is writable
+
+:param annotation_file:
+:type annotation_file:
+:param cache_dir:
+:type cache_dir:
+:return:
+:rtype:
+"""
+        signature = _file_signature(annotation_file)
+        with open(str(annotation_file)) as f:
+            index = cls.from_dataset(json.load(f))
+        save_columns(
+            cls.cache_path(annotation_file, cache_dir),
+            {name: getattr(index, name) for name in _COLUMNS},
+            {
+                "version": COCO_ANNOTATION_INDEX_VERSION,
+                "signature": signature,
+                "sha1": _file_digest(annotation_file),
+            },
+        )
+        return index
+
+    @classmethod
+    def load(
+        cls,
+        annotation_file: Path,
+        *,
+        cache_dir: Optional[Path] = None,
+        verify_hash: bool = False,
+    ) -> Optional["COCOAnnotationIndex"]:
+        """
+Memory maps the index of annotation_file, None if there is none, it was built by another version
+or the json changed since, by size and mtime and with verify_hash also by content
+
+:param annotation_file:
+:type annotation_file:
+:param cache_dir:
+:type cache_dir:
+:param verify_hash: also compare the sha1 of the json, reads the whole file
+:type verify_hash:
+:return:
+:rtype:
+"""
+        header, columns = load_columns(
+            cls.cache_path(annotation_file, cache_dir), _COLUMNS
+        )
+        if (
+            header is None
+            or header.get("version") != COCO_ANNOTATION_INDEX_VERSION
+            or tuple(header.get("signature", ())) != _file_signature(annotation_file)
+            or (verify_hash and header.get("sha1") != _file_digest(annotation_file))
+        ):
+            return None
+        return cls(columns)
+
+    @classmethod
+    def open(
+        cls,
+        annotation_file: Path,
+        *,
+        cache_dir: Optional[Path] = None,
+        verify_hash: bool = False,
+    ) -> "COCOAnnotationIndex":
+        """
+Loads the index of annotation_file, building it first if missing or stale
+
+:param annotation_file:
+:type annotation_file:
+:param cache_dir:
+:type cache_dir:
+:param verify_hash:
+:type verify_hash:
+:return:
+:rtype:
+"""
+        index = cls.load(annotation_file, cache_dir=cache_dir, verify_hash=verify_hash)
+        if index is None:
+            index = cls.build(annotation_file, cache_dir=cache_dir)
+        return index
@@ -10,6 +10,7 @@ __doc__ = r"""
 import copy
 import json
 import logging
+import multiprocessing
 import os
 from collections import defaultdict, namedtuple
 from datetime import datetime
@@ -32,8 +33,9 @@ if pycocotools.coco.__version__ == "2.0" and "1.18" in numpy.__version__:
       )
 
 from draugr.torch_utilities import minmax_to_xywh_torch
-from neodroidvision.utilities.torch_utilities.distributing.distributing_utilities import (
-  all_gather_cuda,
+from neodroidvision.data.detection.coco.coco_native_evaluation import NativeCocoEval
+from neodroidvision.utilities.torch_utilities.distributing.tensor_gathering import (
+  all_gather_data,
   )
 
 __all__ = [
@@ -57,12 +59,55 @@ class IouType(Enum):
   Keypoints = "keypoints"
 
 
+_worker_coco_gt = None
+_worker_coco_eval = {}
+
+
+def _init_evaluation_worker(coco_gt: COCO, iou_types: Sequence[IouType]) -> None:
+  """
+Keeps a read only ground truth index per worker, inherited on fork or unpickled once on spawn
+"""
+  global _worker_coco_gt
+  _worker_coco_gt = coco_gt
+  for iou_type in iou_types:
+    _worker_coco_eval[iou_type] = COCOeval(coco_gt, iouType=iou_type.value)
+
+
+def _evaluate_in_worker(iou_type: IouType, predictions: Dict) -> Tuple:
+  """
+Per image evaluation of a batch of numpy predictions in a pool worker
+
+:return: image ids and their evalImgs
+"""
+  predictions = {
+      image_id:{k:torch.from_numpy(v) for k, v in prediction.items()}
+      for image_id, prediction in predictions.items()
+      }
+  results = CocoEvaluator.prepare_data(predictions, iou_type)
+  coco_eval = _worker_coco_eval[iou_type]
+  coco_eval.cocoDt = load_results(_worker_coco_gt, results) if results else COCO()
+  coco_eval.params.imgIds = list(numpy.unique(list(predictions.keys())))
+  return evaluate(coco_eval)
+
+
 class CocoEvaluator(object):
   """
 
 """
 
-  def __init__(self, coco_api: COCO, iou_types: Sequence[IouType]):
+  def __init__(
+      self, coco_api: COCO, iou_types: Sequence[IouType], num_workers: int = 0
+      ):
+    """
+
+:param coco_api:
+:type coco_api:
+:param iou_types:
+:type iou_types:
+:param num_workers: if positive, update only queues the per image evaluation on a process pool of
+this size and synchronize_between_processes collects it
+:type num_workers:
+"""
     assert isinstance(iou_types, (list, tuple))
     self.coco_api = copy.deepcopy(coco_api)
 
@@ -75,6 +120,15 @@ class CocoEvaluator(object):
     self.img_ids = []
     self.eval_imgs = {k:[] for k in iou_types}
 
+    self.num_workers = num_workers
+    self._pool = None
+    if num_workers > 0:
+      self._pool = multiprocessing.get_context().Pool(
+          num_workers,
+          initializer=_init_evaluation_worker,
+          initargs=(self.coco_api, self.iou_types),
+          )
+
   def update(self, predictions: Dict) -> None:
     """
 
@@ -84,6 +138,17 @@ class CocoEvaluator(object):
     img_ids = list(numpy.unique(list(predictions.keys())))
     self.img_ids.extend(img_ids)
 
+    if self._pool is not None:
+      predictions = {
+          image_id:{k:v.cpu().numpy() for k, v in prediction.items()}
+          for image_id, prediction in predictions.items()
+          }
+      for iou_type in self.iou_types:
+        self.eval_imgs[iou_type].append(
+            self._pool.apply_async(_evaluate_in_worker, (iou_type, predictions))
+            )
+      return
+
     for iou_type in self.iou_types:
       results = self.prepare_data(predictions, iou_type)
       coco_dt = load_results(self.coco_api, results) if results else COCO()
@@ -95,12 +160,34 @@ class CocoEvaluator(object):
 
       self.eval_imgs[iou_type].append(eval_imgs)
 
+  def close(self) -> None:
+    """
+Shuts down the evaluation pool, if any, also on leaving the evaluator as a context manager
+"""
+    if self._pool is not None:
+      self._pool.close()
+      self._pool.join()
+      self._pool = None
+
+  def __enter__(self):
+    return self
 
+  def __exit__(self, exc_type, exc_val, exc_tb):
+    if exc_type is not None and self._pool is not None:
+      self._pool.terminate()  # the queued evaluations are of no use
+    self.close()
 
   def synchronize_between_processes(self):
     """
 
 """
+    if self._pool is not None:
+      for iou_type in self.iou_types:
+        self.eval_imgs[iou_type] = [
+            result.get()[1] for result in self.eval_imgs[iou_type]
+            ]
+      self.close()
+
     for iou_type in self.iou_types:
       self.eval_imgs[iou_type] = numpy.concatenate(self.eval_imgs[iou_type], 2)
       create_common_coco_eval(
@@ -122,7 +209,8 @@ class CocoEvaluator(object):
       print(f"IoU metric: {iou_type}")
       coco_eval.summarize()
 
-  def prepare_data(self, predictions: Sequence, iou_type: IouType)->List[Dict[str, Any]]:
+  @classmethod
+  def prepare_data(cls, predictions: Sequence, iou_type: IouType)->List[Dict[str, Any]]:
     """
 
 :param predictions:
@@ -133,15 +221,16 @@ class CocoEvaluator(object):
 :rtype:
 """
     if iou_type == iou_type.BoundingBox:
-      return self.prepare_for_coco_detection(predictions)
+      return cls.prepare_for_coco_detection(predictions)
     elif iou_type == iou_type.Segmentation:
-      return self.prepare_for_coco_segmentation(predictions)
+      return cls.prepare_for_coco_segmentation(predictions)
     elif iou_type == iou_type.Keypoints:
-      return self.prepare_for_coco_keypoint(predictions)
+      return cls.prepare_for_coco_keypoint(predictions)
     else:
       raise ValueError(f"Unknown iou type {iou_type}")
 
-  def prepare_for_coco_detection(self, predictions: Sequence[BboxPredTuple]):
+  @staticmethod
+  def prepare_for_coco_detection(predictions: Sequence[BboxPredTuple]):
     """
 
 :param predictions:
@@ -172,7 +261,8 @@ class CocoEvaluator(object):
           )
     return coco_results
 
-  def prepare_for_coco_segmentation(self, predictions: Sequence[SegmPredTuple]):
+  @staticmethod
+  def prepare_for_coco_segmentation(predictions: Sequence[SegmPredTuple]):
     """
 
 :param predictions:
@@ -216,7 +306,8 @@ class CocoEvaluator(object):
           )
     return coco_results
 
-  def prepare_for_coco_keypoint(self, predictions: Sequence[KeypointsPredTuple]):
+  @staticmethod
+  def prepare_for_coco_keypoint(predictions: Sequence[KeypointsPredTuple]):
     """
 
 :param predictions:
@@ -307,8 +398,8 @@ def merge(img_ids, eval_imgs):
 :return:
 :rtype:
 """
-  all_img_ids = all_gather_cuda(img_ids)
-  all_eval_imgs = all_gather_cuda(eval_imgs)
+  all_img_ids = all_gather_data(img_ids)
+  all_eval_imgs = all_gather_data(eval_imgs)  # the arrays of the evalImgs dicts as raw bytes
 
   merged_img_ids = []
   for p in all_img_ids:
@@ -343,7 +434,7 @@ def create_common_coco_eval(coco_eval, img_ids, eval_imgs):
   eval_imgs = list(eval_imgs.flatten())
 
   coco_eval.evalImgs = eval_imgs
-  coco_eval.params.img_ids = img_ids
+  coco_eval.params.imgIds = img_ids
   coco_eval._paramsEval = copy.deepcopy(coco_eval.params)
 
 
@@ -519,8 +610,8 @@ def coco_evaluation(dataset, predictions, output_dir, iteration=None):
     json.dump(coco_results, f)
 
   coco_gt = dataset.coco
-  coco_dt = coco_gt.load_results(json_result_file)
-  coco_eval = COCOeval(coco_gt, coco_dt, iou_type)
+  coco_dt = load_results(coco_gt, json_result_file)
+  coco_eval = NativeCocoEval(coco_gt, coco_dt, iou_type)
   coco_eval.evaluate()
   coco_eval.accumulate()
   coco_eval.summarize()
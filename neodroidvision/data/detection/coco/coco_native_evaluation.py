@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Vectorised re-implementation of pycocotools COCOeval for bbox and segm evaluation.
+
+           pycocotools runs computeIoU and evaluateImg once per (image, category, area range) in Python,
+           here (image, category) groups are batched into padded iou matrices and greedily matched for all
+           area ranges and iou thresholds at once, only the loop over detection ranks remains.
+           Accumulation groups detections by category. The precision, recall and the 12 summary stats are
+           the same as those of COCOeval.
+           """
+
+import datetime
+from typing import Optional
+
+import numpy
+import pycocotools.mask
+from pycocotools.coco import COCO
+from pycocotools.cocoeval import Params
+
+__all__ = ["NativeCocoEval", "bbox_iou_xywh"]
+
+
+def bbox_iou_xywh(
+    dt_boxes: numpy.ndarray, gt_boxes: numpy.ndarray, gt_crowd: numpy.ndarray
+) -> numpy.ndarray:
+    """
+Broadcasting equivalent of pycocotools.mask.iou for (x, y, w, h) boxes, for crowd ground truth the
+union is the detection area
+
+:param dt_boxes: (..., D, 4)
+:param gt_boxes: (..., G, 4)
+:param gt_crowd: (..., G)
+:return: (..., D, G)
+"""
+    d = dt_boxes[..., :, None, :]
+    g = gt_boxes[..., None, :, :]
+    w = numpy.minimum(d[..., 2] + d[..., 0], g[..., 2] + g[..., 0]) - numpy.maximum(
+        d[..., 0], g[..., 0]
+    )
+    h = numpy.minimum(d[..., 3] + d[..., 1], g[..., 3] + g[..., 1]) - numpy.maximum(
+        d[..., 1], g[..., 1]
+    )
+    overlapping = (w > 0) & (h > 0)
+    intersection = numpy.where(overlapping, w * h, 0)
+    dt_area = d[..., 2] * d[..., 3]
+    union = numpy.where(
+        gt_crowd[..., None, :], dt_area, dt_area + g[..., 2] * g[..., 3] - intersection
+    )
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        return numpy.where(overlapping, intersection / union, 0)
+
+
+class _AnnotationTable:
+    """
+Columnar view of the annotations of the evaluated images and categories, in the order
+pycocotools groups them, image major and annotation order within an image
+"""
+
+    def __init__(self, coco: COCO, img_ids, cat_ids, is_gt: bool):
+        cat_index = {c: i for i, c in enumerate(cat_ids)}
+        img, cat, boxes, area, ids, flag, anns = [], [], [], [], [], [], []
+        for i, img_id in enumerate(img_ids):
+            for ann in coco.imgToAnns.get(img_id, ()):
+                k = cat_index.get(ann["category_id"])
+                if k is None:
+                    continue
+                img.append(i)
+                cat.append(k)
+                boxes.append(ann["bbox"])
+                area.append(ann["area"])
+                ids.append(ann["id"])
+                flag.append(
+                    bool(ann.get("iscrowd", 0)) if is_gt else float(ann["score"])
+                )
+                anns.append(ann)
+
+        self.img = numpy.asarray(img, dtype=numpy.int64)
+        self.cat = numpy.asarray(cat, dtype=numpy.int64)
+        self.boxes = numpy.asarray(boxes, dtype=numpy.float64).reshape(-1, 4)
+        self.area = numpy.asarray(area, dtype=numpy.float64)
+        self.ids = numpy.asarray(ids, dtype=numpy.float64)
+        if is_gt:
+            self.crowd = numpy.asarray(flag, dtype=bool)
+        else:
+            self.score = numpy.asarray(flag, dtype=numpy.float64)
+        self.anns = anns
+        self.coco = coco
+
+    def __len__(self):
+        return self.img.shape[0]
+
+    def take(self, index: numpy.ndarray) -> None:
+        """
+Reorders (and subsets) all columns in place
+"""
+        for key in ("img", "cat", "boxes", "area", "ids", "crowd", "score"):
+            if hasattr(self, key):
+                setattr(self, key, getattr(self, key)[index])
+        self.anns = [self.anns[i] for i in index]
+
+
+class NativeCocoEval:
+    """
+Drop in for pycocotools.cocoeval.COCOeval, with iou_type bbox or segm and useCats
+
+eval = NativeCocoEval(coco_gt, coco_dt, "bbox")
+eval.evaluate()
+eval.accumulate()
+eval.summarize()  # eval.stats
+"""
+
+    def __init__(
+        self,
+        coco_gt: Optional[COCO] = None,
+        coco_dt: Optional[COCO] = None,
+        iou_type: str = "bbox",
+        max_elements: int = 1 << 22,
+    ):
+        """
+
+:param coco_gt:
+:param coco_dt: results, e.g. from coco_gt.loadRes or load_results
+:param iou_type:
+:param max_elements: bound on the size of the padded matching buffers of a batch of groups
+"""
+        if iou_type not in ("bbox", "segm"):
+            raise ValueError(f"Unsupported iou type {iou_type}, use COCOeval")
+        self.cocoGt = coco_gt
+        self.cocoDt = coco_dt
+        self.params = Params(iouType=iou_type)
+        if coco_gt is not None:
+            self.params.imgIds = sorted(coco_gt.getImgIds())
+            self.params.catIds = sorted(coco_gt.getCatIds())
+        self.max_elements = max_elements
+        self.eval = {}
+        self.stats = []
+
+    def evaluate(self) -> None:
+        """
+Greedy matching of all detections against the ground truth, for every area range and iou
+threshold
+"""
+        p = self.params
+        if not p.useCats:
+            raise NotImplementedError("useCats=0 is not supported, use COCOeval")
+        p.imgIds = list(numpy.unique(p.imgIds))
+        p.catIds = list(numpy.unique(p.catIds))
+        p.maxDets = sorted(p.maxDets)
+        num_categories = len(p.catIds)
+
+        gt = _AnnotationTable(self.cocoGt, p.imgIds, p.catIds, is_gt=True)
+        dt = _AnnotationTable(self.cocoDt, p.imgIds, p.catIds, is_gt=False)
+
+        gt_group = gt.img * num_categories + gt.cat
+        gt.take(numpy.argsort(gt_group, kind="stable"))
+        gt_group = gt.img * num_categories + gt.cat
+
+        dt_group = dt.img * num_categories + dt.cat
+        dt.take(numpy.lexsort((-dt.score, dt_group)))
+        dt_group = dt.img * num_categories + dt.cat
+        group_start = numpy.searchsorted(dt_group, dt_group, side="left")
+        dt_rank = numpy.arange(len(dt)) - group_start
+        dt.take(numpy.nonzero(dt_rank < p.maxDets[-1])[0])
+        dt_group = dt.img * num_categories + dt.cat
+        self._dt_rank = dt_rank[dt_rank < p.maxDets[-1]]
+
+        area_ranges = numpy.asarray(p.areaRng, dtype=numpy.float64)
+        self._gt_ignore = gt.crowd[None, :] | (
+            (gt.area[None, :] < area_ranges[:, :1])
+            | (gt.area[None, :] > area_ranges[:, 1:])
+        )  # (A, G)
+        dt_out_of_range = (dt.area[None, :] < area_ranges[:, :1]) | (
+            dt.area[None, :] > area_ranges[:, 1:]
+        )  # (A, D)
+
+        num_thresholds = len(p.iouThrs)
+        self._dt_matched = numpy.zeros(
+            (len(area_ranges), num_thresholds, len(dt)), dtype=bool
+        )
+        self._dt_ignore = numpy.repeat(dt_out_of_range[:, None, :], num_thresholds, 1)
+
+        groups, gt_starts, gt_counts = numpy.unique(
+            gt_group, return_index=True, return_counts=True
+        )
+        dt_groups, dt_starts, dt_counts = numpy.unique(
+            dt_group, return_index=True, return_counts=True
+        )
+        groups, in_gt, in_dt = numpy.intersect1d(
+            groups, dt_groups, assume_unique=True, return_indices=True
+        )
+        self._match_groups(
+            gt,
+            dt,
+            gt_starts[in_gt],
+            gt_counts[in_gt],
+            dt_starts[in_dt],
+            dt_counts[in_dt],
+            dt_out_of_range,
+        )
+
+        self._gt, self._dt = gt, dt
+        self._paramsEval = p
+
+    def _ious(self, gt, dt, gt_index, gt_valid, dt_index, dt_valid) -> numpy.ndarray:
+        if self.params.iouType == "bbox":
+            return bbox_iou_xywh(
+                dt.boxes[dt_index], gt.boxes[gt_index], gt.crowd[gt_index] & gt_valid
+            )
+
+        ious = numpy.zeros((*dt_index.shape, gt_index.shape[1]))
+        for i in range(dt_index.shape[0]):
+            d = dt_index[i][dt_valid[i]]
+            g = gt_index[i][gt_valid[i]]
+            dt_masks = pycocotools.mask.decode(
+                [dt.coco.annToRLE(dt.anns[j]) for j in d]
+            ).reshape(-1, d.shape[0])
+            gt_masks = pycocotools.mask.decode(
+                [gt.coco.annToRLE(gt.anns[j]) for j in g]
+            ).reshape(-1, g.shape[0])
+            intersection = dt_masks.T.astype(numpy.float32) @ gt_masks.astype(
+                numpy.float32
+            )  # exact, pixel counts are far below 2**24
+            dt_area = dt_masks.sum(0, dtype=numpy.float64)[:, None]
+            union = numpy.where(
+                gt.crowd[g][None, :],
+                dt_area,
+                dt_area + gt_masks.sum(0, dtype=numpy.float64)[None, :] - intersection,
+            )
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                ious[i, : d.shape[0], : g.shape[0]] = numpy.where(
+                    intersection > 0, intersection / union, 0
+                )
+        return ious
+
+    def _match_groups(
+        self, gt, dt, gt_starts, gt_counts, dt_starts, dt_counts, dt_out_of_range,
+    ) -> None:
+        p = self.params
+        num_areas, num_thresholds = len(p.areaRng), len(p.iouThrs)
+        thresholds = numpy.minimum(numpy.asarray(p.iouThrs), 1 - 1e-10)[
+            None, None, :, None
+        ]
+
+        order = numpy.lexsort((dt_counts, gt_counts))
+        start = 0
+        while start < order.shape[0]:  # batches of similarly sized groups
+            end = start + 1
+            while end < order.shape[0]:
+                size = (end + 1 - start) * (
+                    gt_counts[order[end]] * dt_counts[order[start : end + 1]].max()
+                )
+                if size * num_areas * num_thresholds > self.max_elements:
+                    break
+                end += 1
+            batch = order[start:end]
+            start = end
+
+            num_gt, num_dt = gt_counts[batch].max(), dt_counts[batch].max()
+            gt_valid = numpy.arange(num_gt)[None, :] < gt_counts[batch, None]
+            gt_index = numpy.where(
+                gt_valid, gt_starts[batch, None] + numpy.arange(num_gt)[None, :], 0
+            )
+            dt_valid = numpy.arange(num_dt)[None, :] < dt_counts[batch, None]
+            dt_index = numpy.where(
+                dt_valid, dt_starts[batch, None] + numpy.arange(num_dt)[None, :], 0
+            )
+
+            ious = self._ious(gt, dt, gt_index, gt_valid, dt_index, dt_valid)
+            ignore = self._gt_ignore[:, gt_index].transpose(1, 0, 2)[:, :, None, :]
+            crowd = (gt.crowd[gt_index] & gt_valid)[:, None, None, :]
+            gt_ids = gt.ids[gt_index]
+            available = numpy.repeat(
+                numpy.repeat(gt_valid[:, None, None, :], num_areas, 1),
+                num_thresholds,
+                2,
+            )  # (N, A, T, G)
+            matched_ids = numpy.zeros(
+                (batch.shape[0], num_areas, num_thresholds, num_dt)
+            )
+            matched_ignore = numpy.zeros_like(matched_ids, dtype=bool)
+
+            for k in range(num_dt):
+                iou = ious[:, k, None, None, :]
+                candidate = (
+                    available & (iou >= thresholds) & dt_valid[:, k, None, None, None]
+                )
+                regular = candidate & ~ignore
+                # regular ground truth is preferred, ignored ground truth is a fallback
+                candidate = numpy.where(
+                    regular.any(-1, keepdims=True), regular, candidate & ignore
+                )
+                has_match = candidate.any(-1)
+                best = (
+                    num_gt
+                    - 1
+                    - numpy.argmax(
+                        numpy.where(candidate, iou, -numpy.inf)[..., ::-1], -1
+                    )
+                )  # last of equal ious wins, as in evaluateImg
+
+                matched_ids[..., k] = numpy.where(
+                    has_match,
+                    numpy.take_along_axis(
+                        gt_ids[:, None, None, :], best[..., None], -1
+                    )[..., 0],
+                    0,
+                )
+                matched_ignore[..., k] = (
+                    has_match
+                    & numpy.take_along_axis(
+                        numpy.broadcast_to(ignore, available.shape), best[..., None], -1
+                    )[..., 0]
+                )
+                available &= ~(
+                    (numpy.arange(num_gt) == best[..., None])
+                    & has_match[..., None]
+                    & ~crowd
+                )
+
+            flat = dt_index[dt_valid]
+            matched_ids = matched_ids.transpose(1, 2, 0, 3)[:, :, dt_valid]
+            matched_ignore = matched_ignore.transpose(1, 2, 0, 3)[:, :, dt_valid]
+            self._dt_matched[:, :, flat] = matched_ids != 0
+            self._dt_ignore[:, :, flat] = matched_ignore | (
+                (matched_ids == 0) & dt_out_of_range[:, None, flat]
+            )
+
+    def accumulate(self) -> None:
+        """
+Precision (T, R, K, A, M), recall (T, K, A, M) and scores as COCOeval.accumulate
+"""
+        p = self._paramsEval
+        gt, dt = self._gt, self._dt
+        num_thresholds, num_recalls = len(p.iouThrs), len(p.recThrs)
+        num_categories, num_areas, num_max_dets = (
+            len(p.catIds),
+            len(p.areaRng),
+            len(p.maxDets),
+        )
+        precision = -numpy.ones(
+            (num_thresholds, num_recalls, num_categories, num_areas, num_max_dets)
+        )
+        recall = -numpy.ones((num_thresholds, num_categories, num_areas, num_max_dets))
+        scores = -numpy.ones(
+            (num_thresholds, num_recalls, num_categories, num_areas, num_max_dets)
+        )
+
+        num_positives = numpy.stack(
+            [
+                numpy.bincount(gt.cat[~ignore], minlength=num_categories)
+                for ignore in self._gt_ignore
+            ],
+            1,
+        )  # (K, A)
+
+        # per category decreasing score, ties in image then rank order
+        order = numpy.lexsort((self._dt_rank, dt.img, -dt.score, dt.cat))
+        bounds = numpy.searchsorted(dt.cat[order], numpy.arange(num_categories + 1))
+        rec_thresholds = numpy.asarray(p.recThrs)
+
+        for k in range(num_categories):
+            category = order[bounds[k] : bounds[k + 1]]
+            for m, max_det in enumerate(p.maxDets):
+                selection = category[self._dt_rank[category] < max_det]
+                scores_sorted = dt.score[selection]
+                num_dt = selection.shape[0]
+                for a in range(num_areas):
+                    num_positive = num_positives[k, a]
+                    if num_positive == 0:
+                        continue
+                    matched = self._dt_matched[a][:, selection]
+                    not_ignored = ~self._dt_ignore[a][:, selection]
+                    tp_sum = numpy.cumsum(matched & not_ignored, axis=1).astype(float)
+                    fp_sum = numpy.cumsum(~matched & not_ignored, axis=1).astype(float)
+                    rc = tp_sum / num_positive
+                    pr = tp_sum / (fp_sum + tp_sum + numpy.spacing(1))
+                    recall[:, k, a, m] = rc[:, -1] if num_dt else 0
+                    pr = numpy.maximum.accumulate(pr[:, ::-1], axis=1)[:, ::-1]
+
+                    for t in range(num_thresholds):
+                        inds = numpy.searchsorted(rc[t], rec_thresholds, side="left")
+                        valid = inds < num_dt
+                        q = numpy.zeros(num_recalls)
+                        ss = numpy.zeros(num_recalls)
+                        q[valid] = pr[t, inds[valid]]
+                        ss[valid] = scores_sorted[inds[valid]]
+                        precision[t, :, k, a, m] = q
+                        scores[t, :, k, a, m] = ss
+
+        self.eval = {
+            "params": p,
+            "counts": [
+                num_thresholds,
+                num_recalls,
+                num_categories,
+                num_areas,
+                num_max_dets,
+            ],
+            "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "precision": precision,
+            "recall": recall,
+            "scores": scores,
+        }
+
+    def _summarize(
+        self, ap: bool = True, iou_threshold=None, area_range="all", max_dets=100
+    ) -> float:
+        p = self.params
+        i_str = " {:<18} {} @[ IoU={:<9} | area={:>6s} | maxDets={:>3d} ] = {:0.3f}"
+        title_str = "Average Precision" if ap else "Average Recall"
+        type_str = "(AP)" if ap else "(AR)"
+        iou_str = (
+            f"{p.iouThrs[0]:0.2f}:{p.iouThrs[-1]:0.2f}"
+            if iou_threshold is None
+            else f"{iou_threshold:0.2f}"
+        )
+
+        area_index = [i for i, a in enumerate(p.areaRngLbl) if a == area_range]
+        max_dets_index = [i for i, m in enumerate(p.maxDets) if m == max_dets]
+        s = self.eval["precision"] if ap else self.eval["recall"]
+        if iou_threshold is not None:
+            s = s[numpy.where(iou_threshold == p.iouThrs)[0]]
+        s = s[..., area_index, max_dets_index]
+        mean_s = -1 if len(s[s > -1]) == 0 else numpy.mean(s[s > -1])
+        print(i_str.format(title_str, type_str, iou_str, area_range, max_dets, mean_s))
+        return mean_s
+
+    def summarize(self) -> numpy.ndarray:
+        """
+The 12 COCOeval.summarize stats, AP, AP50, AP75, APs, APm, APl, AR1, AR10, AR100, ARs, ARm, ARl
+"""
+        if not self.eval:
+            raise Exception("Please run accumulate() first")
+        max_dets = self.params.maxDets
+        stats = numpy.zeros((12,))
+        stats[0] = self._summarize(True)
+        stats[1] = self._summarize(True, iou_threshold=0.5, max_dets=max_dets[2])
+        stats[2] = self._summarize(True, iou_threshold=0.75, max_dets=max_dets[2])
+        for i, area in enumerate(("small", "medium", "large")):
+            stats[3 + i] = self._summarize(True, area_range=area, max_dets=max_dets[2])
+        for i, max_det in enumerate(max_dets):
+            stats[6 + i] = self._summarize(False, max_dets=max_det)
+        for i, area in enumerate(("small", "medium", "large")):
+            stats[9 + i] = self._summarize(False, area_range=area, max_dets=max_dets[2])
+        self.stats = stats
+        return stats
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Directories of .npy columns plus a json header, the on-disk format of the pre-parsed
+           annotation caches
+           """
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Mapping, Optional, Sequence, Tuple
+
+import numpy
+
+__all__ = ["save_columns", "load_columns"]
+
+
+def save_columns(
+    store_dir: Path, columns: Mapping[str, numpy.ndarray], header: Mapping
+) -> bool:
+    """
+Writes columns and header to store_dir, replacing any previous store. Everything is written to a
+temporary directory first and moved into place, so readers never observe a partial store.
+
+:param store_dir:
+:type store_dir:
+:param columns:
+:type columns:
+:param header: json serialisable, written as index.json
+:type header:
+:return: False if the store could not be written, e.g. on read-only file systems
+:rtype:
+"""
+    store_dir = Path(store_dir)
+    tmp_dir = store_dir.with_name(f"{store_dir.name}.{os.getpid()}.tmp")
+    try:
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        for name, column in columns.items():
+            numpy.save(str(tmp_dir / f"{name}.npy"), column)
+        with open(str(tmp_dir / "index.json"), "w") as f:
+            json.dump(header, f)
+        if store_dir.exists():
+            shutil.rmtree(str(store_dir), ignore_errors=True)
+        os.replace(str(tmp_dir), str(store_dir))
+    except OSError:
+        shutil.rmtree(str(tmp_dir), ignore_errors=True)
+        return False
+    return True
+
+
+def load_columns(
+    store_dir: Path, names: Sequence[str]
+) -> Tuple[Optional[dict], Optional[dict]]:
+    """
+Reads the header and memory maps the columns names of store_dir
+
+:param store_dir:
+:type store_dir:
+:param names:
+:type names:
+:return: header and columns, both None if the store is missing or unreadable
+:rtype:
+"""
+    store_dir = Path(store_dir)
+    try:
+        with open(str(store_dir / "index.json")) as f:
+            header = json.load(f)
+        columns = {
+            name: numpy.load(str(store_dir / f"{name}.npy"), mmap_mode="r")
+            for name in names
+        }
+    except (OSError, ValueError):
+        return None, None  # Missing, partial or foreign store, gets rebuilt
+    return header, columns
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Packed image shards, a dataset split as a few large files of encoded image bytes rather
+           than thousands of small ones.
+
+           Shard layout, little endian:
+
+             header  magic (8 bytes), record count (u8), index offset (u8), key width (u8)
+             blobs   the encoded image files back to back, unmodified
+             index   count fixed width records (key S<key width>, offset u8, length u8)
+           """
+
+import os
+import struct
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy
+
+from neodroidvision.data.image_decoding import ImageDecoder
+
+__all__ = [
+    "SHARD_MAGIC",
+    "SHARD_SUFFIX",
+    "write_image_shards",
+    "ImageShardReader",
+]
+
+SHARD_MAGIC = b"NVSHARD1"
+SHARD_SUFFIX = ".shard"
+
+_HEADER = struct.Struct("<8sQQQ")
+
+
+def _record_dtype(key_width: int) -> numpy.dtype:
+    return numpy.dtype([("key", f"S{key_width}"), ("offset", "<u8"), ("length", "<u8")])
+
+
+def _write_shard(
+    shard_file: Path, records: Sequence[Tuple[bytes, Path]], key_width: int
+) -> None:
+    index = numpy.zeros(len(records), dtype=_record_dtype(key_width))
+    tmp_file = shard_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(str(tmp_file), "wb") as f:
+        f.write(_HEADER.pack(SHARD_MAGIC, 0, 0, 0))
+        for i, (key, image_file) in enumerate(records):
+            with open(str(image_file), "rb") as image:
+                blob = image.read()
+            index[i] = (key, f.tell(), len(blob))
+            f.write(blob)
+        index_offset = f.tell()
+        f.write(index.tobytes())
+        f.seek(0)
+        f.write(_HEADER.pack(SHARD_MAGIC, len(records), index_offset, key_width))
+    os.replace(str(tmp_file), str(shard_file))
+
+
+def write_image_shards(
+    image_files: Iterable[Tuple[str, Path]],
+    output_dir: Path,
+    name: str,
+    *,
+    max_shard_bytes: int = 1 << 32,
+) -> List[Path]:
+    """
+Packs image files into shards named <name>.<shard number>.shard, a new shard is started when the
+current one would exceed max_shard_bytes
+
+:param image_files: (key, path) pairs, keys are what the images are looked up by
+:type image_files:
+:param output_dir:
+:type output_dir:
+:param name: e.g. the dataset split name
+:type name:
+:param max_shard_bytes:
+:type max_shard_bytes:
+:return: the written shard files
+:rtype:
+"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in output_dir.glob(f"{name}.*{SHARD_SUFFIX}"):
+        stale.unlink()
+
+    image_files = [(str(key).encode("utf-8"), Path(p)) for key, p in image_files]
+    key_width = max([len(key) for key, _ in image_files] + [1])
+
+    shards, current, current_bytes = [], [], 0
+    for key, image_file in image_files:
+        size = image_file.stat().st_size
+        if current and current_bytes + size > max_shard_bytes:
+            shards.append(current)
+            current, current_bytes = [], 0
+        current.append((key, image_file))
+        current_bytes += size
+    shards.append(current)
+
+    shard_files = []
+    for i, records in enumerate(shards):
+        shard_file = output_dir / f"{name}.{i:05d}{SHARD_SUFFIX}"
+        _write_shard(shard_file, records, key_width)
+        shard_files.append(shard_file)
+    return shard_files
+
+
+class ImageShardReader:
+    """
+Random access to the images of a set of shards. The shards are memory mapped and images are
+decoded straight from the mapped bytes, nothing is read besides the pages of the requested image.
+
+Mappings are opened lazily and not pickled, so a reader can be handed to DataLoader workers.
+"""
+
+    def __init__(self, shard_files: Sequence[Union[str, Path]]):
+        """
+
+:param shard_files:
+:type shard_files:
+"""
+        self.shard_files = [Path(f) for f in shard_files]
+        if not self.shard_files:
+            raise FileNotFoundError("No image shards given")
+        self._buffers = None
+        self._lookup = None
+
+    @classmethod
+    def from_directory(cls, directory: Path, name: str) -> "ImageShardReader":
+        """
+The shards written by write_image_shards(..., output_dir=directory, name=name)
+
+:param directory:
+:type directory:
+:param name:
+:type name:
+:return:
+:rtype:
+"""
+        shard_files = sorted(Path(directory).glob(f"{name}.*{SHARD_SUFFIX}"))
+        if not shard_files:
+            raise FileNotFoundError(f"No {name} image shards in {directory}")
+        return cls(shard_files)
+
+    def __getstate__(self) -> dict:
+        return {"shard_files": self.shard_files, "_buffers": None, "_lookup": None}
+
+    def _open(self) -> None:
+        buffers, lookup = [], {}
+        for shard, shard_file in enumerate(self.shard_files):
+            buffer = numpy.memmap(str(shard_file), dtype=numpy.uint8, mode="r")
+            magic, count, index_offset, key_width = _HEADER.unpack_from(buffer, 0)
+            if magic != SHARD_MAGIC:
+                raise ValueError(f"{shard_file} is not an image shard")
+            index = numpy.frombuffer(
+                buffer, dtype=_record_dtype(key_width), count=count, offset=index_offset
+            )
+            for key, offset, length in zip(
+                index["key"].tolist(),
+                index["offset"].tolist(),
+                index["length"].tolist(),
+            ):
+                lookup[key.decode("utf-8")] = (shard, offset, length)
+            buffers.append(buffer)
+        self._buffers, self._lookup = buffers, lookup
+
+    def __len__(self) -> int:
+        if self._lookup is None:
+            self._open()
+        return len(self._lookup)
+
+    def __contains__(self, key: str) -> bool:
+        if self._lookup is None:
+            self._open()
+        return str(key) in self._lookup
+
+    def keys(self) -> List[str]:
+        """
+
+:return:
+:rtype:
+"""
+        if self._lookup is None:
+            self._open()
+        return list(self._lookup.keys())
+
+    def read_bytes(self, key: str) -> memoryview:
+        """
+
+:param key:
+:type key:
+:return: the encoded image, a view of the mapped shard
+:rtype:
+"""
+        if self._lookup is None:
+            self._open()
+        shard, offset, length = self._lookup[str(key)]
+        return memoryview(self._buffers[shard])[offset : offset + length]
+
+    def read_image(self, key: str, decoder: Optional[Callable] = None) -> numpy.ndarray:
+        """
+
+:param key:
+:type key:
+:param decoder: an ImageDecoder, defaults to full resolution PIL decoding
+:type decoder:
+:return: the decoded RGB image, as the datasets read them from their directories
+:rtype:
+"""
+        if decoder is None:
+            decoder = ImageDecoder()
+        return decoder(self.read_bytes(key))
@@ -16,9 +16,15 @@ from torch.utils.data import ConcatDataset
 __all__ = ["MultiDataset"]
 
 from draugr.torch_utilities import Split, SupervisedDataset
+from neodroidvision.data.image_decoding import ImageDecoder
+from neodroidvision.detection.single_stage.ssd.bounding_boxes.ssd_batch_augmentation import (
+    SSDBatchAugmentation,
+    SSDSourceTransform,
+)
 from neodroidvision.detection.single_stage.ssd.bounding_boxes.ssd_transforms import (
     SSDTransform,
     SSDAnnotationTransform,
+    SSDBatchAnnotationTransform,
 )
 
 
@@ -74,18 +80,47 @@ class MultiDataset(SupervisedDataset):
             image_size=cfg.input.image_size,
             pixel_mean=cfg.input.pixel_mean,
             split=split,
+            uint8_transport=cfg.data_loader.get("uint8_transport", False),
         )
 
+        annotation_transform = None
+        self.batch_annotation_transform = None
+        self.batch_augmentation = None
         if split == Split.Training:
-            annotation_transform = SSDAnnotationTransform(
+            annotation_kws = dict(
                 image_size=cfg.input.image_size,
                 priors_cfg=cfg.model.box_head.priors,
                 center_variance=cfg.model.box_head.center_variance,
                 size_variance=cfg.model.box_head.size_variance,
                 iou_threshold=cfg.model.box_head.iou_threshold,
             )
-        else:
-            annotation_transform = None
+            batch_augmentation_cfg = cfg.input.get("batch_augmentation", {})
+            if batch_augmentation_cfg.get("enabled", False):
+                img_transform = SSDSourceTransform(
+                    batch_augmentation_cfg.get("source_size", cfg.input.image_size)
+                )
+                self.batch_augmentation = SSDBatchAugmentation(
+                    cfg.input.image_size, cfg.input.pixel_mean
+                )  # samples are augmented as whole batches, see SSDBatchAugmentedLoader
+                self.batch_annotation_transform = SSDBatchAnnotationTransform(
+                    **annotation_kws
+                )
+            elif cfg.data_loader.get("collate_time_encoding", False):
+                self.batch_annotation_transform = SSDBatchAnnotationTransform(
+                    **annotation_kws
+                )  # targets are encoded for the whole batch by the BatchCollator
+            else:
+                annotation_transform = SSDAnnotationTransform(**annotation_kws)
+
+        decoder_cfg = cfg.input.get("decoder", {})
+        reduced = decoder_cfg.get(
+            "reduced_training" if split == Split.Training else "reduced_testing", False
+        )
+        decoder = ImageDecoder(
+            backend=decoder_cfg.get("backend", "pil"),
+            target_size=cfg.input.image_size if reduced else None,
+            max_upsampling=decoder_cfg.get("max_upsampling", 1.0),
+        )
 
         datasets = []
 
@@ -97,6 +132,7 @@ class MultiDataset(SupervisedDataset):
                     split=split,
                     img_transform=img_transform,
                     annotation_transform=annotation_transform,
+                    decoder=decoder,
                 )
             )
 
@@ -1,2 +1,4 @@
 from .voc import *
 from .voc_evaluation import *
+from .voc_evaluator import *
+from .voc_annotation_store import *
@@ -8,20 +8,22 @@ __doc__ = r"""
            """
 
 from pathlib import Path
-from typing import Tuple
-from xml.etree import ElementTree
-
-import numpy
-from PIL import Image
+from typing import Optional, Tuple
 
 __all__ = ["VOCDataset"]
 
 from draugr.torch_utilities.tensors.tensor_container import NamedTensorTuple
 from draugr.torch_utilities import Split
 
+from neodroidvision.data.detection.image_shards import ImageShardReader
+from neodroidvision.data.image_decoding import ImageDecoder
 from neodroidvision.data.detection.object_detection_dataset import (
   ObjectDetectionDataset,
   )
+from neodroidvision.data.detection.voc.voc_annotation_store import (
+  VOCAnnotationStore,
+  parse_voc_annotation,
+  )
 
 
 class VOCDataset(ObjectDetectionDataset):
@@ -86,6 +88,11 @@ class VOCDataset(ObjectDetectionDataset):
       split: Split,
       img_transform: callable = None,
       annotation_transform: callable = None,
+      use_annotation_store: bool = True,
+      annotation_store_workers: int = 0,
+      annotation_store_dir: Optional[Path] = None,
+      image_shards: Optional[Path] = None,
+      decoder: Optional[ImageDecoder] = None,
       ):
     """
 
@@ -107,6 +114,19 @@ Annotations, ImageSets, JPEGImages, SegmentationClass, SegmentationObject.
 :type annotation_transform:
 :param keep_difficult:
 :type keep_difficult:
+:param use_annotation_store: serve annotations and image sizes from a VOCAnnotationStore, parsed once
+and memory mapped afterwards, rather than parsing the xml on every access
+:type use_annotation_store:
+:param annotation_store_workers: parser processes when the store is (re)built
+:type annotation_store_workers:
+:param annotation_store_dir: where stores are kept, defaults to the user cache
+:type annotation_store_dir:
+:param image_shards: directory with the shards packed for dataset_name, images are then read from
+those rather than from JPEGImages
+:type image_shards:
+:param decoder: defaults to full resolution PIL decoding, boxes are scaled along when it decodes
+at a reduced resolution
+:type decoder:
 """
 
     super().__init__(data_root=data_root,
@@ -130,6 +150,21 @@ Annotations, ImageSets, JPEGImages, SegmentationClass, SegmentationObject.
         class_name:i for i, class_name in enumerate(self.categories)
         }
 
+    self._annotation_store = None
+    if use_annotation_store:
+      self._annotation_store = VOCAnnotationStore.open(
+          self._data_dir,
+          self._ids,
+          self._class_dict,
+          num_workers=annotation_store_workers,
+          cache_dir=annotation_store_dir,
+          )
+
+    self._image_shards = None
+    if image_shards is not None:
+      self._image_shards = ImageShardReader.from_directory(image_shards, dataset_name)
+    self._decoder = decoder if decoder is not None else ImageDecoder()
+
   @property
   def predictor_shape(self) -> Tuple[int, ...]:
     """
@@ -139,11 +174,13 @@ Annotations, ImageSets, JPEGImages, SegmentationClass, SegmentationObject.
 
   def __getitem__(self, index):
     image_id = self._ids[index]
-    boxes, labels, is_difficult = self._get_annotation(image_id)
+    boxes, labels, is_difficult = self._get_annotation_at(index)
     if not self._keep_difficult:
       boxes = boxes[is_difficult == 0]
       labels = labels[is_difficult == 0]
     image = self._read_image(image_id)
+    if self._decoder.target_size is not None:
+      boxes = boxes * self._decoder.decoded_scale(image, self.get_img_info(index))
     if self._img_transforms:
       image, boxes, labels = self._img_transforms(image, boxes, labels)
     if self._target_transforms:
@@ -160,7 +197,7 @@ Annotations, ImageSets, JPEGImages, SegmentationClass, SegmentationObject.
 :rtype:
 """
     image_id = self._ids[index]
-    return image_id, self._get_annotation(image_id)
+    return image_id, self._get_annotation_at(index)
 
   def __len__(self):
     return len(self._ids)
@@ -173,51 +210,41 @@ Annotations, ImageSets, JPEGImages, SegmentationClass, SegmentationObject.
         ids.append(line.rstrip())
     return ids
 
+  def _get_annotation_at(self, index):
+    if self._annotation_store is not None:
+      return self._annotation_store.annotation(index)
+    return self._get_annotation(self._ids[index])
+
   def _get_annotation(self, image_id):
     annotation_file = self._data_dir / "Annotations" / f"{image_id}.xml"
-
-    objects = ElementTree.parse(str(annotation_file)).findall("object")
-    boxes = []
-    labels = []
-    is_difficult = []
-    for obj in objects:
-      class_name = obj.find("name").text.lower().strip()
-      bbox = obj.find("bndbox")
-      # VOC dataset format follows Matlab, in which indexes start from 0
-      x1 = float(bbox.find("xmin").text) - 1
-      y1 = float(bbox.find("ymin").text) - 1
-      x2 = float(bbox.find("xmax").text) - 1
-      y2 = float(bbox.find("ymax").text) - 1
-      boxes.append([x1, y1, x2, y2])
-      labels.append(self._class_dict[class_name])
-      is_difficult_str = obj.find("difficult").text
-      is_difficult.append(int(is_difficult_str) if is_difficult_str else 0)
-
-    return (
-        numpy.array(boxes, dtype=numpy.float32),
-        numpy.array(labels, dtype=numpy.int64),
-        numpy.array(is_difficult, dtype=numpy.uint8),
-        )
+    return parse_voc_annotation(annotation_file, self._class_dict)[:3]
 
   def get_img_info(self, index):
     """
 
 :param index:
 :type index:
-:return:
+:return: height, width
 :rtype:
 """
+    if self._annotation_store is not None:
+      return self._annotation_store.img_info(index)
     img_id = self._ids[index]
     annotation_file = self._data_dir / "Annotations" / f"{img_id}.xml"
-    anno = ElementTree.parse(annotation_file).getroot()
-    size = anno.find("size")
-    height, width = tuple(
-        map(int, (size.find("height").text, size.find("width").text))
-        )
-    return height, width
+    return parse_voc_annotation(annotation_file, self._class_dict)[3]
+
+  def image_files(self):
+    """
+
+:return: (image id, path) of every image, what the split is packed from
+:rtype:
+"""
+    return [
+        (image_id, self._data_dir / "JPEGImages" / f"{image_id}.jpg")
+        for image_id in self._ids
+        ]
 
   def _read_image(self, image_id):
-    image_file = self._data_dir / "JPEGImages" / f"{image_id}.jpg"
-    image = Image.open(image_file).convert("RGB")
-    image = numpy.array(image)
-    return image
+    if self._image_shards is not None:
+      return self._image_shards.read_image(image_id, self._decoder)
+    return self._decoder(self._data_dir / "JPEGImages" / f"{image_id}.jpg")
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import hashlib
+import multiprocessing
+import os
+from functools import partial
+from pathlib import Path
+from typing import Mapping, Optional, Sequence, Tuple
+from xml.etree import ElementTree
+
+import numpy
+
+from neodroidvision.data.detection.columnar_cache import load_columns, save_columns
+
+__all__ = [
+    "parse_voc_annotation",
+    "VOCAnnotationStore",
+    "VOC_ANNOTATION_STORE_VERSION",
+]
+
+VOC_ANNOTATION_STORE_VERSION = 2
+
+_COLUMNS = ("boxes", "labels", "difficult", "offsets", "sizes")
+
+
+def parse_voc_annotation(
+    annotation_file: Path, class_dict: Mapping[str, int]
+) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, Tuple[int, int]]:
+    """
+Parses a single VOC xml annotation
+
+:param annotation_file:
+:type annotation_file:
+:param class_dict: class name to label
+:type class_dict:
+:return: boxes (N, 4) float32, labels (N,) int64, is_difficult (N,) uint8, (height, width)
+:rtype:
+"""
+    root = ElementTree.parse(str(annotation_file)).getroot()
+    boxes = []
+    labels = []
+    is_difficult = []
+    for obj in root.findall("object"):
+        class_name = obj.find("name").text.lower().strip()
+        bbox = obj.find("bndbox")
+        # VOC dataset format follows Matlab, in which indexes start from 0
+        x1 = float(bbox.find("xmin").text) - 1
+        y1 = float(bbox.find("ymin").text) - 1
+        x2 = float(bbox.find("xmax").text) - 1
+        y2 = float(bbox.find("ymax").text) - 1
+        boxes.append([x1, y1, x2, y2])
+        labels.append(class_dict[class_name])
+        is_difficult_str = obj.find("difficult").text
+        is_difficult.append(int(is_difficult_str) if is_difficult_str else 0)
+
+    size = root.find("size")
+    height, width = int(size.find("height").text), int(size.find("width").text)
+
+    return (
+        numpy.array(boxes, dtype=numpy.float32).reshape(-1, 4),
+        numpy.array(labels, dtype=numpy.int64),
+        numpy.array(is_difficult, dtype=numpy.uint8),
+        (height, width),
+    )
+
+
+def _annotations_signature(annotations_dir: Path) -> Tuple[int, int]:
+    """
+mtime of the Annotations directory (files added, removed or renamed) and the number of files in it,
+a listing but no stat per file
+"""
+    with os.scandir(str(annotations_dir)) as entries:
+        count = sum(1 for _ in entries)
+    return os.stat(str(annotations_dir)).st_mtime_ns, count
+
+
+def _latest_annotation_mtime(annotations_dir: Path) -> int:
+    """
+latest mtime of the files in the Annotations directory (files edited in place), a stat per file
+"""
+    latest = 0
+    with os.scandir(str(annotations_dir)) as entries:
+        for entry in entries:
+            latest = max(latest, entry.stat().st_mtime_ns)
+    return latest
+
+
+class VOCAnnotationStore:
+    """
+All annotations of a VOC split parsed once and stored column wise, boxes, labels and difficult
+flags of all images concatenated, with per image offsets into them and the image sizes.
+
+The columns are .npy files loaded with numpy.load(mmap_mode='r'), so opening a store costs next to
+nothing regardless of its size, and every lookup is a slice.
+"""
+
+    def __init__(self, columns: Mapping[str, numpy.ndarray], ids: Sequence[str]):
+        """
+
+:param columns: boxes (M, 4), labels (M,), difficult (M,), offsets (N + 1,), sizes (N, 2)
+:type columns:
+:param ids: the N image ids, in order
+:type ids:
+"""
+        self.boxes = columns["boxes"]
+        self.labels = columns["labels"]
+        self.difficult = columns["difficult"]
+        self.offsets = columns["offsets"]
+        self.sizes = columns["sizes"]
+        self.ids = list(ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def annotation(
+        self, index: int
+    ) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """
+
+:param index:
+:type index:
+:return: boxes, labels and is_difficult as VOCDataset._get_annotation, as writable copies
+:rtype:
+"""
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        return (
+            numpy.array(self.boxes[start:stop]),
+            numpy.array(self.labels[start:stop]),
+            numpy.array(self.difficult[start:stop]),
+        )
+
+    def img_info(self, index: int) -> Tuple[int, int]:
+        """
+
+:param index:
+:type index:
+:return: height, width
+:rtype:
+"""
+        height, width = self.sizes[index]
+        return int(height), int(width)
+
+    @staticmethod
+    def cache_path(
+        data_dir: Path, ids: Sequence[str], cache_dir: Optional[Path] = None
+    ) -> Path:
+        """
+The store directory of a data directory and split
+
+:param data_dir:
+:type data_dir:
+:param ids:
+:type ids:
+:param cache_dir: defaults to the user cache
+:type cache_dir:
+:return:
+:rtype:
+"""
+        if cache_dir is None:
+            from neodroidvision import PROJECT_APP_PATH
+
+            cache_dir = PROJECT_APP_PATH.user_cache / "voc_annotations"
+        key = hashlib.sha1(str(Path(data_dir).resolve()).encode("utf-8"))
+        key.update("\n".join(ids).encode("utf-8"))
+        return Path(cache_dir) / key.hexdigest()
+
+    @classmethod
+    def build(
+        cls,
+        data_dir: Path,
+        ids: Sequence[str],
+        class_dict: Mapping[str, int],
+        *,
+        num_workers: int = 0,
+        cache_dir: Optional[Path] = None,
+    ) -> "VOCAnnotationStore":
+        """
+Parses the annotations of ids, with a pool of num_workers processes if above 0, and writes the
+store. When the store can not be written (read-only file system) the in memory columns are
+still returned.
+
+:param data_dir: contains the Annotations directory
+:type data_dir:
+:param ids:
+:type ids:
+:param class_dict:
+:type class_dict:
+:param num_workers:
+:type num_workers:
+:param cache_dir:
+:type cache_dir:
+:return:
+:rtype:
+"""
+        annotations_dir = Path(data_dir) / "Annotations"
+        signature = _annotations_signature(annotations_dir)
+        latest_mtime = _latest_annotation_mtime(annotations_dir)
+        files = [annotations_dir / f"{image_id}.xml" for image_id in ids]
+        parse = partial(parse_voc_annotation, class_dict=dict(class_dict))
+        if num_workers > 0:
+            with multiprocessing.get_context().Pool(num_workers) as pool:
+                parsed = pool.map(
+                    parse, files, chunksize=max(1, len(files) // (num_workers * 8))
+                )
+        else:
+            parsed = [parse(f) for f in files]
+
+        counts = numpy.array([p[1].shape[0] for p in parsed], dtype=numpy.int64)
+        columns = {
+            "boxes": numpy.concatenate(
+                [p[0] for p in parsed] + [numpy.zeros((0, 4), numpy.float32)]
+            ),
+            "labels": numpy.concatenate(
+                [p[1] for p in parsed] + [numpy.zeros(0, numpy.int64)]
+            ),
+            "difficult": numpy.concatenate(
+                [p[2] for p in parsed] + [numpy.zeros(0, numpy.uint8)]
+            ),
+            "offsets": numpy.concatenate(([0], numpy.cumsum(counts))).astype(
+                numpy.int64
+            ),
+            "sizes": numpy.array([p[3] for p in parsed], dtype=numpy.int32).reshape(
+                -1, 2
+            ),
+        }
+
+        save_columns(
+            cls.cache_path(data_dir, ids, cache_dir),
+            columns,
+            {
+                "version": VOC_ANNOTATION_STORE_VERSION,
+                "signature": signature,
+                "latest_mtime": latest_mtime,
+                "class_dict": dict(class_dict),
+                "ids": list(ids),
+            },
+        )
+        return cls(columns, ids)
+
+    @classmethod
+    def load(
+        cls,
+        data_dir: Path,
+        ids: Sequence[str],
+        class_dict: Mapping[str, int],
+        *,
+        cache_dir: Optional[Path] = None,
+        verify_files: bool = False,
+    ) -> Optional["VOCAnnotationStore"]:
+        """
+Memory maps the store of ids, None if there is none or it is stale, that is files were added to,
+removed from or renamed in the Annotations directory since it was built, and with verify_files
+also when a file in it was edited in place
+
+:param data_dir:
+:type data_dir:
+:param ids:
+:type ids:
+:param class_dict:
+:type class_dict:
+:param cache_dir:
+:type cache_dir:
+:param verify_files: also compare the latest mtime of the annotation files, a stat per file
+:type verify_files:
+:return:
+:rtype:
+"""
+        annotations_dir = Path(data_dir) / "Annotations"
+        index, columns = load_columns(
+            cls.cache_path(data_dir, ids, cache_dir), _COLUMNS
+        )
+        if (
+            index is None
+            or index.get("version") != VOC_ANNOTATION_STORE_VERSION
+            or tuple(index.get("signature", ())) != _annotations_signature(annotations_dir)
+            or (
+                verify_files
+                and index.get("latest_mtime")
+                != _latest_annotation_mtime(annotations_dir)
+            )
+            or index.get("class_dict") != dict(class_dict)
+            or index.get("ids") != list(ids)
+        ):
+            return None
+        return cls(columns, ids)
+
+    @classmethod
+    def open(
+        cls,
+        data_dir: Path,
+        ids: Sequence[str],
+        class_dict: Mapping[str, int],
+        *,
+        num_workers: int = 0,
+        cache_dir: Optional[Path] = None,
+        verify_files: bool = False,
+    ) -> "VOCAnnotationStore":
+        """
+Loads the store of ids, building it first if missing or stale
+
+:param data_dir:
+:type data_dir:
+:param ids:
+:type ids:
+:param class_dict:
+:type class_dict:
+:param num_workers: parser processes when building
+:type num_workers:
+:param cache_dir:
+:type cache_dir:
+:param verify_files:
+:type verify_files:
+:return:
+:rtype:
+"""
+        store = cls.load(
+            data_dir, ids, class_dict, cache_dir=cache_dir, verify_files=verify_files
+        )
+        if store is None:
+            store = cls.build(
+                data_dir, ids, class_dict, num_workers=num_workers, cache_dir=cache_dir,
+            )
+        return store
@@ -23,6 +23,7 @@ __all__ = [
     "calc_detection_voc_ap",
     "calc_detection_voc_prec_rec",
     "voc_evaluation",
+    "log_voc_results",
 ]
 
 
@@ -386,8 +387,6 @@ for class :math:`l`. If :obj:`prec[l]` or :obj:`rec[l]` is
 
 
 def voc_evaluation(dataset, predictions, output_dir, iteration=None):
-    class_names = dataset.class_names
-
     pred_boxes_list = []
     pred_labels_list = []
     pred_scores_list = []
@@ -424,9 +423,32 @@ def voc_evaluation(dataset, predictions, output_dir, iteration=None):
         iou_thresh=0.5,
         use_07_metric=True,
     )
+    return log_voc_results(
+        dataset.class_names, ap, map, output_dir, iteration=iteration
+    )
+
+
+def log_voc_results(
+    class_names, ap, mean_ap, output_dir, iteration=None, **extra_metrics
+) -> dict:
+    """
+Logs and writes the per class average precisions to a result file in output_dir, only logged if
+output_dir is None
+
+:param class_names:
+:param ap: per class, index 0 is background
+:param mean_ap:
+:param output_dir:
+:param iteration:
+:param extra_metrics: additional named scalars reported after the mAP
+:return:
+"""
     logger = logging.getLogger("SSD.inference")
-    result_str = f"mAP: {map:.4f}\n"
-    metrics = {"mAP": map}
+    result_str = f"mAP: {mean_ap:.4f}\n"
+    metrics = {"mAP": mean_ap}
+    for name, value in extra_metrics.items():
+        metrics[name] = value
+        result_str += f"{name}: {value:.4f}\n"
     for i, ap in enumerate(ap):
         if i == 0:  # skip background
             continue
@@ -434,13 +456,15 @@ def voc_evaluation(dataset, predictions, output_dir, iteration=None):
         result_str += f"{class_names[i]:<16}: {ap:.4f}\n"
     logger.info(result_str)
 
-    if iteration is not None:
-        result_path = os.path.join(output_dir, f"result_{iteration:07d}.txt")
-    else:
-        result_path = os.path.join(
-            output_dir, f'result_{datetime.now().strftime("%Y-%m-%d_%H-%M-%S")}.txt'
-        )
-    with open(result_path, "w") as f:
-        f.write(result_str)
+    if output_dir is not None:
+        if iteration is not None:
+            result_path = os.path.join(output_dir, f"result_{iteration:07d}.txt")
+        else:
+            result_path = os.path.join(
+                output_dir,
+                f'result_{datetime.now().strftime("%Y-%m-%d_%H-%M-%S")}.txt',
+            )
+        with open(result_path, "w") as f:
+            f.write(result_str)
 
     return dict(metrics=metrics)
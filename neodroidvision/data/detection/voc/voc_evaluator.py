@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+from typing import Iterable, Mapping, Sequence, Tuple
+
+import numpy
+
+from neodroidvision.data.detection.voc.voc_evaluation import (
+    bbox_iou,
+    calc_detection_voc_ap,
+)
+
+__all__ = ["VOCEvaluator", "VOC_IOU_THRESHOLDS"]
+
+VOC_IOU_THRESHOLDS = tuple(numpy.round(numpy.arange(0.5, 0.96, 0.05), 2))
+
+
+def _as_numpy(a) -> numpy.ndarray:
+    if hasattr(a, "detach"):
+        a = a.detach().cpu().numpy()
+    return numpy.asarray(a)
+
+
+class VOCEvaluator:
+    """
+Streaming PASCAL VOC evaluation, the incremental equivalent of eval_detection_voc.
+
+Every update matches the predictions of a batch of images against their ground truth
+for all iou thresholds at once, and only keeps a compact label, score and match record per
+prediction, so evaluation can run alongside inference. compute gives the same average precisions
+as eval_detection_voc at each threshold, for both the 07 11 point and the area metric. Predictions
+are ranked with the same argsort calls on the same score arrays as calc_detection_voc_prec_rec, so
+predictions of equal score are ranked alike.
+"""
+
+    def __init__(self, iou_thresholds: Sequence[float] = VOC_IOU_THRESHOLDS):
+        """
+
+:param iou_thresholds: a prediction is correct at threshold t if its iou with the ground truth
+is at least t
+:type iou_thresholds:
+"""
+        self.iou_thresholds = numpy.asarray(iou_thresholds, dtype=numpy.float64)
+        self.reset()
+
+    def reset(self) -> None:
+        """
+Clears all accumulated matches
+"""
+        self._labels = []
+        self._scores = []
+        # int8 (T, R) chunks, 1 true positive, 0 false positive, -1 ignored
+        self._matches = []
+        self._n_pos = numpy.zeros(0, dtype=numpy.int64)
+        self._seen = numpy.zeros(0, dtype=bool)
+        self.num_images = 0
+
+    def _grow(self, num_categories: int) -> None:
+        if num_categories > self._n_pos.shape[0]:
+            grow = num_categories - self._n_pos.shape[0]
+            self._n_pos = numpy.concatenate(
+                (self._n_pos, numpy.zeros(grow, numpy.int64))
+            )
+            self._seen = numpy.concatenate((self._seen, numpy.zeros(grow, bool)))
+
+    def update(self, batch_predictions: Iterable, batch_gt: Iterable) -> None:
+        """
+
+:param batch_predictions: per image (boxes (R, 4), labels (R,), scores (R,)), a sequence or a mapping
+with those keys, numpy arrays or tensors
+:type batch_predictions:
+:param batch_gt: per image (boxes (G, 4), labels (G,)[, difficult (G,)])
+:type batch_gt:
+"""
+        for prediction, gt in zip(batch_predictions, batch_gt):
+            if isinstance(prediction, Mapping):
+                prediction = (
+                    prediction["boxes"],
+                    prediction["labels"],
+                    prediction["scores"],
+                )
+            self.update_image(*prediction[:3], *gt)
+
+    def update_image(
+        self,
+        pred_boxes,
+        pred_labels,
+        pred_scores,
+        gt_boxes,
+        gt_labels,
+        gt_difficult=None,
+    ) -> None:
+        """
+Greedy matching of a single image, in decreasing score order per category a prediction is a
+true positive if its best overlapping ground truth of the same category is above the threshold
+and not already taken, predictions matching difficult ground truth are ignored.
+"""
+        pred_boxes = _as_numpy(pred_boxes).reshape(-1, 4)
+        pred_labels = _as_numpy(pred_labels).reshape(-1).astype(int)
+        pred_scores = _as_numpy(pred_scores).reshape(-1)
+        gt_boxes = _as_numpy(gt_boxes).reshape(-1, 4)
+        gt_labels = _as_numpy(gt_labels).reshape(-1).astype(int)
+        if gt_difficult is None:
+            gt_difficult = numpy.zeros(gt_boxes.shape[0], dtype=bool)
+        else:
+            gt_difficult = _as_numpy(gt_difficult).reshape(-1).astype(bool)
+
+        self.num_images += 1
+        present = numpy.concatenate((pred_labels, gt_labels))
+        if present.size == 0:
+            return
+        self._grow(present.max() + 1)
+        self._seen[present] = True
+        numpy.add.at(self._n_pos, gt_labels[~gt_difficult], 1)
+
+        num_preds = pred_boxes.shape[0]
+        if num_preds == 0:
+            return
+
+        # per category decreasing score, sorted as calc_detection_voc_prec_rec does, ties included
+        order = numpy.concatenate(
+            [
+                numpy.flatnonzero(category)[pred_scores[category].argsort()[::-1]]
+                for category in (
+                    pred_labels == l for l in numpy.unique(pred_labels)
+                )
+            ]
+        )
+        pred_boxes, pred_labels, pred_scores = (
+            pred_boxes[order],
+            pred_labels[order],
+            pred_scores[order],
+        )
+
+        num_thresholds = self.iou_thresholds.shape[0]
+        matches = numpy.zeros((num_thresholds, num_preds), dtype=numpy.int8)
+        if gt_boxes.shape[0]:
+            # VOC evaluation follows integer typed bounding boxes.
+            pred_boxes = pred_boxes.copy()
+            pred_boxes[:, 2:] += 1
+            gt_boxes = gt_boxes.copy()
+            gt_boxes[:, 2:] += 1
+
+            iou = bbox_iou(pred_boxes, gt_boxes)
+            iou[pred_labels[:, None] != gt_labels[None, :]] = -1
+            gt_index = iou.argmax(axis=1)
+            best_iou = iou[numpy.arange(num_preds), gt_index]
+
+            matched = best_iou[None, :] >= self.iou_thresholds[:, None]  # (T, R)
+            difficult = gt_difficult[gt_index][None, :]
+
+            # first (highest scoring) prediction per threshold and ground truth takes it
+            key = numpy.where(
+                matched,
+                numpy.arange(num_thresholds)[:, None] * gt_boxes.shape[0] + gt_index,
+                -1,
+            ).reshape(-1)
+            first = numpy.zeros(key.shape[0], dtype=bool)
+            first[numpy.unique(key, return_index=True)[1]] = True
+            first = first.reshape(num_thresholds, num_preds)
+
+            matches[matched & first] = 1
+            matches[matched & difficult] = -1
+
+        self._labels.append(pred_labels)
+        self._scores.append(pred_scores)
+        self._matches.append(matches)
+
+    def precision_recall(self) -> Tuple:
+        """
+
+:return: prec and rec as calc_detection_voc_prec_rec, with a list per iou threshold
+:rtype:
+"""
+        num_thresholds = self.iou_thresholds.shape[0]
+        n_fg_class = self._seen.shape[0]
+        prec = [[None] * n_fg_class for _ in range(num_thresholds)]
+        rec = [[None] * n_fg_class for _ in range(num_thresholds)]
+        if n_fg_class == 0:
+            return prec, rec
+
+        if self._labels:
+            labels = numpy.concatenate(self._labels)
+            scores = numpy.concatenate(self._scores)
+            matches = numpy.concatenate(self._matches, axis=1)
+        else:
+            labels = numpy.zeros(0, dtype=int)
+            scores = numpy.zeros(0)
+            matches = numpy.zeros((num_thresholds, 0), dtype=numpy.int8)
+
+        grouped = numpy.argsort(labels, kind="stable")
+        bounds = numpy.searchsorted(labels[grouped], numpy.arange(n_fg_class + 1))
+        for l in numpy.nonzero(self._seen)[0]:
+            category = grouped[bounds[l] : bounds[l + 1]]
+            score_l = scores[category]
+            match_l = matches[:, category][:, score_l.argsort()[::-1]]
+
+            tp = numpy.cumsum(match_l == 1, axis=1)
+            fp = numpy.cumsum(match_l == 0, axis=1)
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                p = tp / (fp + tp)
+            for t in range(num_thresholds):
+                prec[t][l] = p[t]
+                if self._n_pos[l] > 0:
+                    rec[t][l] = tp[t] / self._n_pos[l]
+
+        return prec, rec
+
+    def compute(self) -> dict:
+        """
+
+:return: iou_thresholds (T,), ap and ap_07 (T, n_fg_class) with nan for categories not present,
+map and map_07 (T,)
+:rtype:
+"""
+        prec, rec = self.precision_recall()
+        results = {"iou_thresholds": self.iou_thresholds}
+        for key, use_07_metric in (("ap", False), ("ap_07", True)):
+            ap = numpy.stack(
+                [
+                    calc_detection_voc_ap(p, r, use_07_metric=use_07_metric)
+                    for p, r in zip(prec, rec)
+                ]
+            )
+            results[key] = ap
+            results[f"m{key}"] = numpy.nanmean(ap, axis=1)
+        return results
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Image decoding for the datasets, with registered backends all with the signature
+           (source, min_size) -> RGB uint8 HWC array, see ImageDecoder.
+
+           * pil: PIL, draft mode for JPEGs
+           * opencv: cv2.imdecode, IMREAD_REDUCED_COLOR_2/4/8 for JPEGs
+           * turbojpeg: PyTurboJPEG (pip install neodroidvision[turbojpeg]), DCT scaling factors
+
+           Given a min_size a backend may decode a JPEG at 1/2, 1/4 or 1/8 of its resolution during
+           the inverse DCT, as long as the result is at least min_size in both dimensions. That
+           skips most of the decoding work when the image is resized to a much smaller size
+           afterwards anyway, as for SSD inputs.
+           """
+
+import io
+import math
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy
+from PIL import Image
+
+__all__ = [
+    "IMAGE_DECODERS",
+    "register_image_decoder",
+    "available_image_decoders",
+    "reduction_factor",
+    "ImageDecoder",
+]
+
+ImageSource = Union[str, Path, bytes, bytearray, memoryview]
+
+IMAGE_DECODERS: Dict[str, Callable] = {}
+
+JPEG_REDUCTION_FACTORS = (8, 4, 2)
+
+
+def register_image_decoder(name: str) -> Callable:
+    """
+Decorator registering an image decoding backend under name
+
+:param name:
+:type name:
+:return:
+:rtype:
+"""
+
+    def decorator(f: Callable) -> Callable:
+        IMAGE_DECODERS[name] = f
+        return f
+
+    return decorator
+
+
+def available_image_decoders() -> List[str]:
+    """
+
+:return:
+:rtype:
+"""
+    return list(IMAGE_DECODERS.keys())
+
+
+def reduction_factor(size: Tuple[int, int], min_size: Optional[Tuple[int, int]]) -> int:
+    """
+The largest JPEG DCT reduction factor keeping size at least min_size
+
+:param size: width, height of the source
+:type size:
+:param min_size: width, height
+:type min_size:
+:return: 1, 2, 4 or 8
+:rtype:
+"""
+    if min_size is not None:
+        for factor in JPEG_REDUCTION_FACTORS:
+            if size[0] // factor >= min_size[0] and size[1] // factor >= min_size[1]:
+                return factor
+    return 1
+
+
+def _as_bytes(source: ImageSource) -> Union[bytes, memoryview]:
+    if isinstance(source, (str, Path)):
+        with open(str(source), "rb") as f:
+            return f.read()
+    return source
+
+
+def _is_jpeg(data) -> bool:
+    return bytes(data[:2]) == b"\xff\xd8"
+
+
+@register_image_decoder("pil")
+def pil_decode(
+    source: ImageSource, min_size: Optional[Tuple[int, int]] = None
+) -> numpy.ndarray:
+    """
+PIL decoding, in draft mode when min_size is given, which PIL only honours for JPEGs
+
+:param source: a path or the encoded bytes
+:param min_size: width, height
+:return:
+"""
+    if not isinstance(source, (str, Path)):
+        source = io.BytesIO(source)
+    image = Image.open(source)
+    if min_size is not None:
+        image.draft("RGB", tuple(min_size))
+    return numpy.array(image.convert("RGB"))
+
+
+@register_image_decoder("opencv")
+def opencv_decode(
+    source: ImageSource, min_size: Optional[Tuple[int, int]] = None
+) -> numpy.ndarray:
+    """
+cv2.imdecode, with one of the IMREAD_REDUCED_COLOR flags for JPEGs when min_size allows
+
+:param source: a path or the encoded bytes
+:param min_size: width, height
+:return:
+"""
+    import cv2
+
+    data = _as_bytes(source)
+    flags = cv2.IMREAD_COLOR
+    if min_size is not None and _is_jpeg(data):
+        flags = {
+            1: cv2.IMREAD_COLOR,
+            2: cv2.IMREAD_REDUCED_COLOR_2,
+            4: cv2.IMREAD_REDUCED_COLOR_4,
+            8: cv2.IMREAD_REDUCED_COLOR_8,
+        }[
+            reduction_factor(Image.open(io.BytesIO(data)).size, min_size)
+        ]  # PIL only parses the header here
+    image = cv2.imdecode(numpy.frombuffer(data, dtype=numpy.uint8), flags)
+    if image is None:
+        raise ValueError("OpenCV could not decode the image")
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+_turbo_jpeg = None
+
+
+@register_image_decoder("turbojpeg")
+def turbojpeg_decode(
+    source: ImageSource, min_size: Optional[Tuple[int, int]] = None
+) -> numpy.ndarray:
+    """
+libjpeg-turbo through PyTurboJPEG, with a DCT scaling factor when min_size allows, other formats
+than JPEG fall back to PIL
+
+:param source: a path or the encoded bytes
+:param min_size: width, height
+:return:
+"""
+    global _turbo_jpeg
+    data = _as_bytes(source)
+    if not _is_jpeg(data):
+        return pil_decode(data)
+    try:
+        from turbojpeg import TJPF_RGB, TurboJPEG
+    except ImportError as e:
+        raise ImportError(
+            "The turbojpeg decoder needs PyTurboJPEG and libturbojpeg, "
+            "pip install neodroidvision[turbojpeg]"
+        ) from e
+    if _turbo_jpeg is None:
+        _turbo_jpeg = TurboJPEG()
+    data = bytes(data)
+    width, height, *_ = _turbo_jpeg.decode_header(data)
+    factor = reduction_factor((width, height), min_size)
+    return _turbo_jpeg.decode(data, pixel_format=TJPF_RGB, scaling_factor=(1, factor))
+
+
+class ImageDecoder:
+    """
+Decodes images to RGB uint8 HWC arrays with a registered backend, optionally at a reduced
+resolution that is still at least target_size / max_upsampling. Callers that keep annotations in
+source pixel coordinates must scale them by the decoded over the source size, see decoded_scale.
+"""
+
+    def __init__(
+        self,
+        backend: str = "pil",
+        target_size: Optional[Union[int, Tuple[int, int]]] = None,
+        max_upsampling: float = 1.0,
+    ):
+        """
+
+:param backend: one of available_image_decoders()
+:type backend:
+:param target_size: width, height (or one int for both) the image will be resized to, None always
+decodes at full resolution
+:type target_size:
+:param max_upsampling: how much the reduced image may need to be upsampled to target_size, 1 never
+upsamples. A 640x480 image only decodes at half size for a 300x300 target with 1.25
+:type max_upsampling:
+"""
+        if backend not in IMAGE_DECODERS:
+            raise ValueError(
+                f"Unknown image decoder {backend}, available are {available_image_decoders()}"
+            )
+        if isinstance(target_size, int):
+            target_size = (target_size, target_size)
+        self.backend = backend
+        self.target_size = None if target_size is None else tuple(target_size)
+        self.max_upsampling = max_upsampling
+        self._min_size = None
+        if target_size is not None:
+            self._min_size = tuple(
+                max(1, int(math.ceil(t / max_upsampling))) for t in target_size
+            )
+
+    def __call__(self, source: ImageSource) -> numpy.ndarray:
+        """
+
+:param source: a path or the encoded bytes
+:type source:
+:return:
+:rtype:
+"""
+        return IMAGE_DECODERS[self.backend](source, self._min_size)
+
+    @staticmethod
+    def decoded_scale(
+        image: numpy.ndarray, source_size: Tuple[int, int]
+    ) -> numpy.ndarray:
+        """
+
+:param image: as decoded
+:type image:
+:param source_size: height, width of the source image
+:type source_size:
+:return: x1, y1, x2, y2 factors taking source pixel coordinates to decoded ones
+:rtype:
+"""
+        sx, sy = image.shape[1] / source_size[1], image.shape[0] / source_size[0]
+        return numpy.array((sx, sy, sx, sy), dtype=numpy.float32)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(backend={self.backend!r}, "
+            f"target_size={self.target_size}, max_upsampling={self.max_upsampling})"
+        )
@@ -70,9 +70,22 @@ return (img * self.std + self.mean).astype(numpy.uint8)
         transp=True,
         N_FOLDS=10,
         SEED=246232,
+        uint8_transport: bool = False,
     ):
+        """
+
+:param csv_path:
+:param image_data_path:
+:param subset:
+:param transp:
+:param N_FOLDS:
+:param SEED:
+:param uint8_transport: return uint8 CHW images and masks in [0, 255], for scaling on the
+consumer side, e.g. with InputNormalisation(scale=1 / 255) for both
+"""
 
         self.transp = transp
+        self.uint8_transport = uint8_transport
 
         if subset != subset.Testing:
             data_frame = pandas.read_csv(csv_path / f"train.csv")
@@ -128,11 +141,11 @@ return (img * self.std + self.mean).astype(numpy.uint8)
         else:
             self.transforms = albumentations.Compose(self.validation_augmentations())
 
-    def fetch_masks(self, image_name: str):
+    def fetch_masks(self, image_name: str, dtype=numpy.float32):
         """
-Create mask based on df, image name and shape.
+Create mask based on df, image name and shape, in [0, 1] for float dtypes, [0, 255] for uint8.
 """
-        masks = numpy.zeros(self.response_shape, dtype=numpy.float32)
+        masks = numpy.zeros(self.response_shape, dtype=dtype)
         df = self.data_frame[self.data_frame["im_id"] == image_name]
 
         for idx, im_name in enumerate(df["im_id"].values):
@@ -146,6 +159,8 @@ Create mask based on df, image name and shape.
                 mask = cv2_resize(mask, self.image_size_T)
                 masks[..., classidx] = mask
 
+        if masks.dtype == numpy.uint8:
+            return masks
         return masks / 255.0
 
     @staticmethod
@@ -157,7 +172,9 @@ Create mask based on df, image name and shape.
 
     def __getitem__(self, idx):
         image_name = self.img_ids[idx]
-        masks = self.fetch_masks(image_name)
+        masks = self.fetch_masks(
+            image_name, numpy.uint8 if self.uint8_transport else numpy.float32
+        )
         img = cv2.imread(str(self.image_data_path / image_name))
         img = cv2_resize(img, self.image_size_T)
         img_o = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
@@ -165,8 +182,12 @@ Create mask based on df, image name and shape.
             augmented = self.transforms(image=img_o, mask=masks)
             img_o = augmented["image"]
             masks = augmented["mask"]
-        img_o = uint_hwc_to_chw_float(img_o)
-        masks = hwc_to_chw(masks)
+        if self.uint8_transport:
+            img_o = numpy.ascontiguousarray(hwc_to_chw(img_o))
+            masks = numpy.ascontiguousarray(hwc_to_chw(masks))
+        else:
+            img_o = uint_hwc_to_chw_float(img_o)
+            masks = hwc_to_chw(masks)
         if self.subset == Split.Testing:
             return img_o, masks, self.no_info_mask(img)
         return img_o, masks
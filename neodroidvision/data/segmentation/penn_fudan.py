@@ -9,7 +9,7 @@ __doc__ = r"""
 
 from enum import Enum
 from pathlib import Path
-from typing import Tuple, Union
+from typing import Optional, Tuple, Union
 
 import numpy
 import torch
@@ -29,6 +29,7 @@ from draugr.torch_utilities import (
 
 __all__ = ["PennFudanDataset"]
 
+from neodroidvision.data.image_decoding import ImageDecoder
 from neodroidvision.utilities import (
     TupleCompose,
     TupleRandomHorizontalFlip,
@@ -127,6 +128,8 @@ class PennFudanDataset(SupervisedDataset):
         root: Union[str, Path],
         split: Split = Split.Training,
         return_variant: ReturnVariant = ReturnVariant.binary,
+        decoder: Optional[ImageDecoder] = None,
+        uint8_transport: bool = False,
     ):
         """
 
@@ -134,12 +137,24 @@ class PennFudanDataset(SupervisedDataset):
 :type root:
 :param split:
 :type split:
+:param decoder: decodes the images of the binary variant, defaults to PIL at the smallest
+resolution still at least image_size
+:type decoder:
+:param uint8_transport: the binary variant returns uint8 images and masks, for scaling on the
+consumer side with InputNormalisation(scale=1 / 255) and mask.float()
+:type uint8_transport:
 """
         super().__init__()
         if not isinstance(root, Path):
             root = Path(root)
         self._root_data_path = root
         self._return_variant = return_variant
+        self._uint8_transport = uint8_transport
+        self._decoder = (
+            decoder
+            if decoder is not None
+            else ImageDecoder(target_size=self.image_size)
+        )
 
         if self._return_variant != ReturnVariant.all:
             self._transforms = self.get_transforms(split)
@@ -163,6 +178,7 @@ class PennFudanDataset(SupervisedDataset):
         self.masks = list(
             sorted(self._ped_path.iterdir())
         )  # ensure that they are aligned
+        self._img_infos = {}
 
     def __getitem__(self, idx: int):
         """
@@ -182,7 +198,7 @@ class PennFudanDataset(SupervisedDataset):
 :return:
 :rtype:
 """
-        img = numpy.array(Image.open(self._img_path / self.imgs[idx]).convert("RGB"))
+        img = self._decoder(self._img_path / self.imgs[idx])
         mask = numpy.array(Image.open(self._ped_path / self.masks[idx]))
 
         mask[mask != 0] = 1.0
@@ -190,6 +206,12 @@ class PennFudanDataset(SupervisedDataset):
         img = cv2_resize(img, self.image_size_T)
         mask = cv2_resize(mask, self.image_size_T)
 
+        if self._uint8_transport:
+            return (
+                to_tensor(img, dtype=torch.uint8).permute(2, 0, 1),
+                to_tensor(mask, dtype=torch.uint8).unsqueeze(0),
+            )
+
         return (
             uint_hwc_to_chw_float_tensor(to_tensor(img, dtype=torch.uint8)),
             to_tensor(mask).unsqueeze(0),
@@ -269,6 +291,21 @@ class PennFudanDataset(SupervisedDataset):
             ),
         )
 
+    def get_img_info(self, idx: int) -> Tuple[int, int]:
+        """
+Reads only the image header
+
+:param idx:
+:type idx:
+:return: height, width
+:rtype:
+"""
+        if idx not in self._img_infos:
+            with Image.open(self._img_path / self.imgs[idx]) as image:
+                width, height = image.size
+            self._img_infos[idx] = height, width
+        return self._img_infos[idx]
+
     def __len__(self):
         return len(self.imgs)
 
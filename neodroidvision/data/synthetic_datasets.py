@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Writes synthetic datasets in the on disk layouts of VOCDataset, COCODataset,
+           CloudSegmentationDataset and PennFudanDataset, for data pipeline benchmarks and scaling
+           tests without real data.
+
+           Images are smooth random backgrounds with an elliptic object drawn in every annotated
+           box. Image i is generated from the seed and i alone, so generation splits into chunks
+           of images on a process pool with the same output for any number of workers. Chunks write
+           their images and annotation files directly, and fragments of the shared annotation files
+           (instances json, train.csv), which are concatenated in order by streaming, memory stays
+           bounded for millions of images.
+           """
+
+import functools
+import json
+import multiprocessing
+import shutil
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Iterator, List, Sequence, Tuple, Union
+
+import numpy
+from PIL import Image, ImageDraw
+
+__all__ = [
+    "write_synthetic_voc",
+    "write_synthetic_coco",
+    "write_synthetic_clouds",
+    "write_synthetic_penn_fudan",
+    "write_synthetic_dataset",
+    "SYNTHETIC_DATASET_WRITERS",
+]
+
+Size = Tuple[int, int]
+
+
+def _image_rng(seed: int, index: int) -> numpy.random.Generator:
+    return numpy.random.default_rng([seed, index])
+
+
+def _image_size(
+    rng: numpy.random.Generator, image_size: Size, size_jitter: float
+) -> Size:
+    height, width = image_size
+    if size_jitter:
+        height, width = (
+            int(round(s * rng.uniform(1 - size_jitter, 1 + size_jitter)))
+            for s in image_size
+        )
+    return max(height, 8), max(width, 8)
+
+
+def _objects(
+    rng: numpy.random.Generator,
+    size: Size,
+    objects_per_image: Tuple[int, int],
+    num_categories: int,
+    tall: bool = False,
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+:return: boxes (N, 4) x1, y1, x2, y2 in pixels, inclusive, labels (N,) in [1, num_categories]
+"""
+    height, width = size
+    n = rng.integers(objects_per_image[0], objects_per_image[1] + 1)
+    wh = rng.uniform(0.1, 0.5, (n, 2)) * (width, height)
+    if tall:  # pedestrians
+        wh[:, 0] = numpy.minimum(wh[:, 0], wh[:, 1] / 2)
+    wh = numpy.maximum(wh.astype(numpy.int64), 2)
+    x1 = (rng.random(n) * (width - wh[:, 0])).astype(numpy.int64)
+    y1 = (rng.random(n) * (height - wh[:, 1])).astype(numpy.int64)
+    boxes = numpy.stack((x1, y1, x1 + wh[:, 0] - 1, y1 + wh[:, 1] - 1), 1)
+    return boxes, rng.integers(1, num_categories + 1, n)
+
+
+def _render(
+    rng: numpy.random.Generator, size: Size, boxes: numpy.ndarray
+) -> Tuple[Image.Image, Image.Image]:
+    """
+:return: the rgb image and its instance mask, 0 the background and i + 1 the ellipse in boxes[i]
+"""
+    height, width = size
+    image = Image.fromarray(rng.integers(0, 256, (4, 4, 3), dtype=numpy.uint8)).resize(
+        (width, height), Image.BILINEAR
+    )
+    mask = Image.new("L", (width, height))
+    draw, draw_mask = ImageDraw.Draw(image), ImageDraw.Draw(mask)
+    for instance, box in enumerate(boxes.tolist(), 1):
+        draw.ellipse(box, fill=tuple(rng.integers(0, 256, 3).tolist()))
+        draw_mask.ellipse(box, fill=instance)
+    return image, mask
+
+
+def _chunks(
+    function: Callable, num_images: int, num_workers: int, chunk_size: int, **kws
+) -> Iterator:
+    """
+:return: the results of function((start, stop), **kws) over the chunks of range(num_images), in
+order
+"""
+    chunks = [
+        (start, min(start + chunk_size, num_images))
+        for start in range(0, num_images, chunk_size)
+    ]
+    function = functools.partial(function, **kws)
+    if num_workers > 0 and len(chunks) > 1:
+        with multiprocessing.get_context().Pool(num_workers) as pool:
+            yield from pool.imap(function, chunks)
+    else:
+        yield from map(function, chunks)
+
+
+def _concatenate(fragments: Sequence[Path], out, separator: str = "") -> None:
+    written = False
+    for fragment in fragments:
+        if fragment.stat().st_size:
+            if written:
+                out.write(separator)
+            with open(fragment) as f:
+                shutil.copyfileobj(f, out)
+            written = True
+
+
+def _voc_chunk(
+    chunk: Tuple[int, int],
+    *,
+    data_dir: Path,
+    categories: Sequence[str],
+    id_width: int,
+    seed: int,
+    image_size: Size,
+    size_jitter: float,
+    objects_per_image: Tuple[int, int],
+    jpeg_quality: int,
+) -> List[str]:
+    ids = []
+    for index in range(*chunk):
+        rng = _image_rng(seed, index)
+        size = _image_size(rng, image_size, size_jitter)
+        boxes, labels = _objects(rng, size, objects_per_image, len(categories) - 1)
+        image, _ = _render(rng, size, boxes)
+        image_id = f"{index:0{id_width}d}"
+        image.save(data_dir / "JPEGImages" / f"{image_id}.jpg", quality=jpeg_quality)
+
+        objects = "".join(
+            f"<object><name>{categories[label]}</name><pose>Unspecified</pose>"
+            f"<truncated>0</truncated><difficult>{int(rng.random() < 0.1)}</difficult>"
+            f"<bndbox><xmin>{x1 + 1}</xmin><ymin>{y1 + 1}</ymin>"
+            f"<xmax>{x2 + 1}</xmax><ymax>{y2 + 1}</ymax></bndbox></object>"
+            for (x1, y1, x2, y2), label in zip(boxes.tolist(), labels.tolist())
+        )  # one based pixel coordinates, as matlab
+        (data_dir / "Annotations" / f"{image_id}.xml").write_text(
+            f"<annotation><folder>{data_dir.name}</folder><filename>{image_id}.jpg</filename>"
+            f"<size><width>{size[1]}</width><height>{size[0]}</height><depth>3</depth></size>"
+            f"<segmented>0</segmented>{objects}</annotation>"
+        )
+        ids.append(image_id)
+    return ids
+
+
+def write_synthetic_voc(
+    data_root: Union[str, Path],
+    dataset_name: str = "voc_2007_trainval",
+    *,
+    num_images: int = 100,
+    image_size: Size = (375, 500),
+    size_jitter: float = 0.2,
+    objects_per_image: Tuple[int, int] = (0, 5),
+    jpeg_quality: int = 90,
+    seed: int = 0,
+    num_workers: int = 0,
+    chunk_size: int = 256,
+) -> Path:
+    """
+Writes Annotations, ImageSets/Main and JPEGImages of dataset_name, one in ten objects difficult
+
+:param data_root: as given to VOCDataset
+:param dataset_name: a VOCDataset dataset name, e.g. voc_2007_test
+:param num_images:
+:param image_size: height, width
+:param size_jitter: each side is scaled by a uniform factor in [1 - size_jitter, 1 + size_jitter]
+:param objects_per_image: least and most, inclusive
+:param jpeg_quality:
+:param seed:
+:param num_workers: processes, 0 generates in this process
+:param chunk_size: images per task
+:return: data_root
+"""
+    from neodroidvision.data.detection.voc import VOCDataset
+
+    data_root = Path(data_root)
+    data_dir = data_root / VOCDataset.data_dirs[dataset_name]
+    for directory in ("Annotations", "JPEGImages", "ImageSets/Main"):
+        (data_dir / directory).mkdir(parents=True, exist_ok=True)
+
+    with open(
+        data_dir / "ImageSets" / "Main" / f"{VOCDataset.splits[dataset_name]}.txt", "w"
+    ) as image_set:
+        for ids in _chunks(
+            _voc_chunk,
+            num_images,
+            num_workers,
+            chunk_size,
+            data_dir=data_dir,
+            categories=VOCDataset.categories,
+            id_width=max(6, len(str(num_images - 1))),
+            seed=seed,
+            image_size=image_size,
+            size_jitter=size_jitter,
+            objects_per_image=objects_per_image,
+            jpeg_quality=jpeg_quality,
+        ):
+            image_set.writelines(f"{image_id}\n" for image_id in ids)
+    return data_root
+
+
+def _coco_chunk(
+    chunk: Tuple[int, int],
+    *,
+    image_dir: Path,
+    fragment_dir: Path,
+    file_prefix: str,
+    num_categories: int,
+    seed: int,
+    image_size: Size,
+    size_jitter: float,
+    objects_per_image: Tuple[int, int],
+    jpeg_quality: int,
+) -> Tuple[Path, Path]:
+    images, annotations = [], []
+    for index in range(*chunk):
+        rng = _image_rng(seed, index)
+        size = _image_size(rng, image_size, size_jitter)
+        boxes, labels = _objects(rng, size, objects_per_image, num_categories)
+        image, _ = _render(rng, size, boxes)
+        image_id = index + 1
+        file_name = f"{file_prefix}{image_id:012d}.jpg"
+        image.save(image_dir / file_name, quality=jpeg_quality)
+        images.append(
+            json.dumps(
+                dict(id=image_id, file_name=file_name, height=size[0], width=size[1])
+            )
+        )
+        for k, ((x1, y1, x2, y2), label) in enumerate(
+            zip(boxes.tolist(), labels.tolist())
+        ):
+            w, h = x2 - x1 + 1, y2 - y1 + 1
+            annotations.append(
+                json.dumps(
+                    dict(
+                        id=image_id * (objects_per_image[1] + 1) + k,
+                        image_id=image_id,
+                        category_id=label,
+                        bbox=[x1, y1, w, h],
+                        area=w * h * numpy.pi / 4,
+                        iscrowd=0,
+                        segmentation=[[x1, y1, x1 + w, y1, x1 + w, y1 + h, x1, y1 + h]],
+                    )
+                )
+            )
+    fragments = (
+        fragment_dir / f"images_{chunk[0]}",
+        fragment_dir / f"annotations_{chunk[0]}",
+    )
+    for fragment, entries in zip(fragments, (images, annotations)):
+        fragment.write_text(",".join(entries))
+    return fragments
+
+
+def write_synthetic_coco(
+    data_root: Union[str, Path],
+    dataset_name: str = "coco_2014_train",
+    *,
+    num_images: int = 100,
+    image_size: Size = (480, 640),
+    size_jitter: float = 0.2,
+    objects_per_image: Tuple[int, int] = (0, 8),
+    jpeg_quality: int = 90,
+    seed: int = 0,
+    num_workers: int = 0,
+    chunk_size: int = 256,
+) -> Path:
+    """
+Writes the instances json and the images of dataset_name, with the 80 coco categories by
+contiguous ids
+
+:param data_root: as given to COCODataset
+:param dataset_name: a COCODataset dataset name, e.g. coco_2014_val
+:return: data_root
+"""
+    from neodroidvision.data.detection.coco import COCODataset
+
+    data_root = Path(data_root)
+    annotation_file = data_root / COCODataset.splits[dataset_name]
+    image_dir = data_root / COCODataset.image_dirs[dataset_name]
+    fragment_dir = data_root / f".{dataset_name}.fragments"
+    for directory in (annotation_file.parent, image_dir, fragment_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    categories = COCODataset.categories[1:]
+    fragments = list(
+        _chunks(
+            _coco_chunk,
+            num_images,
+            num_workers,
+            chunk_size,
+            image_dir=image_dir,
+            fragment_dir=fragment_dir,
+            file_prefix=f"COCO_{image_dir.name}_",
+            num_categories=len(categories),
+            seed=seed,
+            image_size=image_size,
+            size_jitter=size_jitter,
+            objects_per_image=objects_per_image,
+            jpeg_quality=jpeg_quality,
+        )
+    )
+    with open(annotation_file, "w") as out:
+        out.write('{"info": {"description": "synthetic"}, "categories": ')
+        out.write(
+            json.dumps(
+                [
+                    dict(id=i, name=name, supercategory=name)
+                    for i, name in enumerate(categories, 1)
+                ]
+            )
+        )
+        out.write(', "images": [')
+        _concatenate([images for images, _ in fragments], out, ",")
+        out.write('], "annotations": [')
+        _concatenate([annotations for _, annotations in fragments], out, ",")
+        out.write("]}")
+    shutil.rmtree(fragment_dir)
+    return data_root
+
+
+def _encode_png(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _clouds_chunk(
+    chunk: Tuple[int, int],
+    *,
+    root: Path,
+    fragment_dir: Path,
+    categories: Sequence[str],
+    num_train: int,
+    seed: int,
+    image_size: Size,
+    size_jitter: float,
+    objects_per_image: Tuple[int, int],
+    jpeg_quality: int,
+) -> Tuple[Path, Path]:
+    from neodroidvision.segmentation.masks.run_length_encoding import (
+        mask_to_run_length,
+    )
+
+    train_rows, test_rows = [], []
+    for index in range(*chunk):
+        rng = _image_rng(seed, index)
+        size = _image_size(rng, image_size, size_jitter)
+        boxes, labels = _objects(rng, size, objects_per_image, len(categories))
+        image, instances = _render(rng, size, boxes)
+        name = f"{index:07x}.jpg"
+        if index >= num_train:
+            image.save(root / "test_images_525" / name, quality=jpeg_quality)
+            test_rows.extend(f"{name}_{category},1 1" for category in categories)
+            continue
+
+        image.save(root / "train_images_525" / name, quality=jpeg_quality)
+        instances = numpy.asarray(instances)
+        for label, category in enumerate(categories, 1):
+            mask = numpy.isin(instances, numpy.flatnonzero(labels == label) + 1)
+            encoded = ""
+            if mask.any():
+                encoded = mask_to_run_length(mask.astype(numpy.uint8))
+                (root / "train_masks_525" / f"{category}{name}").write_bytes(
+                    _encode_png(Image.fromarray(mask.astype(numpy.uint8) * 255))
+                )  # png bytes, read by content, under the name the dataset looks up
+            train_rows.append(f"{name}_{category},{encoded}")
+    fragments = fragment_dir / f"train_{chunk[0]}", fragment_dir / f"test_{chunk[0]}"
+    for fragment, rows in zip(fragments, (train_rows, test_rows)):
+        fragment.write_text("".join(f"{row}\n" for row in rows))
+    return fragments
+
+
+def write_synthetic_clouds(
+    root: Union[str, Path],
+    *,
+    num_images: int = 100,
+    num_test_images: int = None,
+    image_size: Size = (1400, 2100),
+    size_jitter: float = 0.0,
+    objects_per_image: Tuple[int, int] = (1, 4),
+    jpeg_quality: int = 90,
+    seed: int = 0,
+    num_workers: int = 0,
+    chunk_size: int = 64,
+) -> Path:
+    """
+Writes train.csv with run length EncodedPixels per image and category, the train images and masks
+and the test images with sample_submission.csv
+
+:param root: as given to CloudSegmentationDataset, as both csv_path and image_data_path
+:param num_images: of the training split, which CloudSegmentationDataset folds into training
+and validation
+:param num_test_images: num_images // 10 if None
+:return: root
+"""
+    from neodroidvision.data.segmentation.clouds import CloudSegmentationDataset
+
+    root = Path(root)
+    fragment_dir = root / ".clouds.fragments"
+    for directory in (
+        "train_images_525",
+        "train_masks_525",
+        "test_images_525",
+        fragment_dir.name,
+    ):
+        (root / directory).mkdir(parents=True, exist_ok=True)
+    if num_test_images is None:
+        num_test_images = max(num_images // 10, 1)
+
+    fragments = list(
+        _chunks(
+            _clouds_chunk,
+            num_images + num_test_images,
+            num_workers,
+            chunk_size,
+            root=root,
+            fragment_dir=fragment_dir,
+            categories=list(CloudSegmentationDataset.categories.values()),
+            num_train=num_images,
+            seed=seed,
+            image_size=image_size,
+            size_jitter=size_jitter,
+            objects_per_image=objects_per_image,
+            jpeg_quality=jpeg_quality,
+        )
+    )
+    for file_name, split_fragments in (
+        ("train.csv", [train for train, _ in fragments]),
+        ("sample_submission.csv", [test for _, test in fragments]),
+    ):
+        with open(root / file_name, "w") as out:
+            out.write("Image_Label,EncodedPixels\n")
+            _concatenate(split_fragments, out)
+    shutil.rmtree(fragment_dir)
+    return root
+
+
+def _penn_fudan_chunk(
+    chunk: Tuple[int, int],
+    *,
+    root: Path,
+    seed: int,
+    image_size: Size,
+    size_jitter: float,
+    objects_per_image: Tuple[int, int],
+) -> None:
+    for index in range(*chunk):
+        rng = _image_rng(seed, index)
+        size = _image_size(rng, image_size, size_jitter)
+        boxes, _ = _objects(rng, size, objects_per_image, 1, tall=True)
+        image, instances = _render(rng, size, boxes)
+        image.save(root / "PNGImages" / f"FudanPed{index:05d}.png")
+        instances.save(root / "PedMasks" / f"FudanPed{index:05d}_mask.png")
+
+
+def write_synthetic_penn_fudan(
+    root: Union[str, Path],
+    *,
+    num_images: int = 100,
+    image_size: Size = (360, 480),
+    size_jitter: float = 0.2,
+    objects_per_image: Tuple[int, int] = (1, 4),
+    jpeg_quality: int = None,
+    seed: int = 0,
+    num_workers: int = 0,
+    chunk_size: int = 128,
+) -> Path:
+    """
+Writes PNGImages and PedMasks, masks hold the instance index of every pixel, 0 the background
+
+:param root: as given to PennFudanDataset
+:param jpeg_quality: unused, the images are png as in the original
+:return: root
+"""
+    root = Path(root)
+    for directory in ("PNGImages", "PedMasks"):
+        (root / directory).mkdir(parents=True, exist_ok=True)
+    for _ in _chunks(
+        _penn_fudan_chunk,
+        num_images,
+        num_workers,
+        chunk_size,
+        root=root,
+        seed=seed,
+        image_size=image_size,
+        size_jitter=size_jitter,
+        objects_per_image=objects_per_image,
+    ):
+        pass
+    return root
+
+
+SYNTHETIC_DATASET_WRITERS = {
+    "voc": write_synthetic_voc,
+    "coco": write_synthetic_coco,
+    "clouds": write_synthetic_clouds,
+    "penn_fudan": write_synthetic_penn_fudan,
+}
+
+
+def write_synthetic_dataset(kind: str, root: Union[str, Path], **kws) -> Path:
+    """
+
+:param kind: one of SYNTHETIC_DATASET_WRITERS
+:param root:
+:param kws: of the writer
+:return: the root to give the dataset
+"""
+    if kind not in SYNTHETIC_DATASET_WRITERS:
+        raise ValueError(
+            f"Unknown dataset kind {kind}, one of {list(SYNTHETIC_DATASET_WRITERS)}"
+        )
+    return SYNTHETIC_DATASET_WRITERS[kind](root, **kws)
@@ -4,5 +4,12 @@
 __author__ = "Christian Heider Nielsen"
 __doc__ = ""
 
-from .single_stage import *
-from .two_stage import *
+from typing import TYPE_CHECKING
+
+from neodroidvision.utilities.lazy_importing import lazy_star_imports
+
+__getattr__, __dir__ = lazy_star_imports(__name__, ("single_stage", "two_stage"))
+
+if TYPE_CHECKING:
+    from .single_stage import *
+    from .two_stage import *
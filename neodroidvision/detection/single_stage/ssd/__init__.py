@@ -14,3 +14,5 @@ from .bounding_boxes import *
 from .ssd_evaluation import *
 from .multi_box_loss import *
 from .object_detection_dataloader import *
+from .prediction_spilling import *
+from .batch_inference import *
@@ -1,5 +1,5 @@
 from collections import namedtuple
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple, Union
 
 import torch
 from neodroidvision.detection.single_stage.ssd.architecture.nms_box_heads.box_predictor import (
@@ -14,7 +14,7 @@ from torch.nn import Parameter, functional
 
 from draugr.torch_utilities import to_tensor
 
-__all__ = ["SSDNmsBoxHead", "SSDOut"]
+__all__ = ["SSDNmsBoxHead", "SSDOut", "SSDBatchOut"]
 
 from neodroidvision.utilities.torch_utilities.non_maximum_suppression import (
     batched_non_maximum_suppression,
@@ -22,6 +22,10 @@ from neodroidvision.utilities.torch_utilities.non_maximum_suppression import (
 from warg import drop_unused_kws
 
 SSDOut = namedtuple("SSDOut", ("boxes", "labels", "scores", "img_width", "img_height"))
+SSDBatchOut = namedtuple(
+    "SSDBatchOut",
+    ("boxes", "labels", "scores", "num_detections", "img_width", "img_height"),
+)
 
 
 class SSDNmsBoxHead(nn.Module):
@@ -40,7 +44,9 @@ class SSDNmsBoxHead(nn.Module):
         max_per_image: Any,
         center_variance: Any,
         size_variance: Any,
-        max_candidates: int = 100
+        max_candidates: int = 100,
+        batched_post_processing: bool = False,
+        nms_backend: Optional[str] = None
     ):
         """
 
@@ -60,6 +66,12 @@ class SSDNmsBoxHead(nn.Module):
 :type size_variance:
 :param predictor:
 :type predictor:
+:param max_candidates: number of highest scoring candidates per image passed on to nms
+:type max_candidates:
+:param batched_post_processing: post process the whole batch at once, see forward_batched
+:type batched_post_processing:
+:param nms_backend: a registered nms backend, see available_nms_backends, None selects the default
+:type nms_backend:
 """
         super().__init__()
 
@@ -74,6 +86,8 @@ class SSDNmsBoxHead(nn.Module):
         self.center_variance = center_variance
         self.size_variance = size_variance
         self.max_candidates = max_candidates
+        self.batched_post_processing = batched_post_processing
+        self.nms_backend = nms_backend
 
     def post_init(self, **priors_cfg) -> None:
         """
@@ -105,7 +119,7 @@ Only keep detections above the confidence threshold
         indices = torch.argsort(scores, descending=True)
         return (scores[indices][:k], *[a[indices][:k] for a in args])
 
-    def forward(self, features: torch.Tensor) -> SSDOut:
+    def forward(self, features: torch.Tensor) -> Union[SSDOut, SSDBatchOut]:
         """
 
 :param features:
@@ -113,6 +127,9 @@ Only keep detections above the confidence threshold
 :return:
 :rtype:
 """
+        if self.batched_post_processing:
+            return self.forward_batched(features)
+
         categori_logits, bbox_pred = self.predictor(features)
 
         results = []
@@ -159,7 +176,11 @@ scores, boxes, labels = self.keep_above(scores,
             boxes[:, 1::2] *= self.height
 
             keep = batched_non_maximum_suppression(
-                boxes, scores, labels, self.non_maximum_supression_threshold
+                boxes,
+                scores,
+                labels,
+                self.non_maximum_supression_threshold,
+                backend=self.nms_backend,
             )
             keep = keep[: self.max_per_image]  # keep only topk scoring predictions
 
@@ -174,3 +195,85 @@ scores, boxes, labels = self.keep_above(scores,
             )
 
         return SSDOut(*[to_tensor(x) for x in zip(*results)])
+
+    def forward_batched(self, features: torch.Tensor) -> SSDBatchOut:
+        """
+Post processes the whole batch at once without python loops or data dependent control flow,
+so it traces and the confidence threshold is also applied by exported models.
+
+Scores are softmax probabilities, candidates not above the confidence threshold are masked out,
+the max_candidates highest scoring (prior, category) pairs of each image are selected with topk
+and a single nms call separates images and categories by coordinate offsets.
+
+:param features:
+:type features:
+:return: boxes (N, max_per_image, 4), labels (N, max_per_image), scores (N, max_per_image),
+padded with zeros after the first num_detections (N) entries of each image
+:rtype:
+"""
+        categori_logits, bbox_pred = self.predictor(features)
+
+        scores = functional.softmax(categori_logits, dim=-1)[
+            ..., 1:
+        ]  # remove the background category
+        boxes = conversion.center_to_corner_form(
+            conversion.locations_to_boxes(
+                locations=bbox_pred,
+                priors=self._priors,
+                center_variance=self.center_variance,
+                size_variance=self.size_variance,
+            )
+        )
+        boxes = boxes * torch.tensor(
+            [self.width, self.height, self.width, self.height],
+            dtype=boxes.dtype,
+            device=boxes.device,
+        )  # Resize boxes
+
+        batch_size, num_priors, num_categories = scores.shape
+        scores = scores.reshape(batch_size, num_priors * num_categories)
+        above = scores > self.confidence_threshold
+        scores = torch.where(above, scores, torch.zeros_like(scores) - 1)
+
+        num_candidates = min(self.max_candidates, num_priors * num_categories)
+        scores, candidates = scores.topk(num_candidates, dim=1)  # sorted descending
+        labels = candidates % num_categories + 1
+        boxes = torch.gather(
+            boxes,
+            1,
+            (candidates // num_categories).unsqueeze(-1).expand(-1, -1, 4),
+        )
+        valid = scores > self.confidence_threshold
+
+        image_index = (
+            torch.arange(batch_size, device=scores.device)
+            .unsqueeze(1)
+            .expand_as(labels)
+        )
+        keep = batched_non_maximum_suppression(
+            boxes.reshape(-1, 4),
+            scores.reshape(-1),
+            (image_index * (num_categories + 1) + labels).reshape(-1),
+            self.non_maximum_supression_threshold,
+            backend=self.nms_backend,
+        )
+        kept = (
+            torch.zeros_like(scores).reshape(-1).index_fill(0, keep, 1.0).reshape_as(scores)
+            > 0
+        ) & valid
+
+        num_out = min(self.max_per_image, num_candidates)
+        kept_scores, order = torch.where(
+            kept, scores, torch.zeros_like(scores) - 1
+        ).topk(num_out, dim=1)
+        kept = torch.gather(kept, 1, order)
+
+        return SSDBatchOut(
+            boxes=torch.gather(boxes, 1, order.unsqueeze(-1).expand(-1, -1, 4))
+            * kept.unsqueeze(-1),
+            labels=torch.gather(labels, 1, order) * kept,
+            scores=kept_scores * kept,
+            num_detections=kept.sum(1),
+            img_width=to_tensor(self.width),
+            img_height=to_tensor(self.height),
+        )
@@ -3,6 +3,9 @@ from torch import nn
 
 __all__ = ["SingleShotDectection"]
 
+from neodroidvision.utilities.torch_utilities.input_normalisation import (
+    InputNormalisation,
+)
 from warg import NOD
 
 
@@ -19,5 +22,9 @@ class SingleShotDectection(nn.Module):
             cfg.model.box_head.num_categories,
         )
 
+        self.input_normalisation = InputNormalisation(
+            mean=cfg.input.pixel_mean
+        )  # for uint8 batches, see data_loader.uint8_transport
+
     def forward(self, images: torch.Tensor) -> torch.Tensor:
-        return self.backbone(images)
+        return self.backbone(self.input_normalisation(images))
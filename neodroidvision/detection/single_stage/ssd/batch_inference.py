@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Batch inference of a SingleShotDectectionNms over a directory or glob of images, see
+           "neodroid-vision detect".
+
+           Images are decoded and resized by a pool of threads (or processes) a few batches ahead
+           of the model, inferred in batches and streamed to a JSON lines file, a line per image,
+           or a COCO results JSON array, an entry per detection. A hidden progress file next to the
+           output records the images written and the size of the output after every batch, so an
+           interrupted run is resumed by truncating a partially written batch and skipping the
+           images already written. Image ids are the trailing digits of the file names when those
+           are unique among the inputs, otherwise the index of every input, the COCO results are
+           accompanied by an image_ids.json mapping every file to its id.
+           """
+
+import collections
+import glob
+import importlib
+import importlib.util
+import itertools
+import json
+import multiprocessing
+import re
+import time
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy
+import torch
+from PIL import Image
+from draugr.torch_utilities import Split
+from torch.nn import Module
+
+from neodroidvision.data.image_decoding import ImageDecoder
+from neodroidvision.detection.single_stage.ssd.architecture.nms_box_heads import (
+    SSDBatchOut,
+    SSDOut,
+)
+from neodroidvision.detection.single_stage.ssd.bounding_boxes.ssd_transforms import (
+    SSDTransform,
+)
+from neodroidvision.detection.single_stage.ssd.ssd_evaluation import split_predictions
+from neodroidvision.utilities.stage_profiling import StageProfiler
+
+__all__ = [
+    "IMAGE_SUFFIXES",
+    "RESULT_FORMATS",
+    "find_images",
+    "image_id_of",
+    "image_ids_of",
+    "load_config",
+    "coco_category_ids",
+    "ImageLoader",
+    "DetectionResultWriter",
+    "detect_images",
+]
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+RESULT_FORMATS = ("jsonl", "coco")
+
+
+def find_images(inputs: Union[str, Path]) -> List[Path]:
+    """
+
+:param inputs: an image, a directory (searched recursively) or a glob pattern
+:type inputs:
+:return: the image files, sorted
+:rtype:
+"""
+    path = Path(inputs)
+    if path.is_file():
+        return [path]
+    if path.is_dir():
+        candidates = path.rglob("*")
+    else:
+        candidates = map(Path, glob.iglob(str(inputs), recursive=True))
+    return sorted(
+        p for p in candidates if p.suffix.lower() in IMAGE_SUFFIXES and p.is_file()
+    )
+
+
+def image_id_of(path: Path, index: int) -> int:
+    """
+
+:param path:
+:type path:
+:param index: of the image among the inputs
+:type index:
+:return: the trailing digits of the file name, as for COCO and VOC images, otherwise index
+:rtype:
+"""
+    digits = re.search(r"(\d+)$", path.stem)
+    return int(digits.group(1)) if digits else index
+
+
+def image_ids_of(paths: Sequence[Path]) -> List[int]:
+    """
+Image ids unique among paths, the same ids for the same paths on every run
+
+:param paths:
+:type paths:
+:return: the trailing digits of the file names when every name has them and they are unique,
+otherwise the index of every image, so files of the same name in different directories never share
+an id
+:rtype:
+"""
+    ids = [image_id_of(Path(p), -1) for p in paths]
+    if min(ids, default=0) >= 0 and len(set(ids)) == len(ids):
+        return ids
+    return list(range(len(paths)))
+
+
+def load_config(config: Union[str, Path], name: str = "base_cfg") -> Any:
+    """
+
+:param config: a python file or module defining the config, as the ssd sample configs
+:type config:
+:param name: of the config in the module
+:type name:
+:return:
+:rtype:
+"""
+    if Path(config).is_file():
+        spec = importlib.util.spec_from_file_location(Path(config).stem, str(config))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(str(config))
+    return getattr(module, name)
+
+
+def coco_category_ids(annotation_file: Union[str, Path]) -> Dict[int, int]:
+    """
+
+:param annotation_file: a COCO instances json
+:type annotation_file:
+:return: the COCO category id of every contiguous label, as numbered by COCODataset
+:rtype:
+"""
+    with open(annotation_file) as f:
+        categories = json.load(f)["categories"]
+    return {
+        i + 1: category_id
+        for i, category_id in enumerate(sorted(c["id"] for c in categories))
+    }
+
+
+class ImageLoader:
+    """
+Decodes an image and resizes it for the model, picklable for process pools
+"""
+
+    def __init__(
+        self, image_size: int, pixel_mean: Sequence[float], decoder: str = "pil"
+    ):
+        """
+
+:param image_size: of the model input
+:type image_size:
+:param pixel_mean:
+:type pixel_mean:
+:param decoder: see available_image_decoders, JPEGs are decoded at reduced resolution when still
+at least image_size
+:type decoder:
+"""
+        self.decoder = ImageDecoder(decoder, target_size=image_size)
+        self.transform = SSDTransform(
+            image_size, pixel_mean, split=Split.Testing, uint8_transport=True
+        )
+
+    def __call__(
+        self, path: Path
+    ) -> Tuple[Path, Optional[numpy.ndarray], Union[Tuple[int, int], str]]:
+        """
+
+:param path:
+:type path:
+:return: path, the uint8 CHW model input and the height, width of the source, or path, None and
+the error
+:rtype:
+"""
+        try:
+            with Image.open(path) as image:  # only parses the header
+                width, height = image.size
+            image = self.transform(self.decoder(path))[0]
+        except (OSError, ValueError) as e:
+            return path, None, str(e)
+        return path, image.numpy(), (height, width)
+
+
+_LOADER = None
+
+
+def _initialise_loader(loader: ImageLoader) -> None:
+    global _LOADER
+    _LOADER = loader
+
+
+def _load(path: Path) -> tuple:
+    return _LOADER(path)
+
+
+def _prefetched(
+    function: Callable, items: Iterable, pool: Any, window: int
+) -> Iterator:
+    """
+Maps function over items in the pool, in order and at most window items ahead of the consumer,
+unlike Pool.imap which queues every item at once
+"""
+    items = iter(items)
+    pending = collections.deque(
+        pool.apply_async(function, (item,)) for item in itertools.islice(items, window)
+    )
+    while pending:
+        result = pending.popleft().get()
+        for item in itertools.islice(items, 1):
+            pending.append(pool.apply_async(function, (item,)))
+        yield result
+
+
+def _batches(items: Iterable, batch_size: int) -> Iterator[list]:
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class DetectionResultWriter:
+    """
+Streams detections to output in the jsonl or coco format, resumable, used as a context manager.
+The COCO results array is closed when leaving without an exception.
+"""
+
+    def __init__(
+        self,
+        output: Union[str, Path],
+        output_format: str = "jsonl",
+        *,
+        resume: bool = True,
+        category_ids: Optional[Mapping[int, int]] = None,
+        category_names: Optional[Sequence[str]] = None,
+    ):
+        """
+
+:param output:
+:type output:
+:param output_format: jsonl, a line per image with its boxes (x1, y1, x2, y2 in pixels), labels and
+scores, or coco, a COCO results array of an entry per detection
+:type output_format:
+:param resume: continue the results of a previous run, otherwise they are overwritten
+:type resume:
+:param category_ids: of the COCO results per label, the label itself if missing
+:type category_ids:
+:param category_names: per label, added to the jsonl lines
+:type category_names:
+"""
+        if output_format not in RESULT_FORMATS:
+            raise ValueError(
+                f"Unknown result format {output_format}, one of {RESULT_FORMATS}"
+            )
+        self.output = Path(output)
+        self.output_format = output_format
+        self.resume = resume
+        self.category_ids = category_ids or {}
+        self.category_names = category_names
+        self.progress_path = self.output.with_name(f".{self.output.name}.progress")
+        self.image_ids_path = self.output.with_name(f"{self.output.stem}.image_ids.json")
+        self.processed = set()
+        self.num_images = 0
+        self.num_detections = 0
+        self._file = None
+        self._progress = None
+        self._separator = b""
+
+    def __enter__(self) -> "DetectionResultWriter":
+        offset, recorded = 0, 0
+        if self.resume and self.output.exists() and self.progress_path.exists():
+            with open(self.progress_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:  # interrupted while written
+                        break
+                    if not line.endswith(b"\n"):
+                        break
+                    self.processed.update(record["files"])
+                    offset = record["offset"]
+                    recorded += len(line)
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.output, "r+b" if offset else "wb")
+        self._file.truncate(offset)  # drops a partially written batch
+        self._file.seek(offset)
+        self._progress = open(self.progress_path, "r+" if offset else "w")
+        self._progress.truncate(recorded)  # and its partially written record
+        self._progress.seek(recorded)
+        if self.output_format == "coco":
+            if not offset:
+                self._file.write(b"[\n")
+            elif offset > len(b"[\n"):
+                self._separator = b",\n"
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self.output_format == "coco" and exc_type is None:
+            self._file.write(
+                b"\n]\n"
+            )  # after the recorded offset, resuming reopens the array
+        self._file.close()
+        self._progress.close()
+
+    def _entries(
+        self,
+        path: Path,
+        image_id: int,
+        size: Union[Tuple[int, int], str],
+        prediction: Optional[SSDOut],
+    ) -> Iterator[dict]:
+        if prediction is None:
+            if self.output_format == "jsonl":
+                yield dict(file=str(path), image_id=image_id, error=size)
+            return
+        boxes = numpy.round(prediction.boxes.numpy().astype(numpy.float64), 2)
+        labels = prediction.labels.tolist()
+        scores = numpy.round(prediction.scores.numpy().astype(numpy.float64), 5)
+        if self.output_format == "jsonl":
+            entry = dict(
+                file=str(path),
+                image_id=image_id,
+                height=size[0],
+                width=size[1],
+                boxes=boxes.tolist(),
+                labels=labels,
+                scores=scores.tolist(),
+            )
+            if self.category_names is not None:
+                entry["categories"] = [self.category_names[l] for l in labels]
+            yield entry
+        else:
+            boxes[:, 2:] -= boxes[:, :2]
+            for box, label, score in zip(boxes.tolist(), labels, scores.tolist()):
+                yield dict(
+                    image_id=image_id,
+                    category_id=self.category_ids.get(label, label),
+                    bbox=box,
+                    score=score,
+                )
+
+    def write_image_ids(self, paths: Sequence[Path], image_ids: Sequence[int]) -> None:
+        """
+Writes the image id of every file to image_ids_path, for the coco format, whose entries only have
+the image id
+
+:param paths:
+:type paths:
+:param image_ids:
+:type image_ids:
+"""
+        if self.output_format == "coco":
+            self.image_ids_path.write_text(
+                json.dumps({str(p): i for p, i in zip(paths, image_ids)})
+            )
+
+    def append(
+        self,
+        paths: Sequence[Path],
+        image_ids: Sequence[int],
+        sizes: Sequence[Union[Tuple[int, int], str]],
+        predictions: Sequence[Optional[SSDOut]],
+    ) -> None:
+        """
+Writes the predictions of a batch, then records its images as processed
+
+:param paths:
+:type paths:
+:param image_ids:
+:type image_ids:
+:param sizes: height, width of the source images, or the error of those that failed
+:type sizes:
+:param predictions: in source pixel coordinates, None for the images that failed
+:type predictions:
+"""
+        for path, image_id, size, prediction in zip(
+            paths, image_ids, sizes, predictions
+        ):
+            for entry in self._entries(path, image_id, size, prediction):
+                if self.output_format == "jsonl":
+                    self._file.write(json.dumps(entry).encode() + b"\n")
+                else:
+                    self._file.write(self._separator + json.dumps(entry).encode())
+                    self._separator = b",\n"
+                    self.num_detections += 1
+            if prediction is not None and self.output_format == "jsonl":
+                self.num_detections += len(prediction.boxes)
+        self._file.flush()
+        files = [str(p) for p in paths]
+        self._progress.write(
+            json.dumps(dict(files=files, offset=self._file.tell())) + "\n"
+        )
+        self._progress.flush()
+        self.processed.update(files)
+        self.num_images += len(files)
+
+
+@torch.no_grad()
+def detect_images(
+    model: Module,
+    image_paths: Sequence[Path],
+    writer: DetectionResultWriter,
+    *,
+    image_size: int,
+    pixel_mean: Sequence[float],
+    batch_size: int = 8,
+    num_workers: int = 0,
+    use_processes: bool = False,
+    decoder: str = "pil",
+    score_threshold: float = 0.0,
+    device: Optional[torch.device] = None,
+    prefetch_batches: int = 2,
+    log_interval: int = 10,
+    log: Optional[Callable[[str], None]] = print,
+) -> Dict[str, Any]:
+    """
+Infers the images not yet processed by writer, which must be entered
+
+:param model: a SingleShotDectectionNms in eval mode, or any model of its outputs
+:type model:
+:param image_paths:
+:type image_paths:
+:param writer:
+:type writer:
+:param image_size: of the model input
+:type image_size:
+:param pixel_mean:
+:type pixel_mean:
+:param batch_size:
+:type batch_size:
+:param num_workers: decoding threads (or processes), 0 decodes on the calling thread
+:type num_workers:
+:param use_processes: decode in processes rather than threads, for decoders holding the GIL
+:type use_processes:
+:param decoder: see available_image_decoders
+:type decoder:
+:param score_threshold: detections of lower scores (probabilities, also for the log probabilities of
+the per image post processing) are dropped
+:type score_threshold:
+:param device: of the model, its parameters' if None
+:type device:
+:param prefetch_batches: decoded ahead of the model
+:type prefetch_batches:
+:param log_interval: batches between the throughput lines
+:type log_interval:
+:param log:
+:type log:
+:return: the number of images processed, skipped (processed before) and failed, the detections
+written, the throughput and the timing of the decode wait, inference and write stages
+:rtype:
+"""
+    if device is None:
+        device = next(model.parameters()).device
+    image_ids = image_ids_of(image_paths)
+    writer.write_image_ids(image_paths, image_ids)
+    pending = [
+        (image_id, Path(p))
+        for image_id, p in zip(image_ids, image_paths)
+        if str(p) not in writer.processed
+    ]
+    loader = ImageLoader(image_size, pixel_mean, decoder)
+    profiler = StageProfiler(enabled=True)
+    pool = None
+    if num_workers > 0:
+        if use_processes:  # the loader is sent once per process, not per image
+            pool = multiprocessing.get_context().Pool(
+                num_workers, initializer=_initialise_loader, initargs=(loader,)
+            )
+            function = _load
+        else:
+            pool, function = ThreadPool(num_workers), loader
+        loaded = _prefetched(
+            function, (p for _, p in pending), pool, batch_size * prefetch_batches
+        )
+    else:
+        loaded = map(loader, (p for _, p in pending))
+
+    num_images, num_failed, num_detections = 0, 0, writer.num_detections
+    start = time.perf_counter()
+    try:
+        for i, batch in enumerate(
+            _batches(
+                profiler.iterate("decode_wait", zip((j for j, _ in pending), loaded)),
+                batch_size,
+            )
+        ):
+            image_ids = [image_id for image_id, _ in batch]
+            paths, images, sizes = zip(*[item for _, item in batch])
+            decoded = [j for j, image in enumerate(images) if image is not None]
+            predictions = [None] * len(batch)
+            if decoded:
+                with profiler.stage("inference"):
+                    inputs = torch.from_numpy(numpy.stack([images[j] for j in decoded]))
+                    raw = model(inputs.to(device))
+                    outputs = split_predictions(raw)
+                for j, output in zip(decoded, outputs):
+                    height, width = sizes[j]
+                    scores = output.scores
+                    if not isinstance(raw, SSDBatchOut):  # per image log probabilities
+                        scores = scores.exp()
+                    keep = scores > score_threshold
+                    scale = torch.tensor(
+                        (
+                            width / float(output.img_width),
+                            height / float(output.img_height),
+                        )
+                    ).repeat(2)
+                    predictions[j] = SSDOut(
+                        boxes=output.boxes[keep].cpu() * scale,
+                        labels=output.labels[keep].cpu(),
+                        scores=scores[keep].cpu(),
+                        img_width=width,
+                        img_height=height,
+                    )
+            for path, size, image in zip(paths, sizes, images):
+                if image is None and log:
+                    log(f"Could not read {path}: {size}")
+            with profiler.stage("write"):
+                writer.append(paths, image_ids, sizes, predictions)
+            num_images += len(batch)
+            num_failed += len(batch) - len(decoded)
+            if log and log_interval and (i + 1) % log_interval == 0:
+                rate = num_images / (time.perf_counter() - start)
+                log(
+                    f"{num_images}/{len(pending)} images, {rate:.1f} images/s  {profiler}"
+                )
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    seconds = time.perf_counter() - start
+    statistics = dict(
+        images=num_images,
+        skipped=len(image_paths) - len(pending),
+        failed=num_failed,
+        detections=writer.num_detections - num_detections,
+        seconds=seconds,
+        images_per_second=num_images / seconds if seconds > 0 else 0.0,
+        stages=profiler.summary(),
+    )
+    if log:
+        log(
+            f"{num_images} images ({statistics['skipped']} done before, {num_failed} failed), "
+            f"{statistics['detections']} detections in {seconds:.1f}s, "
+            f"{statistics['images_per_second']:.1f} images/s  {profiler}"
+        )
+    return statistics
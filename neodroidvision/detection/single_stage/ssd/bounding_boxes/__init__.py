@@ -8,6 +8,7 @@ __doc__ = r"""
            """
 
 from .conversion import *
+from .ssd_batch_augmentation import *
 from .ssd_priors import *
 from .ssd_transforms import *
 from .tensor_metrics import *
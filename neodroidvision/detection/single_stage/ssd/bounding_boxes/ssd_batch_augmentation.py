@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           The SSD training augmentation of SSDTransform applied to a whole collated uint8 batch with
+           torch ops, in the main process (or a thread of it, see SSDBatchAugmentedLoader) instead
+           of per sample with opencv in the data loader workers. The workers only decode and resize
+           to a fixed source size, see SSDSourceTransform.
+
+           Same recipe and parameter distributions as the per sample pipeline:
+
+             photometric distort  brightness, contrast (before or after), saturation, hue and
+                                  channel permutation, each with probability .5
+             expand               probability .5, ratio U(1, 4) on a mean filled canvas
+             sample crop          one of the six modes of CV2RandomSampleCrop, 50 trials each
+             mirror               probability .5
+             resize, subtract mean
+
+           Expand, crop, mirror and resize are composed into one axis aligned map per sample and
+           applied by a single grid_sample, see resample_axis_aligned. The photometric distortion
+           follows on the resampled image of the output size, it is per pixel and commutes with the
+           resampling up to the interpolation.
+           """
+
+import queue
+import threading
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy
+import torch
+from torch.nn import functional
+
+from draugr.opencv_utilities import CV2Compose, CV2Resize, CV2ToPercentCoords
+from draugr.torch_utilities.tensors.tensor_container import NamedTensorTuple
+from neodroidvision.utilities.torch_utilities.input_normalisation import ToUint8Tensor
+from .tensor_metrics import iou_of_tensors
+
+__all__ = [
+    "SSDSourceTransform",
+    "SSDBatchAugmentation",
+    "SSDBatchAugmentedLoader",
+    "scale_saturation",
+    "shift_hue",
+    "resample_axis_aligned",
+]
+
+CROP_MIN_IOUS = (None, 0.1, 0.3, 0.7, 0.9, float("-inf"))  # None uses the entire image
+CROP_TRIALS = 50
+
+CHANNEL_PERMUTATIONS = (
+    (0, 1, 2),
+    (0, 2, 1),
+    (1, 0, 2),
+    (1, 2, 0),
+    (2, 0, 1),
+    (2, 1, 0),
+)
+
+
+class SSDSourceTransform:
+    """
+Worker side transform when the training augmentation is batched, percent coordinates and a resize
+to a fixed square source size, the image stays uint8 CHW.
+"""
+
+    def __init__(self, source_size: int):
+        """
+
+:param source_size: side of the square source images handed to SSDBatchAugmentation
+:type source_size:
+"""
+        self.source_size = source_size
+        self.transforms = CV2Compose(
+            [CV2ToPercentCoords(), CV2Resize(source_size), ToUint8Tensor()]
+        )
+
+    def __call__(
+        self, image: numpy.ndarray, boxes: numpy.ndarray, labels: numpy.ndarray
+    ) -> Tuple:
+        """
+
+:param image: HWC uint8
+:type image:
+:param boxes: corner form pixel coordinates
+:type boxes:
+:param labels:
+:type labels:
+:return:
+:rtype:
+"""
+        return self.transforms(image, boxes, labels)
+
+
+def scale_saturation(images: torch.Tensor, factor: torch.Tensor) -> torch.Tensor:
+    """
+As scaling the saturation of cv2.COLOR_RGB2HSV float images and converting back, without the
+round trip, hue and value are kept so each channel moves linearly towards or away from the value
+
+:param images: (B, 3, H, W)
+:type images:
+:param factor: (B, 1, 1, 1)
+:type factor:
+:return:
+:rtype:
+"""
+    value = images.amax(1, keepdim=True)
+    return value - factor * (value - images)
+
+
+def shift_hue(images: torch.Tensor, degrees: torch.Tensor) -> torch.Tensor:
+    """
+As adding degrees to the hue of cv2.COLOR_RGB2HSV float images, wrapping it, and converting back
+with cv2.COLOR_HSV2RGB. Saturation and value are kept, so only the hue is computed, from the
+channel differences, and the channels are rebuilt from it, the value and the channel spread.
+
+:param images: (B, 3, H, W)
+:type images:
+:param degrees: (B, 1, 1, 1)
+:type degrees:
+:return:
+:rtype:
+"""
+    r, g, b = images.unbind(1)
+    value = torch.max(torch.max(r, g), b)
+    spread = (value - torch.min(torch.min(r, g), b)).clamp(min=1e-12)
+    # in sextants, [0, 6), with the channel precedence of opencv for equal maxima
+    hue = (
+        torch.where(
+            r == value,
+            (g - b) / spread,
+            torch.where(g == value, 2 + (b - r) / spread, 4 + (r - g) / spread),
+        )
+        + degrees.view(-1, 1, 1) / 60
+    )
+    hue = torch.where(hue < 0, hue + 6, hue)
+    hue = torch.where(hue >= 6, hue - 6, hue)
+
+    channels = []
+    for offset in (5, 3, 1):
+        k = hue + offset
+        k = torch.where(k >= 6, k - 6, k)
+        channels.append(value - spread * torch.min(k, 4 - k).clamp(0, 1))
+    return torch.stack(channels, 1)
+
+
+def _coverage(
+    scale: torch.Tensor, shift: torch.Tensor, size: int, source_size: int
+) -> torch.Tensor:
+    # the summed bilinear weights of the taps inside the source, per output pixel along one axis
+    u = (torch.arange(size, device=scale.device, dtype=torch.float32) + 0.5) / size
+    position = (scale.unsqueeze(1) * u + shift.unsqueeze(1)) * source_size - 0.5
+    low = torch.floor(position)
+    high_weight = position - low
+    return (1 - high_weight) * ((low >= 0) & (low < source_size)) + high_weight * (
+        (low + 1 >= 0) & (low + 1 < source_size)
+    )
+
+
+def resample_axis_aligned(
+    images: torch.Tensor, scale: torch.Tensor, shift: torch.Tensor, size: int
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+Bilinear resampling of (B, C, H, W) images to (B, C, size, size) under per sample axis aligned
+maps from output to source coordinates, both relative, source = scale * output + shift, zero
+padded
+
+:param images:
+:type images:
+:param scale: (B, 2) x, y, negative mirrors
+:type scale:
+:param shift: (B, 2) x, y
+:type shift:
+:param size:
+:type size:
+:return: the resampled images and (B, 1, size, size) how much of each pixel is inside the source,
+the rest is padding
+:rtype:
+"""
+    batch_size, channels, height, width = images.shape
+    theta = torch.zeros((batch_size, 2, 3), device=images.device)
+    theta[:, 0, 0] = scale[:, 0]
+    theta[:, 1, 1] = scale[:, 1]
+    theta[:, :, 2] = scale + 2 * shift - 1  # in grid_sample coordinates, [-1, 1]
+    grid = functional.affine_grid(
+        theta, [batch_size, channels, size, size], align_corners=False
+    )
+    images = functional.grid_sample(
+        images, grid, mode="bilinear", padding_mode="zeros", align_corners=False
+    )
+    coverage = _coverage(scale[:, 1], shift[:, 1], size, height).view(
+        batch_size, 1, size, 1
+    ) * _coverage(scale[:, 0], shift[:, 0], size, width).view(batch_size, 1, 1, size)
+    return images, coverage
+
+
+class SSDBatchAugmentation(torch.nn.Module):
+    """
+SSDTransform for Split.Training, on padded batches. Takes uint8 images (B, 3, S, S) and percent
+coordinate boxes (B, G, 4) with labels (B, G) and a validity mask (B, G), returns mean subtracted
+float images (B, 3, image_size, image_size) and the transformed boxes, labels and mask, boxes
+that left the crop or collapsed are masked out and zeroed.
+
+The crop aspect ratio constraint (.5 to 2) applies to the square source, not to the image before
+the workers resized it.
+"""
+
+    def __init__(
+        self,
+        image_size: int,
+        pixel_mean: Sequence,
+        *,
+        photometric_distort: bool = True,
+        max_crop_rounds: int = 32,
+        generator: Optional[torch.Generator] = None,
+    ):
+        """
+
+:param image_size:
+:type image_size:
+:param pixel_mean: RGB
+:type pixel_mean:
+:param photometric_distort: False only applies the geometric part
+:type photometric_distort:
+:param max_crop_rounds: crop modes are drawn again for samples where all 50 trials failed, up to
+this many times, after that the sample is not cropped
+:type max_crop_rounds:
+:param generator: for reproducible augmentation, needs to be on the device of the images
+:type generator:
+"""
+        super().__init__()
+        self.image_size = image_size
+        self.register_buffer(
+            "pixel_mean", torch.tensor(pixel_mean, dtype=torch.float32).view(1, 3, 1, 1)
+        )
+        self.register_buffer("channel_permutations", torch.tensor(CHANNEL_PERMUTATIONS))
+        self.photometric_distort = photometric_distort
+        self.max_crop_rounds = max_crop_rounds
+        self.generator = generator
+
+    def _rand(self, *size: int, device: torch.device) -> torch.Tensor:
+        return torch.rand(size, generator=self.generator, device=device)
+
+    def _uniform(
+        self, low: float, high: float, *size: int, device: torch.device
+    ) -> torch.Tensor:
+        return low + (high - low) * self._rand(*size, device=device)
+
+    def _with_probability(
+        self, values: torch.Tensor, default: float, p: float = 0.5
+    ) -> torch.Tensor:
+        return torch.where(
+            self._rand(*values.shape, device=values.device) < p,
+            values,
+            torch.full_like(values, default),
+        )
+
+    def distort(self, images: torch.Tensor) -> torch.Tensor:
+        """
+CV2PhotometricDistort, per sample parameters
+
+:param images: float (B, 3, H, W) in [0, 255]
+:type images:
+:return:
+:rtype:
+"""
+        batch_size, device = images.shape[0], images.device
+
+        def per_sample(low, high, default):
+            return self._with_probability(
+                self._uniform(low, high, batch_size, device=device), default
+            ).view(-1, 1, 1, 1)
+
+        brightness = per_sample(-32, 32, 0.0)
+        contrast = per_sample(0.5, 1.5, 1.0)
+        saturation = per_sample(0.5, 1.5, 1.0)
+        hue = per_sample(-18, 18, 0.0)
+
+        # brightness, contrast and saturation in one pass, as saturation is affine in the image and
+        # its value. The hsv ops are positively homogeneous, so whether contrast comes before or
+        # after them, which CV2PhotometricDistort draws, does not change the result
+        value = images.amax(1, keepdim=True)
+        images = images * (contrast * saturation) + contrast * (
+            (1 - saturation) * value + brightness
+        )
+        shifted = hue.view(-1).nonzero().view(-1)
+        if shifted.numel():
+            images = images.index_copy(
+                0, shifted, shift_hue(images[shifted], hue[shifted])
+            )
+
+        permutation = self._with_probability(
+            torch.randint(
+                len(CHANNEL_PERMUTATIONS),
+                (batch_size,),
+                generator=self.generator,
+                device=device,
+            ).float(),
+            0.0,
+        ).long()
+        index = self.channel_permutations[permutation].view(batch_size, 3, 1, 1)
+        return images.gather(1, index.expand_as(images))
+
+    def sample_crops(self, boxes: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+        """
+CV2RandomSampleCrop for all samples at once, in coordinates relative to the (expanded) image
+
+:param boxes: (B, G, 4) relative corner form
+:type boxes:
+:param mask: (B, G)
+:type mask:
+:return: (B, 4) crops, (0, 0, 1, 1) for samples that are not cropped
+:rtype:
+"""
+        batch_size, device = boxes.shape[0], boxes.device
+        crops = torch.tensor((0.0, 0.0, 1.0, 1.0), device=device).repeat(batch_size, 1)
+        pending = mask.any(1)  # samples without boxes are never cropped
+        min_ious = torch.tensor(
+            [2.0 if m is None else m for m in CROP_MIN_IOUS], device=device
+        )  # an unreachable iou for the no crop mode
+
+        for _ in range(self.max_crop_rounds):
+            if not pending.any():
+                break
+            mode = torch.randint(
+                len(CROP_MIN_IOUS),
+                (batch_size,),
+                generator=self.generator,
+                device=device,
+            )
+            pending &= mode != CROP_MIN_IOUS.index(None)
+
+            w = self._uniform(0.3, 1.0, batch_size, CROP_TRIALS, device=device)
+            h = self._uniform(0.3, 1.0, batch_size, CROP_TRIALS, device=device)
+            left = self._rand(batch_size, CROP_TRIALS, device=device) * (1 - w)
+            top = self._rand(batch_size, CROP_TRIALS, device=device) * (1 - h)
+            rects = torch.stack((left, top, left + w, top + h), -1)  # B, T, 4
+
+            overlap = iou_of_tensors(rects.unsqueeze(2), boxes.unsqueeze(1))  # B, T, G
+            overlap = overlap.masked_fill(~mask.unsqueeze(1), float("-inf"))
+            centers = ((boxes[..., :2] + boxes[..., 2:]) / 2).unsqueeze(1)  # B, 1, G, 2
+            inside = (
+                (rects[..., None, :2] < centers) & (rects[..., None, 2:] > centers)
+            ).all(-1) & mask.unsqueeze(1)
+
+            valid = (
+                (h / w >= 0.5)
+                & (h / w <= 2)
+                & (overlap.max(2)[0] >= min_ious[mode].unsqueeze(1))
+                & inside.any(2)
+            )
+            found = pending & valid.any(1)
+            first = valid.float().argmax(1)
+            crops[found] = rects[found, first[found]]
+            pending &= ~found
+        return crops
+
+    def forward(
+        self,
+        images: torch.Tensor,
+        boxes: torch.Tensor,
+        labels: torch.Tensor,
+        mask: torch.Tensor,
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+
+:param images: uint8 (B, 3, S, S)
+:type images:
+:param boxes: (B, G, 4) percent coordinate corner form
+:type boxes:
+:param labels: (B, G)
+:type labels:
+:param mask: (B, G) True for valid targets
+:type mask:
+:return: images, boxes, labels, mask
+:rtype:
+"""
+        batch_size, device = images.shape[0], images.device
+        images = images.float()
+        boxes = boxes.to(device=device, dtype=torch.float32)
+        mask = mask.to(device).bool()
+        # expand, the image is placed at offset in a canvas ratio times its size
+        ratio = self._with_probability(
+            self._uniform(1, 4, batch_size, device=device), 1.0
+        ).view(-1, 1)
+        offset = self._rand(batch_size, 2, device=device) * (ratio - 1)
+        boxes = (boxes + offset.repeat(1, 2).unsqueeze(1)) / ratio.unsqueeze(1)
+
+        crops = self.sample_crops(boxes, mask)
+        centers = (boxes[..., :2] + boxes[..., 2:]) / 2
+        mask &= ((crops[:, None, :2] < centers) & (crops[:, None, 2:] > centers)).all(
+            -1
+        )
+        crop_size = crops[:, 2:] - crops[:, :2]
+        crop_min = crops[:, None, :2].repeat(1, 1, 2)
+        boxes = torch.max(
+            torch.min(boxes, crops[:, None, 2:].repeat(1, 1, 2)), crop_min
+        )
+        boxes = (boxes - crop_min) / crop_size.repeat(1, 2).unsqueeze(1)
+
+        mirror = self._rand(batch_size, device=device) < 0.5
+        x1, y1, x2, y2 = boxes.unbind(-1)
+        boxes = torch.where(
+            mirror.view(-1, 1, 1), torch.stack((1 - x2, y1, 1 - x1, y2), -1), boxes
+        )
+        mask &= (boxes[..., 2:] > boxes[..., :2]).all(-1)  # remove_null_boxes
+
+        # output -> source, s = ratio * (crop_min + crop_size * (1 - u if mirror else u)) - offset
+        scale = ratio * crop_size
+        shift = ratio * crops[:, :2] - offset
+        sign = torch.ones_like(scale)
+        sign[:, 0] = torch.where(mirror, -1.0, 1.0)
+        shift[:, 0] = torch.where(mirror, shift[:, 0] + scale[:, 0], shift[:, 0])
+        scale = scale * sign
+        images, coverage = resample_axis_aligned(images, scale, shift, self.image_size)
+        # coverage is how much of each pixel the image covers, the rest is the mean filled canvas of
+        # the expansion which is not distorted, and zero after the mean is subtracted
+        images = images / coverage.clamp(min=1e-6)
+        if self.photometric_distort:
+            images = self.distort(images)
+        images = coverage * (images - self.pixel_mean)
+
+        boxes = boxes.masked_fill(~mask.unsqueeze(-1), 0)
+        labels = labels.to(device).masked_fill(~mask, 0)
+        return images, boxes, labels, mask
+
+
+class SSDBatchAugmentedLoader:
+    """
+Iterates a DataLoader collating with BatchCollator(padded=True) over SSDSourceTransform samples,
+augmenting and encoding each batch, yielding (images, NamedTensorTuple(boxes, labels), img_ids)
+as the per sample pipeline does. With threaded the batches are prepared ahead by a thread of the
+main process, torch ops release the GIL so it overlaps with the training step.
+"""
+
+    def __init__(
+        self,
+        data_loader: torch.utils.data.DataLoader,
+        augmentation: SSDBatchAugmentation,
+        annotation_transform: callable,
+        *,
+        device: Optional[torch.device] = None,
+        threaded: bool = False,
+        prefetch: int = 2,
+    ):
+        """
+
+:param data_loader:
+:type data_loader:
+:param augmentation:
+:type augmentation:
+:param annotation_transform: batch encoding, e.g. SSDBatchAnnotationTransform
+:type annotation_transform:
+:param device: where the augmentation runs, the batches are yielded on it
+:type device:
+:param threaded:
+:type threaded:
+:param prefetch: batches prepared ahead when threaded
+:type prefetch:
+"""
+        self.data_loader = data_loader
+        self.augmentation = augmentation
+        self.annotation_transform = annotation_transform
+        self.device = torch.device("cpu") if device is None else torch.device(device)
+        self.threaded = threaded
+        self.prefetch = prefetch
+        self.augmentation.to(self.device)
+
+    @property
+    def batch_sampler(self):
+        """
+
+:return:
+:rtype:
+"""
+        return self.data_loader.batch_sampler
+
+    @property
+    def dataset(self):
+        """
+
+:return:
+:rtype:
+"""
+        return self.data_loader.dataset
+
+    def __len__(self) -> int:
+        return len(self.data_loader)
+
+    def _prepare(self, batch: Tuple) -> Tuple:
+        images, targets, img_ids = batch
+        with torch.no_grad():
+            images, boxes, labels, mask = self.augmentation(
+                images.to(self.device, non_blocking=True),
+                targets["boxes"].to(self.device, non_blocking=True),
+                targets["labels"].to(self.device, non_blocking=True),
+                targets["mask"].to(self.device, non_blocking=True),
+            )
+            boxes, labels = self.annotation_transform(boxes, labels, mask)
+        return (
+            images,
+            NamedTensorTuple(boxes=boxes, labels=labels),
+            img_ids.clone(),  # prefetched past the lifetime of reused loader buffers
+        )
+
+    def __iter__(self) -> Iterator:
+        if not self.threaded:
+            for batch in self.data_loader:
+                yield self._prepare(batch)
+            return
+
+        batches = queue.Queue(maxsize=max(1, self.prefetch))
+        done = object()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for batch in self.data_loader:
+                    if stop.is_set():
+                        return
+                    batches.put(self._prepare(batch))
+                batches.put(done)
+            except BaseException as e:
+                batches.put(e)
+
+        thread = threading.Thread(target=produce, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = batches.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            while thread.is_alive():  # unblock a producer waiting on a full queue
+                try:
+                    batches.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            thread.join()
@@ -7,9 +7,12 @@ __doc__ = r"""
            Created on 25/03/2020
            """
 
-from itertools import product
+import hashlib
+import os
+import pickle
 from math import sqrt
-from typing import Tuple
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 import numpy
 import torch
@@ -17,7 +20,126 @@ from warg import drop_unused_kws
 
 from .tensor_metrics import iou_of_tensors
 
-__all__ = ["build_priors", "ssd_assign_priors"]
+__all__ = [
+    "build_priors",
+    "clear_priors_cache",
+    "ssd_assign_priors",
+    "ssd_assign_priors_batched",
+]
+
+
+PRIORS_CACHE_VERSION = 1
+_priors_cache: Dict[Tuple, torch.Tensor] = {}
+
+
+def _priors_cache_key(
+    image_size: Any,
+    feature_maps: Sequence,
+    min_sizes: Sequence,
+    max_sizes: Sequence,
+    strides: Sequence,
+    aspect_ratios: Sequence,
+    clip: bool,
+) -> Tuple:
+    """
+Hashable key for a priors configuration, lists and tuples are treated alike
+"""
+    return (
+        PRIORS_CACHE_VERSION,
+        float(image_size),
+        tuple(int(f) for f in feature_maps),
+        tuple(float(m) for m in min_sizes),
+        tuple(float(m) for m in max_sizes),
+        tuple(float(s) for s in strides),
+        tuple(tuple(float(r) for r in ratios) for ratios in aspect_ratios),
+        bool(clip),
+    )
+
+
+def _priors_cache_file(key: Tuple) -> Path:
+    from neodroidvision import PROJECT_APP_PATH
+
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+    return PROJECT_APP_PATH.user_cache / "ssd_priors" / f"{digest}.pth"
+
+
+def _load_cached_priors(key: Tuple) -> Optional[torch.Tensor]:
+    cache_file = _priors_cache_file(key)
+    if cache_file.exists():
+        try:
+            return torch.load(str(cache_file), map_location="cpu")
+        except (EOFError, RuntimeError, pickle.UnpicklingError):
+            pass  # Corrupt or foreign file, gets rebuilt and replaced
+    return None
+
+
+def _store_cached_priors(key: Tuple, priors: torch.Tensor) -> None:
+    cache_file = _priors_cache_file(key)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        torch.save(priors, str(tmp_file))
+        os.replace(
+            str(tmp_file), str(cache_file)
+        )  # atomic, concurrent workers never observe partial files
+    except OSError:
+        pass  # Read-only or full file systems just disable the disk cache
+
+
+def clear_priors_cache(disk: bool = False) -> None:
+    """
+Empty the process-wide priors cache, optionally also removing the on-disk cache
+"""
+    _priors_cache.clear()
+    if disk:
+        from neodroidvision import PROJECT_APP_PATH
+
+        for cache_file in (PROJECT_APP_PATH.user_cache / "ssd_priors").glob("*.pth"):
+            cache_file.unlink()
+
+
+def _compute_priors(
+    image_size: Any,
+    feature_maps: Sequence,
+    min_sizes: Sequence,
+    max_sizes: Sequence,
+    strides: Sequence,
+    aspect_ratios: Sequence,
+    clip: bool,
+) -> torch.Tensor:
+    """
+Vectorised prior generation, evaluates the exact same float64 expressions as
+the nested per location loop it replaces, so the resulting tensor is identical.
+"""
+    priors = []
+    for k, f in enumerate(feature_maps):
+        scale = image_size / strides[k]
+        small_hw = min_sizes[k] / image_size
+        big_hw = sqrt(min_sizes[k] * max_sizes[k]) / image_size
+
+        # box widths and heights per location, in the order of the original loop
+        wh = [[small_hw, small_hw], [big_hw, big_hw]]
+        for ratio in aspect_ratios[k]:
+            ratio_sq = sqrt(ratio)
+            wh.append([small_hw * ratio_sq, small_hw / ratio_sq])
+            wh.append([small_hw / ratio_sq, small_hw * ratio_sq])
+        wh = numpy.array(wh, dtype=numpy.float64)
+
+        centers = (numpy.arange(f, dtype=numpy.float64) + 0.5) / scale  # unit center
+        cy, cx = numpy.meshgrid(centers, centers, indexing="ij")  # row major, i then j
+        cxcy = numpy.stack((cx, cy), axis=-1).reshape(-1, 1, 2)
+
+        level = numpy.empty((f * f, wh.shape[0], 4), dtype=numpy.float64)
+        level[..., :2] = cxcy
+        level[..., 2:] = wh
+        priors.append(level.reshape(-1, 4))
+
+    priors_t = torch.from_numpy(numpy.concatenate(priors).astype(numpy.float32))
+
+    if clip:
+        priors_t.clamp_(min=0, max=1)
+
+    return priors_t
 
 
 @drop_unused_kws
@@ -29,48 +151,35 @@ def build_priors(
     max_sizes: torch.Tensor,
     strides: torch.Tensor,
     aspect_ratios: torch.Tensor,
-    clip: bool = True
+    clip: bool = True,
+    cache: bool = True
 ) -> torch.Tensor:
     """Generate SSD Prior Boxes.
 It returns the center, height and width of the priors. The values are relative to the image size
+
+Priors are cached process-wide and on disk (in the user cache of the project), keyed by the
+configuration and image size, so data loader workers and repeated model builds reuse them.
+Pass cache=False to always recompute.
+
 Returns:
 priors (num_priors, 4): The prior boxes represented as [[center_x, center_y, w, h]]. All the
 values
 are relative to the image size.
 """
+    cfg = (image_size, feature_maps, min_sizes, max_sizes, strides, aspect_ratios, clip)
+    if not cache:
+        return _compute_priors(*cfg)
 
-    priors = []
-    for k, f in enumerate(feature_maps):
-        scale = image_size / strides[k]
-        small_hw = min_sizes[k] / image_size
-        big_hw = sqrt(min_sizes[k] * max_sizes[k]) / image_size
-
-        for i, j in product(range(f), repeat=2):  # all pair combinations
-            # unit center x,y
-            cx = (j + 0.5) / scale
-            cy = (i + 0.5) / scale
-
-            # small sized square box
-            h = w = small_hw
-            priors.append([cx, cy, w, h])
+    key = _priors_cache_key(*cfg)
+    priors_t = _priors_cache.get(key)
+    if priors_t is None:
+        priors_t = _load_cached_priors(key)
+        if priors_t is None:
+            priors_t = _compute_priors(*cfg)
+            _store_cached_priors(key, priors_t)
+        _priors_cache[key] = priors_t
 
-            # big sized square box
-            h = w = big_hw
-            priors.append([cx, cy, w, h])
-
-            # change h/w ratio of the small sized box
-            h = w = small_hw
-            for ratio in aspect_ratios[k]:
-                ratio_sq = sqrt(ratio)
-                priors.append([cx, cy, w * ratio_sq, h / ratio_sq])
-                priors.append([cx, cy, w / ratio_sq, h * ratio_sq])
-
-    priors_t = torch.tensor(priors)
-
-    if clip:
-        priors_t.clamp_(min=0, max=1)
-
-    return priors_t
+    return priors_t.clone()  # callers may modify or wrap the priors in place
 
 
 def ssd_assign_priors(
@@ -113,3 +222,76 @@ labels (num_priros): labels for priors.
     labels = gt_labels[best_target_per_prior_index]
     labels[best_target_per_prior < iou_threshold] = 0  # the backgournd id
     return gt_boxes[best_target_per_prior_index], labels
+
+
+def ssd_assign_priors_batched(
+    *,
+    gt_boxes: torch.Tensor,
+    gt_labels: torch.Tensor,
+    gt_mask: torch.Tensor,
+    corner_form_priors: torch.Tensor,
+    iou_threshold: float
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Assign padded ground truth boxes and targets to priors for a whole batch at once.
+
+Same assignment as ssd_assign_priors applied to every image, including the forced bipartite
+matching of each target to its best prior (later targets win shared priors), without any python
+level loops.
+
+Args:
+gt_boxes (batch_size, max_num_targets, 4): padded corner form ground truth boxes.
+gt_labels (batch_size, max_num_targets): padded labels of targets.
+gt_mask (batch_size, max_num_targets): True for valid, False for padded targets.
+corner_form_priors (num_priors, 4): corner form priors
+iou_threshold: priors with a lower best iou are assigned the background label
+Returns:
+boxes (batch_size, num_priors, 4): real values for priors, images without targets get the priors.
+labels (batch_size, num_priors): labels for priors.
+"""
+    batch_size, num_targets = gt_mask.shape
+    num_priors = corner_form_priors.shape[0]
+    gt_mask = gt_mask.bool()
+
+    # size: batch_size x num_priors x num_targets, padded targets never match
+    ious = iou_of_tensors(gt_boxes.unsqueeze(1), corner_form_priors.unsqueeze(1))
+    ious.masked_fill_(~gt_mask.unsqueeze(1), -1.0)
+    # size: batch_size x num_priors
+    best_target_per_prior, best_target_per_prior_index = ious.max(2)
+    # size: batch_size x num_targets
+    _, best_prior_per_target_index = ious.max(1)
+
+    # padded targets are scattered into a dummy prior column that is dropped afterwards
+    forced_prior_index = best_prior_per_target_index.masked_fill(~gt_mask, num_priors)
+    # when targets share a best prior the last one wins, as in the loop of ssd_assign_priors,
+    # the earlier ones are redirected to the dummy column so the scatter has unique indices
+    shares_prior = forced_prior_index.unsqueeze(2) == forced_prior_index.unsqueeze(1)
+    is_later = torch.ones(
+        (num_targets, num_targets), dtype=torch.bool, device=gt_mask.device
+    ).triu(1)
+    forced_prior_index = forced_prior_index.masked_fill(
+        (shares_prior & is_later).any(2), num_priors
+    )
+    forced_target = torch.full(
+        (batch_size, num_priors + 1), -1, dtype=torch.long, device=gt_mask.device
+    ).scatter_(
+        1,
+        forced_prior_index,
+        torch.arange(num_targets, device=gt_mask.device).expand(batch_size, -1),
+    )[:, :num_priors]
+    is_forced = forced_target >= 0
+
+    best_target_per_prior_index = torch.where(
+        is_forced, forced_target, best_target_per_prior_index
+    )
+    # 2.0 is used to make sure every target has a prior assigned
+    best_target_per_prior = best_target_per_prior.masked_fill(is_forced, 2.0)
+
+    labels = torch.gather(gt_labels, 1, best_target_per_prior_index)
+    labels[best_target_per_prior < iou_threshold] = 0  # the background id
+    boxes = torch.gather(
+        gt_boxes, 1, best_target_per_prior_index.unsqueeze(-1).expand(-1, -1, 4)
+    )
+    boxes = torch.where(
+        gt_mask.any(1).view(-1, 1, 1), boxes, corner_form_priors.unsqueeze(0)
+    )  # keeps encoded locations finite for images without targets
+    return boxes, labels
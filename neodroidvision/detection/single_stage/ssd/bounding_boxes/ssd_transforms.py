@@ -14,6 +14,7 @@ import torch
 from neodroidvision.detection.single_stage.ssd.bounding_boxes.ssd_priors import (
     build_priors,
     ssd_assign_priors,
+    ssd_assign_priors_batched,
 )
 from warg import NOD
 
@@ -30,13 +31,14 @@ from draugr.opencv_utilities import (
     SubtractMeans,
 )
 from draugr.torch_utilities import Split
+from neodroidvision.utilities.torch_utilities.input_normalisation import ToUint8Tensor
 from .conversion import (
     center_to_corner_form,
     convert_boxes_to_locations,
     corner_form_to_center_form,
 )
 
-__all__ = ["SSDTransform", "SSDAnnotationTransform"]
+__all__ = ["SSDTransform", "SSDAnnotationTransform", "SSDBatchAnnotationTransform"]
 
 
 class SSDTransform(torch.nn.Module):
@@ -44,7 +46,13 @@ class SSDTransform(torch.nn.Module):
 
 """
 
-    def __init__(self, image_size: Tuple, pixel_mean: Tuple, split: Split):
+    def __init__(
+        self,
+        image_size: Tuple,
+        pixel_mean: Tuple,
+        split: Split,
+        uint8_transport: bool = False,
+    ):
         """
 
 :param image_size:
@@ -53,6 +61,10 @@ class SSDTransform(torch.nn.Module):
 :type pixel_mean:
 :param split:
 :type split:
+:param uint8_transport: emit uint8 CHW tensors, leaving the float conversion and mean subtraction
+to an InputNormalisation on the consumer side, as SingleShotDectection does. Augmented training
+images are rounded and clipped to [0, 255]
+:type uint8_transport:
 """
         super().__init__()
 
@@ -70,9 +82,12 @@ class SSDTransform(torch.nn.Module):
                 ]
             )
 
-        transform_list.extend(
-            [CV2Resize(image_size), SubtractMeans(pixel_mean), CV2ToTensor()]
-        )
+        if uint8_transport:
+            transform_list.extend([CV2Resize(image_size), ToUint8Tensor()])
+        else:
+            transform_list.extend(
+                [CV2Resize(image_size), SubtractMeans(pixel_mean), CV2ToTensor()]
+            )
 
         self.transforms = CV2Compose(transform_list)
 
@@ -151,3 +166,40 @@ class SSDAnnotationTransform(torch.nn.Module):
         )
 
         return locations, labels
+
+
+class SSDBatchAnnotationTransform(SSDAnnotationTransform):
+    """
+Encodes the targets of a whole padded mini-batch in one call, for use at collate time
+(see BatchCollator) instead of per sample in the data loader workers.
+"""
+
+    def __call__(
+        self, gt_boxes: torch.Tensor, gt_labels: torch.Tensor, gt_mask: torch.Tensor
+    ) -> Tuple:
+        """
+
+:param gt_boxes: (batch_size, max_num_targets, 4) padded corner form boxes
+:type gt_boxes:
+:param gt_labels: (batch_size, max_num_targets) padded labels
+:type gt_labels:
+:param gt_mask: (batch_size, max_num_targets) True for valid targets
+:type gt_mask:
+:return: locations (batch_size, num_priors, 4) and labels (batch_size, num_priors)
+:rtype:
+"""
+        boxes, labels = ssd_assign_priors_batched(
+            gt_boxes=gt_boxes,
+            gt_labels=gt_labels,
+            gt_mask=gt_mask,
+            corner_form_priors=self.corner_form_priors.to(gt_boxes.device),
+            iou_threshold=self.iou_threshold,
+        )
+        locations = convert_boxes_to_locations(
+            center_form_boxes=corner_form_to_center_form(boxes),
+            center_form_priors=self.center_form_priors.to(gt_boxes.device),
+            center_variance=self.center_variance,
+            size_variance=self.size_variance,
+        )
+
+        return locations, labels
@@ -37,6 +37,10 @@ base_cfg.model.box_head.confidence_threshold = 0.01
 base_cfg.model.box_head.max_per_class = -1
 base_cfg.model.box_head.max_per_image = 100
 base_cfg.model.box_head.batch_size = 10
+base_cfg.model.box_head.max_candidates = 100  # per image, before nms
+# fixed shape, traceable output of padded boxes, labels and scores with a count per image
+base_cfg.model.box_head.batched_post_processing = False
+base_cfg.model.box_head.nms_backend = None  # torchvision, tensor, fast or matrix, None is torchvision if available
 base_cfg.model.box_head.iou_threshold = 0.5
 # match default boxes to any ground truth with jaccard overlap higher than a
 # threshold (0.5)
@@ -83,6 +87,17 @@ base_cfg.input.pixel_mean = (
     117,
     104,
 )  # Values to be used for image normalization, RGB layout
+base_cfg.input.decoder = NOD()
+base_cfg.input.decoder.backend = "pil"  # pil, opencv or turbojpeg
+base_cfg.input.decoder.reduced_testing = True  # JPEG DCT scaled decode, to no less than image_size
+base_cfg.input.decoder.reduced_training = False  # random crops zoom in, keep the full resolution
+base_cfg.input.decoder.max_upsampling = 1.0  # e.g. 1.25 halves 640x480 sources for 300x300
+base_cfg.input.batch_augmentation = NOD()
+base_cfg.input.batch_augmentation.enabled = False  # augment collated uint8 batches with torch
+# ops in the main process instead of per sample in the workers, see SSDBatchAugmentation
+base_cfg.input.batch_augmentation.source_size = 512  # workers resize to this before collating
+base_cfg.input.batch_augmentation.device = "cpu"  # where the batches are augmented
+base_cfg.input.batch_augmentation.threaded = True  # prepare batches ahead in a thread
 
 # -----------------------------------------------------------------------------
 # Dataset
@@ -98,6 +113,15 @@ base_cfg.dataset_type = None
 base_cfg.data_loader = NOD()
 base_cfg.data_loader.num_workers = 8  # number of data loading threads
 base_cfg.data_loader.pin_memory = True
+base_cfg.data_loader.collate_time_encoding = False  # assign priors per batch in the
+# collate function, instead of per sample in the workers
+base_cfg.data_loader.uint8_transport = False  # workers send uint8 images, the model converts
+# them and subtracts the mean on its device, a quarter of the inter process bytes
+base_cfg.data_loader.shared_memory_collation = False  # workers collate into reused shared
+# memory slots, batches are pinned into reused buffers, no allocations per batch once warm
+base_cfg.data_loader.aspect_ratio_grouping = False  # training batches of images on one side
+# of the aspect_ratio_bins (width / height), from get_img_info, see GroupedBatchSampler
+base_cfg.data_loader.aspect_ratio_bins = (1.0,)
 
 # ---------------------------------------------------------------------------- #
 # Solver
@@ -11,11 +11,19 @@ from pathlib import Path
 from typing import List, Union
 
 import torch
-from data.detection.multi_dataset import MultiDataset
+from neodroidvision.data.detection.multi_dataset import MultiDataset
+from neodroidvision.detection.single_stage.ssd.bounding_boxes.ssd_batch_augmentation import (
+    SSDBatchAugmentedLoader,
+)
 from neodroidvision.utilities import (
     BatchCollator,
     DistributedSampler,
+    GroupedBatchSampler,
     LimitedBatchResampler,
+    PinnedBatchLoader,
+    SharedMemoryBatchCollator,
+    aspect_ratio_group_ids,
+    image_sizes,
 )
 from torch.utils.data import ConcatDataset, DataLoader
 from warg import NOD
@@ -25,6 +33,31 @@ from draugr.torch_utilities import Split
 __all__ = ["object_detection_data_loaders"]
 
 
+def _data_loader(
+    dataset, batch_sampler, cfg: NOD, **collator_kws
+) -> Union[DataLoader, PinnedBatchLoader]:
+    if not cfg.data_loader.get("shared_memory_collation", False):
+        return DataLoader(
+            dataset,
+            num_workers=cfg.data_loader.num_workers,
+            batch_sampler=batch_sampler,
+            pin_memory=cfg.data_loader.pin_memory,
+            collate_fn=BatchCollator(**collator_kws),
+        )
+
+    return PinnedBatchLoader(
+        DataLoader(
+            dataset,
+            num_workers=cfg.data_loader.num_workers,
+            batch_sampler=batch_sampler,
+            collate_fn=SharedMemoryBatchCollator(
+                **collator_kws, num_workers=cfg.data_loader.num_workers
+            ),
+        ),  # pins into its own preallocated buffers instead
+        pin_memory=cfg.data_loader.pin_memory,
+    )
+
+
 def object_detection_data_loaders(
     *,
     data_root: Path,
@@ -55,7 +88,7 @@ def object_detection_data_loaders(
     shuffle = split == Split.Training or distributed
     data_loaders = []
 
-    for dataset in MultiDataset(
+    multi_dataset = MultiDataset(
         cfg=cfg,
         dataset_type=cfg.dataset_type,
         data_root=data_root,
@@ -63,7 +96,9 @@ def object_detection_data_loaders(
         if split == Split.Training
         else cfg.datasets.test,
         split=split,
-    ).sub_datasets:
+    )
+
+    for dataset in multi_dataset.sub_datasets:
         if distributed:
             sampler = DistributedSampler(dataset, shuffle=shuffle)
         elif shuffle:
@@ -71,25 +106,50 @@ def object_detection_data_loaders(
         else:
             sampler = torch.utils.data.sampler.SequentialSampler(dataset)
 
-        batch_sampler = torch.utils.data.sampler.BatchSampler(
-            sampler=sampler,
-            batch_size=cfg.solver.batch_size
-            if split == Split.Training
-            else cfg.test.batch_size,
-            drop_last=False,
+        batch_size = (
+            cfg.solver.batch_size if split == Split.Training else cfg.test.batch_size
         )
+        if split == Split.Training and cfg.data_loader.get(
+            "aspect_ratio_grouping", False
+        ):
+            sizes = image_sizes(dataset)
+            batch_sampler = GroupedBatchSampler(
+                sampler,
+                aspect_ratio_group_ids(
+                    sizes, cfg.data_loader.get("aspect_ratio_bins", (1.0,))
+                ),
+                batch_size,
+                sizes=sizes,
+            )
+        else:
+            batch_sampler = torch.utils.data.sampler.BatchSampler(
+                sampler=sampler, batch_size=batch_size, drop_last=False
+            )
         if max_iter is not None:
             batch_sampler = LimitedBatchResampler(
                 batch_sampler, num_iterations=max_iter, start_iter=start_iter
             )
 
+        if multi_dataset.batch_augmentation is not None:
+            batch_augmentation_cfg = cfg.input.batch_augmentation
+            data_loaders.append(
+                SSDBatchAugmentedLoader(
+                    _data_loader(dataset, batch_sampler, cfg, padded=True),
+                    multi_dataset.batch_augmentation,
+                    multi_dataset.batch_annotation_transform,
+                    device=batch_augmentation_cfg.get("device", "cpu"),
+                    threaded=batch_augmentation_cfg.get("threaded", True),
+                )
+            )
+            continue
+
         data_loaders.append(
-            DataLoader(
+            _data_loader(
                 dataset,
-                num_workers=cfg.data_loader.num_workers,
-                batch_sampler=batch_sampler,
-                pin_memory=cfg.data_loader.pin_memory,
-                collate_fn=BatchCollator(split == Split.Training),
+                batch_sampler,
+                cfg,
+                wrap=split == Split.Training,
+                annotation_transform=multi_dataset.batch_annotation_transform,
             )
         )
 
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Per rank spilling of inference predictions to disk, and their memory mapped merge.
+
+           Every rank appends fixed layout records to its own pair of files while inferring, one
+           IMAGE_RECORD per image (image id, first detection, number of detections and the size the
+           model saw) and one DETECTION_RECORD per detection (box, label, score). The main process
+           merges the ranks by memory mapping the files, only the image records are read into
+           memory, predictions are materialised per image when indexed.
+           """
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import numpy
+import torch
+
+from neodroidvision.detection.single_stage.ssd.architecture.nms_box_heads import SSDOut
+
+__all__ = [
+    "IMAGE_RECORD",
+    "DETECTION_RECORD",
+    "PredictionWriter",
+    "SpilledPredictions",
+]
+
+IMAGE_RECORD = numpy.dtype(
+    [
+        ("image_id", "<i8"),
+        ("offset", "<i8"),
+        ("count", "<i8"),
+        ("img_width", "<f4"),
+        ("img_height", "<f4"),
+    ]
+)
+DETECTION_RECORD = numpy.dtype(
+    [("boxes", "<f4", (4,)), ("labels", "<i8"), ("scores", "<f4")]
+)
+MANIFEST_NAME = "manifest.json"
+
+
+def _rank_files(directory: Path, rank: int) -> tuple:
+    return (
+        directory / f"rank_{rank}_images.bin",
+        directory / f"rank_{rank}_detections.bin",
+    )
+
+
+class PredictionWriter:
+    """
+Appends the predictions of a rank to its record files, used as a context manager
+"""
+
+    def __init__(self, directory: Path, rank: int = 0):
+        """
+
+:param directory:
+:type directory:
+:param rank:
+:type rank:
+"""
+        self.directory = Path(directory)
+        self.rank = rank
+        self.num_images = 0
+        self.num_detections = 0
+        self._image_file = None
+        self._detection_file = None
+
+    def __enter__(self) -> "PredictionWriter":
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.rank == 0:  # the previous merge is stale from here on
+            try:
+                (self.directory / MANIFEST_NAME).unlink()
+            except FileNotFoundError:
+                pass
+        image_path, detection_path = _rank_files(self.directory, self.rank)
+        self._image_file = open(image_path, "wb")
+        self._detection_file = open(detection_path, "wb")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._image_file.close()
+        self._detection_file.close()
+
+    def append(self, image_ids: Sequence[int], predictions: Sequence[SSDOut]) -> None:
+        """
+Appends the predictions of a batch
+
+:param image_ids:
+:type image_ids:
+:param predictions:
+:type predictions:
+"""
+        counts = [len(p.boxes) for p in predictions]
+        images = numpy.empty(len(predictions), IMAGE_RECORD)
+        images["image_id"] = image_ids
+        images["count"] = counts
+        images["offset"] = self.num_detections + numpy.cumsum([0] + counts[:-1])
+        images["img_width"] = [float(p.img_width) for p in predictions]
+        images["img_height"] = [float(p.img_height) for p in predictions]
+
+        detections = numpy.empty(sum(counts), DETECTION_RECORD)
+        if len(detections):
+            detections["boxes"] = torch.cat([p.boxes for p in predictions]).numpy()
+            detections["labels"] = torch.cat([p.labels for p in predictions]).numpy()
+            detections["scores"] = torch.cat([p.scores for p in predictions]).numpy()
+
+        self._detection_file.write(detections.tobytes())
+        self._image_file.write(images.tobytes())
+        self.num_images += len(images)
+        self.num_detections += len(detections)
+
+
+class SpilledPredictions(Sequence):
+    """
+The merged predictions of every rank, a sequence of SSDOut ordered by image id, read from the
+memory mapped record files
+"""
+
+    def __init__(self, directory: Path):
+        """
+Opens a merge, see merge
+
+:param directory:
+:type directory:
+"""
+        self.directory = Path(directory)
+        manifest = json.loads((self.directory / MANIFEST_NAME).read_text())
+        self._detections, images = [], []
+        for rank in range(manifest["world_size"]):
+            image_path, detection_path = _rank_files(self.directory, rank)
+            rank_images = numpy.fromfile(image_path, IMAGE_RECORD)
+            images.append((rank, rank_images))
+            self._detections.append(
+                numpy.memmap(detection_path, DETECTION_RECORD, mode="r")
+                if detection_path.stat().st_size
+                else numpy.empty(0, DETECTION_RECORD)
+            )
+
+        ranks = numpy.concatenate(
+            [numpy.full(len(i), r, numpy.int64) for r, i in images]
+        )
+        images = numpy.concatenate([i for _, i in images])
+        # the padding of DistributedSampler repeats images, keep the first of each
+        _, first = numpy.unique(images["image_id"], return_index=True)
+        self._images, self._ranks = images[first], ranks[first]
+
+    @staticmethod
+    def is_complete(directory: Path) -> bool:
+        """
+
+:param directory:
+:type directory:
+:return: whether the directory holds a merge to reuse
+:rtype:
+"""
+        return (Path(directory) / MANIFEST_NAME).exists()
+
+    @staticmethod
+    def merge(directory: Path, world_size: int) -> "SpilledPredictions":
+        """
+On the main process, after every rank has closed its PredictionWriter
+
+:param directory:
+:type directory:
+:param world_size:
+:type world_size:
+:return:
+:rtype:
+"""
+        directory = Path(directory)
+        manifest_path = directory / MANIFEST_NAME
+        temporary = manifest_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps({"world_size": world_size}))
+        os.replace(temporary, manifest_path)
+
+        predictions = SpilledPredictions(directory)
+        image_ids = predictions.image_ids
+        if len(image_ids) and len(image_ids) != image_ids[-1] + 1:
+            logging.getLogger("SSD.inference").warning(
+                "Number of images that were gathered from multiple processes is not a contiguous "
+                "set. Some images might be missing from the evaluation"
+            )
+        return predictions
+
+    @property
+    def image_ids(self) -> numpy.ndarray:
+        """
+
+:return: sorted
+:rtype:
+"""
+        return self._images["image_id"]
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __getitem__(self, index: int) -> SSDOut:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        image = self._images[index]
+        offset, count = int(image["offset"]), int(image["count"])
+        detections = self._detections[self._ranks[index]][offset : offset + count]
+        return SSDOut(
+            boxes=torch.from_numpy(numpy.ascontiguousarray(detections["boxes"])),
+            labels=torch.from_numpy(numpy.ascontiguousarray(detections["labels"])),
+            scores=torch.from_numpy(numpy.ascontiguousarray(detections["scores"])),
+            img_width=torch.tensor([float(image["img_width"])]),
+            img_height=torch.tensor([float(image["img_height"])]),
+        )
+
+    def __iter__(self) -> Iterator[SSDOut]:
+        for index in range(len(self)):
+            yield self[index]
@@ -1,17 +1,34 @@
 import logging
 from pathlib import Path
-from typing import Any, List
+from typing import Any, List, Optional
 
+import numpy
 import torch
 import torch.utils.data
 from neodroidvision import PROJECT_APP_PATH
 from neodroidvision.data.detection.coco import COCODataset, coco_evaluation
-from neodroidvision.data.detection.voc import VOCDataset, voc_evaluation
+from neodroidvision.data.detection.voc import (
+    VOCDataset,
+    VOCEvaluator,
+    log_voc_results,
+    voc_evaluation,
+)
+from neodroidvision.detection.single_stage.ssd.architecture.nms_box_heads import (
+    SSDBatchOut,
+    SSDOut,
+)
 from neodroidvision.detection.single_stage.ssd.object_detection_dataloader import (
     object_detection_data_loaders,
 )
+from neodroidvision.detection.single_stage.ssd.prediction_spilling import (
+    PredictionWriter,
+    SpilledPredictions,
+)
 from neodroidvision.utilities import (
+    all_gather_data,
     distributing_utilities,
+    global_distribution_rank,
+    global_world_size,
     is_main_process,
     synchronise_torch_barrier,
 )
@@ -25,24 +42,77 @@ __all__ = ["do_ssd_evaluation"]
 from draugr.torch_utilities import Split
 
 
+def split_predictions(outputs: Any) -> List[SSDOut]:
+    """
+Per image predictions from the output of a batch, for both the per image and the batched
+post processing of the box head
+
+:param outputs:
+:return:
+"""
+    if isinstance(outputs, SSDBatchOut):
+        return [
+            SSDOut(
+                boxes=outputs.boxes[i, :n],
+                labels=outputs.labels[i, :n],
+                scores=outputs.scores[i, :n],
+                img_width=outputs.img_width,
+                img_height=outputs.img_height,
+            )
+            for i, n in enumerate(outputs.num_detections.tolist())
+        ]
+    return [SSDOut(*fields) for fields in zip(*outputs)]
+
+
 def compute_on_dataset(
     model: Module,
     data_loader: DataLoader,
     device: torch.device,
     cpu_device=torch.device("cpu"),
+    evaluator: Optional[VOCEvaluator] = None,
+    writer: Optional[PredictionWriter] = None,
 ) -> dict:
+    """
+
+  :param model:
+  :param data_loader:
+  :param device:
+  :param cpu_device:
+  :param evaluator: if given, updated with each batch of predictions, rescaled to the original
+  image sizes, against the annotations of the dataset
+  :param writer: if given, the predictions are appended to it instead of being returned
+  :return:
+  """
+    dataset = data_loader.dataset
     results_dict = {}
     for batch in tqdm(data_loader):
         images, targets, image_ids = batch
         with torch.no_grad():
-            results_dict.update(
-                {
-                    img_id: result
-                    for img_id, result in zip(
-                        image_ids, [o.to(cpu_device) for o in model(images.to(device))]
+            predictions = [
+                SSDOut(*[torch.as_tensor(f).to(cpu_device) for f in p])
+                for p in split_predictions(model(images.to(device)))
+            ]
+        image_ids = [int(i) for i in image_ids]
+        if writer is not None:
+            writer.append(image_ids, predictions)
+        else:
+            results_dict.update(dict(zip(image_ids, predictions)))
+
+        if evaluator is not None:
+            rescaled, annotations = [], []
+            for image_id, prediction in zip(image_ids, predictions):
+                height, width = dataset.get_img_info(image_id)
+                scale = torch.tensor(
+                    (
+                        width / float(prediction.img_width),
+                        height / float(prediction.img_height),
                     )
-                }
-            )
+                ).repeat(2)
+                rescaled.append(
+                    (prediction.boxes * scale, prediction.labels, prediction.scores)
+                )
+                annotations.append(dataset.get_annotation(image_id)[1])
+            evaluator.update(rescaled, annotations)
     return results_dict
 
 
@@ -52,7 +122,7 @@ def accumulate_predictions_from_cuda_devices(predictions_per_gpu: Any) -> list:
   :param predictions_per_gpu:
   :return:
   """
-    all_predictions = distributing_utilities.all_gather_cuda(predictions_per_gpu)
+    all_predictions = all_gather_data(predictions_per_gpu)
     if not distributing_utilities.is_main_process():
         return
 
@@ -120,20 +190,53 @@ def inference_ssd(
     logger = logging.getLogger("SSD.inference")
     logger.info(f"Evaluating {dataset_name} dataset({len(dataset)} images):")
 
-    predictions_path = output_folder / "predictions.pth"
-
-    if use_cached and predictions_path.exists():
-        predictions = torch.load(predictions_path, map_location="cpu")
-    else:
-        predictions = compute_on_dataset(model, data_loader, device)
+    evaluator = None
+    if output_folder is None:
+        if isinstance(dataset, VOCDataset) and global_world_size() == 1:
+            evaluator = VOCEvaluator()  # evaluate alongside inference
+        predictions = compute_on_dataset(
+            model, data_loader, device, evaluator=evaluator
+        )
         synchronise_torch_barrier()
         predictions = accumulate_predictions_from_cuda_devices(predictions)
+    else:
+        # every rank spills its predictions, merged by memory mapping on the main process
+        predictions_dir = output_folder / "predictions"
+        legacy_predictions_path = output_folder / "predictions.pth"
+        if use_cached and SpilledPredictions.is_complete(predictions_dir):
+            predictions = SpilledPredictions(predictions_dir)
+        elif use_cached and legacy_predictions_path.exists():
+            predictions = torch.load(legacy_predictions_path, map_location="cpu")
+        else:
+            if isinstance(dataset, VOCDataset) and global_world_size() == 1:
+                evaluator = VOCEvaluator()  # evaluate alongside inference
+            with PredictionWriter(
+                predictions_dir, global_distribution_rank()
+            ) as writer:
+                compute_on_dataset(
+                    model, data_loader, device, evaluator=evaluator, writer=writer
+                )
+            synchronise_torch_barrier()
+            predictions = None
+            if is_main_process():
+                predictions = SpilledPredictions.merge(
+                    predictions_dir, global_world_size()
+                )
 
     if not is_main_process():
         return
 
-    if output_folder:
-        torch.save(predictions, predictions_path)
+    if evaluator is not None:
+        results = evaluator.compute()
+        at_50 = int(numpy.argmin(numpy.abs(results["iou_thresholds"] - 0.5)))
+        return log_voc_results(
+            dataset.categories,
+            results["ap_07"][at_50],
+            results["map_07"][at_50],
+            output_folder,
+            mAP_50_95=float(numpy.mean(results["map_07"])),
+            **kwargs,
+        )
 
     return evaluate_dataset(
         dataset=dataset, predictions=predictions, output_dir=output_folder, **kwargs
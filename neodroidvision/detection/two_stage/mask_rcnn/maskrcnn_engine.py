@@ -73,52 +73,70 @@ def maskrcnn_train_single_epoch(
                      }.items():
           writer.scalar(k, v)
 
+    batch_sampler = data_loader.batch_sampler
+    if writer and getattr(batch_sampler, 'sizes', None) is not None:  # GroupedBatchSampler
+      writer.scalar("padding_ratio", batch_sampler.padding_ratio())
+
 
 def maskrcnn_evaluate(
     model: Module,
     data_loader: DataLoader,
     *,
     device=global_torch_device(),
-    writer: Writer = None
+    writer: Writer = None,
+    num_eval_workers: int = 0
     ):
+  '''
+
+  :param model:
+  :param data_loader:
+  :param device:
+  :param writer:
+  :param num_eval_workers: size of the process pool evaluating predictions while the model runs,
+  0 evaluates in line
+  :return:
+  '''
   n_threads = torch.get_num_threads()
-  # FIXME remove this and make paste_masks_in_image run on the GPU
-  torch.set_num_threads(1)
+  if num_eval_workers == 0:  # the evaluation pool needs the threads of the model
+    # FIXME remove this and make paste_masks_in_image run on the GPU
+    torch.set_num_threads(1)
   cpu_device = torch.device("cpu")
 
-  with torch.no_grad():
-    with TorchEvalSession(model):
-      coco_evaluator = CocoEvaluator(
-          get_coco_api_from_dataset(data_loader.dataset),
-          get_iou_types(model)
-          )
-
-      for image, targets in tqdm.tqdm(data_loader):
-        image = [img.to(device) for img in image]
-        targets = [{k:v.to(device) for k, v in t.items()} for t in targets]
-
-        torch.cuda.synchronize(device)
-        model_time = time.time()
-        outputs = model(image)
-
-        outputs = [{k:v.to(cpu_device) for k, v in t.items()} for t in outputs]
-        model_time = time.time() - model_time
-
-        res = {
-            target["image_id"].item():output
-            for target, output in zip(targets, outputs)
-            }
-        evaluator_time = time.time()
-        coco_evaluator.update(res)
-        evaluator_time = time.time() - evaluator_time
-        if writer:
-          writer.scalar("model_time", model_time)
-          writer.scalar("evaluator_time", evaluator_time)
-
-      coco_evaluator.synchronize_between_processes()
-      coco_evaluator.accumulate()
-      coco_evaluator.summarize()
-
-  torch.set_num_threads(n_threads)
+  try:
+    with torch.no_grad():
+      with TorchEvalSession(model):
+        with CocoEvaluator(
+            get_coco_api_from_dataset(data_loader.dataset),
+            get_iou_types(model),
+            num_workers=num_eval_workers
+            ) as coco_evaluator:
+
+          for image, targets in tqdm.tqdm(data_loader):
+            image = [img.to(device) for img in image]
+            targets = [{k:v.to(device) for k, v in t.items()} for t in targets]
+
+            torch.cuda.synchronize(device)
+            model_time = time.time()
+            outputs = model(image)
+
+            outputs = [{k:v.to(cpu_device) for k, v in t.items()} for t in outputs]
+            model_time = time.time() - model_time
+
+            res = {
+                target["image_id"].item():output
+                for target, output in zip(targets, outputs)
+                }
+            evaluator_time = time.time()
+            coco_evaluator.update(res)
+            evaluator_time = time.time() - evaluator_time
+            if writer:
+              writer.scalar("model_time", model_time)
+              writer.scalar("evaluator_time", evaluator_time)
+
+          coco_evaluator.synchronize_between_processes()
+          coco_evaluator.accumulate()
+          coco_evaluator.summarize()
+  finally:
+    torch.set_num_threads(n_threads)
 
   return coco_evaluator
@@ -7,15 +7,16 @@ __doc__ = r"""
            Created on 09/02/2020
            """
 
+import shutil
+from pathlib import Path
+
 import fire
 from neodroidvision import get_version
 from pyfiglet import Figlet
 
-import draugr
-
 sponsors = "SINTEF Ocean, Alexandra Institute, Norges Forskningsråd"
 margin_percentage = 0 / 6
-terminal_width = draugr.get_terminal_size().columns
+terminal_width = shutil.get_terminal_size().columns  # not draugr's, it imports torch
 margin = int(margin_percentage * terminal_width)
 width = terminal_width - 2 * margin
 underline = "_" * width
@@ -38,6 +39,194 @@ Prints the version of this Neodroid installation.
     def sponsors() -> None:
         print(sponsors)
 
+    @staticmethod
+    def pack(
+        data_root: str,
+        dataset_name: str,
+        output_dir: str,
+        max_shard_gigabytes: float = 4.0,
+    ) -> None:
+        """
+Packs the images of a VOC or COCO split into image shards, load them with
+VOCDataset(..., image_shards=output_dir) or COCODataset(..., image_shards=output_dir)
+
+:param data_root: as given to the dataset
+:param dataset_name: e.g. voc_2007_trainval or coco_2014_train
+:param output_dir:
+:param max_shard_gigabytes:
+"""
+        from draugr.torch_utilities import Split
+        from neodroidvision.data.detection.coco import COCODataset
+        from neodroidvision.data.detection.image_shards import write_image_shards
+        from neodroidvision.data.detection.voc import VOCDataset
+
+        if dataset_name in VOCDataset.data_dirs:
+            dataset_type = VOCDataset
+        elif dataset_name in COCODataset.splits:
+            dataset_type = COCODataset
+        else:
+            raise ValueError(f"Unknown dataset {dataset_name}")
+
+        dataset = dataset_type(
+            data_root=Path(data_root),
+            dataset_name=dataset_name,
+            split=Split.Testing,  # every image of the split
+        )
+        shard_files = write_image_shards(
+            dataset.image_files(),
+            Path(output_dir),
+            dataset_name,
+            max_shard_bytes=int(max_shard_gigabytes * (1 << 30)),
+        )
+        for shard_file in shard_files:
+            print(shard_file)
+
+    @staticmethod
+    def synthesise(
+        kind: str,
+        root: str,
+        num_images: int = 100,
+        height: int = None,
+        width: int = None,
+        min_objects: int = None,
+        max_objects: int = None,
+        jpeg_quality: int = 90,
+        num_workers: int = None,
+        seed: int = 0,
+    ) -> None:
+        """
+Writes a synthetic dataset in the layout of VOCDataset (voc), COCODataset (coco),
+CloudSegmentationDataset (clouds) or PennFudanDataset (penn_fudan), see synthetic_datasets
+
+:param kind: voc, coco, clouds or penn_fudan
+:param root: the data root to give the dataset
+:param num_images:
+:param height: of the images, the default of the kind if not given
+:param width:
+:param min_objects: per image
+:param max_objects:
+:param jpeg_quality:
+:param num_workers: processes, all cores if not given
+:param seed:
+"""
+        import inspect
+        import os
+
+        from neodroidvision.data.synthetic_datasets import (
+            SYNTHETIC_DATASET_WRITERS,
+            write_synthetic_dataset,
+        )
+
+        if kind not in SYNTHETIC_DATASET_WRITERS:
+            raise ValueError(
+                f"Unknown dataset kind {kind}, one of {list(SYNTHETIC_DATASET_WRITERS)}"
+            )
+        defaults = {
+            k: v.default
+            for k, v in inspect.signature(
+                SYNTHETIC_DATASET_WRITERS[kind]
+            ).parameters.items()
+        }
+        kws = dict(num_images=num_images, jpeg_quality=jpeg_quality, seed=seed)
+        if height is not None or width is not None:
+            default_height, default_width = defaults["image_size"]
+            kws["image_size"] = (height or default_height, width or default_width)
+        if min_objects is not None or max_objects is not None:
+            default_min, default_max = defaults["objects_per_image"]
+            kws["objects_per_image"] = (
+                default_min if min_objects is None else min_objects,
+                default_max if max_objects is None else max_objects,
+            )
+        kws["num_workers"] = os.cpu_count() if num_workers is None else num_workers
+        print(write_synthetic_dataset(kind, Path(root), **kws))
+
+    @staticmethod
+    def detect(
+        checkpoint: str,
+        config: str,
+        inputs: str,
+        output: str,
+        output_format: str = "jsonl",
+        batch_size: int = 8,
+        num_workers: int = None,
+        processes: bool = False,
+        decoder: str = "pil",
+        score_threshold: float = 0.0,
+        annotation_file: str = None,
+        resume: bool = True,
+        device: str = None,
+    ) -> None:
+        """
+Detects objects in images with a SingleShotDectectionNms, streaming the results to output as the
+batches complete, see batch_inference. An interrupted run continues where it stopped when rerun.
+
+neodroid-vision detect model.pth configs/vgg_ssd300_voc0712.py "images/**/*.jpg" detections.jsonl
+
+:param checkpoint: of the model, as saved by CheckPointer
+:param config: python file or module of the config, defining base_cfg
+:param inputs: an image, a directory or a glob pattern
+:param output: results file
+:param output_format: jsonl, a line per image, or coco, a COCO results array
+:param batch_size:
+:param num_workers: decoding threads, all cores if not given
+:param processes: decode in processes instead of threads
+:param decoder: pil, opencv or turbojpeg
+:param score_threshold: detections of lower scores are dropped
+:param annotation_file: COCO instances json of the categories the model was trained on, for the
+category ids of the coco results
+:param resume: skip the images in the results of a previous run, otherwise overwrite them
+:param device: e.g. cpu or cuda:0, the global torch device if not given
+"""
+        import os
+
+        import torch
+        from draugr.torch_utilities import global_torch_device
+        from neodroidvision.detection import SingleShotDectectionNms
+        from neodroidvision.detection.single_stage.ssd.batch_inference import (
+            DetectionResultWriter,
+            coco_category_ids,
+            detect_images,
+            find_images,
+            load_config,
+        )
+        from neodroidvision.utilities import CheckPointer
+
+        cfg = load_config(config)
+        cfg.model.backbone.pretrained = False  # the checkpoint has the weights
+        cfg.model.box_head.batched_post_processing = True  # fixed shape batches
+        model = SingleShotDectectionNms(cfg)
+        CheckPointer(model, save_dir=Path(checkpoint).parent).load(
+            Path(checkpoint), use_latest=False, keys=("model",)
+        )
+        model.post_init()
+        model.to(global_torch_device() if device is None else torch.device(device))
+        model.eval()
+
+        image_paths = find_images(inputs)
+        print(f"{len(image_paths)} images in {inputs}")
+        with DetectionResultWriter(
+            output,
+            output_format,
+            resume=resume,
+            category_ids=coco_category_ids(annotation_file)
+            if annotation_file
+            else None,
+            category_names=getattr(cfg.get("dataset_type"), "categories", None),
+        ) as writer:
+            detect_images(
+                model,
+                image_paths,
+                writer,
+                image_size=cfg.input.image_size,
+                pixel_mean=cfg.input.pixel_mean,
+                batch_size=batch_size,
+                num_workers=os.cpu_count() if num_workers is None else num_workers,
+                use_processes=processes,
+                decoder=decoder,
+                score_threshold=score_threshold,
+            )
+        print(output)
+
 
 def draw_cli_header(*, title="Neodroid Vision", font="big"):
     figlet = Figlet(font=font, justify="center", width=terminal_width)
@@ -7,4 +7,11 @@ __doc__ = r"""
            Created on 28/10/2019
            """
 
-from .fission import *
+from typing import TYPE_CHECKING
+
+from neodroidvision.utilities.lazy_importing import lazy_star_imports
+
+__getattr__, __dir__ = lazy_star_imports(__name__, ("fission",))
+
+if TYPE_CHECKING:
+    from .fission import *
@@ -4,8 +4,17 @@
 __author__ = "Christian Heider Nielsen"
 __doc__ = ""
 
-from .denoise import *
-from .flow import *
-from .generative import *
-from .metric import *
-from .vae import *
+from typing import TYPE_CHECKING
+
+from neodroidvision.utilities.lazy_importing import lazy_star_imports
+
+__getattr__, __dir__ = lazy_star_imports(
+    __name__, ("denoise", "flow", "generative", "metric", "vae")
+)
+
+if TYPE_CHECKING:
+    from .denoise import *
+    from .flow import *
+    from .generative import *
+    from .metric import *
+    from .vae import *
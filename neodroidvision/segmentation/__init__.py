@@ -3,5 +3,12 @@
 
 __author__ = "Christian Heider Nielsen"
 
-from .evaluation import *
-from .masks import *
+from typing import TYPE_CHECKING
+
+from neodroidvision.utilities.lazy_importing import lazy_star_imports
+
+__getattr__, __dir__ = lazy_star_imports(__name__, ("evaluation", "masks"))
+
+if TYPE_CHECKING:
+    from .evaluation import *
+    from .masks import *
@@ -5,9 +5,23 @@ __author__ = "Christian Heider Nielsen"
 __doc__ = r"""
            """
 
-from .metric_utilities import *
-from .metric_utilities import *
-from .torch_utilities import *
+from typing import TYPE_CHECKING
 
-# from .tf_utilities import *
-from .visualisation import *
+from .lazy_importing import lazy_star_imports
+
+__getattr__, __dir__ = lazy_star_imports(
+    __name__,
+    (
+        "metric_utilities",
+        "stage_profiling",
+        "torch_utilities",
+        # "tf_utilities",
+        "visualisation",
+    ),
+)
+
+if TYPE_CHECKING:
+    from .metric_utilities import *
+    from .stage_profiling import *
+    from .torch_utilities import *
+    from .visualisation import *
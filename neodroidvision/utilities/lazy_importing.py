@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Lazy star imports of the submodules of a package (PEP 562), so importing a package of
+           neodroidvision costs nothing until one of its names is used. An attribute missing from
+           the package is looked up in the public names of its submodules, imported in order until
+           one has it, and cached on the package; "from package import *" imports them all.
+           """
+
+import importlib
+import sys
+from typing import Any, Callable, List, Sequence, Tuple
+
+__all__ = ["lazy_star_imports"]
+
+
+def _public_names(module: Any) -> List[str]:
+    names = getattr(module, "__all__", None)
+    if names is None:
+        names = [n for n in vars(module) if not n.startswith("_")]
+    return list(names)
+
+
+def lazy_star_imports(
+    package_name: str, submodules: Sequence[str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+Replaces "from .submodule import *" of every submodule in a package __init__
+
+__getattr__, __dir__ = lazy_star_imports(__name__, ("single_stage", "two_stage"))
+
+:param package_name: __name__ of the package
+:type package_name:
+:param submodules: relative names, in the order they were star imported
+:type submodules:
+:return: the module level __getattr__ and __dir__ of the package
+:rtype:
+"""
+    package = sys.modules[package_name]
+    submodules = tuple(submodules)
+
+    def import_submodule(name: str) -> Any:
+        return importlib.import_module(f".{name}", package_name)
+
+    def __getattr__(name: str) -> Any:
+        if name == "__all__":
+            names = list(submodules)
+            for submodule in submodules:
+                names.extend(
+                    n
+                    for n in _public_names(import_submodule(submodule))
+                    if n not in names
+                )
+            package.__all__ = names
+            return names
+        if name.startswith("__"):
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+        if name in submodules:
+            return import_submodule(name)
+        for submodule in submodules:
+            module = import_submodule(submodule)
+            if name in _public_names(module) and hasattr(module, name):
+                value = getattr(module, name)
+                setattr(package, name, value)
+                return value
+        raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(package)) | set(submodules))
+
+    return __getattr__, __dir__
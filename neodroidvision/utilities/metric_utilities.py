@@ -8,6 +8,10 @@ from torch import distributed
 
 __all__ = ["SmoothedValue", "MetricLogger"]
 
+from neodroidvision.utilities.stage_profiling import (
+    StageProfiler,
+    default_stage_profiler,
+)
 from neodroidvision.utilities.torch_utilities.distributing.distributing_utilities import is_distribution_ready
 
 
@@ -45,13 +49,11 @@ Warning: does not synchronize the deque!
 
     @property
     def median(self):
-        d = torch.tensor(list(self.deque))
-        return d.median().item()
+        return sorted(self.deque)[(len(self.deque) - 1) // 2]  # the lower, as torch.median
 
     @property
     def avg(self):
-        d = torch.tensor(list(self.deque), dtype=torch.float32)
-        return d.mean().item()
+        return sum(self.deque) / len(self.deque)
 
     @property
     def global_avg(self):
@@ -78,9 +80,29 @@ Warning: does not synchronize the deque!
 class MetricLogger(object):
     MB = 1024.0 * 1024.0
 
-    def __init__(self, delimiter="\t"):
+    def __init__(self, delimiter="\t", profiler: StageProfiler = None):
+        """
+
+:param delimiter:
+:type delimiter:
+:param profiler: of the stages, default_stage_profiler() if None
+:type profiler:
+"""
         self.meters = defaultdict(SmoothedValue)
         self.delimiter = delimiter
+        if profiler is None:
+            profiler = default_stage_profiler()
+        self.profiler = profiler
+
+    def stage(self, name: str):
+        """
+
+:param name:
+:type name:
+:return: a context manager timing its body as the stage name, see StageProfiler
+:rtype:
+"""
+        return self.profiler.stage(name)
 
     def update(self, **kwargs):
         for k, v in kwargs.items():
@@ -112,9 +134,19 @@ class MetricLogger(object):
         self.meters[name] = meter
 
     def log_every(self, iterable, print_freq, header=None):
+        """
+Yields the items of iterable, printing the meters every print_freq items
+
+:param iterable:
+:param print_freq:
+:param header: of the printed lines, the wait for the next item is profiled as the stage
+"{header} data", kept apart from the other loggers sharing the profiler
+:return:
+"""
         i = 0
         if not header:
             header = ""
+        data_stage = f"{header} data" if header else "data"
         start_time = time.time()
         end = time.time()
         iter_time = SmoothedValue(fmt="{avg:.4f}")
@@ -134,6 +166,7 @@ class MetricLogger(object):
 
         for obj in iterable:
             data_time.update(time.time() - end)
+            self.profiler.record(data_stage, data_time.value)
             yield obj
             iter_time.update(time.time() - end)
             if i % print_freq == 0 or i == len(iterable) - 1:
@@ -150,6 +183,8 @@ class MetricLogger(object):
                         memory=torch.cuda.max_memory_allocated() / self.MB,
                     )
                 )
+                if self.profiler.enabled:
+                    print(f"{header} stages: {self.profiler}")
             i += 1
             end = time.time()
         total_time = time.time() - start_time
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Low overhead timing of named hot path stages (data wait, host to device, forward, loss,
+           backward, optimiser, nms, eval).
+
+           Every stage keeps constant size streaming statistics, count, total, an exponential
+           moving average and a logarithmically binned quantile sketch (P50, P95 within 1%
+           relative error). A disabled profiler hands out one shared no-op context manager, so
+           instrumented code costs a method call and a with statement, well under a microsecond.
+
+           Library code times its stages on default_stage_profiler(), which MetricLogger uses
+           unless given another, so enabling it for a run also reveals e.g. the time spent in nms.
+           """
+
+import contextlib
+import functools
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Union
+
+import torch
+
+__all__ = [
+    "QuantileSketch",
+    "StageStatistics",
+    "StageProfiler",
+    "default_stage_profiler",
+]
+
+
+class QuantileSketch:
+    """
+Fixed size histogram of positive values over logarithmic bins, a quantile is reported within
+relative_accuracy of a value of the series, updates are O(1), queries O(num_bins)
+"""
+
+    __slots__ = ("_log_gamma", "_min_index", "counts", "count")
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        min_value: float = 1e-7,
+        num_bins: int = 2048,
+    ):
+        """
+
+:param relative_accuracy:
+:type relative_accuracy:
+:param min_value: smaller values land in the first bin
+:type min_value:
+:param num_bins: larger values than min_value * ((1 + a) / (1 - a)) ** num_bins land in the last
+:type num_bins:
+"""
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self._min_index = math.ceil(math.log(min_value) / self._log_gamma)
+        self.counts = [0] * num_bins
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """
+
+:param value:
+:type value:
+"""
+        index = (
+            math.ceil(math.log(value) / self._log_gamma) - self._min_index
+            if value > 0
+            else 0
+        )
+        self.counts[min(max(index, 0), len(self.counts) - 1)] += 1
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+
+:param q: in [0, 1]
+:type q:
+:return: nan if empty
+:rtype:
+"""
+        if not self.count:
+            return math.nan
+        rank, seen = q * (self.count - 1), 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                break
+        # the midpoint (in relative error) of the bin (gamma ** (i - 1), gamma ** i]
+        gamma = math.exp(self._log_gamma)
+        return 2 * gamma ** (index + self._min_index) / (gamma + 1)
+
+
+class StageStatistics:
+    """
+Streaming statistics of the durations of a stage, in seconds
+"""
+
+    __slots__ = ("count", "total", "ema", "last", "sketch", "_ema_factor")
+
+    def __init__(self, ema_factor: float = 0.1):
+        """
+
+:param ema_factor: weight of the newest duration in the moving average
+:type ema_factor:
+"""
+        self.count = 0
+        self.total = 0.0
+        self.ema = 0.0
+        self.last = 0.0
+        self.sketch = QuantileSketch()
+        self._ema_factor = ema_factor
+
+    def update(self, seconds: float) -> None:
+        """
+
+:param seconds:
+:type seconds:
+"""
+        self.ema = (
+            seconds
+            if not self.count
+            else self.ema + self._ema_factor * (seconds - self.ema)
+        )
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.sketch.add(seconds)
+
+    @property
+    def p50(self) -> float:
+        return self.sketch.quantile(0.5)
+
+    @property
+    def p95(self) -> float:
+        return self.sketch.quantile(0.95)
+
+    def summary(self) -> Dict[str, float]:
+        """
+
+:return:
+:rtype:
+"""
+        return dict(
+            count=self.count,
+            total=self.total,
+            ema=self.ema,
+            p50=self.p50,
+            p95=self.p95,
+            last=self.last,
+        )
+
+
+class _StageTimer:
+    """
+Times one stage of a profiler, not reentrant for the same stage
+"""
+
+    __slots__ = ("_profiler", "_statistics", "_start")
+
+    def __init__(self, profiler: "StageProfiler", statistics: StageStatistics):
+        self._profiler = profiler
+        self._statistics = statistics
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        if self._profiler.synchronise_cuda:
+            torch.cuda.synchronize()
+        self._start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._profiler.synchronise_cuda:
+            torch.cuda.synchronize()
+        self._statistics.update(time.perf_counter() - self._start)
+
+
+_DISABLED = contextlib.nullcontext()
+
+
+class StageProfiler:
+    """
+Times named stages, see the module doc. Disabled by default.
+
+with profiler.stage("forward"):
+    outputs = model(images)
+"""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        *,
+        ema_factor: float = 0.1,
+        synchronise_cuda: bool = False,
+    ):
+        """
+
+:param enabled:
+:type enabled:
+:param ema_factor: see StageStatistics
+:type ema_factor:
+:param synchronise_cuda: synchronise at stage boundaries, so queued cuda kernels are attributed to
+the stage launching them
+:type synchronise_cuda:
+"""
+        self.enabled = enabled
+        self.synchronise_cuda = synchronise_cuda
+        self.stages: Dict[str, StageStatistics] = {}
+        self._ema_factor = ema_factor
+        self._timers: Dict[str, _StageTimer] = {}
+
+    def statistics(self, name: str) -> StageStatistics:
+        """
+
+:param name:
+:type name:
+:return: of the stage, created on first use
+:rtype:
+"""
+        statistics = self.stages.get(name)
+        if statistics is None:
+            statistics = self.stages[name] = StageStatistics(self._ema_factor)
+            self._timers[name] = _StageTimer(self, statistics)
+        return statistics
+
+    def stage(self, name: str) -> Any:
+        """
+
+:param name:
+:type name:
+:return: a context manager timing its body as the stage name
+:rtype:
+"""
+        if not self.enabled:
+            return _DISABLED
+        timer = self._timers.get(name)
+        if timer is None:
+            self.statistics(name)
+            timer = self._timers[name]
+        return timer
+
+    def timed(self, name: str) -> Callable:
+        """
+Decorator timing the calls of a function as the stage name
+
+:param name:
+:type name:
+:return:
+:rtype:
+"""
+
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self.stage(name):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+Records a duration measured elsewhere
+
+:param name:
+:type name:
+:param seconds:
+:type seconds:
+"""
+        if self.enabled:
+            self.statistics(name).update(seconds)
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """
+Yields from iterable, timing the wait for every item as the stage name, e.g. the data wait of a
+data loader
+
+:param name:
+:type name:
+:param iterable:
+:type iterable:
+:return:
+:rtype:
+"""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(name, time.perf_counter() - start)
+            yield item
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self._timers.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+
+:return: the statistics of every stage
+:rtype:
+"""
+        return {name: s.summary() for name, s in self.stages.items()}
+
+    def write_tensorboard(
+        self, writer: Any, global_step: int, tag: str = "stages"
+    ) -> None:
+        """
+Adds the moving average, P50 and P95 of every stage as scalars, in seconds
+
+:param writer: a tensorboard SummaryWriter
+:type writer:
+:param global_step:
+:type global_step:
+:param tag:
+:type tag:
+"""
+        for name, statistics in self.stages.items():
+            for key in ("ema", "p50", "p95"):
+                writer.add_scalar(
+                    f"{tag}/{name}/{key}",
+                    getattr(statistics, key),
+                    global_step=global_step,
+                )
+
+    def write_jsonl(
+        self, file: Union[str, Path], step: Optional[int] = None, **extra: Any
+    ) -> None:
+        """
+Appends the summary as a line of json
+
+:param file:
+:type file:
+:param step:
+:type step:
+:param extra: written along
+:type extra:
+"""
+        with open(file, "a") as f:
+            f.write(
+                json.dumps(
+                    dict(step=step, time=time.time(), stages=self.summary(), **extra)
+                )
+                + "\n"
+            )
+
+    def __str__(self) -> str:
+        return "  ".join(
+            f"{name}: {s.ema * 1e3:.2f}ms (p50 {s.p50 * 1e3:.2f} p95 {s.p95 * 1e3:.2f})"
+            for name, s in self.stages.items()
+        )
+
+
+_DEFAULT_STAGE_PROFILER = StageProfiler()
+
+
+def default_stage_profiler() -> StageProfiler:
+    """
+
+:return: the profiler of the process, disabled until enabled
+:rtype:
+"""
+    return _DEFAULT_STAGE_PROFILER
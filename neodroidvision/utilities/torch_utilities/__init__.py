@@ -7,10 +7,15 @@ __doc__ = r"""
 
 from .batch_resampler import *
 from .check_pointer import *
+from .checkpoint_archive import *
 from .custom_model_caching import *
 from .distributing import *
+from .grouped_batch_sampler import *
+from .input_normalisation import *
 from .layers import *
 from .mechanims import *
 from .non_maximum_suppression import *
 from .output_activation import *
+from .shared_memory_collation import *
+from .tensor_serialisation import *
 from .tuple_transforms import *
@@ -1,17 +1,23 @@
-from typing import Iterable, Tuple
+import itertools
+from typing import Callable, Iterable, Iterator, Tuple
 
+import torch
 from torch.utils.data.dataloader import default_collate
 from torch.utils.data.sampler import BatchSampler
 
 from draugr.torch_utilities.tensors.tensor_container import NamedTensorTuple
 
-__all__ = ["LimitedBatchResampler", "BatchCollator"]
+__all__ = ["LimitedBatchResampler", "BatchCollator", "pad_targets"]
 
 
 class LimitedBatchResampler(BatchSampler):
     """
 Wraps a BatchSampler, re-sampling from it until
 a specified number of iterations have been sampled
+
+Resuming from start_iter continues the epoch it falls in, epochs being len(batch_sampler) batches
+long. A BatchSampler over a sampler with load_state_dict, like DistributedSampler, is positioned
+at the batch directly, the batches of other batch samplers are skipped.
 """
 
     def __init__(self, batch_sampler, num_iterations, start_iter=0):
@@ -19,15 +25,33 @@ a specified number of iterations have been sampled
         self.num_iterations = num_iterations
         self.start_iter = start_iter
 
+    def _resumed(self, num_batches: int) -> Iterator:
+        sampler = self.batch_sampler.sampler
+        if type(self.batch_sampler) is BatchSampler and hasattr(
+            sampler, "load_state_dict"
+        ):
+            sampler.load_state_dict(
+                {
+                    **sampler.state_dict(),
+                    "offset": num_batches * self.batch_sampler.batch_size,
+                }
+            )
+            return iter(self.batch_sampler)
+        return itertools.islice(self.batch_sampler, num_batches, None)
+
     def __iter__(self):
-        iteration = self.start_iter
+        iteration, skip = self.start_iter, 0
+        if self.start_iter:
+            skip = self.start_iter % max(len(self.batch_sampler), 1)
         while iteration <= self.num_iterations:
             # if the underlying sampler has a set_epoch method, like
             # DistributedSampler, used for making each process see
             # a different split of the dataset, then set it
             if hasattr(self.batch_sampler.sampler, "set_epoch"):
-                self.batch_sampler.sampler.set_epoch(iteration)
-            for batch in self.batch_sampler:
+                self.batch_sampler.sampler.set_epoch(iteration - skip)
+            batches = self._resumed(skip) if skip else self.batch_sampler
+            skip = 0
+            for batch in batches:
                 iteration += 1
                 if iteration > self.num_iterations:
                     break
@@ -37,16 +61,68 @@ a specified number of iterations have been sampled
         return self.num_iterations
 
 
+def pad_targets(boxes: Iterable, labels: Iterable) -> Tuple:
+    """
+Pads per sample boxes (N_i, 4) and labels (N_i) to (batch_size, max(1, max N_i), ...),
+returning them together with a mask of the valid entries
+"""
+    boxes = [torch.as_tensor(b).reshape(-1, 4) for b in boxes]
+    labels = [torch.as_tensor(l).reshape(-1) for l in labels]
+    max_targets = max([1] + [b.shape[0] for b in boxes])
+
+    padded_boxes = boxes[0].new_zeros((len(boxes), max_targets, 4))
+    padded_labels = labels[0].new_zeros((len(labels), max_targets))
+    mask = torch.zeros((len(boxes), max_targets), dtype=torch.bool)
+    for i, (b, l) in enumerate(zip(boxes, labels)):
+        padded_boxes[i, : b.shape[0]] = b
+        padded_labels[i, : l.shape[0]] = l
+        mask[i, : b.shape[0]] = True
+    return padded_boxes, padded_labels, mask
+
+
 class BatchCollator:
-    def __init__(self, wrap: bool = True):
+    def __init__(
+        self,
+        wrap: bool = True,
+        annotation_transform: Callable = None,
+        padded: bool = False,
+    ):
+        """
+
+:param wrap: collate targets into a NamedTensorTuple
+:param annotation_transform: optional collate-time encoding stage, receives the padded
+boxes, labels and validity mask of the whole batch and returns the encoded boxes and labels,
+e.g. SSDBatchAnnotationTransform
+:param padded: collate targets into padded boxes, labels and their validity mask without
+encoding them, for augmenting whole batches later, e.g. with SSDBatchAugmentation
+"""
         self.wrap = wrap
+        self.annotation_transform = annotation_transform
+        self.padded = padded
 
     def __call__(self, batch: Iterable) -> Tuple:
         transposed_batch = list(zip(*batch))
         images = default_collate(transposed_batch[0])
         img_ids = default_collate(transposed_batch[2])
 
-        if self.wrap:
+        if self.wrap and self.annotation_transform is not None:
+            list_targets = transposed_batch[1]
+            boxes, labels = self.annotation_transform(
+                *pad_targets(
+                    [d["boxes"] for d in list_targets],
+                    [d["labels"] for d in list_targets],
+                )
+            )
+            targets = NamedTensorTuple(boxes=boxes, labels=labels)
+
+        elif self.wrap and self.padded:
+            list_targets = transposed_batch[1]
+            boxes, labels, mask = pad_targets(
+                [d["boxes"] for d in list_targets], [d["labels"] for d in list_targets]
+            )
+            targets = NamedTensorTuple(boxes=boxes, labels=labels, mask=mask)
+
+        elif self.wrap:
             list_targets = transposed_batch[1]
             targets = {
                 key: default_collate([d[key] for d in list_targets])
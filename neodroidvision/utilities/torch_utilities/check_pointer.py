@@ -7,14 +7,23 @@ __doc__ = r"""
            Created on 23/03/2020
            """
 
+import json
 import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional, Sequence
 
 import torch
+from neodroidvision.utilities.torch_utilities.checkpoint_archive import (
+    CheckpointArchive,
+    is_checkpoint_archive,
+    save_checkpoint_archive,
+)
 from neodroidvision.utilities.torch_utilities.custom_model_caching import (
     custom_cache_url,
 )
+from neodroidvision.utilities.torch_utilities.tensor_serialisation import copy_mapping
 from torch.nn import Module
 from torch.nn.parallel import DistributedDataParallel
 from torch.optim import Optimizer
@@ -22,12 +31,53 @@ from torch.optim import Optimizer
 __all__ = ["CheckPointer"]
 
 
+def _snapshot(obj: Any) -> Any:
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return copy_mapping(obj, ((k, _snapshot(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)) and not hasattr(obj, "_fields"):
+        return type(obj)(_snapshot(v) for v in obj)
+    return obj
+
+
+def _select(
+    checkpoint: dict, keys: Optional[Sequence[str]], prefixes: Optional[Sequence[str]]
+) -> dict:
+    if keys is not None:
+        checkpoint = {k: v for k, v in checkpoint.items() if k in keys}
+    if prefixes is not None and "model" in checkpoint:
+        checkpoint["model"] = copy_mapping(
+            checkpoint["model"],
+            (
+                (name, value)
+                for name, value in checkpoint["model"].items()
+                if name.startswith(tuple(prefixes))
+            ),
+        )
+    return checkpoint
+
+
+def _atomic_save(obj: Any, path: Path) -> None:
+    temporary = path.with_name(f".{path.name}.tmp")
+    torch.save(obj, temporary)
+    os.replace(temporary, path)
+
+
 class CheckPointer:
     """
+Saves and loads model, optimizer and scheduler checkpoints. Checkpoints are written to a temporary
+file and moved into place, the last checkpoint tag only ever names complete checkpoints.
 
+In asynchronous mode save only snapshots the state dicts to the cpu, a background thread writes
+them, at most one write is pending, a save waits for the one before. Call wait before exiting.
+
+In archive mode checkpoints are written as checkpoint archives, loading them memory maps the file
+and reads only the selected entries and parameters, see checkpoint_archive. Both formats load.
 """
 
     _last_checkpoint_name = "last_checkpoint.txt"
+    _retention_name = "checkpoints.json"
 
     def __init__(
         self,
@@ -37,6 +87,11 @@ class CheckPointer:
         save_dir: Path = Path.cwd(),
         save_to_disk: bool = None,
         logger: logging.Logger = None,
+        *,
+        asynchronous: bool = False,
+        keep_last: Optional[int] = None,
+        keep_best: int = 0,
+        archive: bool = False,
     ):
         """
 
@@ -52,6 +107,15 @@ class CheckPointer:
 :type save_to_disk:
 :param logger:
 :type logger:
+:param asynchronous: write checkpoints in a background thread
+:type asynchronous:
+:param keep_last: keep only the last keep_last checkpoints saved here, all if None, 0 keeps only the
+one just saved (and the best)
+:type keep_last:
+:param keep_best: and the keep_best of them with the highest scores, see save
+:type keep_best:
+:param archive: write checkpoint archives instead of torch pickles
+:type archive:
 """
         self.model = model
         self.optimizer = optimizer
@@ -61,8 +125,22 @@ class CheckPointer:
         if logger is None:
             logger = logging.getLogger(__name__)
         self.logger = logger
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.archive = archive
+        self._writer = ThreadPoolExecutor(1) if asynchronous else None
+        self._pending: Optional[Future] = None
+
+    def save(self, name, score: float = None, **kwargs):
+        """
 
-    def save(self, name, **kwargs):
+:param name: of the checkpoint file
+:type name:
+:param score: higher is better, for keep_best
+:type score:
+:param kwargs: saved along
+:type kwargs:
+"""
         if not self.save_dir:
             return
 
@@ -82,11 +160,81 @@ class CheckPointer:
 
         save_file = self.save_dir / f"{name}.pth"
         self.logger.info(f"Saving checkpoint to {save_file}")
-        torch.save(data, save_file)
+        if self._writer is None:
+            self._write(data, save_file, score)
+            return
+
+        data = _snapshot(data)  # training goes on modifying the parameters in place
+        self.wait()
+        self._pending = self._writer.submit(self._write, data, save_file, score)
 
+    def wait(self) -> None:
+        """
+Waits for the pending asynchronous write, raising its error if it failed
+"""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def _write(self, data: dict, save_file: Path, score: Optional[float]) -> None:
+        if self.archive:
+            save_checkpoint_archive(data, save_file)
+        else:
+            _atomic_save(data, save_file)
         self.tag_last_checkpoint(save_file)
+        if self.keep_last is not None or self.keep_best:
+            self._retain(save_file, score)
+
+    def _retain(self, save_file: Path, score: Optional[float]) -> None:
+        retention_file = self.save_dir / self._retention_name
+        history = []
+        if retention_file.exists():
+            history = json.loads(retention_file.read_text())
+        history = [h for h in history if h["file"] != save_file.name]
+        history.append({"file": save_file.name, "score": score})
+
+        keep = {save_file.name}
+        if self.keep_last is not None:
+            keep.update(h["file"] for h in history[len(history) - self.keep_last :])
+        else:
+            keep.update(h["file"] for h in history)
+        scored = [h for h in history if h["score"] is not None]
+        scored.sort(key=lambda h: h["score"], reverse=True)
+        keep.update(h["file"] for h in scored[: self.keep_best])
+
+        for h in history:
+            if h["file"] not in keep:
+                try:
+                    (self.save_dir / h["file"]).unlink()
+                except FileNotFoundError:
+                    pass
+        temporary = retention_file.with_name(f".{retention_file.name}.tmp")
+        temporary.write_text(json.dumps([h for h in history if h["file"] in keep]))
+        os.replace(temporary, retention_file)
 
-    def load(self, f: Path = None, use_latest=True):
+    def load(
+        self,
+        f: Path = None,
+        use_latest=True,
+        *,
+        keys: Optional[Sequence[str]] = None,
+        prefixes: Optional[Sequence[str]] = None,
+    ):
+        """
+Restores the model, and the optimizer and scheduler if given and saved
+
+:param f: checkpoint file or url
+:type f:
+:param use_latest: load the last checkpoint tagged in save_dir instead, if any
+:type use_latest:
+:param keys: top level entries to load, e.g. ("model",) for inference, all if None
+:type keys:
+:param prefixes: load only the model parameters and buffers whose names start with one of these,
+non strictly, all if None
+:type prefixes:
+:return: any further checkpoint data
+:rtype:
+"""
         if f is None:
             return {}
 
@@ -101,12 +249,13 @@ class CheckPointer:
             return {}
 
         self.logger.info(f"Loading checkpoint from {f}")
-        checkpoint = self._load_file(f)
+        checkpoint = self._load_file(f, keys, prefixes)
         model = self.model
         if isinstance(model, DistributedDataParallel):
             model = self.model.module
 
-        model.load_state_dict(checkpoint.pop("model"))
+        if "model" in checkpoint:
+            model.load_state_dict(checkpoint.pop("model"), strict=prefixes is None)
         if "optimizer" in checkpoint and self.optimizer:
             self.logger.info(f"Loading optimizer from {f}")
             self.optimizer.load_state_dict(checkpoint.pop("optimizer"))
@@ -128,13 +277,29 @@ class CheckPointer:
         return last_saved
 
     def tag_last_checkpoint(self, last_filename) -> None:
-        with open(str(self.save_dir / self._last_checkpoint_name), "w") as f:
-            f.write(last_filename)
+        tag_file = self.save_dir / self._last_checkpoint_name
+        temporary = tag_file.with_name(f".{tag_file.name}.tmp")
+        with open(str(temporary), "w") as f:
+            f.write(str(last_filename))
+        os.replace(temporary, tag_file)
 
-    def _load_file(self, f: str) -> Any:
+    def _load_file(
+        self,
+        f: str,
+        keys: Optional[Sequence[str]] = None,
+        prefixes: Optional[Sequence[str]] = None,
+    ) -> Any:
         # download url files
         if f.startswith("http"):
             # if the file is a url path, download it and cache it
             f = custom_cache_url(f)
             self.logger.info(f"url {f} cached in {f}")
-        return torch.load(f, map_location=torch.device("cpu"))
+        if is_checkpoint_archive(f):
+            archive = CheckpointArchive(f)
+            if keys is None:
+                keys = archive.keys()
+            checkpoint = archive.load([k for k in keys if k != "model"])
+            if "model" in keys:
+                checkpoint.update(archive.load(("model",), prefixes))
+            return checkpoint
+        return _select(torch.load(f, map_location=torch.device("cpu")), keys, prefixes)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           A checkpoint layout whose tensors can be memory mapped, and loaded selectively.
+
+           The file is MAGIC, the length of the header and the header, a pickle of the top level
+           entries (model, optimizer, ...) with their tensors and numeric arrays replaced by
+           placeholders recording offset, dtype and shape, followed by the raw bytes of those
+           tensors. Loading reads only the header, tensors are views of a copy on write memory
+           map of the file, so restoring a state dict copies each tensor into its target page by
+           page, the tensors of unselected entries or parameters are never read.
+           """
+
+import os
+import pickle
+import struct
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Union
+
+import numpy
+import torch
+
+from .tensor_serialisation import (
+    LEAF_ALIGNMENT,
+    copy_mapping,
+    restore_tensors,
+    strip_tensors,
+)
+
+__all__ = ["save_checkpoint_archive", "CheckpointArchive", "is_checkpoint_archive"]
+
+MAGIC = b"NVCKPT\x00\x01"
+HEADER_LENGTH = struct.Struct("<Q")
+DATA_ALIGNMENT = 64
+
+
+def is_checkpoint_archive(path: Union[str, Path]) -> bool:
+    """
+
+:param path:
+:type path:
+:return: whether path is written by save_checkpoint_archive
+:rtype:
+"""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def save_checkpoint_archive(data: Dict[str, Any], path: Union[str, Path]) -> None:
+    """
+Writes data (e.g. model, optimizer and scheduler state dicts) to a temporary file moved to path
+
+:param data: top level entries, loadable one by one
+:type data:
+:param path:
+:type path:
+"""
+    path = Path(path)
+    leaves, offset = [], [0]
+    entries = {key: strip_tensors(value, leaves, offset) for key, value in data.items()}
+    header = pickle.dumps({"entries": entries}, pickle.HIGHEST_PROTOCOL)
+    header_end = len(MAGIC) + HEADER_LENGTH.size + len(header)
+    data_start = -(-header_end // DATA_ALIGNMENT) * DATA_ALIGNMENT
+
+    temporary = path.with_name(f".{path.name}.tmp")
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        f.write(bytes(data_start - header_end))
+        for leaf in leaves:
+            leaf = leaf.detach().cpu().contiguous()
+            num_bytes = leaf.numel() * leaf.element_size()
+            if num_bytes:
+                f.write(leaf.view(-1).view(torch.uint8).numpy())
+            f.write(bytes(-num_bytes % LEAF_ALIGNMENT))
+    os.replace(temporary, path)
+
+
+class CheckpointArchive:
+    """
+Reads a checkpoint written by save_checkpoint_archive
+"""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+Reads only the header
+
+:param path:
+:type path:
+"""
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a checkpoint archive")
+            (header_length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+            self._entries = pickle.loads(f.read(header_length))["entries"]
+        header_end = len(MAGIC) + HEADER_LENGTH.size + header_length
+        self._data_start = -(-header_end // DATA_ALIGNMENT) * DATA_ALIGNMENT
+        self._payload = None
+
+    def keys(self) -> Sequence[str]:
+        """
+
+:return: the top level entries
+:rtype:
+"""
+        return list(self._entries)
+
+    def _mapped(self) -> torch.Tensor:
+        if self._payload is None:
+            if os.path.getsize(self.path) > self._data_start:
+                self._payload = torch.from_numpy(
+                    numpy.memmap(
+                        self.path, numpy.uint8, mode="c", offset=self._data_start
+                    )
+                )  # copy on write, the tensors are writable without touching the file
+            else:
+                self._payload = torch.empty((0,), dtype=torch.uint8)
+        return self._payload
+
+    def load(
+        self,
+        keys: Optional[Sequence[str]] = None,
+        prefixes: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+
+:param keys: top level entries to load, all if None
+:type keys:
+:param prefixes: of the names in dict entries (state dicts) to load, all if None
+:type prefixes:
+:return: the entries, their tensors backed by the memory map of the file
+:rtype:
+"""
+        loaded = {}
+        for key, skeleton in self._entries.items():
+            if keys is not None and key not in keys:
+                continue
+            if prefixes is not None and isinstance(skeleton, dict):
+                skeleton = copy_mapping(
+                    skeleton,
+                    (
+                        (name, value)
+                        for name, value in skeleton.items()
+                        if isinstance(name, str) and name.startswith(tuple(prefixes))
+                    ),
+                )
+            loaded[key] = restore_tensors(skeleton, self._mapped())
+        return loaded
@@ -11,3 +11,4 @@ from .distributed import *
 from .distributing_utilities import *
 from .metrics import *
 from .serialisation import *
+from .tensor_gathering import *
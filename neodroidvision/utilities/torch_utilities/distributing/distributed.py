@@ -1,13 +1,69 @@
 # Copyright (c) Facebook, Inc. and its affiliates. All Rights Reserved.
-# Code is copy-pasted exactly as in torch.utils.data.distributed.
-# FIXME remove this once c10d fixes the bug it has
+# Resumable DistributedSampler over lazily evaluated Feistel permutations, in O(1) memory per rank.
 import math
+from typing import Iterator
 
-import torch
+import numpy
 import torch.distributed as dist
 from torch.utils.data.sampler import Sampler
 
-__all__ = ["DistributedSampler"]
+__all__ = ["DistributedSampler", "FeistelPermutation"]
+
+
+class FeistelPermutation:
+    """
+A pseudo random permutation of range(n) evaluated per position, in O(1) memory. A balanced Feistel
+network keyed by (seed, epoch) permutes the smallest even-bit domain holding n, positions mapped
+beyond n are walked along their cycle back into range(n).
+"""
+
+    num_rounds = 4
+
+    def __init__(self, n: int, seed: int = 0, epoch: int = 0):
+        """
+
+:param n:
+:type n:
+:param seed:
+:type seed:
+:param epoch:
+:type epoch:
+"""
+        self.n = n
+        half_bits = max(1, math.ceil(math.log2(max(n, 2)) / 2))
+        self.half_bits = numpy.uint64(half_bits)
+        self.half_mask = numpy.uint64((1 << half_bits) - 1)
+        self.keys = numpy.random.SeedSequence([seed, epoch]).generate_state(
+            self.num_rounds, numpy.uint64
+        )
+
+    def _round(self, right: numpy.ndarray, key: numpy.uint64) -> numpy.ndarray:
+        h = (right + key) * numpy.uint64(0x9E3779B97F4A7C15)  # wraps modulo 2 ** 64
+        h ^= h >> numpy.uint64(29)
+        h *= numpy.uint64(0xBF58476D1CE4E5B9)
+        h ^= h >> numpy.uint64(32)
+        return h & self.half_mask
+
+    def _network(self, x: numpy.ndarray) -> numpy.ndarray:
+        left, right = x >> self.half_bits, x & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ self._round(right, key)
+        return (left << self.half_bits) | right
+
+    def __call__(self, positions: numpy.ndarray) -> numpy.ndarray:
+        """
+
+:param positions: in range(n)
+:type positions:
+:return: the permuted indices, int64
+:rtype:
+"""
+        x = self._network(numpy.asarray(positions, numpy.uint64))
+        outside = x >= self.n
+        while outside.any():  # at most 4n domain, a few walks
+            x[outside] = self._network(x[outside])
+            outside = x >= self.n
+        return x.astype(numpy.int64)
 
 
 # from torchvision.datasets.samplers import DistributedSampler
@@ -24,15 +80,28 @@ dataset: Dataset used for sampling.
 num_replicas (optional): Number of processes participating in
   distributed training.
 rank (optional): Rank of the current process within num_replicas.
+
+The rank's slice of the epoch's permutation is generated lazily in chunks by a FeistelPermutation,
+no list of the dataset indices is built, and iteration can be resumed mid epoch from a state_dict.
+An iteration starts from the offset when it is created and resets it, so an abandoned iteration is
+not continued by the next one, the position of the current iteration is kept in position.
+
+position counts the samples handed out, not the samples trained on. A DataLoader prefetches
+batches ahead of the training loop (more with several workers), so a state_dict taken during
+training is ahead of it and resuming from it skips the unconsumed batches. Checkpoint the offset
+from the batches consumed instead, as LimitedBatchResampler does with start_iter * batch_size.
 """
 
-    def __init__(self, dataset, num_replicas=None, rank=None, shuffle=True):
+    chunk_size = 4096
+
+    def __init__(self, dataset, num_replicas=None, rank=None, shuffle=True, seed=0):
         """
 
     :param dataset:
     :param num_replicas:
     :param rank:
     :param shuffle:
+    :param seed: of the permutations, together with the epoch
     """
         if num_replicas is None:
             if not dist.is_available():
@@ -46,32 +115,86 @@ rank (optional): Rank of the current process within num_replicas.
         self.num_replicas = num_replicas
         self.rank = rank
         self.epoch = 0
+        self.offset = 0
+        self.position = 0
         self.num_samples = int(math.ceil(len(self.dataset) * 1.0 / self.num_replicas))
         self.total_size = self.num_samples * self.num_replicas
         self.shuffle = shuffle
+        self.seed = seed
 
-    def __iter__(self):
-        if self.shuffle:
-            # deterministically shuffle based on epoch
-            g = torch.Generator()
-            g.manual_seed(self.epoch)
-            indices = torch.randperm(len(self.dataset), generator=g).tolist()
-        else:
-            indices = torch.arange(len(self.dataset)).tolist()
+    def __iter__(self) -> Iterator[int]:
+        offset, self.offset = self.offset, 0
+        self.position = offset
+        return self._iterate(
+            offset, FeistelPermutation(len(self.dataset), self.seed, self.epoch)
+        )
 
-        # add extra samples to make it evenly divisible
-        indices += indices[: (self.total_size - len(indices))]
-        assert len(indices) == self.total_size
+    def _iterate(self, offset: int, permutation: FeistelPermutation) -> Iterator[int]:
+        n = len(self.dataset)
 
-        # subsample
-        offset = self.num_samples * self.rank
-        indices = indices[offset : offset + self.num_samples]
-        assert len(indices) == self.num_samples
-
-        return iter(indices)
+        # the rank's contiguous slice of the permutation, extra samples wrapping around to its
+        # start make it evenly divisible
+        start = self.num_samples * self.rank
+        while offset < self.num_samples:
+            stop = min(offset + self.chunk_size, self.num_samples)
+            positions = numpy.arange(start + offset, start + stop) % n
+            indices = permutation(positions) if self.shuffle else positions
+            for index in indices.tolist():
+                offset += 1
+                self.position = offset
+                yield index
+        self.position = 0
 
     def __len__(self):
         return self.num_samples
 
+    def epoch_indices(self) -> numpy.ndarray:
+        """
+All indices of the rank's slice of the current epoch, in order, without iterating the sampler
+
+:return:
+:rtype:
+"""
+        n = len(self.dataset)
+        start = self.num_samples * self.rank
+        positions = numpy.arange(start, start + self.num_samples) % n
+        if self.shuffle:
+            return FeistelPermutation(n, self.seed, self.epoch)(positions)
+        return positions
+
     def set_epoch(self, epoch):
+        """
+Starts the epoch from its beginning
+
+:param epoch:
+"""
         self.epoch = epoch
+        self.offset = self.position = 0
+
+    def state_dict(self) -> dict:
+        """
+
+Exact only when the sampler is iterated directly, behind a DataLoader the offset includes the
+prefetched batches, override it with the consumed ones before saving
+
+:return: seed, epoch and the offset of the next sample in the rank's slice of it, of the current
+iteration unless a resumed one has not started yet
+:rtype:
+"""
+        return {
+            "seed": self.seed,
+            "epoch": self.epoch,
+            "offset": self.offset or self.position,
+        }
+
+    def load_state_dict(self, state_dict: dict) -> None:
+        """
+The next iteration continues from the offset of the state
+
+:param state_dict:
+:type state_dict:
+"""
+        self.seed = state_dict["seed"]
+        self.epoch = state_dict["epoch"]
+        self.offset = state_dict["offset"]
+        self.position = 0
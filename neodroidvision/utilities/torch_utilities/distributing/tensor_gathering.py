@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           All-gather of nested data on any backend, tensors and numeric arrays are sent as raw
+           bytes instead of being pickled.
+
+           The tensor and numeric array leaves of every rank's data (in dicts, lists, tuples,
+           named tuples and object arrays) are replaced by placeholders recording their offset,
+           dtype and shape. The rest, the skeleton, is pickled. A rank's payload is the leaf bytes
+           followed by the pickled skeleton, gathered in chunks of bounded size after an
+           all-gather of the payload sizes. The local payload is not assembled, every chunk is
+           copied from the leaves into one chunk sized buffer on the transport device, so no
+           second copy of the data is held on the host or the gpu. The gathered leaves are views
+           of the received bytes.
+           """
+
+import bisect
+import pickle
+from typing import Any, List, Optional, Sequence, Tuple
+
+import torch
+from torch import distributed
+
+from ..tensor_serialisation import LEAF_ALIGNMENT, restore_tensors, strip_tensors
+from .distributing_utilities import global_world_size
+
+__all__ = ["all_gather_data", "pack_data", "unpack_data"]
+
+DEFAULT_CHUNK_BYTES = 64 * 2 ** 20
+
+
+def _payload_segments(data: Any) -> Tuple[List[Tuple[int, torch.Tensor]], int, int]:
+    """
+The uint8 views of the tensor and numeric array leaves of data and of its pickled skeleton, with
+their offsets in the payload, the leaves are not copied unless not contiguous
+
+:return: (offset, bytes) in increasing offset, payload size, offset of the skeleton
+"""
+    leaves, offset = [], [0]
+    skeleton = pickle.dumps(
+        strip_tensors(data, leaves, offset), pickle.HIGHEST_PROTOCOL
+    )
+    skeleton_offset = offset[0]
+    segments, position = [], 0
+    for leaf in leaves:
+        num_bytes = leaf.numel() * leaf.element_size()
+        if num_bytes:
+            segments.append(
+                (position, leaf.contiguous().view(-1).view(torch.uint8))
+            )
+        position += -(-num_bytes // LEAF_ALIGNMENT) * LEAF_ALIGNMENT
+    segments.append(
+        (skeleton_offset, torch.frombuffer(bytearray(skeleton), dtype=torch.uint8))
+    )
+    return segments, skeleton_offset + len(skeleton), skeleton_offset
+
+
+def _fill_payload(
+    segments: Sequence[Tuple[int, torch.Tensor]],
+    offsets: Sequence[int],
+    out: torch.Tensor,
+    start: int,
+) -> None:
+    """
+Copies the bytes [start, start + out.numel()) of the payload into out, zeros between and after
+the segments, offsets are those of the segments
+"""
+    end = start + out.numel()
+    out.zero_()
+    first = max(bisect.bisect_right(offsets, start) - 1, 0)
+    for position, segment in segments[first:]:
+        if position >= end:
+            break
+        low, high = max(position, start), min(position + segment.numel(), end)
+        if low < high:
+            out[low - start : high - start].copy_(
+                segment[low - position : high - position]
+            )
+
+
+def pack_data(
+    data: Any, device: torch.device = torch.device("cpu")
+) -> Tuple[torch.Tensor, int]:
+    """
+Packs data into a uint8 payload of its tensor and numeric array leaves followed by its pickled
+skeleton
+
+:param data:
+:type data:
+:param device: of the payload
+:type device:
+:return: payload, offset of the skeleton in it
+:rtype:
+"""
+    segments, size, skeleton_offset = _payload_segments(data)
+    payload = torch.empty((size,), dtype=torch.uint8, device=device)
+    _fill_payload(segments, [o for o, _ in segments], payload, 0)
+    return payload, skeleton_offset
+
+
+def unpack_data(payload: torch.Tensor, skeleton_offset: int) -> Any:
+    """
+Inverse of pack_data, the tensor leaves are views of payload
+
+:param payload:
+:type payload:
+:param skeleton_offset:
+:type skeleton_offset:
+:return:
+:rtype:
+"""
+    skeleton = pickle.loads(payload[skeleton_offset:].cpu().numpy().tobytes())
+    return restore_tensors(skeleton, payload)
+
+
+def _chunked_all_gather(
+    segments: Sequence[Tuple[int, torch.Tensor]],
+    sizes: Sequence[int],
+    received: List[torch.Tensor],
+    chunk_bytes: int,
+    group: Optional[Any],
+    device: torch.device,
+) -> None:
+    """
+Gathers the payloads chunk by chunk, each chunk of the local payload is assembled from its
+segments into a single chunk_bytes buffer on the transport device
+"""
+    offsets = [o for o, _ in segments]
+    chunk_buffer = torch.empty(
+        (min(chunk_bytes, max(sizes)),), dtype=torch.uint8, device=device
+    )
+    for start in range(0, max(sizes), chunk_bytes):
+        length = min(chunk_bytes, max(sizes) - start)
+        outputs, scratch = [], []
+        for size, out in zip(sizes, received):
+            if size >= start + length and out.device == device:
+                outputs.append(out[start : start + length])  # received in place
+            else:
+                outputs.append(torch.empty((length,), dtype=torch.uint8, device=device))
+                scratch.append((len(outputs) - 1, size))
+        chunk = chunk_buffer[:length]
+        _fill_payload(segments, offsets, chunk, start)
+        distributed.all_gather(outputs, chunk, group=group)
+        for rank, size in scratch:
+            valid = min(max(size - start, 0), length)
+            received[rank][start : start + valid].copy_(outputs[rank][:valid])
+
+
+def all_gather_data(
+    data: Any,
+    *,
+    group: Optional[Any] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    device: Optional[torch.device] = None,
+) -> List[Any]:
+    """
+All-gather of arbitrary picklable data from every rank, with tensors and numeric numpy arrays sent
+as raw bytes, see the module doc. Works with gloo (on the cpu) and nccl (through the current cuda
+device), bytes move in chunks of chunk_bytes per rank, bounding the memory of the collective
+beyond the gathered result.
+
+:param data:
+:type data:
+:param group: process group, the default group if None
+:type group:
+:param chunk_bytes:
+:type chunk_bytes:
+:param device: of the gathered tensors, the cpu by default
+:type device:
+:return: the data of every rank, in rank order
+:rtype:
+"""
+    world_size = (
+        global_world_size()
+        if group is None
+        else distributed.get_world_size(group=group)
+    )
+    if world_size == 1:
+        return [data]
+
+    if distributed.get_backend(group) == "nccl":
+        transport = torch.device("cuda", torch.cuda.current_device())
+    else:
+        transport = torch.device("cpu")
+    if device is None:
+        device = torch.device("cpu")
+
+    # the local payload is never assembled whole, chunks are copied from the leaves
+    segments, size, skeleton_offset = _payload_segments(data)
+    header = torch.tensor([size, skeleton_offset], dtype=torch.int64, device=transport)
+    headers = [torch.empty_like(header) for _ in range(world_size)]
+    distributed.all_gather(headers, header, group=group)
+    headers = [h.tolist() for h in headers]
+
+    received = [
+        torch.empty((size,), dtype=torch.uint8, device=device) for size, _ in headers
+    ]
+    _chunked_all_gather(
+        segments, [size for size, _ in headers], received, chunk_bytes, group, transport
+    )
+    return [
+        unpack_data(buffer, skeleton_offset)
+        for buffer, (_, skeleton_offset) in zip(received, headers)
+    ]
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Batches of images with similar aspect ratios, for detectors batching variable size
+           images padded to the largest height and width of the batch (e.g. Mask R-CNN), where a
+           batch mixing portrait and landscape images is mostly padding.
+           """
+
+from typing import Iterator, List, Sequence
+
+import numpy
+from torch.utils.data import ConcatDataset, Subset
+from torch.utils.data.sampler import BatchSampler, Sampler
+
+__all__ = [
+    "GroupedBatchSampler",
+    "image_sizes",
+    "aspect_ratio_group_ids",
+    "batch_padding_ratio",
+]
+
+
+def image_sizes(dataset) -> numpy.ndarray:
+    """
+Height and width of every image of the dataset from its get_img_info, the annotations (or their
+caches), without decoding images. Subset and ConcatDataset are looked through.
+
+:param dataset: a dataset with get_img_info(index) returning (height, width) or a dict with height
+and width
+:type dataset:
+:return: (N, 2) int64 heights and widths
+:rtype:
+"""
+    if isinstance(dataset, Subset):
+        return image_sizes(dataset.dataset)[numpy.asarray(dataset.indices, numpy.int64)]
+    if isinstance(dataset, ConcatDataset):
+        return numpy.concatenate([image_sizes(d) for d in dataset.datasets])
+    if not hasattr(dataset, "get_img_info"):
+        raise TypeError(f"{type(dataset).__name__} has no get_img_info to group by")
+
+    sizes = numpy.empty((len(dataset), 2), numpy.int64)
+    for i in range(len(dataset)):
+        info = dataset.get_img_info(i)
+        if isinstance(info, dict):
+            info = info["height"], info["width"]
+        sizes[i] = info
+    return sizes
+
+
+def aspect_ratio_group_ids(
+    sizes: numpy.ndarray, bins: Sequence[float] = (1.0,)
+) -> numpy.ndarray:
+    """
+Quantises width / height aspect ratios into groups
+
+:param sizes: (N, 2) heights and widths, e.g. image_sizes(dataset)
+:type sizes:
+:param bins: ascending group boundaries, the default groups portrait (and square) apart from
+landscape images, 2 ** numpy.linspace(-1, 1, 2 * k + 1) gives 2 * k + 2 finer groups
+:type bins:
+:return: (N,) group id of every image, in [0, len(bins)]
+:rtype:
+"""
+    sizes = numpy.asarray(sizes)
+    aspect_ratios = sizes[:, 1] / numpy.maximum(sizes[:, 0], 1)
+    return numpy.searchsorted(numpy.sort(bins), aspect_ratios, side="right")
+
+
+def batch_padding_ratio(sizes: numpy.ndarray) -> float:
+    """
+Fraction of a batch that is padding when its images, rescaled to a common shorter side as detection
+transforms do (e.g. GeneralizedRCNNTransform), are padded to the largest height and width
+
+:param sizes: (B, 2) heights and widths
+:type sizes:
+:return:
+:rtype:
+"""
+    sizes = numpy.asarray(sizes, numpy.float64)
+    sizes = sizes / sizes.min(axis=1, keepdims=True)
+    padded_area = sizes[:, 0].max() * sizes[:, 1].max() * len(sizes)
+    return float(1 - numpy.prod(sizes, axis=1).sum() / padded_area)
+
+
+class GroupedBatchSampler(BatchSampler):
+    """
+Wraps a sampler, e.g. RandomSampler or DistributedSampler, yielding batches of indices of a single
+group each. Indices are buffered per group in the order the sampler gives them, a batch is yielded
+when a group buffer fills up, the partial buffers at the end unless drop_uneven.
+
+Batches are formed per process, with DistributedSampler the number of batches may differ between
+ranks by up to the number of groups, iterate a fixed number of iterations with LimitedBatchResampler
+
+The length is counted from group_ids without iterating the sampler (which would draw a permutation
+of the global RNG for RandomSampler), exact for samplers of the whole dataset. For samplers of a
+subset, like DistributedSampler, it is counted once at construction, for the epoch of the sampler
+then, the batches of other epochs may differ by up to the number of groups.
+"""
+
+    def __init__(
+        self,
+        sampler: Sampler,
+        group_ids: Sequence[int],
+        batch_size: int,
+        drop_uneven: bool = False,
+        sizes: numpy.ndarray = None,
+    ):
+        """
+
+:param sampler: base sampler, its set_epoch is reached by LimitedBatchResampler as usual
+:type sampler:
+:param group_ids: of every index of the dataset, e.g. aspect_ratio_group_ids(sizes)
+:type group_ids:
+:param batch_size:
+:type batch_size:
+:param drop_uneven: drop the batches smaller than batch_size at the end
+:type drop_uneven:
+:param sizes: (N, 2) heights and widths of the images, e.g. image_sizes(dataset), for measuring
+the padding ratio of the yielded batches
+:type sizes:
+"""
+        if not isinstance(sampler, Sampler):
+            raise ValueError(
+                f"sampler should be an instance of torch.utils.data.Sampler, but got sampler={sampler}"
+            )
+        self.sampler = sampler
+        self.group_ids = numpy.asarray(group_ids, numpy.int64)
+        self.groups = numpy.unique(self.group_ids).tolist()
+        self.batch_size = batch_size
+        self.drop_last = self.drop_uneven = drop_uneven
+        self.sizes = sizes
+        self._padding, self._num_batches = 0.0, 0
+        self._length = self._count_batches()
+
+    def __iter__(self) -> Iterator[List[int]]:
+        self._padding, self._num_batches = 0.0, 0
+        buffers = {group: [] for group in self.groups}
+        for index in self.sampler:
+            buffer = buffers[self.group_ids[index]]
+            buffer.append(index)
+            if len(buffer) == self.batch_size:
+                yield self._measured(buffer[:])
+                buffer.clear()
+
+        if not self.drop_uneven:
+            for buffer in buffers.values():
+                if buffer:
+                    yield self._measured(buffer)
+
+    def _measured(self, batch: List[int]) -> List[int]:
+        if self.sizes is not None:
+            self._padding += batch_padding_ratio(self.sizes[batch])
+            self._num_batches += 1
+        return batch
+
+    def _count_batches(self) -> int:
+        if len(self.sampler) == len(self.group_ids):  # e.g. RandomSampler
+            counts = numpy.bincount(self.group_ids)
+        elif hasattr(self.sampler, "epoch_indices"):  # does not move a resumed offset
+            counts = numpy.bincount(self.group_ids[self.sampler.epoch_indices()])
+        else:
+            counts = numpy.bincount(
+                self.group_ids[numpy.fromiter(iter(self.sampler), numpy.int64)]
+            )
+        if self.drop_uneven:
+            return int((counts // self.batch_size).sum())
+        return int((-(-counts // self.batch_size)).sum())
+
+    def __len__(self) -> int:
+        return self._length
+
+    def padding_ratio(self) -> float:
+        """
+Mean fraction of padding of the batches yielded so far by the current (or last) iteration, e.g. of
+an epoch, see batch_padding_ratio, requires sizes
+
+:return:
+:rtype:
+"""
+        assert self.sizes is not None, "pass sizes to measure the padding ratio"
+        return self._padding / max(self._num_batches, 1)
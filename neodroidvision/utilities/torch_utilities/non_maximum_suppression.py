@@ -1,14 +1,37 @@
-import sys
 import warnings
+from typing import Callable, Dict, List, Optional, Tuple
 
 import torch
 import torchvision
 
-__all__ = ["non_maximum_suppression", "batched_non_maximum_suppression"]
+from neodroidvision.utilities.stage_profiling import default_stage_profiler
 
-__doc__ = """This file is merily a wrapper to provide a custom implementation of NMS"""
+__all__ = [
+    "non_maximum_suppression",
+    "batched_non_maximum_suppression",
+    "register_nms_backend",
+    "get_nms_backend",
+    "available_nms_backends",
+    "box_iou_matrix",
+    "tensor_batched_nms",
+    "fast_batched_nms",
+    "matrix_nms_decay",
+    "matrix_batched_nms",
+]
 
-if torchvision.__version__ >= "0.3.0":
+__doc__ = """This file is merily a wrapper to provide a custom implementation of NMS
+
+Batched NMS strategies are registered as named backends, all with the signature
+(boxes, scores, idxs, iou_threshold) -> keep, see batched_non_maximum_suppression.
+
+* torchvision: torchvision.ops.nms with the coordinate offset trick, exact
+* tensor: pure torch exact (greedy) NMS, runs anywhere including TorchScript
+* fast: Fast NMS, may suppress slightly more than exact NMS
+* matrix: Matrix NMS, soft score decay computed in parallel
+"""
+
+nms_support = None
+if hasattr(torchvision, "ops") and hasattr(torchvision.ops, "nms"):
     nms_support = torchvision.ops.nms
 else:
     try:
@@ -18,10 +41,72 @@ else:
         nms_support = ssd_torch_extension.nms  # non_maximum_suppression
     except ImportError:
         warnings.warn(
-            "No NMS is available. Please upgrade torchvision to 0.3.0+ or compile c++ NMS "
-            "using `cd ext & python build.py build_ext develop`"
+            "No compiled NMS is available, falling back to the pure torch 'tensor' backend. "
+            "Upgrade torchvision to 0.3.0+ or compile c++ NMS "
+            "using `cd ext & python build.py build_ext develop` for the 'torchvision' backend"
+        )
+
+NMS_BACKENDS: Dict[str, Callable] = {}
+
+
+def register_nms_backend(name: str) -> Callable:
+    """
+Decorator registering a batched NMS implementation under name
+
+:param name:
+:type name:
+:return:
+:rtype:
+"""
+
+    def decorator(f: Callable) -> Callable:
+        NMS_BACKENDS[name] = f
+        return f
+
+    return decorator
+
+
+def available_nms_backends() -> List[str]:
+    """
+
+:return:
+:rtype:
+"""
+    return list(NMS_BACKENDS.keys())
+
+
+def get_nms_backend(name: Optional[str] = None) -> Callable:
+    """
+
+:param name: a registered backend, None selects torchvision when available, otherwise tensor
+:type name:
+:return:
+:rtype:
+"""
+    if name is None:
+        name = "torchvision" if "torchvision" in NMS_BACKENDS else "tensor"
+    if name not in NMS_BACKENDS:
+        raise ValueError(
+            f"Unknown NMS backend {name}, available are {available_nms_backends()}"
         )
-        sys.exit(-1)
+    return NMS_BACKENDS[name]
+
+
+def box_iou_matrix(boxes1: torch.Tensor, boxes2: torch.Tensor) -> torch.Tensor:
+    """
+Pairwise intersection over union of (x1, y1, x2, y2) boxes
+
+:param boxes1: (N, 4)
+:param boxes2: (M, 4)
+:return: (N, M)
+"""
+    area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+    area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+    left_top = torch.max(boxes1[:, None, :2], boxes2[None, :, :2])
+    right_bottom = torch.min(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    wh = (right_bottom - left_top).clamp(min=0)
+    intersection = wh[..., 0] * wh[..., 1]
+    return intersection / (area1[:, None] + area2[None, :] - intersection)
 
 
 def non_maximum_suppression(boxes, scores, iou_threshold: float) -> torch.Tensor:
@@ -34,6 +119,10 @@ nms_thresh(float): thresh
 Returns:
 indices kept.
 """
+    if nms_support is None:
+        return tensor_batched_nms(
+            boxes, scores, torch.zeros_like(scores, dtype=torch.long), iou_threshold
+        )
     return nms_support(boxes, scores, iou_threshold)
 
 
@@ -64,10 +153,135 @@ def my_batched_nms(boxes, scores, idxs, iou_threshold) -> torch.Tensor:
     return keep
 
 
-batched_support = my_batched_nms
+if nms_support is not None:
+    register_nms_backend("torchvision")(my_batched_nms)
+
+
+def _sorted_overlaps(
+    boxes: torch.Tensor, scores: torch.Tensor, idxs: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+Candidates in decreasing score order and the strictly upper triangular iou matrix between them,
+one matrix over all categories that is zeroed across categories, so block diagonal by category.
+Masking rather than the coordinate offset of my_batched_nms keeps the ious exact, offset
+coordinates lose float32 precision.
+"""
+    order = torch.argsort(scores, descending=True)
+    sorted_boxes = boxes[order]
+    sorted_idxs = idxs[order]
+    iou = box_iou_matrix(sorted_boxes, sorted_boxes)
+    same_category = sorted_idxs[:, None] == sorted_idxs[None, :]
+    return order, (iou * same_category).triu(1)
+
+
+@register_nms_backend("tensor")
+def tensor_batched_nms(
+    boxes: torch.Tensor, scores: torch.Tensor, idxs: torch.Tensor, iou_threshold: float
+) -> torch.Tensor:
+    """
+Exact (greedy) batched NMS in pure torch, TorchScript compatible.
+
+A box is kept iff no kept box of the same category with a higher score overlaps it more
+than iou_threshold. That recurrence is solved with whole matrix updates, the first k boxes
+are final after k updates, so it converges in as many steps as the longest suppression chain
+rather than one step per box.
+
+Returns:
+keep (Tensor): int64 indices of the kept elements, sorted in decreasing order of scores
+"""
+    if boxes.numel() == 0:
+        return torch.empty((0,), dtype=torch.int64, device=boxes.device)
+    order, iou = _sorted_overlaps(boxes, scores, idxs)
+    overlaps = iou > iou_threshold
+    kept = torch.ones(order.shape[0], dtype=torch.bool, device=boxes.device)
+    while True:
+        suppressed = (overlaps & kept[:, None]).any(0)
+        if torch.equal(~suppressed, kept):
+            break
+        kept = ~suppressed
+    return order[kept]
+
+
+@register_nms_backend("fast")
+def fast_batched_nms(
+    boxes: torch.Tensor, scores: torch.Tensor, idxs: torch.Tensor, iou_threshold: float
+) -> torch.Tensor:
+    """
+Fast NMS (YOLACT), a box is discarded if any higher scoring box of the same category overlaps
+it more than iou_threshold, also when that box is itself discarded. Keeps a subset of exact NMS
+in a single upper triangular iou matrix pass.
+
+Returns:
+keep (Tensor): int64 indices of the kept elements, sorted in decreasing order of scores
+"""
+    if boxes.numel() == 0:
+        return torch.empty((0,), dtype=torch.int64, device=boxes.device)
+    order, iou = _sorted_overlaps(boxes, scores, idxs)
+    return order[~(iou > iou_threshold).any(0)]
+
+
+def matrix_nms_decay(
+    boxes: torch.Tensor,
+    scores: torch.Tensor,
+    idxs: torch.Tensor,
+    kernel: str = "gaussian",
+    sigma: float = 2.0,
+) -> torch.Tensor:
+    """
+Matrix NMS (SOLOv2) score decay factors, in [0, 1] and in the input order
+
+Each box is decayed by its most overlapping higher scoring box of the same category,
+compensated by how much that box is itself suppressed.
+
+:param boxes:
+:param scores:
+:param idxs:
+:param kernel: gaussian or linear
+:param sigma: gaussian kernel width
+:return:
+"""
+    if kernel not in ("gaussian", "linear"):
+        raise ValueError(f"Unknown matrix nms kernel {kernel}")
+    decay = torch.ones_like(scores)
+    if boxes.numel() == 0:
+        return decay
+    order, iou = _sorted_overlaps(boxes, scores, idxs)
+    compensate = iou.max(0)[0].unsqueeze(1)  # for the suppressing box of each row
+    if kernel == "gaussian":
+        sorted_decay = torch.exp(-sigma * (iou ** 2 - compensate ** 2))
+    else:
+        sorted_decay = (1 - iou) / (1 - compensate).clamp(min=1e-6)
+    decay[order] = sorted_decay.min(0)[0].clamp(max=1)
+    return decay
+
+
+@register_nms_backend("matrix")
+def matrix_batched_nms(
+    boxes: torch.Tensor,
+    scores: torch.Tensor,
+    idxs: torch.Tensor,
+    iou_threshold: float,
+    kernel: str = "gaussian",
+    sigma: float = 2.0,
+) -> torch.Tensor:
+    """
+Matrix NMS as a hard selection, boxes whose decay factor falls below 1 - iou_threshold are
+discarded (for the linear kernel and an uncompensated neighbour that is an iou above
+iou_threshold). Use matrix_nms_decay for the decayed scores themselves.
+
+Returns:
+keep (Tensor): int64 indices of the kept elements, sorted in decreasing order of decayed scores
+"""
+    if boxes.numel() == 0:
+        return torch.empty((0,), dtype=torch.int64, device=boxes.device)
+    decay = matrix_nms_decay(boxes, scores, idxs, kernel=kernel, sigma=sigma)
+    keep = torch.nonzero(decay >= 1 - iou_threshold, as_tuple=False).squeeze(1)
+    return keep[torch.argsort(scores[keep] * decay[keep], descending=True)]
 
 
-def batched_non_maximum_suppression(boxes, scores, idxs, iou_threshold) -> torch.Tensor:
+def batched_non_maximum_suppression(
+    boxes, scores, idxs, iou_threshold, backend: Optional[str] = None
+) -> torch.Tensor:
     """
 Performs non-maximum suppression in a batched fashion.
 
@@ -86,6 +300,8 @@ indices of the categories for each one of the boxes.
 iou_threshold : float
 discards all overlapping boxes
 with IoU < iou_threshold
+backend : str
+one of available_nms_backends(), None selects torchvision when available, otherwise tensor
 
 Returns
 -------
@@ -94,4 +310,5 @@ int64 tensor with the indices of
 the elements that have been kept by NMS, sorted
 in decreasing order of scores
 """
-    return batched_support(boxes, scores, idxs, iou_threshold)
+    with default_stage_profiler().stage("nms"):
+        return get_nms_backend(backend)(boxes, scores, idxs, iou_threshold)
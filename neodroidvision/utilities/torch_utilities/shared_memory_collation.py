@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Batch collation into preallocated buffers instead of fresh tensors per batch.
+
+           Every data loader worker keeps a ring of shared memory slots, sized from its first
+           batch, and collates samples straight into the next free slot. The batch handed to the
+           main process is views of the slot, which pass through the worker queue as shared memory
+           handles, no bytes are copied. A slot is only written again once the main process has
+           released the batch in it, which PinnedBatchLoader does when the following batch is
+           requested (or right away after copying it into its own ring of pinned buffers).
+
+           Both sides count buffer allocations and reuses, see PinnedBatchLoader.statistics.
+           """
+
+import multiprocessing
+import os
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy
+import torch
+from torch.utils.data import get_worker_info
+
+from draugr.torch_utilities.tensors.tensor_container import NamedTensorTuple
+from .batch_resampler import BatchCollator
+
+__all__ = ["SharedMemoryBatchCollator", "PinnedBatchLoader"]
+
+SHARED_COUNTERS = ("shared_allocations", "shared_reuses", "shared_bytes")
+PADDING_MULTIPLE = 16  # padded target capacity grows in steps of this
+
+
+def _as_tensor(value) -> torch.Tensor:
+    if isinstance(value, numpy.ndarray):
+        return torch.from_numpy(value)
+    return torch.as_tensor(value)
+
+
+class _BufferRing:
+    """
+Slots of named buffers, a buffer is reused while its dtype and trailing shape match and it has the
+capacity, otherwise it is (re)allocated
+"""
+
+    def __init__(self, num_slots: int, allocate: Callable, count: Callable):
+        self.slots = [{} for _ in range(num_slots)]
+        self.allocate = allocate
+        self.count = count
+
+    def view(
+        self, slot: int, name: str, shape: Sequence[int], dtype: torch.dtype
+    ) -> torch.Tensor:
+        buffer = self.slots[slot].get(name)
+        if (
+            buffer is None
+            or buffer.dtype != dtype
+            or buffer.dim() != len(shape)
+            or any(b < s for b, s in zip(buffer.shape, shape))
+        ):
+            capacity = list(shape)
+            if buffer is not None and buffer.dim() == len(shape):
+                capacity = [max(b, s) for b, s in zip(buffer.shape, shape)]
+            buffer = self.allocate(capacity, dtype)
+            self.slots[slot][name] = buffer
+            self.count("allocations", buffer.numel() * buffer.element_size())
+        else:
+            self.count("reuses", 0)
+        return buffer[tuple(slice(0, s) for s in shape)]
+
+
+class SharedMemoryBatchCollator(BatchCollator):
+    """
+BatchCollator collating into a per worker ring of shared memory slots. Batches are returned as
+(images, targets, img_ids, worker) for PinnedBatchLoader, which releases the slots and yields the
+usual (images, targets, img_ids).
+"""
+
+    def __init__(
+        self,
+        wrap: bool = True,
+        annotation_transform: Callable = None,
+        padded: bool = False,
+        *,
+        num_workers: int = 0,
+        slots_per_worker: int = 4,
+    ):
+        """
+
+:param wrap: see BatchCollator
+:param annotation_transform: see BatchCollator, its outputs are copied into the slots
+:param padded: see BatchCollator
+:param num_workers: of the DataLoader
+:param slots_per_worker: at least 2, a worker waits for a slot when all of its batches are
+unreleased, the default covers the DataLoader prefetch_factor of 2, the batch held by the consumer
+and the one being collated
+"""
+        super().__init__(wrap, annotation_transform, padded)
+        assert slots_per_worker >= 2
+        self.slots_per_worker = slots_per_worker
+        self._produced = multiprocessing.RawArray("q", max(1, num_workers))
+        self._consumed = multiprocessing.RawArray("q", max(1, num_workers))
+        self._counters = multiprocessing.Array("q", len(SHARED_COUNTERS))
+        self._ring = None
+        self._ring_pid = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_ring"] = None  # every worker has its own ring
+        return state
+
+    def _count(self, kind: str, num_bytes: int) -> None:
+        with self._counters.get_lock():
+            self._counters[SHARED_COUNTERS.index(f"shared_{kind}")] += 1
+            self._counters[SHARED_COUNTERS.index("shared_bytes")] += num_bytes
+
+    @staticmethod
+    def _allocate(shape: Sequence[int], dtype: torch.dtype) -> torch.Tensor:
+        return torch.empty(shape, dtype=dtype).share_memory_()
+
+    def _acquire_slot(self, worker: int) -> int:
+        while self._produced[worker] - self._consumed[worker] >= self.slots_per_worker:
+            time.sleep(1e-4)  # all slots hold batches the main process has not released
+        slot = self._produced[worker] % self.slots_per_worker
+        self._produced[worker] += 1
+        return slot
+
+    def release(self, worker: int) -> None:
+        """
+Main process side, the oldest unreleased batch of worker may be overwritten
+
+:param worker:
+:type worker:
+"""
+        self._consumed[worker] += 1
+
+    def release_all(self) -> None:
+        """
+Main process side, every batch produced so far may be overwritten, e.g. when an epoch is abandoned
+and the DataLoader discards the batches in flight
+"""
+        for worker in range(len(self._consumed)):
+            self._consumed[worker] = self._produced[worker]
+
+    def reset(self) -> None:
+        """
+Main process side, before new workers are started
+"""
+        for worker in range(len(self._consumed)):
+            self._produced[worker] = self._consumed[worker] = 0
+
+    def statistics(self) -> Dict[str, int]:
+        """
+
+:return: buffer allocations, reuses and allocated bytes, summed over workers
+:rtype:
+"""
+        with self._counters.get_lock():
+            return dict(zip(SHARED_COUNTERS, self._counters[:]))
+
+    def _stack(self, slot: int, name: str, values: Sequence) -> torch.Tensor:
+        values = [_as_tensor(v) for v in values]
+        out = self._ring.view(
+            slot, name, (len(values), *values[0].shape), values[0].dtype
+        )
+        torch.stack(values, out=out)
+        return out
+
+    def _pad(self, slot: int, boxes: Sequence, labels: Sequence) -> Tuple:
+        boxes = [_as_tensor(b).reshape(-1, 4) for b in boxes]
+        labels = [_as_tensor(l).reshape(-1) for l in labels]
+        max_targets = max([1] + [b.shape[0] for b in boxes])
+        capacity = -(-max_targets // PADDING_MULTIPLE) * PADDING_MULTIPLE
+        batch_size = len(boxes)
+
+        padded_boxes = self._ring.view(
+            slot, "boxes", (batch_size, capacity, 4), boxes[0].dtype
+        )[:, :max_targets]
+        padded_labels = self._ring.view(
+            slot, "labels", (batch_size, capacity), labels[0].dtype
+        )[:, :max_targets]
+        mask = self._ring.view(slot, "mask", (batch_size, capacity), torch.bool)[
+            :, :max_targets
+        ]
+        padded_boxes.zero_()
+        padded_labels.zero_()
+        mask.zero_()
+        for i, (b, l) in enumerate(zip(boxes, labels)):
+            padded_boxes[i, : b.shape[0]] = b
+            padded_labels[i, : l.shape[0]] = l
+            mask[i, : b.shape[0]] = True
+        return padded_boxes, padded_labels, mask
+
+    def __call__(self, batch: Iterable) -> Tuple:
+        info = get_worker_info()
+        worker = 0 if info is None else info.id
+        if self._ring is None or self._ring_pid != os.getpid():
+            # not inherited from a forking process, workers must not share slots
+            self._ring = _BufferRing(self.slots_per_worker, self._allocate, self._count)
+            self._ring_pid = os.getpid()
+        slot = self._acquire_slot(worker)
+
+        transposed_batch = list(zip(*batch))
+        images = self._stack(slot, "images", transposed_batch[0])
+        img_ids = self._stack(slot, "img_ids", transposed_batch[2])
+        list_targets = transposed_batch[1]
+
+        if self.wrap and self.annotation_transform is not None:
+            boxes, labels = self.annotation_transform(
+                *self._pad(
+                    slot,
+                    [d["boxes"] for d in list_targets],
+                    [d["labels"] for d in list_targets],
+                )
+            )
+            encoded_boxes = self._ring.view(
+                slot, "encoded_boxes", boxes.shape, boxes.dtype
+            )
+            encoded_labels = self._ring.view(
+                slot, "encoded_labels", labels.shape, labels.dtype
+            )
+            encoded_boxes.copy_(boxes)
+            encoded_labels.copy_(labels)
+            targets = NamedTensorTuple(boxes=encoded_boxes, labels=encoded_labels)
+
+        elif self.wrap and self.padded:
+            boxes, labels, mask = self._pad(
+                slot,
+                [d["boxes"] for d in list_targets],
+                [d["labels"] for d in list_targets],
+            )
+            targets = NamedTensorTuple(boxes=boxes, labels=labels, mask=mask)
+
+        elif self.wrap:
+            targets = NamedTensorTuple(
+                **{
+                    key: self._stack(
+                        slot, f"targets.{key}", [d[key] for d in list_targets]
+                    )
+                    for key in list_targets[0]
+                }
+            )
+
+        else:
+            targets = None
+
+        return images, targets, img_ids, worker
+
+
+class PinnedBatchLoader:
+    """
+Iterates a DataLoader collating with a SharedMemoryBatchCollator, yielding (images, targets,
+img_ids) views that stay valid until the next batch is requested. With pin_memory (and CUDA) the
+batches are copied into a ring of preallocated pinned buffers, for asynchronous host to device
+copies, instead of the fresh pinned tensors per batch of DataLoader(pin_memory=True), which should
+be off.
+"""
+
+    def __init__(
+        self,
+        data_loader: torch.utils.data.DataLoader,
+        *,
+        pin_memory: bool = False,
+        num_pinned_slots: int = 2,
+    ):
+        """
+
+:param data_loader:
+:type data_loader:
+:param pin_memory:
+:type pin_memory:
+:param num_pinned_slots: the yielded slot plus those the next batches are copied into while the
+host to device copies of earlier ones may still run
+:type num_pinned_slots:
+"""
+        assert isinstance(data_loader.collate_fn, SharedMemoryBatchCollator)
+        self.data_loader = data_loader
+        self.collator = data_loader.collate_fn
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+        self._pinned = None
+        self._pinned_events = [None] * num_pinned_slots
+        self._pinned_counts = {"pinned_allocations": 0, "pinned_reuses": 0}
+
+    @property
+    def batch_sampler(self):
+        """
+
+:return:
+:rtype:
+"""
+        return self.data_loader.batch_sampler
+
+    @property
+    def dataset(self):
+        """
+
+:return:
+:rtype:
+"""
+        return self.data_loader.dataset
+
+    def __len__(self) -> int:
+        return len(self.data_loader)
+
+    def statistics(self) -> Dict[str, int]:
+        """
+Buffer allocations and reuses, of the workers' shared memory slots and of the pinned ring.
+Allocations stop growing once every slot has seen the largest batch shapes.
+
+:return:
+:rtype:
+"""
+        return {**self.collator.statistics(), **self._pinned_counts}
+
+    def _count_pinned(self, kind: str, num_bytes: int) -> None:
+        self._pinned_counts[f"pinned_{kind}"] += 1
+
+    @staticmethod
+    def _allocate_pinned(shape: Sequence[int], dtype: torch.dtype) -> torch.Tensor:
+        return torch.empty(shape, dtype=dtype, pin_memory=True)
+
+    def _pin(self, slot: int, batch: Tuple) -> Tuple:
+        if self._pinned_events[slot] is not None:
+            self._pinned_events[slot].synchronize()  # copies out of the slot are done
+
+        def pinned(name: str, value: torch.Tensor) -> torch.Tensor:
+            out = self._pinned.view(slot, name, value.shape, value.dtype)
+            out.copy_(value)
+            return out
+
+        images, targets, img_ids = batch
+        if targets is not None:
+            targets = NamedTensorTuple(
+                **{key: pinned(f"targets.{key}", targets[key]) for key in targets}
+            )
+        return pinned("images", images), targets, pinned("img_ids", img_ids)
+
+    def __iter__(self) -> Iterator:
+        persistent_workers = getattr(self.data_loader, "persistent_workers", False)
+        if not persistent_workers:
+            self.collator.reset()
+        if self.pin_memory and self._pinned is None:
+            self._pinned = _BufferRing(
+                len(self._pinned_events), self._allocate_pinned, self._count_pinned
+            )
+        iterator = iter(self.data_loader)
+        unreleased: List[int] = []
+        pinned_slot = 0
+        try:
+            while True:
+                for worker in unreleased:
+                    self.collator.release(worker)
+                unreleased.clear()
+                try:
+                    images, targets, img_ids, worker = next(iterator)
+                except StopIteration:
+                    return
+                batch = images, targets, img_ids
+                if self.pin_memory:
+                    previous = (pinned_slot - 1) % len(self._pinned_events)
+                    # recorded after the copies out of the previous batch were issued
+                    self._pinned_events[previous] = torch.cuda.Event()
+                    self._pinned_events[previous].record()
+                    batch = self._pin(pinned_slot, batch)
+                    pinned_slot = (pinned_slot + 1) % len(self._pinned_events)
+                    self.collator.release(worker)  # copied out of its slot already
+                else:
+                    unreleased.append(worker)
+                yield batch
+        finally:
+            self.collator.release_all()  # unblocks workers waiting on discarded batches
+            if not persistent_workers:
+                del iterator  # shut them down before the next epoch resets the counts
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Nested data split into its tensor and numeric array leaves and a picklable skeleton of
+           placeholders recording their offset, dtype and shape, so the leaves can be moved or
+           stored as raw bytes, see all_gather_data and save_checkpoint_archive.
+           """
+
+from collections import OrderedDict
+from typing import Any, Iterable, List, NamedTuple, Tuple
+
+import numpy
+import torch
+
+__all__ = ["LEAF_ALIGNMENT", "copy_mapping", "strip_tensors", "restore_tensors"]
+
+LEAF_ALIGNMENT = 16  # leaves start at offsets viewable as any dtype
+
+
+class _Leaf(NamedTuple):
+    offset: int
+    dtype: torch.dtype
+    shape: Tuple[int, ...]
+    is_numpy: bool
+
+
+class _ObjectArray(NamedTuple):
+    shape: Tuple[int, ...]
+    items: list
+
+
+def copy_mapping(obj: Any, items: Iterable) -> Any:
+    """
+A mapping of the type of obj from items, keeping the _metadata of state dicts, which holds the
+versions of their modules
+
+:param obj: dict or OrderedDict
+:type obj:
+:param items: key value pairs
+:type items:
+:return:
+:rtype:
+"""
+    mapping = type(obj)(items)
+    if hasattr(obj, "_metadata"):
+        mapping._metadata = obj._metadata
+    return mapping
+
+
+def strip_tensors(obj: Any, leaves: List[torch.Tensor], offset: List[int]) -> Any:
+    """
+Replaces the tensor and numeric array leaves of obj, in dicts, lists, tuples, named tuples and
+object arrays, by placeholders of their offset, dtype and shape
+
+:param obj:
+:type obj:
+:param leaves: the replaced tensors are appended, numeric arrays as tensors sharing their memory
+:type leaves:
+:param offset: one element list of the byte offset of the next leaf, advanced past the leaves
+appended, each starting at a multiple of LEAF_ALIGNMENT
+:type offset:
+:return: the skeleton, picklable without the leaves
+:rtype:
+"""
+    if isinstance(obj, numpy.ndarray):
+        if obj.dtype == object:
+            return _ObjectArray(
+                obj.shape, [strip_tensors(o, leaves, offset) for o in obj.reshape(-1)]
+            )
+        if obj.dtype.kind not in "biufc" or not obj.dtype.isnative:
+            return obj
+        try:
+            tensor = torch.from_numpy(numpy.ascontiguousarray(obj))
+        except TypeError:  # e.g. uint16
+            return obj
+    elif (
+        type(obj) is torch.Tensor
+        and obj.layout == torch.strided
+        and not obj.is_quantized
+    ):
+        tensor = obj.detach()
+    elif type(obj) in (dict, OrderedDict):  # e.g. state dicts
+        return copy_mapping(
+            obj, ((k, strip_tensors(v, leaves, offset)) for k, v in obj.items())
+        )
+    elif type(obj) in (list, tuple):
+        return type(obj)(strip_tensors(o, leaves, offset) for o in obj)
+    elif isinstance(obj, tuple) and hasattr(obj, "_fields"):
+        return type(obj)(*[strip_tensors(o, leaves, offset) for o in obj])
+    else:
+        return obj  # pickled with the skeleton
+
+    leaf = _Leaf(
+        offset[0], tensor.dtype, tuple(tensor.shape), isinstance(obj, numpy.ndarray)
+    )
+    leaves.append(tensor)
+    num_bytes = tensor.numel() * tensor.element_size()
+    offset[0] += -(-num_bytes // LEAF_ALIGNMENT) * LEAF_ALIGNMENT
+    return leaf
+
+
+def restore_tensors(obj: Any, payload: torch.Tensor) -> Any:
+    """
+Inverse of strip_tensors, the leaves are views of payload
+
+:param obj: the skeleton
+:type obj:
+:param payload: uint8 tensor of the leaves at their offsets
+:type payload:
+:return:
+:rtype:
+"""
+    if isinstance(obj, _Leaf):
+        num_bytes = (
+            int(numpy.prod(obj.shape, dtype=numpy.int64))
+            * torch.tensor([], dtype=obj.dtype).element_size()
+        )
+        tensor = (
+            payload[obj.offset : obj.offset + num_bytes]
+            .view(obj.dtype)
+            .reshape(obj.shape)
+        )
+        return tensor.numpy() if obj.is_numpy else tensor
+    if isinstance(obj, _ObjectArray):
+        array = numpy.empty(len(obj.items), dtype=object)
+        array[:] = [restore_tensors(o, payload) for o in obj.items]
+        return array.reshape(obj.shape)
+    if type(obj) in (dict, OrderedDict):
+        return copy_mapping(
+            obj, ((k, restore_tensors(v, payload)) for k, v in obj.items())
+        )
+    if type(obj) in (list, tuple):
+        return type(obj)(restore_tensors(o, payload) for o in obj)
+    if isinstance(obj, tuple) and hasattr(obj, "_fields"):
+        return type(obj)(*[restore_tensors(o, payload) for o in obj])
+    return obj
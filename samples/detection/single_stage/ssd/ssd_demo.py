@@ -25,7 +25,7 @@ def run_demo(cfg, class_names, model_ckpt, score_threshold, images_dir, output_d
     checkpointer = CheckPointer(
         model, save_dir=ensure_existence(PROJECT_APP_PATH.user_data / "results")
     )
-    checkpointer.load(model_ckpt, use_latest=model_ckpt is None)
+    checkpointer.load(model_ckpt, use_latest=model_ckpt is None, keys=("model",))
     print(
         f"Loaded weights from {model_ckpt if model_ckpt else checkpointer.get_checkpoint_file()}"
     )
@@ -60,7 +60,7 @@ def main():
             save_dir=PROJECT_APP_PATH.user_data / "results",
             logger=logging.getLogger("SSD.inference"),
         )
-        checkpointer.load(args.ckpt, use_latest=args.ckpt is None)
+        checkpointer.load(args.ckpt, use_latest=args.ckpt is None, keys=("model",))
         do_ssd_evaluation(
             base_cfg, model.to(torch.device(base_cfg.MODEL.DEVICE)), distributed
         )
@@ -46,7 +46,7 @@ def export_detection_model(
     checkpointer = CheckPointer(
         model, save_dir=ensure_existence(PROJECT_APP_PATH.user_data / "results")
     )
-    checkpointer.load(model_ckpt, use_latest=model_ckpt is None)
+    checkpointer.load(model_ckpt, use_latest=model_ckpt is None, keys=("model",))
     print(
         f"Loaded weights from {model_ckpt if model_ckpt else checkpointer.get_checkpoint_file()}"
     )
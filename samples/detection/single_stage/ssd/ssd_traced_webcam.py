@@ -31,7 +31,6 @@ from draugr.torch_utilities import (
     TorchEvalSession,
     global_torch_device,
 )
-import pkg_resources
 
 
 @torch.no_grad()
@@ -77,6 +77,9 @@ def inner_train_ssd(*,
     logger = logging.getLogger("SSD.trainer")
     logger.info("Start training ...")
     meters = MetricLogger()
+    profiler = meters.profiler
+    profiler.enabled = kws.get("profile_stages", False)
+    profiler.synchronise_cuda = profiler.enabled and device.type == "cuda"
 
     with TorchTrainSession(model):
         save_to_disk = global_distribution_rank() == 0
@@ -93,31 +96,38 @@ def inner_train_ssd(*,
         start_iter = arguments["iteration"]
         start_training_time = time.time()
         end = time.time()
-        for iteration, (images, targets, _) in enumerate(data_loader, start_iter):
+        for iteration, (images, targets, _) in enumerate(
+            profiler.iterate("data", data_loader), start_iter
+        ):
             arguments["iteration"] = iteration
 
-            images = images.to(device)
-            targets = targets.to(device)
+            with meters.stage("to_device"):
+                images = images.to(device)
+                targets = targets.to(device)
             loss_instance = MultiBoxLoss(neg_pos_ratio=cfg.model.neg_pos_ratio)
-            cls_logits, bbox_pred = model(images)
+            with meters.stage("forward"):
+                cls_logits, bbox_pred = model(images)
 
-            reg_loss, cls_loss = loss_instance(
-                cls_logits, bbox_pred, targets.labels, targets.boxes
-            )
-            loss_dict = dict(reg_loss=reg_loss, cls_loss=cls_loss)
+            with meters.stage("loss"):
+                reg_loss, cls_loss = loss_instance(
+                    cls_logits, bbox_pred, targets.labels, targets.boxes
+                )
+                loss_dict = dict(reg_loss=reg_loss, cls_loss=cls_loss)
 
-            loss = sum(loss for loss in loss_dict.values())
+                loss = sum(loss for loss in loss_dict.values())
 
-            loss_dict_reduced = reduce_loss_dict(
-                loss_dict
-            )  # reduce losses over all GPUs for logging purposes
-            losses_reduced = sum(loss for loss in loss_dict_reduced.values())
-            meters.update(total_loss=losses_reduced, **loss_dict_reduced)
+                loss_dict_reduced = reduce_loss_dict(
+                    loss_dict
+                )  # reduce losses over all GPUs for logging purposes
+                losses_reduced = sum(loss for loss in loss_dict_reduced.values())
+                meters.update(total_loss=losses_reduced, **loss_dict_reduced)
 
-            optimiser.zero_grad()
-            loss.backward()
-            optimiser.step()
-            scheduler.step()
+            with meters.stage("backward"):
+                optimiser.zero_grad()
+                loss.backward()
+            with meters.stage("optimiser"):
+                optimiser.step()
+                scheduler.step()
 
             batch_time = time.time() - end
             end = time.time()
@@ -136,6 +146,14 @@ def inner_train_ssd(*,
                         ]
                     )
                 )
+                if profiler.enabled:
+                    logger.info(f"stages: {profiler}")
+                    if save_to_disk:
+                        profiler.write_jsonl(
+                            Path(cfg.output_dir) / "stages.jsonl", iteration
+                        )
+                        if writer:
+                            profiler.write_tensorboard(writer, iteration)
                 if writer:
                     global_step = iteration
                     writer.add_scalar(
@@ -157,7 +175,7 @@ def inner_train_ssd(*,
                 and iteration % kws.eval_step == 0
                 and not iteration == max_iter
             ):
-                with TorchEvalSession(model):
+                with TorchEvalSession(model), meters.stage("eval"):
                     eval_results = do_ssd_evaluation(
                         data_root,
                         cfg,
@@ -177,6 +195,7 @@ def inner_train_ssd(*,
                             )
 
         check_pointer.save("model_final", **arguments)
+        check_pointer.wait()
 
         total_training_time = int(
             time.time() - start_training_time
@@ -219,7 +238,15 @@ def train_ssd(data_root: Path, cfg, solver_cfg: NOD, kws: NOD) -> Module:
     arguments = {"iteration": 0}
     save_to_disk = global_distribution_rank() == 0
     checkpointer = CheckPointer(
-        model, optimiser, scheduler, cfg.output_dir, save_to_disk, logger
+        model,
+        optimiser,
+        scheduler,
+        cfg.output_dir,
+        save_to_disk,
+        logger,
+        asynchronous=True,  # the training loop only pays for the snapshot to the cpu
+        keep_last=kws.get("keep_last_checkpoints", None),
+        archive=True,  # memory mapped, inference loads only the model weights
     )
     arguments.update(checkpointer.load())
 
@@ -264,6 +291,12 @@ def main():
     parser.add_argument(
         "--save_step", default=2500, type=int, help="Save checkpoint every save_step"
     )
+    parser.add_argument(
+        "--keep_last_checkpoints",
+        default=None,
+        type=int,
+        help="Delete all but the last keep_last_checkpoints checkpoints, keep all if not given",
+    )
     parser.add_argument(
         "--eval_step",
         default=2500,
@@ -271,6 +304,12 @@ def main():
         help="Evaluate dataset every eval_step, disabled when eval_step < 0",
     )
     parser.add_argument("--use_tensorboard", default=True, type=str2bool)
+    parser.add_argument(
+        "--profile_stages",
+        default=False,
+        type=str2bool,
+        help="Time the stages of every iteration, logged every log_step and to stages.jsonl",
+    )
     parser.add_argument(
         "--skip-test",
         dest="skip_test",
@@ -11,7 +11,7 @@ __doc__ = ""
 
 from apppath import ensure_existence
 
-from torch.utils.data import DataLoader, Subset
+from torch.utils.data import DataLoader, RandomSampler, Subset
 from tqdm import tqdm
 
 from draugr.torch_utilities import (
@@ -35,6 +35,11 @@ from neodroidvision.detection.two_stage.mask_rcnn.maskrcnn_engine import (
   maskrcnn_train_single_epoch,
   maskrcnn_evaluate,
   )
+from neodroidvision.utilities import (
+  GroupedBatchSampler,
+  aspect_ratio_group_ids,
+  image_sizes,
+  )
 from warg import GDKC
 
 if __name__ == "__main__":
@@ -54,6 +59,7 @@ if __name__ == "__main__":
         gamma=0.1,
         )
     num_workers = os.cpu_count()
+    num_eval_workers = 2  # evaluates the predictions while the model runs, 0 in line
     torch_seed(3825)
 
     dataset = PennFudanDataset(
@@ -68,10 +74,16 @@ if __name__ == "__main__":
 
     split_indices = torch.randperm(split.total_num).tolist()
 
+    training_subset = Subset(dataset, split_indices[: -split.validation_num])
+    training_sizes = image_sizes(training_subset)  # from the png headers
     data_loader = DataLoader(
-        Subset(dataset, split_indices[: -split.validation_num]),
-        batch_size=batch_size,
-        shuffle=True,
+        training_subset,
+        batch_sampler=GroupedBatchSampler(
+            RandomSampler(training_subset),
+            aspect_ratio_group_ids(training_sizes),
+            batch_size,
+            sizes=training_sizes,
+            ),
         num_workers=num_workers,
         collate_fn=collate_batch_fn,
         )
@@ -102,7 +114,8 @@ if __name__ == "__main__":
             lr_scheduler.step()  # update the learning rate
             maskrcnn_evaluate(model,
                               data_loader_val,
-                              writer=writer
+                              writer=writer,
+                              num_eval_workers=num_eval_workers
                               )  # evaluate on the validation dataset
             save_model(model,model_name=model_name,save_directory=export_root)
 
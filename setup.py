@@ -3,7 +3,7 @@
 from typing import List, Union
 
 
-def python_version_check(major=3, minor=6):
+def python_version_check(major=3, minor=7):
     import sys
 
     assert sys.version_info.major == major and sys.version_info.minor >= minor, (
@@ -59,6 +59,7 @@ class NeodroidVisionPackage:
         return find_packages(
             exclude=[
                 # 'neodroidvision/...'
+                "benchmarks",
             ]
         )
 
@@ -206,5 +207,5 @@ if __name__ == "__main__":
         tests_require=pkg.test_dependencies,
         setup_requires=pkg.setup_dependencies,
         include_package_data=True,
-        python_requires=">=3.6",
+        python_requires=">=3.7",
     )
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Synthetic datasets, written once per session, see neodroidvision.data.synthetic_datasets,
+           imported by the fixtures so sessions not using them do not import the data stack
+           """
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def synthetic_voc_root(tmp_path_factory):
+    """data_root of a voc_2007_test split of 24 images"""
+    from neodroidvision.data.synthetic_datasets import write_synthetic_voc
+
+    return write_synthetic_voc(
+        tmp_path_factory.mktemp("voc"),
+        "voc_2007_test",
+        num_images=24,
+        image_size=(120, 160),
+        chunk_size=8,
+    )
+
+
+@pytest.fixture(scope="session")
+def synthetic_coco_root(tmp_path_factory):
+    """data_root of a coco_2014_val split of 24 images"""
+    from neodroidvision.data.synthetic_datasets import write_synthetic_coco
+
+    return write_synthetic_coco(
+        tmp_path_factory.mktemp("coco"),
+        "coco_2014_val",
+        num_images=24,
+        image_size=(120, 160),
+        chunk_size=8,
+    )
+
+
+@pytest.fixture(scope="session")
+def synthetic_clouds_root(tmp_path_factory):
+    """root of 20 training and 4 test images"""
+    from neodroidvision.data.synthetic_datasets import write_synthetic_clouds
+
+    return write_synthetic_clouds(
+        tmp_path_factory.mktemp("clouds"),
+        num_images=20,
+        num_test_images=4,
+        image_size=(140, 210),
+        chunk_size=8,
+    )
+
+
+@pytest.fixture(scope="session")
+def synthetic_penn_fudan_root(tmp_path_factory):
+    """root of 12 images"""
+    from neodroidvision.data.synthetic_datasets import write_synthetic_penn_fudan
+
+    return write_synthetic_penn_fudan(
+        tmp_path_factory.mktemp("penn_fudan"),
+        num_images=12,
+        image_size=(120, 160),
+        chunk_size=4,
+    )
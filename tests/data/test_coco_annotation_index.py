@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import json
+import os
+
+import numpy
+import pytest
+from draugr.torch_utilities import Split
+
+from neodroidvision.data.detection.coco import COCOAnnotationIndex, COCODataset
+from neodroidvision.data.synthetic_datasets import write_synthetic_coco
+
+
+def write_coco_annotations(data_root, seed: int = 0):
+    """
+A synthetic coco_2014_minival with annotations interleaved across images, an empty box, crowds,
+images without annotations and non contiguous category ids
+"""
+    write_synthetic_coco(
+        data_root, "coco_2014_minival", num_images=30, image_size=(40, 60), seed=seed
+    )
+    annotation_file = data_root / COCODataset.splits["coco_2014_minival"]
+    dataset = json.loads(annotation_file.read_text())
+    rng = numpy.random.RandomState(seed)
+    annotations = dataset["annotations"]
+    annotations[0]["bbox"][2] = 0.0
+    for annotation in annotations[1::7]:
+        annotation["iscrowd"] = 1
+    dataset["annotations"] = [annotations[i] for i in rng.permutation(len(annotations))]
+    used = {annotation["category_id"] for annotation in annotations}
+    dataset["categories"] = [c for c in dataset["categories"] if c["id"] in used]
+    annotation_file.write_text(json.dumps(dataset))
+    return annotation_file
+
+
+@pytest.mark.parametrize("split", [Split.Training, Split.Testing])
+def test_indexed_dataset_matches_pycocotools(tmp_path, split):
+    write_coco_annotations(tmp_path)
+    indexed = COCODataset(
+        tmp_path, "coco_2014_minival", split, annotation_index_dir=tmp_path / "cache",
+    )
+    reference = COCODataset(
+        tmp_path, "coco_2014_minival", split, use_annotation_index=False
+    )
+
+    assert indexed._ids == reference._ids
+    assert indexed.contiguous_id_to_coco_id == reference.contiguous_id_to_coco_id
+    for i in range(len(reference)):
+        image_id, (boxes, labels) = indexed.get_annotation(i)
+        reference_id, (reference_boxes, reference_labels) = reference.get_annotation(i)
+        assert image_id == reference_id
+        numpy.testing.assert_array_equal(boxes, reference_boxes)
+        numpy.testing.assert_array_equal(labels, reference_labels)
+        assert boxes.dtype == numpy.float32 and labels.dtype == numpy.int64
+
+        info = indexed.get_img_info(i)
+        assert info == {k: v for k, v in reference.get_img_info(i).items() if k in info}
+
+
+def test_index_is_memory_mapped_and_rebuilt_on_change(tmp_path):
+    annotation_file = write_coco_annotations(tmp_path)
+    cache_dir = tmp_path / "cache"
+
+    assert COCOAnnotationIndex.load(annotation_file, cache_dir=cache_dir) is None
+    COCOAnnotationIndex.open(annotation_file, cache_dir=cache_dir)
+    index = COCOAnnotationIndex.load(annotation_file, cache_dir=cache_dir)
+    assert isinstance(index.boxes, numpy.memmap)
+    assert COCOAnnotationIndex.load(
+        annotation_file, cache_dir=cache_dir, verify_hash=True
+    )
+
+    stat = annotation_file.stat()
+    write_coco_annotations(tmp_path, seed=1)
+    os.utime(str(annotation_file), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert COCOAnnotationIndex.load(annotation_file, cache_dir=cache_dir) is None
+
+    rebuilt = COCOAnnotationIndex.open(annotation_file, cache_dir=cache_dir)
+    expected = COCOAnnotationIndex.from_dataset(json.loads(annotation_file.read_text()))
+    numpy.testing.assert_array_equal(rebuilt.image_ids, expected.image_ids)
+    numpy.testing.assert_array_equal(rebuilt.boxes, expected.boxes)
+
+
+def test_hash_check_catches_same_size_and_mtime_edits(tmp_path):
+    annotation_file = write_coco_annotations(tmp_path)
+    cache_dir = tmp_path / "cache"
+    COCOAnnotationIndex.open(annotation_file, cache_dir=cache_dir)
+
+    stat = annotation_file.stat()
+    content = annotation_file.read_text()
+    annotation_file.write_text(content.replace('"iscrowd": 0', '"iscrowd": 1', 1))
+    os.utime(str(annotation_file), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert COCOAnnotationIndex.load(annotation_file, cache_dir=cache_dir)
+    assert (
+        COCOAnnotationIndex.load(annotation_file, cache_dir=cache_dir, verify_hash=True)
+        is None
+    )
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import contextlib
+import io
+
+import numpy
+import pytest
+from pycocotools.cocoeval import COCOeval
+
+from benchmarks.fixtures import batched_predictions, evaluated, load, synthetic_coco
+from neodroidvision.data.detection.coco import CocoEvaluator
+from neodroidvision.data.detection.coco.coco_evaluation import IouType
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+
+def run(coco_gt, results, num_workers):
+    with CocoEvaluator(
+        coco_gt, [IouType.BoundingBox], num_workers=num_workers
+    ) as evaluator, contextlib.redirect_stdout(io.StringIO()):
+        for batch in batched_predictions(results):
+            evaluator.update(batch)
+        evaluator.synchronize_between_processes()
+        evaluator.accumulate()
+        evaluator.summarize()
+    return evaluator.coco_eval[IouType.BoundingBox]
+
+
+def test_parallel_update_matches_serial_and_cocoeval():
+    dataset, results = synthetic_coco(num_images=30, seed=7)
+    coco_gt, _ = load(dataset, results)
+
+    serial = run(coco_gt, results, num_workers=0)
+    parallel = run(coco_gt, results, num_workers=2)
+    numpy.testing.assert_array_equal(parallel.stats, serial.stats)
+    numpy.testing.assert_array_equal(
+        parallel.eval["precision"], serial.eval["precision"]
+    )
+
+    with_predictions = sorted({r["image_id"] for r in results})
+    reference = COCOeval(*load(dataset, results), "bbox")
+    reference.params.imgIds = with_predictions
+    numpy.testing.assert_allclose(evaluated(reference).stats, serial.stats)
+
+
+def test_pool_is_shut_down_on_errors():
+    dataset, results = synthetic_coco(num_images=4, seed=7)
+    coco_gt, _ = load(dataset, results)
+    evaluator = CocoEvaluator(coco_gt, [IouType.BoundingBox], num_workers=1)
+    pool = evaluator._pool
+    with pytest.raises(KeyboardInterrupt), evaluator:
+        evaluator.update(next(batched_predictions(results)))
+        raise KeyboardInterrupt
+    assert evaluator._pool is None
+    with pytest.raises(ValueError):  # terminated
+        pool.apply_async(print)
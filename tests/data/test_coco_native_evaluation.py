@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy
+import pytest
+from pycocotools.coco import COCO
+from pycocotools.cocoeval import COCOeval
+
+from benchmarks.fixtures import evaluated, load, synthetic_coco
+from neodroidvision.data.detection.coco.coco_native_evaluation import NativeCocoEval
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_bbox_parity(seed):
+    dataset, results = synthetic_coco(seed=seed)
+    reference = evaluated(COCOeval(*load(dataset, results), "bbox"))
+    native = evaluated(NativeCocoEval(*load(dataset, results), "bbox"))
+
+    numpy.testing.assert_array_equal(native.stats, reference.stats)
+    for key in ("precision", "recall", "scores"):
+        numpy.testing.assert_array_equal(native.eval[key], reference.eval[key])
+
+
+def test_bbox_parity_in_small_batches_and_subsets():
+    dataset, results = synthetic_coco(seed=4)
+    evaluators = []
+    for evaluator in (COCOeval, NativeCocoEval):
+        evaluator = evaluator(*load(dataset, results), "bbox")
+        evaluator.params.imgIds = evaluator.params.imgIds[::2]
+        evaluator.params.catIds = evaluator.params.catIds[1:]
+        evaluator.params.maxDets = [1, 3, 5]
+        evaluators.append(evaluator)
+    evaluators[1].max_elements = 1  # one group at a time
+
+    reference, native = [evaluated(e) for e in evaluators]
+    numpy.testing.assert_array_equal(native.stats, reference.stats)
+    numpy.testing.assert_array_equal(
+        native.eval["precision"], reference.eval["precision"]
+    )
+
+
+def test_segm_parity():
+    dataset, results = synthetic_coco(num_images=15, seed=5, segm=True)
+    reference = evaluated(COCOeval(*load(dataset, results), "segm"))
+    native = evaluated(NativeCocoEval(*load(dataset, results), "segm"))
+
+    numpy.testing.assert_array_equal(native.stats, reference.stats)
+    numpy.testing.assert_array_equal(
+        native.eval["precision"], reference.eval["precision"]
+    )
+
+
+def test_no_detections():
+    dataset, _ = synthetic_coco(num_images=5, seed=6)
+    coco_gt, _ = load(dataset, synthetic_coco(num_images=5, seed=6)[1])
+    reference = evaluated(COCOeval(coco_gt, COCO(), "bbox"))
+    native = evaluated(NativeCocoEval(coco_gt, COCO(), "bbox"))
+    numpy.testing.assert_array_equal(native.stats, reference.stats)
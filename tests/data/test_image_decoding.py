@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import io
+
+import numpy
+import pytest
+from PIL import Image
+from draugr.torch_utilities import Split
+
+from benchmarks.fixtures import encoded, smooth_image, usable_decoders
+from neodroidvision.data.detection.voc import VOCDataset
+from neodroidvision.data.image_decoding import (
+    ImageDecoder,
+    reduction_factor,
+)
+from neodroidvision.data.synthetic_datasets import write_synthetic_voc
+
+
+def test_reduction_factor():
+    assert reduction_factor((640, 480), None) == 1
+    assert reduction_factor((640, 480), (300, 300)) == 1
+    assert reduction_factor((640, 480), (240, 240)) == 2
+    assert reduction_factor((2000, 1600), (200, 200)) == 8
+    assert reduction_factor((2000, 1600), (300, 300)) == 4
+
+
+@pytest.mark.parametrize("backend", list(usable_decoders()))
+def test_full_resolution_decode_matches_pil(backend):
+    image = smooth_image(97, 131)
+    data = encoded(image)
+    reference = numpy.array(Image.open(io.BytesIO(data)).convert("RGB"))
+    decoded = ImageDecoder(backend)(data)
+    assert decoded.dtype == numpy.uint8 and decoded.shape == reference.shape
+    assert numpy.abs(decoded.astype(int) - reference).max() <= 8
+
+    png = ImageDecoder(backend, target_size=10)(encoded(image, "PNG"))
+    assert png.shape == image.shape  # only JPEGs are decoded at a reduced resolution
+
+
+@pytest.mark.parametrize("backend", list(usable_decoders()))
+def test_reduced_decode_keeps_at_least_target_size(backend):
+    image = smooth_image(480, 640)
+    data = encoded(image)
+    for target_size, max_upsampling, expected in (
+        (300, 1.0, (480, 640)),
+        (300, 1.25, (240, 320)),
+        ((150, 100), 1.0, (120, 160)),
+        (50, 1.0, (60, 80)),
+    ):
+        decoded = ImageDecoder(backend, target_size, max_upsampling)(data)
+        assert decoded.shape == (*expected, 3)
+        reference = numpy.array(
+            Image.fromarray(image).resize(expected[::-1], Image.BILINEAR)
+        )
+        assert numpy.abs(decoded.astype(int) - reference).mean() < 6
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        ImageDecoder("unknown")
+
+
+def test_voc_boxes_follow_reduced_decode(tmp_path):
+    write_synthetic_voc(tmp_path, "voc_2007_test", num_images=5)
+    full = VOCDataset(
+        tmp_path, "voc_2007_test", Split.Testing, annotation_store_dir=tmp_path / "c"
+    )
+    reduced = VOCDataset(
+        tmp_path,
+        "voc_2007_test",
+        Split.Testing,
+        annotation_store_dir=tmp_path / "c",
+        decoder=ImageDecoder(target_size=40),
+    )
+
+    for i in range(len(full)):
+        image, targets, _ = full[i]
+        reduced_image, reduced_targets, _ = reduced[i]
+        assert min(reduced_image.shape[:2]) >= 40
+        scale = numpy.array(reduced_image.shape[1::-1] * 2) / numpy.array(
+            image.shape[1::-1] * 2
+        )
+        numpy.testing.assert_allclose(
+            reduced_targets["boxes"], targets["boxes"] * scale, rtol=1e-5
+        )
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import pickle
+
+import numpy
+import pytest
+from PIL import Image
+from draugr.torch_utilities import Split
+
+from neodroidvision.data.detection.coco import COCODataset
+from neodroidvision.data.detection.image_shards import (
+    ImageShardReader,
+    write_image_shards,
+)
+from neodroidvision.data.detection.voc import VOCDataset
+from neodroidvision.data.synthetic_datasets import (
+    write_synthetic_coco,
+    write_synthetic_voc,
+)
+from neodroidvision.entry_points.cli import NeodroidVisionCLI
+
+
+def write_jpegs(image_files, seed: int = 0):
+    rng = numpy.random.RandomState(seed)
+    for _, image_file in image_files:
+        image_file.parent.mkdir(parents=True, exist_ok=True)
+        Image.fromarray(
+            rng.randint(0, 255, (rng.randint(20, 60), rng.randint(20, 60), 3), "uint8")
+        ).save(str(image_file), quality=90)
+
+
+def test_shards_round_trip(tmp_path):
+    image_files = [(f"{i:06d}", tmp_path / "images" / f"{i}.jpg") for i in range(25)]
+    write_jpegs(image_files)
+
+    shard_files = write_image_shards(
+        image_files, tmp_path / "shards", "split", max_shard_bytes=8000
+    )
+    assert len(shard_files) > 1
+
+    reader = ImageShardReader.from_directory(tmp_path / "shards", "split")
+    assert len(reader) == len(image_files)
+    reader = pickle.loads(pickle.dumps(reader))  # as handed to DataLoader workers
+    for key, image_file in image_files:
+        assert bytes(reader.read_bytes(key)) == image_file.read_bytes()
+        numpy.testing.assert_array_equal(
+            reader.read_image(key), numpy.array(Image.open(image_file).convert("RGB"))
+        )
+
+    with pytest.raises(KeyError):
+        reader.read_bytes("missing")
+
+
+def test_repacking_replaces_previous_shards(tmp_path):
+    image_files = [(str(i), tmp_path / "images" / f"{i}.jpg") for i in range(6)]
+    write_jpegs(image_files)
+    write_image_shards(image_files, tmp_path, "split", max_shard_bytes=1)
+    write_image_shards(image_files[:2], tmp_path, "split")
+    assert sorted(ImageShardReader.from_directory(tmp_path, "split").keys()) == [
+        "0",
+        "1",
+    ]
+
+
+def test_voc_dataset_from_shards(tmp_path):
+    write_synthetic_voc(tmp_path, "voc_2007_test", num_images=6, image_size=(40, 60))
+    from_directory = VOCDataset(
+        tmp_path, "voc_2007_test", Split.Testing, annotation_store_dir=tmp_path / "c"
+    )
+
+    NeodroidVisionCLI.pack(str(tmp_path), "voc_2007_test", str(tmp_path / "shards"))
+    from_shards = VOCDataset(
+        tmp_path,
+        "voc_2007_test",
+        Split.Testing,
+        annotation_store_dir=tmp_path / "c",
+        image_shards=tmp_path / "shards",
+    )
+    for i in range(len(from_directory)):
+        image, targets, index = from_shards[i]
+        expected_image, expected_targets, expected_index = from_directory[i]
+        numpy.testing.assert_array_equal(image, expected_image)
+        numpy.testing.assert_array_equal(targets["boxes"], expected_targets["boxes"])
+        assert index == expected_index
+
+
+def test_coco_dataset_from_shards(tmp_path):
+    write_synthetic_coco(
+        tmp_path, "coco_2014_minival", num_images=8, image_size=(40, 60)
+    )
+
+    NeodroidVisionCLI.pack(str(tmp_path), "coco_2014_minival", str(tmp_path / "shards"))
+    from_shards = COCODataset(
+        tmp_path,
+        "coco_2014_minival",
+        Split.Training,
+        annotation_index_dir=tmp_path / "c",
+        image_shards=tmp_path / "shards",
+    )
+    reference = COCODataset(
+        tmp_path, "coco_2014_minival", Split.Training, use_annotation_index=False
+    )
+    for i in range(len(reference)):
+        image, targets, _ = from_shards[i]
+        expected_image, expected_targets, _ = reference[i]
+        numpy.testing.assert_array_equal(image, expected_image)
+        numpy.testing.assert_array_equal(targets["labels"], expected_targets["labels"])
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import hashlib
+
+import numpy
+import pandas
+import torch
+from PIL import Image
+from draugr.torch_utilities import Split
+
+from neodroidvision.data.detection.coco import COCODataset
+from neodroidvision.data.detection.voc import VOCDataset
+from neodroidvision.data.segmentation import CloudSegmentationDataset, PennFudanDataset
+from neodroidvision.data.segmentation.penn_fudan import ReturnVariant
+from neodroidvision.data.synthetic_datasets import write_synthetic_voc
+from neodroidvision.entry_points.cli import NeodroidVisionCLI
+from neodroidvision.segmentation.masks.run_length_encoding import run_length_to_mask
+
+
+def digest(directory):
+    return {
+        p.relative_to(directory).as_posix(): hashlib.md5(p.read_bytes()).hexdigest()
+        for p in sorted(directory.rglob("*"))
+        if p.is_file()
+    }
+
+
+def test_voc(synthetic_voc_root, tmp_path):
+    dataset = VOCDataset(
+        synthetic_voc_root,
+        "voc_2007_test",
+        Split.Testing,
+        annotation_store_dir=synthetic_voc_root / "cache",
+    )
+    assert len(dataset) == 24
+    num_objects = 0
+    for index in range(len(dataset)):
+        image, targets, _ = dataset[index]
+        height, width = dataset.get_img_info(index)
+        assert image.shape == (height, width, 3)
+        boxes = targets["boxes"]
+        assert ((boxes[:, :2] >= 0) & (boxes[:, 2:] < [width, height])).all()
+        assert (boxes[:, 2:] > boxes[:, :2]).all()
+        num_objects += len(boxes)
+    assert num_objects > 24
+
+    # the same images for any number of processes
+    pooled = write_synthetic_voc(
+        tmp_path,
+        "voc_2007_test",
+        num_images=24,
+        image_size=(120, 160),
+        chunk_size=8,
+        num_workers=2,
+    )
+    assert digest(pooled / "VOC2007") == digest(synthetic_voc_root / "VOC2007")
+
+
+def test_coco(synthetic_coco_root):
+    dataset = COCODataset(
+        synthetic_coco_root,
+        "coco_2014_val",
+        Split.Testing,
+        annotation_index_dir=synthetic_coco_root / "cache",
+    )
+    assert len(dataset) == 24
+    annotations = sum(len(dataset.coco.getAnnIds(imgIds=i)) for i in dataset._ids)
+    assert annotations == sum(len(dataset[i][1]["labels"]) for i in range(len(dataset)))
+    image, targets, _ = dataset[3]
+    info = dataset.get_img_info(3)
+    assert image.shape == (info["height"], info["width"], 3)
+    assert len(dataset.coco.getCatIds()) == 80
+
+
+def test_clouds(synthetic_clouds_root):
+    train = pandas.read_csv(synthetic_clouds_root / "train.csv")
+    assert len(train) == 20 * 4
+    encoded = train.dropna().iloc[0]
+    name, category = encoded["Image_Label"].split("_")
+    image = Image.open(synthetic_clouds_root / "train_images_525" / name)
+    mask = numpy.asarray(
+        Image.open(synthetic_clouds_root / "train_masks_525" / f"{category}{name}")
+    )
+    numpy.testing.assert_array_equal(
+        run_length_to_mask(encoded["EncodedPixels"], image.size[::-1]), mask // 255
+    )
+
+    dataset = CloudSegmentationDataset(
+        synthetic_clouds_root,
+        synthetic_clouds_root,
+        subset=Split.Testing,
+        uint8_transport=True,
+    )
+    assert len(dataset) == 4
+    image, masks, _ = dataset[0]
+    assert image.shape[0] == 3 and masks.shape[0] == 4
+    assert image.shape[1:] == masks.shape[1:]
+
+
+def test_penn_fudan(synthetic_penn_fudan_root):
+    dataset = PennFudanDataset(
+        synthetic_penn_fudan_root, return_variant=ReturnVariant.instanced
+    )
+    assert len(dataset) == 12
+    for index in range(len(dataset)):
+        image, masks = dataset[index]
+        assert 1 <= len(masks) <= 4
+        assert masks.shape[1:] == image.shape[1:]
+    binary = PennFudanDataset(synthetic_penn_fudan_root)
+    image, mask = binary[0]
+    assert image.shape == (3, *PennFudanDataset.image_size_T)
+    assert torch.equal(torch.unique(mask), torch.tensor([0.0, 1.0]))
+
+
+def test_cli(tmp_path):
+    NeodroidVisionCLI.synthesise(
+        "penn_fudan", str(tmp_path), num_images=3, height=64, width=48, num_workers=1
+    )
+    images = sorted((tmp_path / "PNGImages").iterdir())
+    assert len(images) == 3
+    for image in images:  # jittered by up to 20% per side
+        width, height = Image.open(image).size
+        assert 38 <= width <= 58 and 51 <= height <= 77
+    assert len(list((tmp_path / "PedMasks").iterdir())) == 3
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import os
+
+import numpy
+from draugr.torch_utilities import Split
+
+from neodroidvision.data.detection.voc import (
+    VOCAnnotationStore,
+    VOCDataset,
+    parse_voc_annotation,
+)
+from neodroidvision.data.synthetic_datasets import write_synthetic_voc
+
+CLASS_DICT = {name: i for i, name in enumerate(VOCDataset.categories)}
+
+
+def write_voc(data_root, num_images: int = 12):
+    """
+A synthetic voc_2007_test split, images without objects and difficult objects included
+
+:return: the data dir and the image ids
+"""
+    write_synthetic_voc(
+        data_root, "voc_2007_test", num_images=num_images, image_size=(60, 80)
+    )
+    data_dir = data_root / "VOC2007"
+    return data_dir, (data_dir / "ImageSets" / "Main" / "test.txt").read_text().split()
+
+
+def assert_store_matches_xml(store, data_dir, ids):
+    assert len(store) == len(ids)
+    for i, image_id in enumerate(ids):
+        boxes, labels, difficult, size = parse_voc_annotation(
+            data_dir / "Annotations" / f"{image_id}.xml", CLASS_DICT
+        )
+        s_boxes, s_labels, s_difficult = store.annotation(i)
+        numpy.testing.assert_array_equal(s_boxes, boxes)
+        numpy.testing.assert_array_equal(s_labels, labels)
+        numpy.testing.assert_array_equal(s_difficult, difficult)
+        assert s_boxes.dtype == numpy.float32 and s_boxes.shape == (len(labels), 4)
+        assert s_labels.dtype == numpy.int64 and s_difficult.dtype == numpy.uint8
+        assert store.img_info(i) == size
+
+
+def test_store_round_trip(tmp_path):
+    cache_dir = tmp_path / "cache"
+    data_dir, ids = write_voc(tmp_path)
+
+    assert (
+        VOCAnnotationStore.load(data_dir, ids, CLASS_DICT, cache_dir=cache_dir) is None
+    )
+    VOCAnnotationStore.build(data_dir, ids, CLASS_DICT, cache_dir=cache_dir)
+    store = VOCAnnotationStore.load(data_dir, ids, CLASS_DICT, cache_dir=cache_dir)
+    assert isinstance(store.boxes, numpy.memmap)
+    assert_store_matches_xml(store, data_dir, ids)
+
+    boxes, *_ = store.annotation(0)
+    boxes += 1  # copies, the store stays read-only
+
+
+def test_store_process_pool_parse(tmp_path):
+    data_dir, ids = write_voc(tmp_path, num_images=20)
+    serial = VOCAnnotationStore.build(
+        data_dir, ids, CLASS_DICT, cache_dir=tmp_path / "serial"
+    )
+    pooled = VOCAnnotationStore.build(
+        data_dir, ids, CLASS_DICT, num_workers=2, cache_dir=tmp_path / "pooled"
+    )
+    for column in ("boxes", "labels", "difficult", "offsets", "sizes"):
+        numpy.testing.assert_array_equal(
+            getattr(serial, column), getattr(pooled, column)
+        )
+
+
+def test_store_invalidated_by_annotation_changes(tmp_path):
+    cache_dir = tmp_path / "cache"
+    data_dir, ids = write_voc(tmp_path)
+    VOCAnnotationStore.open(data_dir, ids, CLASS_DICT, cache_dir=cache_dir)
+    assert VOCAnnotationStore.load(data_dir, ids, CLASS_DICT, cache_dir=cache_dir)
+
+    edited = data_dir / "Annotations" / f"{ids[3]}.xml"
+    edited.write_text(
+        "<annotation><size><width>64</width><height>32</height></size>"
+        "<object><name>dog</name><difficult>0</difficult>"
+        "<bndbox><xmin>2</xmin><ymin>3</ymin><xmax>10</xmax><ymax>12</ymax></bndbox>"
+        "</object></annotation>"
+    )
+    stat = edited.stat()
+    os.utime(str(edited), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert VOCAnnotationStore.load(data_dir, ids, CLASS_DICT, cache_dir=cache_dir)
+    assert (
+        VOCAnnotationStore.load(
+            data_dir, ids, CLASS_DICT, cache_dir=cache_dir, verify_files=True
+        )
+        is None
+    )
+
+    store = VOCAnnotationStore.open(
+        data_dir, ids, CLASS_DICT, cache_dir=cache_dir, verify_files=True
+    )
+    assert store.img_info(3) == (32, 64)
+    numpy.testing.assert_array_equal(store.annotation(3)[0], [[1, 2, 9, 11]])
+    assert_store_matches_xml(store, data_dir, ids)
+
+    (data_dir / "Annotations" / "unrelated.xml").write_text("<annotation/>")
+    assert (
+        VOCAnnotationStore.load(data_dir, ids, CLASS_DICT, cache_dir=cache_dir) is None
+    )
+
+
+def test_voc_dataset_backed_by_store(tmp_path):
+    _, ids = write_voc(tmp_path)
+    stored = VOCDataset(
+        tmp_path,
+        "voc_2007_test",
+        Split.Testing,
+        annotation_store_dir=tmp_path / "cache",
+    )
+    parsed = VOCDataset(
+        tmp_path, "voc_2007_test", Split.Testing, use_annotation_store=False
+    )
+    assert len(stored) == len(parsed) == len(ids)
+    for i in range(len(ids)):
+        assert stored.get_img_info(i) == parsed.get_img_info(i)
+        s_id, s_annotation = stored.get_annotation(i)
+        p_id, p_annotation = parsed.get_annotation(i)
+        assert s_id == p_id
+        for s, p in zip(s_annotation, p_annotation):
+            numpy.testing.assert_array_equal(s, p)
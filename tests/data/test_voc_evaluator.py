@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy
+import pytest
+import torch
+
+from benchmarks.fixtures import synthetic_detections
+from neodroidvision.data.detection.voc import VOCEvaluator, eval_detection_voc
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_voc_evaluator_matches_eval_detection_voc(seed):
+    predictions, gt = synthetic_detections(60, seed=seed)
+
+    evaluator = VOCEvaluator()
+    for start in range(0, len(gt), 7):  # streamed in batches
+        evaluator.update(predictions[start : start + 7], gt[start : start + 7])
+    results = evaluator.compute()
+
+    for t, iou_threshold in enumerate(results["iou_thresholds"]):
+        for key, use_07_metric in (("ap", False), ("ap_07", True)):
+            ap, mean_ap = eval_detection_voc(
+                *zip(*predictions),
+                *zip(*gt),
+                iou_thresh=iou_threshold,
+                use_07_metric=use_07_metric,
+            )
+            numpy.testing.assert_array_equal(results[key][t], ap)
+            assert results[f"m{key}"][t] == mean_ap
+
+
+def test_voc_evaluator_accepts_tensors_and_mappings():
+    predictions, gt = synthetic_detections(10, seed=3)
+    reference = VOCEvaluator(iou_thresholds=(0.5,))
+    reference.update(predictions, gt)
+
+    evaluator = VOCEvaluator(iou_thresholds=(0.5,))
+    evaluator.update(
+        [
+            dict(
+                boxes=torch.from_numpy(b),
+                labels=torch.from_numpy(l),
+                scores=torch.from_numpy(s),
+            )
+            for b, l, s in predictions
+        ],
+        [tuple(torch.from_numpy(a) for a in g) for g in gt],
+    )
+    assert evaluator.num_images == 10
+    numpy.testing.assert_array_equal(
+        reference.compute()["ap_07"], evaluator.compute()["ap_07"]
+    )
+
+
+def test_voc_evaluator_without_difficult():
+    predictions, gt = synthetic_detections(10, seed=4)
+    gt_boxes, gt_labels, _ = zip(*gt)
+    evaluator = VOCEvaluator(iou_thresholds=(0.5,))
+    evaluator.update(predictions, zip(gt_boxes, gt_labels))
+
+    ap, _ = eval_detection_voc(*zip(*predictions), gt_boxes, gt_labels)
+    numpy.testing.assert_array_equal(evaluator.compute()["ap"][0], ap)
+
+
+@pytest.mark.parametrize("seed", [5, 6])
+def test_voc_evaluator_ranks_tied_scores_as_eval_detection_voc(seed):
+    predictions, gt = synthetic_detections(40, seed=seed)
+    predictions = [
+        (boxes, labels, numpy.round(scores, 1)) for boxes, labels, scores in predictions
+    ]
+
+    evaluator = VOCEvaluator()
+    evaluator.update(predictions, gt)
+    results = evaluator.compute()
+
+    for t, iou_threshold in enumerate(results["iou_thresholds"]):
+        ap, _ = eval_detection_voc(
+            *zip(*predictions), *zip(*gt), iou_thresh=iou_threshold
+        )
+        numpy.testing.assert_array_equal(results["ap"][t], ap)
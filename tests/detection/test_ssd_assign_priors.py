@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import torch
+
+from benchmarks.fixtures import ENCODING_CFG, random_targets
+from neodroidvision.detection.single_stage.ssd.bounding_boxes import (
+    SSDAnnotationTransform,
+    SSDBatchAnnotationTransform,
+    ssd_assign_priors,
+    ssd_assign_priors_batched,
+)
+from neodroidvision.utilities import BatchCollator, pad_targets
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+
+def test_assign_priors_batched_parity():
+    g = torch.Generator().manual_seed(0)
+    priors = SSDAnnotationTransform(**ENCODING_CFG).corner_form_priors
+
+    samples = [random_targets(n, g) for n in (1, 3, 7, 12, 2)]
+    duplicate_boxes, _ = random_targets(2, g)
+    samples.append(  # targets sharing their best prior, the last one must win
+        (duplicate_boxes[[0, 0, 1]], torch.tensor([3, 5, 7]))
+    )
+
+    gt_boxes, gt_labels, gt_mask = pad_targets(*zip(*samples))
+    boxes, labels = ssd_assign_priors_batched(
+        gt_boxes=gt_boxes,
+        gt_labels=gt_labels,
+        gt_mask=gt_mask,
+        corner_form_priors=priors,
+        iou_threshold=0.5,
+    )
+
+    for i, (sample_boxes, sample_labels) in enumerate(samples):
+        expected_boxes, expected_labels = ssd_assign_priors(
+            gt_boxes=sample_boxes,
+            gt_labels=sample_labels,
+            corner_form_priors=priors,
+            iou_threshold=0.5,
+        )
+        assert torch.equal(labels[i], expected_labels)
+        assert torch.equal(boxes[i], expected_boxes)
+    assert (labels[-1] == 7).sum() > 0 and (labels[-1] == 5).sum() > 0
+
+
+def test_collate_time_encoding():
+    g = torch.Generator().manual_seed(1)
+    samples = [random_targets(n, g) for n in (4, 1, 6)]
+    batch = [
+        (torch.zeros(3, 8, 8), dict(boxes=b.numpy(), labels=l.numpy()), i)
+        for i, (b, l) in enumerate(samples)
+    ]
+    empty_targets = dict(boxes=torch.zeros((0, 4)), labels=torch.zeros((0,)).long())
+    batch.append((torch.zeros(3, 8, 8), empty_targets, 3))
+
+    images, targets, ids = BatchCollator(
+        annotation_transform=SSDBatchAnnotationTransform(**ENCODING_CFG)
+    )(batch)
+
+    per_sample = SSDAnnotationTransform(**ENCODING_CFG)
+    for i, (b, l) in enumerate(samples):
+        locations, labels = per_sample(b, l)
+        assert torch.equal(targets["labels"][i], labels)
+        assert torch.allclose(targets["boxes"][i], locations)
+
+    assert images.shape == (4, 3, 8, 8)
+    assert (targets["labels"][3] == 0).all()
+    assert torch.isfinite(targets["boxes"]).all()
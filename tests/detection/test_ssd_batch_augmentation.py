@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import cv2
+import numpy
+import pytest
+import torch
+from draugr.torch_utilities import Split
+
+from neodroidvision.detection.single_stage.ssd.bounding_boxes import (
+    SSDBatchAnnotationTransform,
+    SSDBatchAugmentation,
+    SSDBatchAugmentedLoader,
+    SSDSourceTransform,
+    SSDTransform,
+)
+from neodroidvision.detection.single_stage.ssd.bounding_boxes.ssd_batch_augmentation import (
+    resample_axis_aligned,
+    scale_saturation,
+    shift_hue,
+)
+from neodroidvision.detection.single_stage.ssd.config.ssd_base_config import base_cfg
+from neodroidvision.utilities import BatchCollator
+
+PIXEL_MEAN = (123, 117, 104)
+
+
+def opencv_hsv_op(image, hue=0.0, saturation=1.0):
+    hsv = cv2.cvtColor(image.permute(1, 2, 0).numpy(), cv2.COLOR_RGB2HSV)
+    hsv[..., 1] *= saturation
+    hsv[..., 0] += hue
+    hsv[..., 0][hsv[..., 0] > 360.0] -= 360.0
+    hsv[..., 0][hsv[..., 0] < 0.0] += 360.0
+    return cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
+
+
+def test_hsv_ops_match_opencv():
+    images = torch.rand(4, 3, 9, 11) * 255
+    images[0, :, 0, 0] = 100  # grey, no hue
+    images[1, :2, 0, 0] = 200  # equal maxima
+    factors = torch.tensor([0.5, 1.3, -17.0, 18.0]).view(-1, 1, 1, 1)
+    saturated = scale_saturation(images[:2], factors[:2])
+    shifted = shift_hue(images[2:], factors[2:])
+    for i in range(2):
+        numpy.testing.assert_allclose(
+            saturated[i].permute(1, 2, 0).numpy(),
+            opencv_hsv_op(images[i], saturation=factors[i].item()),
+            atol=1e-2,
+        )
+        numpy.testing.assert_allclose(
+            shifted[i].permute(1, 2, 0).numpy(),
+            opencv_hsv_op(images[2 + i], hue=factors[2 + i].item()),
+            atol=1e-2,
+        )
+
+
+def test_resample_matches_grid_coverage():
+    images = torch.ones(3, 1, 20, 20)
+    scale = torch.tensor([[1.0, 1.0], [2.0, 1.5], [-0.5, 0.4]])
+    shift = torch.tensor([[0.0, 0.0], [-0.6, -0.2], [0.9, 0.3]])
+    resampled, coverage = resample_axis_aligned(images, scale, shift, 16)
+    torch.testing.assert_allclose(resampled, coverage)
+    assert coverage[0].min() == 1 and coverage[2].min() == 1
+    assert coverage[1].min() == 0
+
+
+def test_boxes_follow_the_image():
+    batch_size, size, out = 64, 128, 64
+    images = (
+        torch.tensor(PIXEL_MEAN, dtype=torch.uint8)
+        .view(1, 3, 1, 1)
+        .repeat(batch_size, 1, size, size)
+    )
+    boxes = torch.tensor([[0.1, 0.2, 0.4, 0.6], [0.55, 0.5, 0.95, 0.9]])
+    values = (250, 10)
+    for (x1, y1, x2, y2), value in zip((boxes * size).long().tolist(), values):
+        images[:, :, y1:y2, x1:x2] = value
+    augmentation = SSDBatchAugmentation(
+        out,
+        PIXEL_MEAN,
+        photometric_distort=False,
+        generator=torch.Generator().manual_seed(0),
+    )
+    images, out_boxes, labels, mask = augmentation(
+        images,
+        boxes.repeat(batch_size, 1, 1),
+        torch.tensor([1, 2]).repeat(batch_size, 1),
+        torch.ones(batch_size, 2, dtype=torch.bool),
+    )
+    assert images.shape == (batch_size, 3, out, out)
+    assert mask.any() and not mask.all()
+    assert (labels[~mask] == 0).all() and (out_boxes[~mask] == 0).all()
+    assert (out_boxes[mask] >= 0).all() and (out_boxes[mask] <= 1).all()
+
+    checked = 0
+    for i, j in mask.nonzero().tolist():
+        x1, y1, x2, y2 = (out_boxes[i, j] * out).tolist()
+        x1, y1, x2, y2 = int(x1 + 1.5), int(y1 + 1.5), int(x2 - 1.5), int(y2 - 1.5)
+        if x2 > x1 and y2 > y1:  # the inside, away from the interpolated edges
+            patch = images[i, 0, y1:y2, x1:x2]
+            assert (patch - (values[j] - PIXEL_MEAN[0])).abs().max() < 4
+            checked += 1
+    assert checked > batch_size // 2
+
+
+def test_statistics_match_per_sample_pipeline():
+    num_samples, size, out = 600, 96, 48
+    rng = numpy.random.RandomState(0)
+    image = rng.randint(0, 255, (size, size, 3)).astype(numpy.uint8)
+    boxes = numpy.array([[8, 15, 38, 52], [52, 45, 90, 86]], numpy.float32)
+    labels = numpy.array([1, 2])
+
+    def statistics(num_boxes, areas, images):
+        return numpy.array(
+            [num_boxes.mean(), areas.mean(), images.mean(), images.std(1).mean()]
+        )
+
+    numpy.random.seed(0)
+    transform = SSDTransform(out, PIXEL_MEAN, Split.Training)
+    num_boxes, areas, images = [], [], []
+    for _ in range(num_samples):
+        i, b, _ = transform(image.copy(), boxes.copy(), labels.copy())
+        num_boxes.append(len(b))
+        areas.append(((b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])).sum() / max(1, len(b)))
+        images.append(i.reshape(-1).numpy())
+    reference = statistics(
+        numpy.array(num_boxes), numpy.array(areas), numpy.stack(images)
+    )
+
+    torch.manual_seed(0)
+    i, b, _, m = SSDBatchAugmentation(out, PIXEL_MEAN)(
+        torch.from_numpy(image).permute(2, 0, 1).repeat(num_samples, 1, 1, 1),
+        torch.from_numpy(boxes / size).repeat(num_samples, 1, 1),
+        torch.from_numpy(labels).repeat(num_samples, 1),
+        torch.ones(num_samples, 2, dtype=torch.bool),
+    )
+    areas = ((b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])).sum(1)
+    batched = statistics(
+        m.sum(1).float().numpy(),
+        (areas / m.sum(1).clamp(min=1)).numpy(),
+        i.reshape(num_samples, -1).numpy(),
+    )
+    tolerance = 0.1 * numpy.abs(reference) + (0, 0, 4, 0)  # the mean pixel varies the most
+    assert (numpy.abs(batched - reference) <= tolerance).all(), (batched, reference)
+
+
+class FixedDataset(torch.utils.data.Dataset):
+    def __init__(self, transform):
+        self.transform = transform
+
+    def __len__(self):
+        return 10
+
+    def __getitem__(self, index):
+        rng = numpy.random.RandomState(index)
+        height, width = rng.randint(40, 80, 2)
+        boxes = numpy.array(
+            [[2, 3, width // 2, height // 2], [5, 7, width - 2, height - 1]][
+                : 1 + index % 2
+            ],
+            numpy.float32,
+        )
+        image, boxes, labels = self.transform(
+            rng.randint(0, 255, (height, width, 3)).astype(numpy.uint8),
+            boxes,
+            numpy.arange(1, len(boxes) + 1),
+        )
+        return image, dict(boxes=boxes, labels=labels), index
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_augmented_loader(threaded):
+    cfg = base_cfg
+    annotation_transform = SSDBatchAnnotationTransform(
+        image_size=cfg.input.image_size,
+        priors_cfg=cfg.model.box_head.priors,
+        center_variance=cfg.model.box_head.center_variance,
+        size_variance=cfg.model.box_head.size_variance,
+        iou_threshold=cfg.model.box_head.iou_threshold,
+    )
+    data_loader = torch.utils.data.DataLoader(
+        FixedDataset(SSDSourceTransform(64)),
+        batch_size=4,
+        collate_fn=BatchCollator(padded=True),
+    )
+    images, targets, _ = next(iter(data_loader))
+    assert images.dtype == torch.uint8 and images.shape == (4, 3, 64, 64)
+    assert targets["mask"].tolist()[:2] == [[True, False], [True, True]]
+
+    loader = SSDBatchAugmentedLoader(
+        data_loader,
+        SSDBatchAugmentation(cfg.input.image_size, cfg.input.pixel_mean),
+        annotation_transform,
+        threaded=threaded,
+    )
+    assert len(loader) == 3
+    batches = list(loader)
+    assert [len(ids) for _, _, ids in batches] == [4, 4, 2]
+    images, targets, _ = batches[0]
+    num_priors = annotation_transform.center_form_priors.shape[0]
+    assert images.shape == (4, 3, cfg.input.image_size, cfg.input.image_size)
+    assert targets["boxes"].shape == (4, num_priors, 4)
+    assert targets["labels"].shape == (4, num_priors)
+
+    for _ in zip(range(1), loader):  # abandoning the iteration stops the thread
+        pass
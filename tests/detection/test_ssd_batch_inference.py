@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import json
+from pathlib import Path
+
+import pytest
+import torch
+
+from neodroidvision.detection import SingleShotDectectionNms
+from neodroidvision.detection.single_stage.ssd.batch_inference import (
+    DetectionResultWriter,
+    detect_images,
+    find_images,
+    image_id_of,
+    image_ids_of,
+    load_config,
+)
+from neodroidvision.entry_points.cli import NeodroidVisionCLI
+from neodroidvision.utilities import CheckPointer
+
+CONFIG = """
+import copy
+
+from neodroidvision.data.detection.voc import VOCDataset
+from neodroidvision.detection import SSDLiteBoxPredictor
+from neodroidvision.detection.single_stage.ssd.architecture.backbones import (
+    mobilenet_v2_factory,
+)
+from neodroidvision.detection.single_stage.ssd.config import ssd_base_config
+
+base_cfg = copy.deepcopy(ssd_base_config.base_cfg)
+base_cfg.model.backbone.update(
+    name=mobilenet_v2_factory,
+    out_channels=(96, 1280, 512, 256, 256, 64),
+    predictor_type=SSDLiteBoxPredictor,
+    pretrained=False,
+)
+base_cfg.model.box_head.priors.update(
+    feature_maps=(20, 10, 5, 3, 2, 1),
+    strides=(16, 32, 64, 106, 160, 320),
+    min_sizes=(60, 105, 150, 195, 240, 285),
+    max_sizes=(105, 150, 195, 240, 285, 330),
+    aspect_ratios=((2, 3),) * 6,
+    boxes_per_location=(6,) * 6,
+)
+base_cfg.input.update(image_size=320)
+base_cfg.dataset_type = VOCDataset
+"""
+
+
+@pytest.fixture(scope="module")
+def ssd_checkpoint(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("ssd")
+    (directory / "mobilenet_v2_ssd320.py").write_text(CONFIG)
+    cfg = load_config(directory / "mobilenet_v2_ssd320.py")
+    torch.manual_seed(0)
+    CheckPointer(
+        SingleShotDectectionNms(cfg), save_dir=directory, save_to_disk=True
+    ).save("model")
+    return directory / "model.pth", directory / "mobilenet_v2_ssd320.py"
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_find_images(synthetic_voc_root):
+    images = synthetic_voc_root / "VOC2007" / "JPEGImages"
+    assert len(find_images(images)) == 24
+    assert find_images(f"{images}/00000[0-4].jpg") == sorted(
+        images.glob("00000[0-4].jpg")
+    )
+    assert find_images(images / "000003.jpg") == [images / "000003.jpg"]
+    assert image_id_of(images / "000003.jpg", 7) == 3
+    assert image_id_of(images / "cat.jpg", 7) == 7
+
+
+def test_image_ids_are_unique():
+    assert image_ids_of([Path("a/000003.jpg"), Path("a/000012.jpg")]) == [3, 12]
+    assert image_ids_of([Path("a/1.jpg"), Path("b/1.jpg")]) == [0, 1]
+    assert image_ids_of([Path("img3.jpg"), Path("a.jpg"), Path("b.jpg")]) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_cli_detect_and_resume(
+    ssd_checkpoint, synthetic_voc_root, tmp_path, num_workers
+):
+    checkpoint, config = ssd_checkpoint
+    images = synthetic_voc_root / "VOC2007" / "JPEGImages"
+    output = tmp_path / "detections.jsonl"
+    detect = lambda **kws: NeodroidVisionCLI.detect(
+        str(checkpoint),
+        str(config),
+        str(images),
+        str(output),
+        batch_size=5,
+        num_workers=num_workers,
+        device="cpu",
+        **kws,
+    )
+    detect()
+    lines = read_lines(output)
+    assert [l["file"] for l in lines] == [str(p) for p in find_images(images)]
+    line = lines[0]
+    assert len(line["boxes"]) == len(line["labels"]) == len(line["scores"]) > 0
+    assert line["categories"][0] in load_config(config).dataset_type.categories
+
+    # interrupted after the second batch, while writing the third
+    progress = tmp_path / ".detections.jsonl.progress"
+    records = read_lines(progress)
+    progress.write_text("".join(json.dumps(r) + "\n" for r in records[:2]) + '{"fi')
+    with open(output, "ab") as f:
+        f.write(b'{"file": "partial')
+    detect()
+    assert read_lines(output) == lines
+    assert sum(len(r["files"]) for r in read_lines(progress)) == 24
+
+    detect(resume=False, score_threshold=0.5)
+    assert all(min(l["scores"], default=1) > 0.5 for l in read_lines(output))
+
+
+def test_coco_results_resume(ssd_checkpoint, synthetic_voc_root, tmp_path):
+    checkpoint, config = ssd_checkpoint
+    cfg = load_config(config)
+    cfg.model.box_head.batched_post_processing = True
+    model = SingleShotDectectionNms(cfg)
+    CheckPointer(model).load(checkpoint, use_latest=False, keys=("model",))
+    model.post_init()
+    model.eval()
+    paths = find_images(synthetic_voc_root / "VOC2007" / "JPEGImages")
+    output = tmp_path / "detections.json"
+
+    def run(image_paths, interrupt=False):
+        with DetectionResultWriter(output, "coco", category_ids={1: 100}) as writer:
+            statistics = detect_images(
+                model,
+                image_paths,
+                writer,
+                image_size=cfg.input.image_size,
+                pixel_mean=cfg.input.pixel_mean,
+                batch_size=4,
+                log=None,
+            )
+            if interrupt:
+                raise KeyboardInterrupt
+        return statistics
+
+    with pytest.raises(KeyboardInterrupt):
+        run(paths[:10], interrupt=True)
+    with pytest.raises(json.JSONDecodeError):  # the array is left open
+        json.loads(output.read_text())
+    statistics = run(paths)
+    assert statistics["images"] == 14 and statistics["skipped"] == 10
+
+    results = json.loads(output.read_text())
+    assert {r["image_id"] for r in results} <= {image_id_of(p, 0) for p in paths}
+    assert all(r["category_id"] != 1 for r in results)
+    assert any(r["category_id"] == 100 for r in results)
+    assert all(len(r["bbox"]) == 4 and r["bbox"][2] >= 0 for r in results)
+
+    run(paths)  # nothing left to do, the array is closed again
+    assert json.loads(output.read_text()) == results
+
+
+def test_per_image_post_processing_scores(ssd_checkpoint, synthetic_voc_root, tmp_path):
+    checkpoint, config = ssd_checkpoint
+    paths = find_images(synthetic_voc_root / "VOC2007" / "JPEGImages")[:3]
+
+    def run(batched_post_processing):
+        cfg = load_config(config)
+        cfg.model.box_head.batched_post_processing = batched_post_processing
+        model = SingleShotDectectionNms(cfg)
+        CheckPointer(model).load(checkpoint, use_latest=False, keys=("model",))
+        model.post_init()
+        model.eval()
+        output = tmp_path / f"{batched_post_processing}.jsonl"
+        with DetectionResultWriter(output, "jsonl") as writer:
+            detect_images(
+                model,
+                paths,
+                writer,
+                image_size=cfg.input.image_size,
+                pixel_mean=cfg.input.pixel_mean,
+                batch_size=1,  # the per image outputs of a batch are stacked
+                log=None,
+            )
+        return read_lines(output)
+
+    per_image, batched = run(False), run(True)
+    assert sum(len(l["scores"]) for l in per_image) > 0
+    for line, expected in zip(per_image, batched):
+        assert all(0 < s <= 1 for s in line["scores"])
+        assert max(line["scores"]) == pytest.approx(max(expected["scores"]), abs=1e-4)
+
+
+def test_coco_results_of_same_file_names(ssd_checkpoint, synthetic_voc_root, tmp_path):
+    checkpoint, config = ssd_checkpoint
+    cfg = load_config(config)
+    model = SingleShotDectectionNms(cfg)
+    CheckPointer(model).load(checkpoint, use_latest=False, keys=("model",))
+    model.post_init()
+    model.eval()
+    source = find_images(synthetic_voc_root / "VOC2007" / "JPEGImages")
+    for directory, image in zip(("a", "b"), source[:2]):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "1.jpg").write_bytes(image.read_bytes())
+    paths = find_images(f"{tmp_path}/*/1.jpg")
+    assert len(paths) == 2
+
+    output = tmp_path / "detections.json"
+    with DetectionResultWriter(output, "coco") as writer:
+        detect_images(
+            model,
+            paths,
+            writer,
+            image_size=cfg.input.image_size,
+            pixel_mean=cfg.input.pixel_mean,
+            log=None,
+        )
+    image_ids = json.loads(writer.image_ids_path.read_text())
+    assert image_ids == {str(paths[0]): 0, str(paths[1]): 1}
+    results = json.loads(output.read_text())
+    assert results and {r["image_id"] for r in results} <= {0, 1}
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import torch
+
+from benchmarks.fixtures import make_head, random_features
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+
+def test_batched_post_processing_parity():
+    features = random_features(4)
+    per_image = make_head()(features)
+    batched = make_head(batched_post_processing=True)(features)
+
+    assert batched.boxes.shape == (4, 20, 4)
+    for i in range(4):
+        n = int(batched.num_detections[i])
+        assert n == per_image.boxes[i].shape[0]
+        assert torch.allclose(batched.boxes[i, :n], per_image.boxes[i], atol=1e-4)
+        assert torch.equal(batched.labels[i, :n], per_image.labels[i].long())
+        assert torch.allclose(batched.scores[i, :n], per_image.scores[i].exp())
+
+
+def test_batched_post_processing_threshold_and_padding():
+    features = random_features(3, seed=1)
+    out = make_head(batched_post_processing=True, confidence_threshold=0.999)(features)
+
+    counts = out.num_detections
+    assert (counts < 20).all()
+    for i, n in enumerate(counts.tolist()):
+        assert (out.scores[i, :n] > 0.999).all()
+        assert (out.scores[i, n:] == 0).all()
+        assert (out.labels[i, n:] == 0).all()
+        assert (out.boxes[i, n:] == 0).all()
+
+
+def test_batched_post_processing_traces():
+    head = make_head(batched_post_processing=True, confidence_threshold=0.5).eval()
+    traced = torch.jit.trace(head, (random_features(2),), check_trace=False)
+
+    features = random_features(2, seed=2)
+    eager, exported = head(features), traced(features)
+    assert torch.equal(eager.num_detections, exported[3])
+    assert torch.allclose(eager.boxes, exported[0])
+    assert torch.allclose(eager.scores, exported[2])
+
+
+def test_nms_backend_selection():
+    features = random_features(2, seed=3)
+    for batched in (False, True):
+        reference = make_head(batched_post_processing=batched)(features)
+        tensor = make_head(batched_post_processing=batched, nms_backend="tensor")(
+            features
+        )
+        if batched:
+            assert torch.equal(reference.num_detections, tensor.num_detections)
+            assert torch.equal(reference.boxes, tensor.boxes)
+        else:
+            for a, b in zip(reference.boxes, tensor.boxes):
+                assert torch.equal(a, b)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy
+import torch
+from torch.utils.data import DataLoader, Dataset, Subset
+
+from benchmarks.fixtures import make_head, synthetic_detections
+from neodroidvision.data.detection.voc import (
+    VOCDataset,
+    VOCEvaluator,
+    eval_detection_voc,
+)
+from neodroidvision.detection.single_stage.ssd.prediction_spilling import (
+    PredictionWriter,
+    SpilledPredictions,
+)
+from neodroidvision.detection.single_stage.ssd.ssd_evaluation import (
+    compute_on_dataset,
+    inference_ssd,
+)
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+
+class AnnotatedNoise(Dataset):
+    """Random ssd head inputs with the annotation interface of VOCDataset"""
+
+    def __init__(self, num_images: int = 6):
+        self.features = (
+            torch.randn(
+                (num_images, 8732, 21), generator=torch.Generator().manual_seed(0)
+            )
+            * 3
+        )
+        self.gt = synthetic_detections(num_images, num_categories=21)[1]
+
+    def __getitem__(self, index):
+        return self.features[index], 0, index
+
+    def __len__(self):
+        return len(self.features)
+
+    def get_img_info(self, index):
+        return 375, 500
+
+    def get_annotation(self, index):
+        return str(index), self.gt[index]
+
+
+class VOCAnnotatedNoise(AnnotatedNoise, VOCDataset):
+    """AnnotatedNoise evaluated as a VOCDataset"""
+
+
+def test_evaluation_alongside_inference():
+    dataset = AnnotatedNoise()
+    for batched in (False, True):
+        head = make_head(batched_post_processing=batched, confidence_threshold=0.2)
+        model = lambda logits: head((logits, torch.zeros((*logits.shape[:2], 4))))
+        evaluator = VOCEvaluator()
+        predictions = compute_on_dataset(
+            model,
+            DataLoader(dataset, batch_size=4),
+            torch.device("cpu"),
+            evaluator=evaluator,
+        )
+        assert sorted(predictions) == list(range(len(dataset)))
+        assert sum(len(p.boxes) for p in predictions.values())
+
+        scale = numpy.array((500 / 300, 375 / 300) * 2, dtype=numpy.float32)
+        ap, _ = eval_detection_voc(
+            [predictions[i].boxes.numpy() * scale for i in range(len(dataset))],
+            [predictions[i].labels.numpy() for i in range(len(dataset))],
+            [predictions[i].scores.numpy() for i in range(len(dataset))],
+            *zip(*dataset.gt),
+            use_07_metric=True,
+        )
+        numpy.testing.assert_allclose(evaluator.compute()["ap_07"][0], ap)
+
+
+def test_spilled_predictions_match_in_memory(tmp_path):
+    dataset = AnnotatedNoise(num_images=7)
+    head = make_head(batched_post_processing=True, confidence_threshold=0.2)
+    model = lambda logits: head((logits, torch.zeros((*logits.shape[:2], 4))))
+    expected = compute_on_dataset(
+        model, DataLoader(dataset, batch_size=4), torch.device("cpu")
+    )
+
+    # two ranks, the second padded with the first image as DistributedSampler does
+    for rank, indices in enumerate(([0, 1, 2, 3], [4, 5, 6, 0])):
+        with PredictionWriter(tmp_path, rank) as writer:
+            returned = compute_on_dataset(
+                model,
+                DataLoader(Subset(dataset, indices), batch_size=3),
+                torch.device("cpu"),
+                writer=writer,
+            )
+        assert returned == {} and writer.num_images == 4
+    assert not SpilledPredictions.is_complete(tmp_path)
+
+    merged = SpilledPredictions.merge(tmp_path, world_size=2)
+    assert SpilledPredictions.is_complete(tmp_path)
+    for predictions in (
+        merged,
+        SpilledPredictions(tmp_path),
+    ):  # reused as use_cached does
+        assert len(predictions) == len(dataset)
+        assert predictions.image_ids.tolist() == list(range(len(dataset)))
+        for i, prediction in enumerate(predictions):
+            for field, expected_field in zip(prediction, expected[i]):
+                torch.testing.assert_allclose(field, expected_field)
+            assert prediction.labels.dtype == expected[i].labels.dtype
+
+
+def test_inference_without_output_folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dataset = VOCAnnotatedNoise()
+    head = make_head(batched_post_processing=True, confidence_threshold=0.2)
+    model = lambda logits: head((logits, torch.zeros((*logits.shape[:2], 4))))
+
+    evaluator = VOCEvaluator()
+    compute_on_dataset(
+        model,
+        DataLoader(dataset, batch_size=4),
+        torch.device("cpu"),
+        evaluator=evaluator,
+    )
+    expected = evaluator.compute()
+
+    metrics = inference_ssd(
+        model=model,
+        data_loader=DataLoader(dataset, batch_size=4),
+        dataset_name="voc_2007_test",
+        device=torch.device("cpu"),
+    )["metrics"]
+    assert metrics["mAP"] == expected["map_07"][0]
+    assert metrics["mAP_50_95"] == numpy.mean(expected["map_07"])
+    ap = expected["ap_07"][0]
+    numpy.testing.assert_array_equal(
+        [metrics[VOCDataset.categories[i]] for i in range(1, len(ap))], ap[1:]
+    )
+    assert not list(tmp_path.iterdir())  # no result file written
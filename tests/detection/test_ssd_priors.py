@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from benchmarks.fixtures import PRIORS_300, PRIORS_512, build_priors_loop
+import neodroidvision
+from neodroidvision.detection.single_stage.ssd.bounding_boxes.ssd_priors import (
+    build_priors,
+    clear_priors_cache,
+)
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+
+@pytest.fixture
+def tmp_priors_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        neodroidvision, "PROJECT_APP_PATH", SimpleNamespace(user_cache=tmp_path)
+    )
+    clear_priors_cache()
+    yield tmp_path
+    clear_priors_cache()
+
+
+@pytest.mark.parametrize("cfg", [PRIORS_300, PRIORS_512], ids=["300", "512"])
+@pytest.mark.parametrize("clip", [True, False])
+def test_build_priors_parity(cfg, clip):
+    cfg = {**cfg, "clip": clip}
+    reference = build_priors_loop(**cfg)
+    priors = build_priors(cache=False, **cfg)
+    assert priors.shape == reference.shape
+    assert priors.dtype == reference.dtype
+    assert torch.equal(priors, reference)
+
+
+def test_build_priors_num_priors():
+    assert build_priors(cache=False, **PRIORS_300).shape == (8732, 4)
+    assert build_priors(cache=False, **PRIORS_512).shape == (24564, 4)
+
+
+def test_build_priors_cache(tmp_priors_cache):
+    first = build_priors(**PRIORS_300)
+    assert len(list((tmp_priors_cache / "ssd_priors").glob("*.pth"))) == 1
+
+    first.zero_()  # callers get their own copy
+    assert torch.equal(build_priors(**PRIORS_300), build_priors_loop(**PRIORS_300))
+
+    clear_priors_cache()  # process cache empty, served from disk
+    assert torch.equal(build_priors(**PRIORS_300), build_priors_loop(**PRIORS_300))
+
+    as_lists = {
+        k: list(v) if isinstance(v, tuple) else v for k, v in PRIORS_300.items()
+    }
+    build_priors(**as_lists)
+    assert len(list((tmp_priors_cache / "ssd_priors").glob("*.pth"))) == 1
+
+    build_priors(**PRIORS_512)
+    assert len(list((tmp_priors_cache / "ssd_priors").glob("*.pth"))) == 2
+
+    clear_priors_cache(disk=True)
+    assert not list((tmp_priors_cache / "ssd_priors").glob("*.pth"))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import json
+
+from benchmarks.runner import (
+    available_benchmarks,
+    compare_results,
+    main,
+    run_benchmarks,
+)
+
+
+def test_suite_covers_the_hot_paths():
+    names = {case.split("[")[0] for case in available_benchmarks()}
+    assert names == {
+        "build_priors",
+        "ssd_assign_priors",
+        "multi_box_loss",
+        "batched_non_maximum_suppression",
+        "ssd_nms_box_head_forward",
+        "eval_detection_voc",
+        "coco_evaluator_update",
+        "run_length_encoding",
+        "voc_dataset_getitem",
+        "skip_hourglass_fission",
+    }
+
+
+def test_run_and_compare(tmp_path):
+    results = run_benchmarks(
+        ["run_length_encoding[*height=350*", "voc_dataset_getitem*"],
+        repeats=2,
+        min_time=0.0,
+        log=None,
+    )
+    assert set(results["results"]) == {
+        "run_length_encoding[direction=encode,height=350,width=525]",
+        "run_length_encoding[direction=decode,height=350,width=525]",
+        "voc_dataset_getitem[annotation_store=False]",
+        "voc_dataset_getitem[annotation_store=True]",
+    }
+    for result in results["results"].values():
+        assert 0 < result["best"] <= result["median"] and result["repeats"] == 2
+
+    faster = {
+        "results": {
+            k: dict(v, best=v["best"] / 2) for k, v in results["results"].items()
+        }
+    }
+    assert compare_results(results, results) == {}
+    assert set(compare_results(results, faster, threshold=0.5)) == set(
+        results["results"]
+    )
+    assert compare_results(results, faster, threshold=1.5) == {}
+
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(faster))
+    arguments = ["--filter", "build_priors*", "--repeats", "1", "--min_time", "0"]
+    assert main(arguments + ["--save_baseline", str(baseline)]) == 0
+    slower = json.loads(baseline.read_text())
+    for result in slower["results"].values():
+        result["best"] /= 100
+    baseline.write_text(json.dumps(slower))
+    assert main(arguments + ["--baseline", str(baseline), "--threshold", "0.2"]) == 1
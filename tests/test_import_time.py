@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+
+           Importing neodroidvision or one of its packages must not import the heavy dependencies,
+           they are imported lazily by the names using them, see utilities.lazy_importing
+           """
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+HEAVY_MODULES = (
+    "albumentations",
+    "cv2",
+    "draugr",
+    "matplotlib",
+    "neodroid",
+    "pandas",
+    "pkg_resources",
+    "pycocotools",
+    "sklearn",
+    "torch",
+    "torchvision",
+)
+IMPORT_TIME_BUDGET = 0.25  # seconds, torch alone takes more
+
+
+def import_profile(module: str):
+    """
+Imports module in a fresh interpreter under -X importtime
+
+:return: the cumulative seconds of the top level neodroidvision imports, and the modules imported
+"""
+    script = (
+        "import json, sys; before = set(sys.modules); "
+        f"import {module}; "
+        "print(json.dumps(sorted(set(sys.modules) - before)))"
+    )
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    seconds = 0.0
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith(" neodroidvision"):  # not nested in another import
+            seconds += int(cumulative) * 1e-6
+    return seconds, json.loads(process.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "neodroidvision",
+        "neodroidvision.classification",
+        "neodroidvision.data",
+        "neodroidvision.detection",
+        "neodroidvision.multitask",
+        "neodroidvision.regression",
+        "neodroidvision.segmentation",
+        "neodroidvision.utilities",
+    ],
+)
+def test_import_is_lazy(module):
+    seconds, imported = import_profile(module)
+    heavy = [m for m in imported if m.split(".")[0] in HEAVY_MODULES]
+    assert not heavy, f"import {module} imported {heavy}"
+    assert seconds < IMPORT_TIME_BUDGET, f"import {module} took {seconds:.3f}s"
+
+
+def test_cli_does_not_import_torch():
+    _, imported = import_profile("neodroidvision.entry_points.cli")
+    assert not {"torch", "draugr"} & {m.split(".")[0] for m in imported}
+
+
+def test_lazy_attributes():
+    import neodroidvision
+    from neodroidvision import utilities
+    from neodroidvision.utilities import StageProfiler
+    from neodroidvision.utilities.stage_profiling import (
+        StageProfiler as DefinedStageProfiler,
+    )
+
+    assert StageProfiler is DefinedStageProfiler
+    assert neodroidvision.utilities is utilities
+    assert "StageProfiler" in utilities.__all__
+    assert "stage_profiling" in dir(utilities)
+    with pytest.raises(AttributeError):
+        utilities.not_a_name
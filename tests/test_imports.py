@@ -11,7 +11,6 @@ __all__ = []
 
 from pathlib import Path
 
-import pkg_resources
 from neodroidvision import PROJECT_NAME
 
 
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import pytest
+import torch
+
+from neodroidvision.utilities import (
+    CheckPointer,
+    CheckpointArchive,
+    is_checkpoint_archive,
+)
+
+
+def make_training():
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(torch.nn.Linear(4, 8), torch.nn.BatchNorm1d(8))
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.1, momentum=0.9)
+    scheduler = torch.optim.lr_scheduler.StepLR(optimizer, 2)
+    return model, optimizer, scheduler
+
+
+def step(model, optimizer, scheduler):
+    optimizer.zero_grad()
+    model(torch.randn(3, 4)).sum().backward()
+    optimizer.step()
+    scheduler.step()
+
+
+def test_asynchronous_save_snapshots_the_state(tmp_path):
+    model, optimizer, scheduler = make_training()
+    check_pointer = CheckPointer(
+        model, optimizer, scheduler, tmp_path, True, asynchronous=True
+    )
+    step(model, optimizer, scheduler)
+    check_pointer.save("model_000001", iteration=1)
+    expected = {k: v.clone() for k, v in model.state_dict().items()}
+    step(model, optimizer, scheduler)  # while it may still be written
+    check_pointer.save("model_000002", iteration=2)
+    check_pointer.wait()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "last_checkpoint.txt",
+        "model_000001.pth",
+        "model_000002.pth",
+    ]  # no temporary files left
+    assert check_pointer.get_checkpoint_file() == str(tmp_path / "model_000002.pth")
+    saved = torch.load(tmp_path / "model_000002.pth")["model"]
+    assert saved._metadata == model.state_dict()._metadata
+
+    restored, restored_optimizer, restored_scheduler = make_training()
+    extra = CheckPointer(
+        restored, restored_optimizer, restored_scheduler, tmp_path
+    ).load(tmp_path / "model_000001.pth", use_latest=False)
+    assert extra == {"iteration": 1}
+    for key, value in restored.state_dict().items():
+        assert torch.equal(value, expected[key])
+    assert restored_scheduler.last_epoch == 1
+    assert restored_optimizer.state_dict()["state"]
+
+
+def test_retention_keeps_the_last_and_the_best(tmp_path):
+    model, optimizer, scheduler = make_training()
+    check_pointer = CheckPointer(
+        model, optimizer, scheduler, tmp_path, True, keep_last=2, keep_best=1
+    )
+    for i, score in enumerate((0.1, 0.9, 0.3, None, 0.2)):
+        check_pointer.save(f"model_{i}", score=score)
+    assert sorted(p.name for p in tmp_path.glob("*.pth")) == [
+        "model_1.pth",
+        "model_3.pth",
+        "model_4.pth",
+    ]
+
+    # the history carries over to a resumed run
+    resumed = CheckPointer(
+        model, optimizer, scheduler, tmp_path, True, asynchronous=True, keep_last=1
+    )
+    resumed.save("model_5", score=0.5)
+    resumed.wait()
+    assert sorted(p.name for p in tmp_path.glob("*.pth")) == ["model_5.pth"]
+
+    best_only = CheckPointer(
+        model, save_dir=tmp_path, save_to_disk=True, keep_last=0, keep_best=1
+    )
+    best_only.save("model_6", score=0.1)
+    best_only.save("model_7", score=0.0)
+    assert sorted(p.name for p in tmp_path.glob("*.pth")) == [
+        "model_5.pth",
+        "model_7.pth",
+    ]
+
+
+def test_asynchronous_errors_surface_on_wait(tmp_path):
+    model, optimizer, scheduler = make_training()
+    check_pointer = CheckPointer(
+        model, None, None, tmp_path / "missing", True, asynchronous=True
+    )
+    check_pointer.save("model")
+    with pytest.raises(RuntimeError):
+        check_pointer.wait()
+
+
+@pytest.mark.parametrize("archive", [True, False])
+def test_partial_load(tmp_path, archive):
+    model, optimizer, scheduler = make_training()
+    step(model, optimizer, scheduler)
+    check_pointer = CheckPointer(
+        model, optimizer, scheduler, tmp_path, True, archive=archive
+    )
+    check_pointer.save("model", iteration=3)
+    assert is_checkpoint_archive(tmp_path / "model.pth") == archive
+
+    restored, restored_optimizer, restored_scheduler = make_training()
+    extra = CheckPointer(
+        restored, restored_optimizer, restored_scheduler, tmp_path
+    ).load(tmp_path / "model.pth", use_latest=False, keys=("model",))
+    assert extra == {}
+    for key, value in restored.state_dict().items():
+        assert torch.equal(value, model.state_dict()[key])
+    assert not restored_optimizer.state_dict()["state"]
+    assert restored_scheduler.last_epoch == 0
+
+    restored, *_ = make_training()
+    torch.nn.init.zeros_(restored[0].weight)
+    CheckPointer(restored, save_dir=tmp_path).load(
+        tmp_path / "model.pth", use_latest=False, prefixes=("1.",)
+    )
+    assert torch.equal(restored[1].running_mean, model[1].running_mean)
+    assert not restored[0].weight.any()
+
+
+def test_archive_is_memory_mapped(tmp_path):
+    model, optimizer, scheduler = make_training()
+    step(model, optimizer, scheduler)
+    CheckPointer(model, optimizer, scheduler, tmp_path, True, archive=True).save(
+        "model", iteration=3, architecture="ssd"
+    )
+    archive = CheckpointArchive(tmp_path / "model.pth")
+    assert archive.keys() == ["model", "optimizer", "scheduler", "iteration", "architecture"]
+
+    loaded = archive.load()
+    assert loaded["iteration"] == 3 and loaded["architecture"] == "ssd"
+    assert loaded["scheduler"] == scheduler.state_dict()
+    momentum = loaded["optimizer"]["state"][0]["momentum_buffer"]
+    assert torch.equal(momentum, optimizer.state_dict()["state"][0]["momentum_buffer"])
+
+    weights = archive.load(keys=("model",), prefixes=("0.",))["model"]
+    assert list(weights) == ["0.weight", "0.bias"]
+    assert weights["0.weight"].data_ptr() % 16 == 0
+    weights["0.weight"].zero_()  # copy on write, the file is untouched
+    assert torch.equal(
+        CheckpointArchive(tmp_path / "model.pth").load()["model"]["0.weight"],
+        model[0].weight.detach(),
+    )
+
+
+@pytest.mark.parametrize("archive", [True, False])
+def test_state_dict_metadata_round_trip(tmp_path, archive):
+    model, optimizer, scheduler = make_training()
+    CheckPointer(model, save_dir=tmp_path, save_to_disk=True, archive=archive).save(
+        "model"
+    )
+    metadata = model.state_dict()._metadata
+    assert metadata[""]["version"] and metadata["1"]["version"] == 2
+
+    if archive:
+        loaded = CheckpointArchive(tmp_path / "model.pth").load()["model"]
+        assert loaded._metadata == metadata
+    restored, *_ = make_training()
+    partial = CheckPointer(restored, save_dir=tmp_path)._load_file(
+        str(tmp_path / "model.pth"), ("model",), ("1.",)
+    )
+    assert all(name.startswith("1.") for name in partial["model"])
+    assert partial["model"]._metadata == metadata
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import numpy
+from torch.utils.data.sampler import BatchSampler, SequentialSampler
+
+from neodroidvision.utilities import (
+    DistributedSampler,
+    FeistelPermutation,
+    LimitedBatchResampler,
+)
+
+
+def test_feistel_permutation_is_a_permutation():
+    for n in (1, 2, 3, 17, 1000, 4097):
+        indices = FeistelPermutation(n, seed=3, epoch=1)(numpy.arange(n))
+        assert sorted(indices.tolist()) == list(range(n))
+    first, second = (
+        FeistelPermutation(1000, epoch=e)(numpy.arange(1000)) for e in (0, 1)
+    )
+    assert not numpy.array_equal(first, second)
+    numpy.testing.assert_array_equal(
+        first, FeistelPermutation(1000, epoch=0)(numpy.arange(1000))
+    )
+
+
+def test_ranks_partition_the_padded_permutation():
+    dataset = range(103)
+    samplers = [DistributedSampler(dataset, num_replicas=4, rank=r) for r in range(4)]
+    ranks = [list(sampler) for sampler in samplers]
+    assert all(len(indices) == len(samplers[0]) == 26 for indices in ranks)
+    flat = [i for indices in ranks for i in indices]
+    assert set(flat) == set(range(103))
+    assert flat[103:] == flat[:1]  # the extra sample wraps around
+
+    unshuffled = DistributedSampler(dataset, num_replicas=4, rank=3, shuffle=False)
+    assert list(unshuffled) == list(range(78, 103)) + [0]
+
+
+def test_resumes_mid_epoch_from_its_state():
+    sampler = DistributedSampler(range(10000), num_replicas=2, rank=1, seed=7)
+    sampler.chunk_size = 64
+    sampler.set_epoch(3)
+    expected = list(sampler)
+
+    iterator = iter(sampler)
+    consumed = [next(iterator) for _ in range(1000)]
+    state = sampler.state_dict()
+    assert state == {"seed": 7, "epoch": 3, "offset": 1000}
+
+    resumed = DistributedSampler(range(10000), num_replicas=2, rank=1)
+    resumed.load_state_dict(state)
+    assert consumed + list(resumed) == expected
+    assert resumed.offset == 0  # the next iteration is a whole epoch again
+
+    abandoned = iter(resumed)
+    next(abandoned)
+    assert resumed.state_dict()["offset"] == 1
+    assert list(resumed) == expected  # does not continue the abandoned iteration
+    assert resumed.state_dict()["offset"] == 0
+
+
+class CountingSampler(DistributedSampler):
+    drawn = 0
+
+    def __iter__(self):
+        for index in super().__iter__():
+            self.drawn += 1
+            yield index
+
+
+def test_limited_batch_resampler_resumes_without_replaying():
+    def batches(sampler, start_iter):
+        return list(
+            LimitedBatchResampler(
+                BatchSampler(sampler, 8, drop_last=False),
+                num_iterations=40,
+                start_iter=start_iter,
+            )
+        )
+
+    from_start = CountingSampler(range(100), num_replicas=2, rank=0)
+    expected = batches(from_start, 0)
+    for start_iter in (3, 7, 13, 21):
+        sampler = CountingSampler(range(100), num_replicas=2, rank=0)
+        assert batches(sampler, start_iter) == expected[start_iter:]
+        assert from_start.drawn - sampler.drawn == sum(
+            len(b) for b in expected[:start_iter]
+        )  # the batches before start_iter are not drawn at all
+
+    sequential = batches(SequentialSampler(range(50)), 0)
+    assert batches(SequentialSampler(range(50)), 10) == sequential[10:]
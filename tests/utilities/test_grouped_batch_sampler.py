@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import numpy
+import pytest
+import torch
+from PIL import Image
+from draugr.torch_utilities import Split
+from torch.utils.data import ConcatDataset, RandomSampler, Subset
+from torch.utils.data.sampler import BatchSampler, SequentialSampler
+
+from neodroidvision.data.segmentation import PennFudanDataset
+from neodroidvision.utilities import (
+    DistributedSampler,
+    GroupedBatchSampler,
+    LimitedBatchResampler,
+    aspect_ratio_group_ids,
+    batch_padding_ratio,
+    image_sizes,
+)
+
+
+class SizedImages:
+    def __init__(self, num_images: int = 50, as_dict: bool = False):
+        rng = numpy.random.RandomState(0)
+        self.sizes = [
+            (375, 500) if rng.rand() < 0.6 else (500, 333) for _ in range(num_images)
+        ]
+        self.as_dict = as_dict
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def get_img_info(self, index):
+        height, width = self.sizes[index]
+        if self.as_dict:
+            return {"height": height, "width": width, "file_name": f"{index}.jpg"}
+        return height, width
+
+
+def test_image_sizes_look_through_subsets_and_concatenations():
+    dataset = SizedImages()
+    sizes = image_sizes(dataset)
+    assert sizes.shape == (50, 2) and tuple(sizes[0]) == dataset.sizes[0]
+    numpy.testing.assert_array_equal(image_sizes(SizedImages(as_dict=True)), sizes)
+    numpy.testing.assert_array_equal(
+        image_sizes(Subset(dataset, [3, 1])), sizes[[3, 1]]
+    )
+    numpy.testing.assert_array_equal(
+        image_sizes(ConcatDataset([dataset, Subset(dataset, [2])])),
+        numpy.concatenate([sizes, sizes[[2]]]),
+    )
+    assert aspect_ratio_group_ids(sizes).tolist() == [
+        int(w > h) for h, w in dataset.sizes
+    ]
+
+
+def test_penn_fudan_image_sizes(synthetic_penn_fudan_root):
+    dataset = PennFudanDataset(synthetic_penn_fudan_root, Split.Testing)
+    path = synthetic_penn_fudan_root / "PNGImages" / dataset.imgs[1]
+    assert dataset.get_img_info(1) == Image.open(path).size[::-1]
+    assert image_sizes(dataset).shape == (len(dataset), 2)
+
+
+def test_len_does_not_iterate_the_sampler():
+    dataset = SizedImages()
+    group_ids = aspect_ratio_group_ids(image_sizes(dataset))
+
+    torch.manual_seed(0)
+    sampler = GroupedBatchSampler(RandomSampler(range(len(dataset))), group_ids, 8)
+    assert len(sampler) == sum(-(-numpy.bincount(group_ids) // 8))
+    torch.manual_seed(0)
+    expected = list(RandomSampler(range(len(dataset))))
+    torch.manual_seed(0)
+    len(sampler)
+    assert list(sampler.sampler) == expected
+
+    distributed = DistributedSampler(dataset, num_replicas=2, rank=1)
+    distributed.load_state_dict({"seed": 0, "epoch": 3, "offset": 5})
+    grouped = GroupedBatchSampler(distributed, group_ids, 4)
+    assert distributed.state_dict()["offset"] == 5
+    numpy.testing.assert_array_equal(distributed.epoch_indices()[5:], list(distributed))
+    assert len(grouped) == sum(
+        -(-numpy.bincount(group_ids[distributed.epoch_indices()]) // 4)
+    )
+
+
+def test_batches_are_grouped_and_cover_the_sampler():
+    dataset = SizedImages()
+    sizes = image_sizes(dataset)
+    group_ids = aspect_ratio_group_ids(sizes)
+    sampler = GroupedBatchSampler(
+        RandomSampler(range(len(dataset))), group_ids, 8, sizes=sizes
+    )
+
+    batches = list(sampler)
+    assert len(batches) == len(sampler)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(dataset)))
+    for batch in batches:
+        assert len(set(group_ids[batch])) == 1
+    assert sampler.padding_ratio() == 0
+
+    torch.manual_seed(1)
+    ungrouped_sampler = GroupedBatchSampler(
+        RandomSampler(range(len(dataset))), numpy.zeros(len(dataset)), 8, sizes=sizes
+    )
+    epochs = [
+        [batch_padding_ratio(sizes[batch]) for batch in ungrouped_sampler]
+        for _ in range(2)
+    ]
+    assert numpy.mean(epochs[0]) != pytest.approx(numpy.mean(epochs[1]))
+    assert ungrouped_sampler.padding_ratio() == pytest.approx(numpy.mean(epochs[1]))
+
+    ungrouped = [
+        batch_padding_ratio(sizes[batch])
+        for batch in BatchSampler(RandomSampler(range(len(dataset))), 8, False)
+    ]
+    assert numpy.mean(ungrouped) > 0.2
+
+    dropped = GroupedBatchSampler(SequentialSampler(dataset), group_ids, 8, True)
+    assert len(list(dropped)) == len(dropped) == sum(numpy.bincount(group_ids) // 8)
+    assert all(len(batch) == 8 for batch in dropped)
+
+
+def test_distributed_limited_grouped_batches():
+    dataset = SizedImages()
+    group_ids = aspect_ratio_group_ids(image_sizes(dataset))
+
+    ranks = []
+    for rank in range(2):
+        sampler = DistributedSampler(dataset, num_replicas=2, rank=rank)
+        ranks.append(
+            list(
+                LimitedBatchResampler(
+                    GroupedBatchSampler(sampler, group_ids, 4), num_iterations=20
+                )
+            )
+        )
+
+    for batches in ranks:
+        assert len(batches) == 20
+        for batch in batches:
+            assert len(set(group_ids[batch])) == 1
+    epoch_indices = [i for rank in ranks for batch in rank[:7] for i in batch]
+    assert set(epoch_indices) == set(range(len(dataset)))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import numpy
+import torch
+from PIL import Image
+from draugr.torch_utilities import Split
+
+from neodroidvision.data.segmentation import PennFudanDataset
+from neodroidvision.detection.single_stage.ssd.bounding_boxes import SSDTransform
+from neodroidvision.utilities import InputNormalisation, ToUint8Tensor
+
+PIXEL_MEAN = (123, 117, 104)
+
+
+def test_uint8_transport_matches_worker_normalisation():
+    image = numpy.random.RandomState(0).randint(0, 255, (61, 47, 3)).astype("uint8")
+    boxes = numpy.array([[3.0, 4.0, 30.0, 40.0]], numpy.float32)
+    labels = numpy.array([1])
+
+    expected, expected_boxes, _ = SSDTransform(32, PIXEL_MEAN, Split.Testing)(
+        image, boxes.copy(), labels
+    )
+    uint8, uint8_boxes, _ = SSDTransform(
+        32, PIXEL_MEAN, Split.Testing, uint8_transport=True
+    )(image, boxes.copy(), labels)
+    assert uint8.dtype == torch.uint8 and uint8.shape == expected.shape
+
+    normalisation = InputNormalisation(mean=PIXEL_MEAN)
+    torch.testing.assert_allclose(normalisation(uint8[None])[0], expected)
+    numpy.testing.assert_array_equal(uint8_boxes, expected_boxes)
+
+    # already normalised batches pass through
+    assert normalisation(expected) is expected
+    assert len(normalisation.state_dict()) == 0
+
+
+def test_augmented_images_are_rounded_and_clipped():
+    image = numpy.array([[[-3.2, 12.6, 300.0]]], numpy.float32)
+    assert ToUint8Tensor()(image).view(-1).tolist() == [0, 13, 255]
+
+
+def test_penn_fudan_uint8_transport(tmp_path):
+    rng = numpy.random.RandomState(0)
+    (tmp_path / "PNGImages").mkdir()
+    (tmp_path / "PedMasks").mkdir()
+    for i in range(2):
+        Image.fromarray(rng.randint(0, 255, (300, 280, 3)).astype("uint8")).save(
+            tmp_path / "PNGImages" / f"{i}.png"
+        )
+        Image.fromarray(rng.randint(0, 3, (300, 280)).astype("uint8")).save(
+            tmp_path / "PedMasks" / f"{i}_mask.png"
+        )
+
+    floats = PennFudanDataset(tmp_path, Split.Testing)
+    uint8s = PennFudanDataset(tmp_path, Split.Testing, uint8_transport=True)
+    normalisation = InputNormalisation(scale=1 / 255)
+    for i in range(len(floats)):
+        image, mask = floats[i]
+        uint8_image, uint8_mask = uint8s[i]
+        assert uint8_image.dtype == torch.uint8 and uint8_mask.dtype == torch.uint8
+        torch.testing.assert_allclose(normalisation(uint8_image[None])[0], image)
+        torch.testing.assert_allclose(uint8_mask.float(), mask)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+import torch
+import torchvision
+
+from neodroidvision.utilities.torch_utilities.non_maximum_suppression import (
+    available_nms_backends,
+    batched_non_maximum_suppression,
+    matrix_nms_decay,
+    tensor_batched_nms,
+)
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+
+def random_candidates(n: int, num_categories: int = 5, seed: int = 0):
+    g = torch.Generator().manual_seed(seed)
+    xy = torch.rand((n, 2), generator=g) * 200
+    wh = torch.rand((n, 2), generator=g) * 60 + 4
+    boxes = torch.cat((xy, xy + wh), 1)
+    scores = torch.rand(n, generator=g)
+    idxs = torch.randint(num_categories, (n,), generator=g)
+    return boxes, scores, idxs
+
+
+def test_backends_registered():
+    assert {"tensor", "fast", "matrix"} <= set(available_nms_backends())
+    with pytest.raises(ValueError):
+        batched_non_maximum_suppression(*random_candidates(4), 0.5, backend="nope")
+
+
+@pytest.mark.parametrize("n", [0, 1, 50, 1000])
+@pytest.mark.parametrize("iou_threshold", [0.3, 0.5, 0.7])
+def test_tensor_backend_is_exact(n, iou_threshold):
+    boxes, scores, idxs = random_candidates(n, seed=n)
+    reference = torchvision.ops.batched_nms(boxes, scores, idxs, iou_threshold)
+    assert torch.equal(
+        batched_non_maximum_suppression(
+            boxes, scores, idxs, iou_threshold, backend="tensor"
+        ),
+        reference,
+    )
+
+
+def test_tensor_backend_scripts():
+    boxes, scores, idxs = random_candidates(300)
+    scripted = torch.jit.script(tensor_batched_nms)
+    assert torch.equal(
+        scripted(boxes, scores, idxs, 0.5), tensor_batched_nms(boxes, scores, idxs, 0.5)
+    )
+
+
+def test_fast_backend_keeps_subset_of_exact():
+    boxes, scores, idxs = random_candidates(1000)
+    exact = set(tensor_batched_nms(boxes, scores, idxs, 0.5).tolist())
+    fast = batched_non_maximum_suppression(boxes, scores, idxs, 0.5, backend="fast")
+    assert set(fast.tolist()) <= exact
+    assert (scores[fast][1:] <= scores[fast][:-1]).all()
+
+
+def test_matrix_backend():
+    boxes = torch.tensor(
+        [[0, 0, 10, 10], [0, 0, 10, 10.5], [20, 20, 30, 30], [0, 0, 10, 10]],
+        dtype=torch.float,
+    )
+    scores = torch.tensor([0.9, 0.8, 0.7, 0.6])
+    idxs = torch.tensor([0, 0, 0, 1])
+
+    decay = matrix_nms_decay(boxes, scores, idxs)
+    assert decay[0] == 1 and decay[2] == 1 and decay[3] == 1
+    assert decay[1] < 0.3
+
+    keep = batched_non_maximum_suppression(boxes, scores, idxs, 0.5, backend="matrix")
+    assert keep.tolist() == [0, 2, 3]
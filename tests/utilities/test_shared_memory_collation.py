@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import numpy
+import torch
+from torch.utils.data import DataLoader, Dataset
+
+from neodroidvision.utilities import (
+    BatchCollator,
+    PinnedBatchLoader,
+    SharedMemoryBatchCollator,
+)
+
+
+class VaryingTargets(Dataset):
+    def __init__(self, num_samples: int = 24, max_targets: int = 3):
+        self.num_samples = num_samples
+        self.max_targets = max_targets
+
+    def __len__(self):
+        return self.num_samples
+
+    def __getitem__(self, index):
+        rng = numpy.random.RandomState(index)
+        num_targets = 1 + index % self.max_targets
+        image = torch.from_numpy(rng.randint(0, 255, (3, 8, 10)).astype(numpy.uint8))
+        boxes = rng.rand(num_targets, 4).astype(numpy.float32)
+        labels = rng.randint(1, 20, num_targets)
+        return image, dict(boxes=boxes, labels=labels), index
+
+
+def batches(data_loader):
+    return [
+        (
+            images.clone(),
+            {key: targets[key].clone() for key in targets},
+            img_ids.clone(),
+        )
+        for images, targets, img_ids in data_loader
+    ]
+
+
+def assert_batches_equal(actual, expected):
+    assert len(actual) == len(expected)
+    for (images, targets, img_ids), (e_images, e_targets, e_img_ids) in zip(
+        actual, expected
+    ):
+        assert torch.equal(images, e_images) and torch.equal(img_ids, e_img_ids)
+        assert targets.keys() == e_targets.keys()
+        for key in targets:
+            assert torch.equal(targets[key], e_targets[key])
+
+
+def test_matches_batch_collator_and_reuses_slots():
+    dataset = VaryingTargets()
+    expected = batches(
+        DataLoader(dataset, batch_size=4, collate_fn=BatchCollator(padded=True))
+    )
+
+    loader = PinnedBatchLoader(
+        DataLoader(
+            dataset,
+            batch_size=4,
+            num_workers=2,
+            persistent_workers=True,
+            collate_fn=SharedMemoryBatchCollator(
+                padded=True, num_workers=2, slots_per_worker=2
+            ),
+        )
+    )
+    for epoch in range(2):
+        assert_batches_equal(batches(loader), expected)
+
+    statistics = loader.statistics()
+    # images, img_ids and three padded targets per slot, in two slots of two workers, once
+    assert statistics["shared_allocations"] == 2 * 2 * 5
+    assert statistics["shared_reuses"] == 2 * len(loader) * 5 - 2 * 2 * 5
+
+    iterator = iter(loader)
+    next(iterator)
+    iterator.close()  # abandoned, the batches in flight are discarded
+    assert_batches_equal(batches(loader), expected)
+    assert loader.statistics()["shared_allocations"] == 2 * 2 * 5
+
+
+def test_padded_capacity_grows_on_overflow():
+    collator = SharedMemoryBatchCollator(padded=True, slots_per_worker=2)
+    loader = PinnedBatchLoader(
+        DataLoader(VaryingTargets(max_targets=40), batch_size=8, collate_fn=collator)
+    )
+    expected = batches(
+        DataLoader(
+            VaryingTargets(max_targets=40),
+            batch_size=8,
+            collate_fn=BatchCollator(padded=True),
+        )
+    )
+    assert_batches_equal(batches(loader), expected)
+
+    allocations = loader.statistics()["shared_allocations"]
+    assert allocations > 2 * 5  # 8, 16 then 24 targets do not fit in 16 capacity slots
+    batches(loader)
+    assert loader.statistics()["shared_allocations"] == allocations
+
+
+def test_wrapped_and_unwrapped_targets():
+    dataset = VaryingTargets(max_targets=1)
+    for wrap in (True, False):
+        expected = DataLoader(
+            dataset, batch_size=6, collate_fn=BatchCollator(wrap=wrap)
+        )
+        loader = PinnedBatchLoader(
+            DataLoader(
+                dataset, batch_size=6, collate_fn=SharedMemoryBatchCollator(wrap=wrap),
+            )
+        )
+        for (images, targets, img_ids), (e_images, e_targets, e_img_ids) in zip(
+            loader, expected
+        ):
+            assert torch.equal(images, e_images) and torch.equal(img_ids, e_img_ids)
+            if wrap:
+                for key in ("boxes", "labels"):
+                    assert torch.equal(targets[key], e_targets[key])
+            else:
+                assert targets is None and e_targets is None
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+import json
+import time
+
+import numpy
+import torch
+
+from neodroidvision.utilities import (
+    MetricLogger,
+    QuantileSketch,
+    SmoothedValue,
+    StageProfiler,
+    batched_non_maximum_suppression,
+    default_stage_profiler,
+)
+
+
+class ScalarRecorder:
+    def __init__(self):
+        self.scalars = {}
+
+    def add_scalar(self, tag, value, global_step=None):
+        self.scalars[tag] = (value, global_step)
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    values = numpy.random.RandomState(0).lognormal(-5, 1.5, 10000)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(float(value))
+    for q in (0.5, 0.95):
+        expected = numpy.quantile(values, q, interpolation="lower")
+        assert abs(sketch.quantile(q) - expected) <= 0.011 * expected
+    assert len(sketch.counts) == 2048
+
+
+def test_stages_and_exports(tmp_path):
+    profiler = StageProfiler(enabled=True, ema_factor=0.5)
+    for duration in (0.001, 0.003):
+        profiler.record("data", duration)
+    for _ in profiler.iterate("wait", range(3)):
+        with profiler.stage("forward"):
+            time.sleep(0.002)
+
+    @profiler.timed("decorated")
+    def add(a, b):
+        return a + b
+
+    assert add(1, b=2) == 3
+
+    data = profiler.stages["data"]
+    assert data.count == 2 and data.ema == 0.002 and data.last == 0.003
+    assert profiler.stages["wait"].count == 3
+    forward = profiler.stages["forward"]
+    assert forward.count == 3 and forward.total >= 0.006 and forward.p50 >= 0.0019
+    assert profiler.stages["decorated"].count == 1
+
+    writer = ScalarRecorder()
+    profiler.write_tensorboard(writer, 7)
+    assert writer.scalars["stages/data/ema"] == (0.002, 7)
+    assert "stages/forward/p95" in writer.scalars
+
+    profiler.write_jsonl(tmp_path / "stages.jsonl", 1)
+    profiler.write_jsonl(tmp_path / "stages.jsonl", 2, rank=0)
+    lines = [
+        json.loads(l) for l in (tmp_path / "stages.jsonl").read_text().splitlines()
+    ]
+    assert [l["step"] for l in lines] == [1, 2] and lines[1]["rank"] == 0
+    assert lines[0]["stages"]["data"]["count"] == 2
+    assert "forward:" in str(profiler)
+
+
+def test_disabled_timer_overhead():
+    profiler = StageProfiler()
+    n = 100000
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(n):
+            with profiler.stage("forward"):
+                pass
+        best = min(best, (time.perf_counter() - start) / n)
+    assert best < 1e-6
+    assert not profiler.stages
+
+
+def test_metric_logger_profiles_library_stages():
+    meters = MetricLogger()
+    assert meters.profiler is default_stage_profiler()
+    meters.profiler.enabled = True
+    try:
+        with meters.stage("forward"):
+            batched_non_maximum_suppression(
+                torch.rand(8, 4) + torch.tensor([0, 0, 1, 1.0]),
+                torch.rand(8),
+                torch.zeros(8, dtype=torch.int64),
+                0.5,
+            )
+        for _ in meters.log_every(range(2), 10):
+            pass
+        for _ in MetricLogger().log_every(range(3), 10, header="Test:"):
+            pass
+        assert {"forward", "nms", "data", "Test: data"} <= set(meters.profiler.stages)
+        assert meters.profiler.stages["data"].count == 2
+        assert meters.profiler.stages["Test: data"].count == 3
+    finally:
+        meters.profiler.enabled = False
+        meters.profiler.reset()
+
+
+def test_smoothed_value_median_matches_torch():
+    value = SmoothedValue(window_size=6)
+    for v in (5, 1, 4, 2, 3, 6, 0.5):
+        value.update(v)
+    window = torch.tensor(list(value.deque))
+    assert value.median == window.median().item()
+    assert abs(value.avg - window.mean().item()) < 1e-6
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "Christian Heider Nielsen"
+__doc__ = r"""
+
+           Created on 18/10/2026
+           """
+
+from collections import namedtuple
+
+import numpy
+import torch
+import torch.multiprocessing
+from torch import distributed
+
+from neodroidvision.utilities import all_gather_data, pack_data, unpack_data
+
+Prediction = namedtuple("Prediction", ("boxes", "labels", "scores"))
+
+
+def rank_data(rank: int) -> dict:
+    rng = numpy.random.RandomState(rank)
+    eval_imgs = numpy.empty((2, 1, 2), dtype=object)
+    eval_imgs[0, 0, 0] = None
+    for i in range(1, 4):
+        eval_imgs.reshape(-1)[i] = {
+            "image_id": 10 * rank + i,
+            "dtMatches": rng.rand(10, 3 + rank),
+            "gtIgnore": rng.rand(2 + i) > 0.5,
+            "dtScores": [0.5, 0.25],
+        }
+    return {
+        "predictions": {
+            10 * rank
+            + i: Prediction(
+                torch.rand(i + rank, 4),
+                torch.arange(i + rank),
+                torch.rand(i + rank, dtype=torch.float64),
+            )
+            for i in range(3)
+        },
+        "eval_imgs": eval_imgs,
+        "mask": torch.rand(5, 7 * (rank + 1)) > 0.5,
+        "complex": torch.randn(3, dtype=torch.complex128),
+        "empty": torch.zeros(0, 4, dtype=torch.int16),
+        "uint16": numpy.arange(3, dtype=numpy.uint16),
+        "name": f"rank {rank}",
+    }
+
+
+def assert_equal(actual, expected):
+    assert type(actual) is type(expected)
+    if isinstance(expected, torch.Tensor):
+        assert actual.dtype == expected.dtype and torch.equal(actual, expected)
+    elif isinstance(expected, numpy.ndarray):
+        assert actual.dtype == expected.dtype and actual.shape == expected.shape
+        if expected.dtype == object:
+            for a, e in zip(actual.reshape(-1), expected.reshape(-1)):
+                assert_equal(a, e)
+        else:
+            numpy.testing.assert_array_equal(actual, expected)
+    elif isinstance(expected, dict):
+        assert actual.keys() == expected.keys()
+        for key in expected:
+            assert_equal(actual[key], expected[key])
+    elif isinstance(expected, (list, tuple)):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            assert_equal(a, e)
+    else:
+        assert actual == expected
+
+
+def test_pack_round_trip():
+    torch.manual_seed(0)
+    data = rank_data(1)
+    payload, skeleton_offset = pack_data(data)
+    assert payload.dtype == torch.uint8
+    assert_equal(unpack_data(payload, skeleton_offset), data)
+
+    # the leaves are sent as raw bytes, only the skeleton is pickled
+    assert payload.numel() - skeleton_offset < 4096
+    assert skeleton_offset >= sum(
+        t.numel() * t.element_size() for t in data["predictions"][12]
+    )
+
+
+def gather_worker(rank: int, world_size: int, init_file: str) -> None:
+    distributed.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        torch.manual_seed(rank)
+        gathered = all_gather_data(rank_data(rank), chunk_bytes=100)
+        assert len(gathered) == world_size
+        for other in range(world_size):
+            torch.manual_seed(other)
+            assert_equal(gathered[other], rank_data(other))
+    finally:
+        distributed.destroy_process_group()
+
+
+def test_all_gather_data_gloo(tmp_path):
+    torch.multiprocessing.spawn(
+        gather_worker, args=(3, str(tmp_path / "init")), nprocs=3, join=True
+    )